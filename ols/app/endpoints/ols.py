@@ -40,7 +40,7 @@ from ols.src.quota.quota_limiter import QuotaLimiter
 from ols.src.quota.token_usage_history import TokenUsageHistory
 from ols.utils import errors_parsing, suid
 from ols.utils.audit_logger import AuditContext, AuditLogger
-from ols.utils.token_handler import PromptTooLongError
+from ols.utils.token_handler import PromptTooLongError, TokenHandler
 
 logger = logging.getLogger(__name__)
 
@@ -645,6 +645,8 @@ def store_conversation_history(
                 tool_calls=tool_calls or [],
                 tool_results=tool_results or [],
             )
+            # counted once here, history budgeting of next turns reuses the counts
+            TokenHandler().count_entry_tokens(cache_entry)
             config.conversation_cache.insert_or_append(
                 user_id,
                 conversation_id,
@@ -2,6 +2,7 @@
 
 import logging
 from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, Response
 from starlette.datastructures import Headers
@@ -14,6 +15,14 @@ from ols.constants import SERVICE_NAME
 from ols.src.config_status import extract_config_status, store_config_status
 from ols.src.tools.offloaded_content import cleanup_offload_storage
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
+    """Save embedding snapshots and close pooled connections on shutdown."""
+    yield
+    await config.close_clients()
+
+
 app = FastAPI(
     title=f"Swagger {SERVICE_NAME} service - OpenAPI",
     description=f"{SERVICE_NAME} service API specification.",
@@ -22,6 +31,7 @@ app = FastAPI(
         "name": "Apache 2.0",
         "url": "https://www.apache.org/licenses/LICENSE-2.0.html",
     },
+    lifespan=lifespan,
 )
 
 
@@ -9,6 +9,7 @@ from .metrics import (
     llm_token_received_total,
     llm_token_sent_total,
     provider_model_configuration,
+    query_preparation_stage_duration_seconds,
     response_duration_seconds,
     rest_api_calls_total,
     setup_model_metrics,
@@ -26,6 +27,7 @@ __all__ = [
     "llm_token_received_total",
     "llm_token_sent_total",
     "provider_model_configuration",
+    "query_preparation_stage_duration_seconds",
     "response_duration_seconds",
     "rest_api_calls_total",
     "setup_model_metrics",
@@ -75,6 +75,13 @@ gen_ai_execute_tool_duration_seconds = Histogram(
     buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 45, 60, 90, 120),
 )
 
+query_preparation_stage_duration_seconds = Histogram(
+    "ols_query_preparation_stage_duration_seconds",
+    "Durations of query preparation stages run before the first LLM call",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
 # metric that indicates what provider + model customers are using so we can
 # understand what is popular/important
 provider_model_configuration = Gauge(
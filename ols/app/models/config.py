@@ -226,6 +226,8 @@ class AuthenticationConfig(BaseModel):
     skip_tls_verification: bool = False
     k8s_cluster_api: Optional[AnyHttpUrl] = None
     k8s_ca_cert_path: Optional[FilePath] = None
+    cache_ttl: float = constants.K8S_AUTH_CACHE_TTL
+    negative_cache_ttl: float = constants.K8S_AUTH_NEGATIVE_CACHE_TTL
 
     def validate_yaml(self) -> None:
         """Validate YAML containing authentication configuration section."""
@@ -236,6 +238,14 @@ class AuthenticationConfig(BaseModel):
                 f"invalid authentication module: {self.module}, supported modules are"
                 f" {constants.SUPPORTED_AUTHENTICATION_MODULES}"
             )
+        if self.cache_ttl < 0:
+            raise checks.InvalidConfigurationError(
+                "The cache_ttl needs to be a non-negative number"
+            )
+        if self.negative_cache_ttl < 0:
+            raise checks.InvalidConfigurationError(
+                "The negative_cache_ttl needs to be a non-negative number"
+            )
 
 
 class TLSSecurityProfile(BaseModel):
@@ -720,6 +730,16 @@ class ToolFilteringConfig(BaseModel):
         description="Minimum similarity threshold for filtering results",
     )
 
+    backend: constants.HybridRAGBackend = Field(
+        default=constants.HybridRAGBackend.QDRANT,
+        description="Vector store of tool embeddings: qdrant or numpy",
+    )
+
+    snapshot_dir: Optional[str] = Field(
+        default=None,
+        description="Directory of the tool embedding snapshot reused on restart",
+    )
+
 
 class SkillsConfig(BaseModel):
     """Configuration for skill selection using hybrid RAG retrieval.
@@ -746,6 +766,67 @@ class SkillsConfig(BaseModel):
         description="Minimum similarity score to accept a skill match",
     )
 
+    backend: constants.HybridRAGBackend = Field(
+        default=constants.HybridRAGBackend.QDRANT,
+        description="Vector store of skill embeddings: qdrant or numpy",
+    )
+
+    snapshot_dir: Optional[str] = Field(
+        default=None,
+        description="Directory of the skill embedding snapshot reused on restart",
+    )
+
+
+class EmbeddingBatchingConfig(BaseModel):
+    """Configuration of batching of texts embedded concurrently.
+
+    Texts embedded at the same time, e.g. queries of concurrent requests, are
+    encoded together in one forward pass of the embedding model.
+    """
+
+    max_batch_size: int = Field(
+        default=constants.EMBEDDING_BATCH_MAX_SIZE,
+        ge=1,
+        le=256,
+        description="Maximum number of texts encoded in one batch",
+    )
+
+    max_wait_ms: float = Field(
+        default=constants.EMBEDDING_BATCH_MAX_WAIT_MS,
+        ge=0.0,
+        le=1000.0,
+        description="Maximum time in milliseconds to wait for more texts to batch",
+    )
+
+
+class RetrievalCacheConfig(BaseModel):
+    """Configuration of the semantic cache of RAG retrieval results.
+
+    If this config is present, nodes retrieved for a query are served for
+    following queries with similar enough embeddings. If absent, vector
+    indexes are searched for every query.
+    """
+
+    similarity_threshold: float = Field(
+        default=constants.RAG_RETRIEVAL_CACHE_SIMILARITY_THRESHOLD,
+        ge=0.0,
+        le=1.0,
+        description="Minimum cosine similarity of query embeddings for a cache hit",
+    )
+
+    ttl_seconds: float = Field(
+        default=constants.RAG_RETRIEVAL_CACHE_TTL_SECONDS,
+        gt=0.0,
+        description="Time in seconds cached nodes are served for",
+    )
+
+    max_entries: int = Field(
+        default=constants.RAG_RETRIEVAL_CACHE_MAX_ENTRIES,
+        ge=1,
+        le=10000,
+        description="Maximum number of cached retrievals",
+    )
+
 
 class ApprovalType(StrEnum):
     """Approval strategy for tool execution."""
@@ -807,7 +888,14 @@ class PostgresConfig(BaseModel):
     gss_encmode: str = constants.POSTGRES_CACHE_GSSENCMODE
     ca_cert_path: Optional[FilePath] = None
     max_entries: PositiveInt = constants.POSTGRES_CACHE_MAX_ENTRIES
+    local_cache_max_conversations: int = (
+        constants.POSTGRES_CACHE_LOCAL_MAX_CONVERSATIONS
+    )
     tls_security_profile: Optional["TLSSecurityProfile"] = None
+    pool_min_size: int = constants.POSTGRES_POOL_MIN_SIZE
+    pool_max_size: PositiveInt = constants.POSTGRES_POOL_MAX_SIZE
+    pool_timeout: float = constants.POSTGRES_POOL_TIMEOUT
+    pool_health_check_interval: float = constants.POSTGRES_POOL_HEALTH_CHECK_INTERVAL
 
     def __init__(self, **data: Any) -> None:
         """Initialize configuration."""
@@ -822,6 +910,20 @@ class PostgresConfig(BaseModel):
         """Validate Postgres cache config."""
         if not 0 < self.port < 65536:
             raise ValueError("The port needs to be between 0 and 65536")
+        if not 0 <= self.pool_min_size <= self.pool_max_size:
+            raise ValueError(
+                "The pool_min_size needs to be between 0 and pool_max_size"
+            )
+        if self.local_cache_max_conversations < 0:
+            raise ValueError(
+                "The local_cache_max_conversations needs to be a non-negative number"
+            )
+        if self.pool_timeout <= 0:
+            raise ValueError("The pool_timeout needs to be a positive number")
+        if self.pool_health_check_interval < 0:
+            raise ValueError(
+                "The pool_health_check_interval needs to be a non-negative number"
+            )
         return self
 
 
@@ -1004,6 +1106,8 @@ class ReferenceContent(BaseModel):
     """
 
     indexes: Optional[list[ReferenceContentIndex]] = None
+    # load FAISS vectors and docstores memory-mapped instead of into memory
+    memory_mapped: bool = False
 
     def __init__(self, data: Optional[dict] = None) -> None:
         """Initialize configuration and perform basic validation."""
@@ -1015,6 +1119,7 @@ class ReferenceContent(BaseModel):
             self.indexes = [ReferenceContentIndex(i) for i in data["indexes"]]
         else:
             self.indexes = None
+        self.memory_mapped = data.get("memory_mapped", False)
 
     def validate_yaml(self) -> None:
         """Validate reference content config."""
@@ -1027,7 +1132,8 @@ class SolrHybridSettings(BaseModel):
     """Pydantic container for Solr hybrid RAG (portal-rag ``/hybrid-search``).
 
     Holds the Solr HTTP base URL, ranked hit count, optional ``fq`` filter, hybrid
-    rerank pool and vector weight, optional post-score cutoff, and HTTP client timeout.
+    rerank pool and vector weight, optional post-score cutoff, HTTP client timeout
+    and connection pool limits.
 
     Presence of the ``solr_hybrid`` section in the config enables the feature;
     omit the section entirely to disable it.
@@ -1089,6 +1195,30 @@ class SolrHybridSettings(BaseModel):
             "matched chunk during chunk expansion. ``0`` disables expansion."
         ),
     )
+    http_max_connections: int = Field(
+        default=20,
+        ge=1,
+        le=500,
+        description="Maximum number of pooled HTTP connections to Solr.",
+    )
+    http_max_keepalive_connections: int = Field(
+        default=10,
+        ge=0,
+        le=500,
+        description="Maximum number of idle connections to Solr kept alive.",
+    )
+    http_keepalive_expiry_s: float = Field(
+        default=60.0,
+        ge=0.0,
+        description="Seconds an idle connection to Solr is kept alive.",
+    )
+    http2: bool = Field(
+        default=True,
+        description=(
+            "Negotiate HTTP/2 with Solr when the ``h2`` package is installed; "
+            "HTTP/2 is used only over TLS (``https`` base URL)."
+        ),
+    )
 
     def validate_yaml(self) -> None:
         """Validate Solr hybrid settings."""
@@ -1257,6 +1387,10 @@ class OLSConfig(BaseModel):
 
     solr_hybrid: Optional[SolrHybridSettings] = None
 
+    embedding_batching: EmbeddingBatchingConfig = EmbeddingBatchingConfig()
+
+    retrieval_cache: Optional[RetrievalCacheConfig] = None
+
     tool_round_cap_fraction: float = constants.DEFAULT_TOOL_ROUND_CAP_FRACTION
 
     offload_storage_path: str = constants.DEFAULT_OFFLOAD_STORAGE_PATH
@@ -1319,6 +1453,11 @@ class OLSConfig(BaseModel):
             self.solr_hybrid = SolrHybridSettings(**data.get("solr_hybrid"))
 
         self.audit = AuditConfig(**data.get("audit", {}))
+        self.embedding_batching = EmbeddingBatchingConfig(
+            **data.get("embedding_batching", {})
+        )
+        if data.get("retrieval_cache", None) is not None:
+            self.retrieval_cache = RetrievalCacheConfig(**data.get("retrieval_cache"))
 
         raw_cap = data.get(
             "tool_round_cap_fraction", constants.DEFAULT_TOOL_ROUND_CAP_FRACTION
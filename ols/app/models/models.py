@@ -814,6 +814,10 @@ class CacheEntry(BaseModel):
         attachments: List of attachments included in the query.
         tool_calls: List of tool calls made during the response generation.
         tool_results: List of tool results from the tool calls.
+        query_tokens: Token count of the query in conversation history, None
+            when it has not been counted yet.
+        response_tokens: Token count of the response in conversation history,
+            None when it has not been counted yet.
     """
 
     query: HumanMessage
@@ -821,6 +825,8 @@ class CacheEntry(BaseModel):
     attachments: list[Attachment] = []
     tool_calls: list[dict] = []
     tool_results: list[dict] = []
+    query_tokens: Optional[int] = None
+    response_tokens: Optional[int] = None
 
     @field_validator("response")
     @classmethod
@@ -832,13 +838,19 @@ class CacheEntry(BaseModel):
 
     def to_dict(self) -> dict:
         """Convert the cache entry to a dictionary."""
-        return {
+        data: dict[str, Any] = {
             "human_query": self.query,
             "ai_response": self.response,
             "attachments": [attachment.model_dump() for attachment in self.attachments],
             "tool_calls": self.tool_calls,
             "tool_results": self.tool_results,
         }
+        # token counts are stored only once they are known
+        if self.query_tokens is not None:
+            data["query_tokens"] = self.query_tokens
+        if self.response_tokens is not None:
+            data["response_tokens"] = self.response_tokens
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> Self:
@@ -851,6 +863,9 @@ class CacheEntry(BaseModel):
             ],
             tool_calls=data.get("tool_calls", []),
             tool_results=data.get("tool_results", []),
+            # entries stored by older versions are counted on their next use
+            query_tokens=data.get("query_tokens"),
+            response_tokens=data.get("response_tokens"),
         )
 
     @staticmethod
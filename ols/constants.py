@@ -48,6 +48,13 @@ class QueryMode(StrEnum):
     TROUBLESHOOTING = "troubleshooting"
 
 
+class HybridRAGBackend(StrEnum):
+    """Vector stores of hybrid RAG used for tool filtering and skill selection."""
+
+    QDRANT = "qdrant"
+    NUMPY = "numpy"
+
+
 class GenericLLMParameters:
     """Generic LLM parameters that can be mapped into LLM provider-specific parameters."""
 
@@ -87,6 +94,10 @@ DEFAULT_TOKENIZER_MODEL = "cl100k_base"
 # Example: 1.05 means we increase by 5%.
 TOKEN_BUFFER_WEIGHT = 1.1
 
+# Maximum number of token counts memoized by TokenHandler, shared by all
+# instances; a system prompt or a history message is counted once per process
+TOKEN_COUNT_CACHE_MAX_ENTRIES = 4096
+
 # Fraction of context window reserved for tool outputs when MCP servers or
 # Solr hybrid search is configured. Computed as int(context_window_size * ratio) at startup.
 DEFAULT_TOOL_BUDGET_RATIO = 0.5
@@ -123,10 +134,38 @@ RAG_CONTENT_LIMIT = 5
 # Range: 0 to 1
 RAG_SIMILARITY_CUTOFF = 0.3
 
+# Node metadata key holding the exact token count of the node text formatted as
+# RAG context, counted with DEFAULT_TOKENIZER_MODEL. It is stored in nodes when the
+# index is built or when its docstore is converted to the memory-mapped copy; nodes
+# without it are counted when they are retrieved.
+RAG_NODE_TOKEN_COUNT_KEY = "ols_chunk_token_count"  # noqa: S105
+
+# number of threads running blocking vector index searches off the event loop;
+# indexes of one query are searched concurrently
+RAG_RETRIEVAL_MAX_WORKERS = 4
+
+# Semantic cache of RAG retrieval results: a cached retrieval is served for a
+# query whose embedding has at least this cosine similarity to the cached one
+RAG_RETRIEVAL_CACHE_SIMILARITY_THRESHOLD = 0.95
+RAG_RETRIEVAL_CACHE_TTL_SECONDS = 3600
+RAG_RETRIEVAL_CACHE_MAX_ENTRIES = 256
+
+# directory holding compact copies of docstores of memory-mapped vector indexes
+RAG_INDEX_CACHE_PATH = "/tmp/ols-rag-index-cache"  # noqa: S108
+
 # Solr hybrid (OKP ``portal-rag`` / ``hybrid-search``) query embeddings must match the
 # vectors stored in the index (same default as solr-experiment / solr_vector_io).
 SOLR_HYBRID_EMBEDDING_MODEL_ID = "ibm-granite/granite-embedding-30m-english"
 
+# Maximum number of embeddings memoized across requests, shared by all models;
+# one 768-dimensional embedding takes about 6 KiB
+EMBEDDING_CACHE_MAX_ENTRIES = 1024
+
+# Texts embedded concurrently are encoded together in one forward pass: at most
+# this many texts, collected for at most this many milliseconds
+EMBEDDING_BATCH_MAX_SIZE = 32
+EMBEDDING_BATCH_MAX_WAIT_MS = 5
+
 
 # cache constants
 CACHE_TYPE_MEMORY = "memory"
@@ -137,6 +176,27 @@ POSTGRES_CACHE_PORT = 5432
 POSTGRES_CACHE_DBNAME = "cache"
 POSTGRES_CACHE_USER = "postgres"
 POSTGRES_CACHE_MAX_ENTRIES = 1000
+# fraction of capacity evicted at once when the Postgres cache overflows, so the
+# eviction runs in batches instead of on every insert
+POSTGRES_CACHE_EVICTION_BATCH_RATIO = 0.1
+# number of rows the Postgres cache entry counter is split into, so concurrent
+# writes to different conversations do not wait for one counter row lock
+POSTGRES_CACHE_COUNTER_SHARDS = 32
+# number of decoded conversations kept in process memory in front of the
+# Postgres cache, 0 disables the local tier
+POSTGRES_CACHE_LOCAL_MAX_CONVERSATIONS = 0
+# cache values with encoded size (in bytes) at least this big are compressed
+POSTGRES_CACHE_COMPRESSION_THRESHOLD = 512
+# zlib compression level of large cache values
+POSTGRES_CACHE_COMPRESSION_LEVEL = 6
+
+# connection pool shared by all Postgres-backed components
+POSTGRES_POOL_MIN_SIZE = 1
+POSTGRES_POOL_MAX_SIZE = 10
+# how long to wait for a free connection when the pool is exhausted (in seconds)
+POSTGRES_POOL_TIMEOUT = 30.0
+# idle connections older than this are checked before being handed out (in seconds)
+POSTGRES_POOL_HEALTH_CHECK_INTERVAL = 30.0
 
 # look at https://www.postgresql.org/docs/current/libpq-connect.html#LIBPQ-CONNECT-SSLMODE
 # for all possible options
@@ -233,6 +293,17 @@ NOOP_WITH_TOKEN_AUTHENTICATION_MODULE = "noop-with-token"  # noqa: S105
 # All supported authentication modules
 SUPPORTED_AUTHENTICATION_MODULES = {"k8s", "noop", "noop-with-token"}
 
+# how long (in seconds) are results of K8S TokenReview and SubjectAccessReview
+# reused for the same token and path, 0 disables the cache
+K8S_AUTH_CACHE_TTL = 30.0
+# shorter lifetime of denied decisions, so granted access is picked up quickly
+K8S_AUTH_NEGATIVE_CACHE_TTL = 5.0
+# maximum number of cached K8S authentication decisions
+K8S_AUTH_CACHE_MAX_ENTRIES = 4096
+# number of threads running blocking K8S TokenReview and SubjectAccessReview calls
+# off the event loop
+K8S_AUTH_MAX_WORKERS = 8
+
 # Default configuration file name
 DEFAULT_CONFIGURATION_FILE = "olsconfig.yaml"
 
@@ -10,7 +10,7 @@ import psycopg2
 from ols import constants
 from ols.app.models.config import LimiterConfig, PostgresConfig, QuotaHandlersConfig
 from ols.utils.config import AppConfig
-from ols.utils.ssl import libpq_tls_params
+from ols.utils.postgres import PostgresConnectionPool
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -40,8 +40,8 @@ def quota_scheduler(config: Optional[QuotaHandlersConfig]) -> bool:
         logger.warning("Storage for quota limiter is not set, skipping")
         return False
 
-    connection = connect(config.storage)
-    if connection is None:
+    pool = connect(config.storage)
+    if pool is None:
         logger.warning("Unable to connect to Postgres, skipping")
         return False
 
@@ -58,15 +58,19 @@ def quota_scheduler(config: Optional[QuotaHandlersConfig]) -> bool:
 
     while True:
         logger.info("Quota scheduler sync started")
-        for name, limiter in config.limiters.limiters.items():
-            try:
-                quota_revocation(connection, name, limiter)
-            except Exception as e:
-                logger.error("Quota revoke error: %s", e)
+        try:
+            # connection is borrowed from the shared pool just for one sync
+            with pool.connection() as connection:
+                for name, limiter in config.limiters.limiters.items():
+                    try:
+                        quota_revocation(connection, name, limiter)
+                    except Exception as e:
+                        logger.error("Quota revoke error: %s", e)
+        except psycopg2.Error as e:
+            logger.error("Quota scheduler sync error: %s", e)
         logger.info("Quota scheduler sync finished")
         sleep(period)
     # unreachable code
-    connection.close()
     return True
 
 
@@ -156,24 +160,14 @@ def get_subject_id(limiter_type: str) -> str:
             return "?"
 
 
-def connect(config: PostgresConfig) -> Any:
-    """Initialize connection to database."""
+def connect(config: PostgresConfig) -> Optional[PostgresConnectionPool]:
+    """Initialize connection pool to database."""
     logger.info("Initializing connection to quota limiter database")
-    connect_kwargs: dict[str, Any] = {
-        "host": config.host,
-        "port": config.port,
-        "user": config.user,
-        "password": config.password,
-        "dbname": config.dbname,
-        "sslmode": config.ssl_mode,
-        "sslrootcert": config.ca_cert_path,
-        "gssencmode": config.gss_encmode,
-        **libpq_tls_params(config.tls_security_profile),
-    }
-    connection = psycopg2.connect(**connect_kwargs)
-    if connection is not None:
-        connection.autocommit = True
-    return connection
+    try:
+        return PostgresConnectionPool.shared(config)
+    except psycopg2.Error as e:
+        logger.error("Unable to connect to quota limiter database: %s", e)
+        return None
 
 
 def start_quota_scheduler(config: AppConfig) -> None:
@@ -1,18 +1,28 @@
 """Manage authentication flow for FastAPI endpoints with K8S/OCP."""
 
+import asyncio
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Optional, Self
+from typing import NamedTuple, Optional, Self
 
 import kubernetes.client
 from fastapi import HTTPException, Request
 from kubernetes.client.rest import ApiException
 from kubernetes.config import ConfigException
+from prometheus_client import Counter, Histogram
 
 from ols import config
 from ols.constants import (
     DEFAULT_USER_NAME,
     DEFAULT_USER_UID,
+    K8S_AUTH_CACHE_MAX_ENTRIES,
+    K8S_AUTH_MAX_WORKERS,
     NO_USER_TOKEN,
     RUNNING_IN_CLUSTER,
 )
@@ -25,6 +35,26 @@ logger = logging.getLogger(__name__)
 CLUSTER_ID_LOCAL = "local"
 CLUSTER_VERSION_UNAVAILABLE = "unknown"
 
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+k8s_auth_cache_hits_total = Counter(
+    "ols_k8s_auth_cache_hits_total",
+    "Authentication decisions served from the cache",
+)
+k8s_auth_cache_misses_total = Counter(
+    "ols_k8s_auth_cache_misses_total",
+    "Authentication decisions made by calling the K8S API server",
+)
+k8s_auth_reviews_coalesced_total = Counter(
+    "ols_k8s_auth_reviews_coalesced_total",
+    "Requests that waited for the review of the same token already in flight",
+)
+k8s_auth_review_duration_seconds = Histogram(
+    "ols_k8s_auth_review_duration_seconds",
+    "Durations of TokenReview and SubjectAccessReview calls",
+    ["review"],
+)
+
 
 class ClusterIDUnavailableError(Exception):
     """Cluster ID is not available."""
@@ -42,6 +72,7 @@ class K8sClientSingleton:
     """
 
     _instance = None
+    _lock = threading.Lock()
     _api_client = None
     _authn_api: kubernetes.client.AuthenticationV1Api
     _authz_api: kubernetes.client.AuthorizationV1Api
@@ -55,63 +86,70 @@ class K8sClientSingleton:
         This method initializes the Kubernetes API clients the first time it is called.
         and ensures that subsequent calls return the same instance.
         """
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            configuration = kubernetes.client.Configuration()
-
-            try:
-                if (
-                    config.ols_config.authentication_config.k8s_cluster_api is not None
-                    and config.dev_config.k8s_auth_token is not None
-                ):
-                    logger.info("loading kubeconfig from app Config config")
-                    configuration.api_key["authorization"] = (
-                        config.dev_config.k8s_auth_token
-                    )
-                    configuration.api_key_prefix["authorization"] = "Bearer"
-                else:
-                    logger.debug("no Auth Token Override was provided,\
-                            procceeding with in-cluster config load")
-                    try:
-                        logger.info("loading in-cluster config")
-                        kubernetes.config.load_incluster_config(
-                            client_configuration=configuration
+        with cls._lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                configuration = kubernetes.client.Configuration()
+
+                try:
+                    if (
+                        config.ols_config.authentication_config.k8s_cluster_api
+                        is not None
+                        and config.dev_config.k8s_auth_token is not None
+                    ):
+                        logger.info("loading kubeconfig from app Config config")
+                        configuration.api_key["authorization"] = (
+                            config.dev_config.k8s_auth_token
                         )
-                    except ConfigException as e:
-                        logger.debug("unable to load in-cluster config: %s", e)
+                        configuration.api_key_prefix["authorization"] = "Bearer"
+                    else:
+                        logger.debug("no Auth Token Override was provided,\
+                                procceeding with in-cluster config load")
                         try:
-                            logger.info("loading config from kube-config file")
-                            kubernetes.config.load_kube_config(
+                            logger.info("loading in-cluster config")
+                            kubernetes.config.load_incluster_config(
                                 client_configuration=configuration
                             )
-                        except ConfigException as ce:
-                            logger.error(
-                                "failed to load kubeconfig, in-cluster config\
-                                  and no override token was provided: %s",
-                                ce,
-                            )
-
-                configuration.host = (
-                    config.ols_config.authentication_config.k8s_cluster_api
-                    or configuration.host
-                )
-                configuration.verify_ssl = (
-                    not config.ols_config.authentication_config.skip_tls_verification
-                )
-                configuration.ssl_ca_cert = (
-                    config.ols_config.authentication_config.k8s_ca_cert_path
-                    if config.ols_config.authentication_config.k8s_ca_cert_path
-                    not in {None, Path()}
-                    else configuration.ssl_ca_cert
-                )
-                api_client = kubernetes.client.ApiClient(configuration)
-                cls._api_client = api_client
-                cls._custom_objects_api = kubernetes.client.CustomObjectsApi(api_client)
-                cls._authn_api = kubernetes.client.AuthenticationV1Api(api_client)
-                cls._authz_api = kubernetes.client.AuthorizationV1Api(api_client)
-            except Exception as e:
-                logger.info("Failed to initialize Kubernetes client: %s", e)
-                raise
+                        except ConfigException as e:
+                            logger.debug("unable to load in-cluster config: %s", e)
+                            try:
+                                logger.info("loading config from kube-config file")
+                                kubernetes.config.load_kube_config(
+                                    client_configuration=configuration
+                                )
+                            except ConfigException as ce:
+                                logger.error(
+                                    "failed to load kubeconfig, in-cluster config\
+                                      and no override token was provided: %s",
+                                    ce,
+                                )
+
+                    configuration.host = (
+                        config.ols_config.authentication_config.k8s_cluster_api
+                        or configuration.host
+                    )
+                    configuration.verify_ssl = (
+                        not config.ols_config.authentication_config.skip_tls_verification
+                    )
+                    configuration.ssl_ca_cert = (
+                        config.ols_config.authentication_config.k8s_ca_cert_path
+                        if config.ols_config.authentication_config.k8s_ca_cert_path
+                        not in {None, Path()}
+                        else configuration.ssl_ca_cert
+                    )
+                    api_client = kubernetes.client.ApiClient(configuration)
+                    cls._api_client = api_client
+                    cls._custom_objects_api = kubernetes.client.CustomObjectsApi(
+                        api_client
+                    )
+                    cls._authn_api = kubernetes.client.AuthenticationV1Api(api_client)
+                    cls._authz_api = kubernetes.client.AuthorizationV1Api(api_client)
+                except Exception as e:
+                    logger.info("Failed to initialize Kubernetes client: %s", e)
+                    raise
+                # published only when fully initialized, other threads may
+                # use the API clients as soon as the instance is set
+                cls._instance = instance
         return cls._instance
 
     @classmethod
@@ -242,19 +280,28 @@ def get_user_info(token: str) -> Optional[kubernetes.client.V1TokenReview]:
 
     Returns:
         The user information if the token is valid, None otherwise.
+
+    Raises:
+        HTTPException: If the API server could not review the token.
     """
     auth_api = K8sClientSingleton.get_authn_api()
     token_review = kubernetes.client.V1TokenReview(
         spec=kubernetes.client.V1TokenReviewSpec(token=token)
     )
     try:
-        response = auth_api.create_token_review(token_review)
+        with k8s_auth_review_duration_seconds.labels("token_review").time():
+            response = auth_api.create_token_review(token_review)
         if response.status.authenticated:
             return response.status
         return None
     except ApiException as e:
+        # the token has not been reviewed at all, so this must not be turned
+        # into a (cached) denial
         logger.error("API exception during TokenReview: %s", e)
-        return None
+        raise HTTPException(
+            status_code=503,
+            detail={"response": "Unable to Review Token", "cause": str(e)},
+        ) from e
     except Exception as e:
         logger.error("Unexpected error during TokenReview - Unauthorized: %s", e)
         raise HTTPException(
@@ -279,6 +326,93 @@ def _extract_bearer_token(header: str) -> str:
         return ""
 
 
+class AuthDecision(NamedTuple):
+    """Result of TokenReview and SubjectAccessReview for one token and path."""
+
+    allowed: bool
+    user_id: Optional[str] = None
+    username: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class AuthDecisionCache:
+    """Bounded TTL cache of authentication decisions.
+
+    Decisions are keyed by a hash of the bearer token, so tokens themselves
+    are never kept in memory, together with the virtual path the access was
+    checked for. Denied decisions expire sooner than granted ones. Once the
+    cache is full, the least recently stored decision is dropped.
+    """
+
+    def __init__(self, max_entries: int = K8S_AUTH_CACHE_MAX_ENTRIES) -> None:
+        """Initialize empty cache with the given capacity."""
+        self.max_entries = max_entries
+        self._decisions: OrderedDict[str, tuple[float, AuthDecision]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str, virtual_path: str) -> str:
+        """Construct cache key from the bearer token and the virtual path."""
+        digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        return f"{digest}:{virtual_path}"
+
+    def get(self, key: str) -> Optional[AuthDecision]:
+        """Return the decision if it is cached and has not expired yet."""
+        with self._lock:
+            item = self._decisions.get(key)
+            if item is None:
+                return None
+            expires_at, decision = item
+            if expires_at <= time.monotonic():
+                del self._decisions[key]
+                return None
+            return decision
+
+    def put(self, key: str, decision: AuthDecision, ttl: float) -> None:
+        """Store the decision for ttl seconds, a non-positive ttl stores nothing."""
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._decisions[key] = (time.monotonic() + ttl, decision)
+            self._decisions.move_to_end(key)
+            while len(self._decisions) > self.max_entries:
+                self._decisions.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached decisions."""
+        with self._lock:
+            self._decisions.clear()
+
+
+# shared by all AuthDependency instances, the key contains the virtual path
+auth_decision_cache = AuthDecisionCache()
+
+# the kubernetes client is synchronous, reviews run on these threads so they
+# do not block the event loop
+_auth_executor = ThreadPoolExecutor(
+    max_workers=K8S_AUTH_MAX_WORKERS, thread_name_prefix="k8s-auth"
+)
+
+# reviews in flight by cache key, accessed from the event loop only
+_reviews_in_flight: dict[str, asyncio.Future[AuthDecision]] = {}
+
+
+def _review_done(key: str, review: asyncio.Future[AuthDecision]) -> None:
+    """Forget finished review and cache its decision."""
+    if _reviews_in_flight.get(key) is review:
+        del _reviews_in_flight[key]
+    if review.cancelled() or review.exception() is not None:
+        # errors of the API server are not cached
+        return
+    decision = review.result()
+    auth_config = config.ols_config.authentication_config
+    auth_decision_cache.put(
+        key,
+        decision,
+        auth_config.cache_ttl if decision.allowed else auth_config.negative_cache_ttl,
+    )
+
+
 class AuthDependency(AuthDependencyInterface):
     """Create an AuthDependency Class that allows customizing the acces Scope path to check."""
 
@@ -293,6 +427,7 @@ class AuthDependency(AuthDependencyInterface):
 
         Validates the bearer token from the request,
         performs access control checks using Kubernetes TokenReview and SubjectAccessReview.
+        Their results are reused for a short time from `auth_decision_cache`.
 
         Args:
             request: The FastAPI request object.
@@ -328,10 +463,60 @@ class AuthDependency(AuthDependencyInterface):
                 status_code=401,
                 detail="Unauthorized: Bearer token not found or invalid",
             )
+        key = AuthDecisionCache.key(token, self.virtual_path)
+        decision = auth_decision_cache.get(key)
+        if decision is not None:
+            k8s_auth_cache_hits_total.inc()
+        else:
+            k8s_auth_cache_misses_total.inc()
+            decision = await self._coalesced_review(key, token)
+
+        if not decision.allowed:
+            raise HTTPException(status_code=403, detail=decision.detail)
+        return decision.user_id, decision.username, False, token
+
+    def _coalesced_review(self, key: str, token: str) -> asyncio.Future[AuthDecision]:
+        """Review the token off the event loop, sharing reviews already in flight.
+
+        The blocking Kubernetes client runs on a bounded executor. Concurrent
+        requests with the same token and path wait for one review instead of
+        each sending their own. The shared review is shielded, so a cancelled
+        request (for example a disconnected client) does not cancel the review
+        for the others.
+
+        Args:
+            key: Cache key of the token and the virtual path.
+            token: The bearer token from the request.
+
+        Returns:
+            Future with the decision of the review.
+        """
+        review = _reviews_in_flight.get(key)
+        if review is None:
+            loop = asyncio.get_running_loop()
+            review = loop.run_in_executor(_auth_executor, self._review, token)
+            _reviews_in_flight[key] = review
+            review.add_done_callback(partial(_review_done, key))
+        else:
+            k8s_auth_reviews_coalesced_total.inc()
+        return asyncio.shield(review)
+
+    def _review(self, token: str) -> AuthDecision:
+        """Review the token and its access to the virtual path by the K8S API.
+
+        Args:
+            token: The bearer token from the request.
+
+        Returns:
+            Decision whether the token holder has access to the virtual path.
+
+        Raises:
+            HTTPException: If the API server could not review the access.
+        """
         user_info = get_user_info(token)
         if user_info is None:
-            raise HTTPException(
-                status_code=403, detail="Forbidden: Invalid or expired token"
+            return AuthDecision(
+                allowed=False, detail="Forbidden: Invalid or expired token"
             )
         if user_info.user.username == "kube:admin":
             user_info.user.uid = K8sClientSingleton.get_cluster_id()
@@ -347,13 +532,18 @@ class AuthDependency(AuthDependencyInterface):
             )
         )
         try:
-            response = authorization_api.create_subject_access_review(sar)
-            if not response.status.allowed:
-                raise HTTPException(
-                    status_code=403, detail="Forbidden: User does not have access"
-                )
+            with k8s_auth_review_duration_seconds.labels(
+                "subject_access_review"
+            ).time():
+                response = authorization_api.create_subject_access_review(sar)
         except ApiException as e:
             logger.error("API exception during SubjectAccessReview: %s", e)
             raise HTTPException(status_code=403, detail="Internal server error") from e
+        if not response.status.allowed:
+            return AuthDecision(
+                allowed=False, detail="Forbidden: User does not have access"
+            )
 
-        return user_info.user.uid, user_info.user.username, False, token
+        return AuthDecision(
+            allowed=True, user_id=user_info.user.uid, username=user_info.user.username
+        )
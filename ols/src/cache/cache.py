@@ -89,6 +89,26 @@ class Cache(ABC):
             bool: True if entries were deleted, False if key wasn't found.
         """
 
+    @abstractmethod
+    def replace_history(
+        self,
+        user_id: str,
+        conversation_id: str,
+        entries: list[CacheEntry],
+        skip_user_id_check: bool,
+    ) -> None:
+        """Atomically replace the whole conversation history by given entries.
+
+        Readers observe either the previous or the new history, never a
+        partially written one. Topic summary of the conversation is kept.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            entries: The new history, from the oldest to the newest entry.
+            skip_user_id_check: Skip user_id suid check.
+        """
+
     @abstractmethod
     def list(self, user_id: str, skip_user_id_check: bool) -> list[ConversationData]:
         """List all conversations for a given user_id.
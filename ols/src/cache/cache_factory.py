@@ -5,6 +5,7 @@ from ols.app.models.config import ConversationCacheConfig
 from ols.src.cache.cache import Cache
 from ols.src.cache.in_memory_cache import InMemoryCache
 from ols.src.cache.postgres_cache import PostgresCache
+from ols.src.cache.tiered_cache import TieredCache
 
 
 class CacheFactory:
@@ -15,13 +16,19 @@ class CacheFactory:
         """Create an instance of Cache based on loaded configuration.
 
         Returns:
-            An instance of `Cache` (either `PostgresCache` or `InMemoryCache`).
+            An instance of `Cache` (`InMemoryCache`, `PostgresCache` or
+            `TieredCache` wrapping `PostgresCache` when its local tier is enabled).
         """
         match config.type:
             case constants.CACHE_TYPE_MEMORY:
                 return InMemoryCache(config.memory)
             case constants.CACHE_TYPE_POSTGRES:
-                return PostgresCache(config.postgres)
+                cache = PostgresCache(config.postgres)
+                if config.postgres.local_cache_max_conversations > 0:
+                    return TieredCache(
+                        cache, config.postgres.local_cache_max_conversations
+                    )
+                return cache
             case _:
                 raise ValueError(
                     f"Invalid cache type: {config.type}. "
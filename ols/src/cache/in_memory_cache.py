@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import threading
 import time
-from collections import deque
+from collections import OrderedDict
 from typing import TYPE_CHECKING, Any
 
 from ols.app.models.models import CacheEntry, ConversationData
@@ -16,7 +16,14 @@ from ols.src.cache.cache import Cache
 
 
 class InMemoryCache(Cache):
-    """An in-memory LRU cache implementation in O(1) time."""
+    """An in-memory LRU cache implementation in O(1) time.
+
+    Conversations are kept in an `OrderedDict` ordered from the least to the
+    most recently used one, so both touching and evicting a conversation are
+    O(1). A per-user index of conversation keys makes `list` proportional to
+    the number of conversations of the given user. All operations, including
+    recency updates made by `get`, are guarded by one lock.
+    """
 
     _instance = None
     _lock = threading.Lock()
@@ -34,10 +41,33 @@ class InMemoryCache(Cache):
         # pylint: disable=W0201
         self.capacity: int = int(config.max_entries)
         self.total_entries: int = 0
-        self.deque: deque[str] = deque()
-        self.cache: dict[str, list[dict[str, Any]]] = {}
+        # conversation histories from the least to the most recently used one
+        self.cache: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
         # Conversations metadata storage
         self._conversations: dict[str, ConversationData] = {}
+        # keys of conversations with metadata, per user ID
+        self._user_conversations: dict[str, set[str]] = {}
+
+    @staticmethod
+    def _user_id_of(key: str) -> str:
+        """Get user ID from the compound key; conversation ID never contains separator."""
+        return key.rpartition(Cache.COMPOUND_KEY_SEPARATOR)[0]
+
+    def _store_conversation(self, key: str, conversation: ConversationData) -> None:
+        """Store conversation metadata and register it in the per-user index."""
+        self._conversations[key] = conversation
+        self._user_conversations.setdefault(self._user_id_of(key), set()).add(key)
+
+    def _forget_conversation(self, key: str) -> None:
+        """Remove conversation metadata and unregister it from the per-user index."""
+        if self._conversations.pop(key, None) is None:
+            return
+        user_id = self._user_id_of(key)
+        keys = self._user_conversations.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_conversations[user_id]
 
     def get(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -54,12 +84,12 @@ class InMemoryCache(Cache):
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        if key not in self.cache:
-            return None
-
-        self.deque.remove(key)
-        self.deque.appendleft(key)
-        value = self.cache[key].copy()
+        with self._lock:
+            value = self.cache.get(key)
+            if value is None:
+                return None
+            self.cache.move_to_end(key)
+            value = value.copy()
         return [CacheEntry.from_dict(cache_entry) for cache_entry in value]
 
     def insert_or_append(
@@ -74,8 +104,8 @@ class InMemoryCache(Cache):
         Eviction policy:
           - Capacity is treated as number of message entries across all conversations.
           - When inserting causes total entries to exceed capacity, evict the oldest
-            message(s) from the least-recently-used conversation(s) (tail of deque)
-            until total_entries <= capacity.
+            message(s) from the least-recently-used conversation(s) (head of the
+            ordered dict) until total_entries <= capacity.
 
         Args:
             user_id: User identification.
@@ -90,44 +120,91 @@ class InMemoryCache(Cache):
             if key not in self.cache:
                 self.cache[key] = [value]
             else:
-                self.deque.remove(key)
                 self.cache[key].append(value)
-            self.deque.appendleft(key)
+                self.cache.move_to_end(key)
             self.total_entries += 1
 
             # Update conversations metadata
             current_time = time.time()
             if key in self._conversations:
                 conv_data = self._conversations[key]
-                self._conversations[key] = ConversationData(
-                    conversation_id=conversation_id,
-                    topic_summary=conv_data.topic_summary,
-                    last_message_timestamp=current_time,
-                    message_count=conv_data.message_count + 1,
+                self._store_conversation(
+                    key,
+                    ConversationData(
+                        conversation_id=conversation_id,
+                        topic_summary=conv_data.topic_summary,
+                        last_message_timestamp=current_time,
+                        message_count=conv_data.message_count + 1,
+                    ),
                 )
             else:
-                self._conversations[key] = ConversationData(
-                    conversation_id=conversation_id,
-                    topic_summary="",
-                    last_message_timestamp=current_time,
-                    message_count=1,
+                self._store_conversation(
+                    key,
+                    ConversationData(
+                        conversation_id=conversation_id,
+                        topic_summary="",
+                        last_message_timestamp=current_time,
+                        message_count=1,
+                    ),
                 )
 
             # Evict oldest messages until we're within capacity
-            if self.total_entries > self.capacity and self.deque:
-                oldest_key = self.deque[-1]
-                oldest_list = self.cache.get(oldest_key, [])
-                del oldest_list[0]
-                self.total_entries -= 1
-
-                if len(oldest_list) == 0:
-                    del self.cache[oldest_key]
-                    self.deque.pop()
-                    # Also remove from conversations metadata
-                    if oldest_key in self._conversations:
-                        del self._conversations[oldest_key]
-                else:
-                    self.cache[oldest_key] = oldest_list
+            self._evict()
+
+    def _evict(self) -> None:
+        """Evict the oldest messages until we're within capacity, the lock is held."""
+        while self.total_entries > self.capacity and self.cache:
+            oldest_key, oldest_list = next(iter(self.cache.items()))
+            del oldest_list[0]
+            self.total_entries -= 1
+
+            if len(oldest_list) == 0:
+                del self.cache[oldest_key]
+                # Also remove from conversations metadata
+                self._forget_conversation(oldest_key)
+
+    def replace_history(
+        self,
+        user_id: str,
+        conversation_id: str,
+        entries: list[CacheEntry],
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Atomically replace the whole conversation history by given entries.
+
+        The new history is built outside the lock and swapped in at once. It
+        becomes the most recently used conversation; an empty history deletes
+        the conversation.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            entries: The new history, from the oldest to the newest entry.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        value = [cache_entry.to_dict() for cache_entry in entries]
+
+        with self._lock:
+            self.total_entries -= len(self.cache.pop(key, ()))
+            if not value:
+                self._forget_conversation(key)
+                return
+
+            self.cache[key] = value
+            self.total_entries += len(value)
+
+            conv_data = self._conversations.get(key)
+            self._store_conversation(
+                key,
+                ConversationData(
+                    conversation_id=conversation_id,
+                    topic_summary=conv_data.topic_summary if conv_data else "",
+                    last_message_timestamp=time.time(),
+                    message_count=len(value),
+                ),
+            )
+            self._evict()
 
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -148,13 +225,9 @@ class InMemoryCache(Cache):
             if key not in self.cache:
                 return False
 
-            # Remove from both cache and deque
-            self.total_entries -= len(self.cache[key])
-            del self.cache[key]
-            self.deque.remove(key)
+            self.total_entries -= len(self.cache.pop(key))
             # Also remove from conversations metadata
-            if key in self._conversations:
-                del self._conversations[key]
+            self._forget_conversation(key)
             return True
 
     def list(
@@ -170,16 +243,13 @@ class InMemoryCache(Cache):
             A list of ConversationData objects containing conversation_id,
             topic_summary, last_message_timestamp, and message_count.
         """
-        conversations: list[ConversationData] = []
         super()._check_user_id(user_id, skip_user_id_check)
-        prefix = f"{user_id}{Cache.COMPOUND_KEY_SEPARATOR}"
 
         with self._lock:
-            conversations.extend(
-                conv
-                for key, conv in self._conversations.items()
-                if key.startswith(prefix)
-            )
+            conversations = [
+                self._conversations[key]
+                for key in self._user_conversations.get(user_id, ())
+            ]
 
         # Sort by last_message_timestamp descending
         conversations.sort(key=lambda x: x.last_message_timestamp, reverse=True)
@@ -204,21 +274,16 @@ class InMemoryCache(Cache):
 
         with self._lock:
             current_time = time.time()
-            if key in self._conversations:
-                conv_data = self._conversations[key]
-                self._conversations[key] = ConversationData(
+            conv_data = self._conversations.get(key)
+            self._store_conversation(
+                key,
+                ConversationData(
                     conversation_id=conversation_id,
                     topic_summary=topic_summary,
                     last_message_timestamp=current_time,
-                    message_count=conv_data.message_count,
-                )
-            else:
-                self._conversations[key] = ConversationData(
-                    conversation_id=conversation_id,
-                    topic_summary=topic_summary,
-                    last_message_timestamp=current_time,
-                    message_count=0,
-                )
+                    message_count=conv_data.message_count if conv_data else 0,
+                ),
+            )
 
     def ready(self) -> bool:
         """Check if the cache is ready.
@@ -1,42 +1,42 @@
 """Cache that uses Postgres to store cached values."""
 
-import json
 import logging
-import threading
-from typing import Any
+import zlib
+from typing import Any, Optional
 
 import psycopg2
 
+from ols import constants
 from ols.app.models.config import PostgresConfig
-from ols.app.models.models import (
-    CacheEntry,
-    ConversationData,
-    MessageDecoder,
-    MessageEncoder,
-)
+from ols.app.models.models import CacheEntry, ConversationData
 from ols.src.cache.cache import Cache
 from ols.src.cache.cache_error import CacheError
+from ols.src.cache.value_codec import decode_value, encode_value
 from ols.utils.postgres import PostgresBase, connection
 
 logger = logging.getLogger(__name__)
 
+# (first seq, last seq, created_at of the last entry) of a conversation history
+HistoryVersion = tuple[int, int, Any]
+
 
 class PostgresCache(Cache, PostgresBase):
     """Cache that uses Postgres to store cached values.
 
     The cache itself is stored in following tables:
 
-    Cache table:
+    Cache entries table (one row per `CacheEntry`):
     ```
          Column      |            Type             | Nullable | Default | Storage  |
     -----------------+-----------------------------+----------+---------+----------+
      user_id         | text                        | not null |         | extended |
      conversation_id | text                        | not null |         | extended |
-     value           | bytea                       |          |         | extended |
-     updated_at      | timestamp without time zone |          |         | plain    |
+     seq             | integer                     | not null |         | plain    |
+     value           | bytea                       | not null |         | extended |
+     created_at      | timestamp without time zone | not null |         | plain    |
     Indexes:
-        "cache_pkey" PRIMARY KEY, btree (user_id, conversation_id)
-        "timestamps" btree (updated_at)
+        "cache_entries_pkey" PRIMARY KEY, btree (user_id, conversation_id, seq)
+        "cache_entries_created_at" btree (created_at)
     ```
 
     Conversations metadata table:
@@ -51,15 +51,48 @@ class PostgresCache(Cache, PostgresBase):
     Indexes:
         "conversations_pkey" PRIMARY KEY, btree (user_id, conversation_id)
     ```
+
+    Cache counters table:
+    ```
+     Column |  Type   | Nullable | Default |
+    --------+---------+----------+---------+
+     name   | text    | not null |         |
+     shard  | integer | not null | 0       |
+     value  | bigint  | not null | 0       |
+    Indexes:
+        "cache_counters_pkey" PRIMARY KEY, btree (name, shard)
+    ```
+
+    Appending to a conversation is a single INSERT and reading it back is an
+    ordered range scan over the primary key, so neither operation depends on
+    the length of the conversation. Compacted history replaces the previous
+    one atomically, in a single transaction. Conversations stored by older
+    versions in the legacy `cache` table (one JSON array blob per conversation)
+    are split into per-entry rows by `MIGRATE_LEGACY_CACHE_TABLE` during
+    initialization.
+
+    The total number of stored entries is maintained incrementally in the
+    counters table, so checking the capacity never scans the cache. The
+    counter is split into shards selected by the conversation, so concurrent
+    writes to different conversations lock different counter rows and do not
+    wait for each other; the total is the sum of all shards. Once the capacity
+    is exceeded, the oldest entries are evicted in one batch down to a low
+    watermark, by one writer at a time.
+
+    Values are encoded by `value_codec.encode_value`: a header byte selects
+    the format and large values (typically with tool results) are compressed.
+    Values without the header, written by older versions, are plain JSON and
+    are still decoded.
     """
 
-    CREATE_CACHE_TABLE = """
-        CREATE TABLE IF NOT EXISTS cache (
+    CREATE_CACHE_ENTRIES_TABLE = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
             user_id         text NOT NULL,
             conversation_id text NOT NULL,
-            value           bytea,
-            updated_at      timestamp,
-            PRIMARY KEY(user_id, conversation_id)
+            seq             integer NOT NULL,
+            value           bytea NOT NULL,
+            created_at      timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY(user_id, conversation_id, seq)
         );
         """
 
@@ -75,43 +108,117 @@ class PostgresCache(Cache, PostgresBase):
         """
 
     CREATE_INDEX = """
-        CREATE INDEX IF NOT EXISTS timestamps
-            ON cache (updated_at)
+        CREATE INDEX IF NOT EXISTS cache_entries_created_at
+            ON cache_entries (created_at)
+        """
+
+    # the legacy table stored whole conversation as one JSON array; split it
+    # into one row per array element (keeping the order) and drop it afterwards
+    MIGRATE_LEGACY_CACHE_TABLE = """
+        DO $$
+        BEGIN
+            IF to_regclass('cache') IS NOT NULL THEN
+                INSERT INTO cache_entries(user_id, conversation_id, seq, value, created_at)
+                SELECT c.user_id, c.conversation_id, e.seq,
+                       convert_to(e.entry::text, 'utf-8'),
+                       COALESCE(c.updated_at, CURRENT_TIMESTAMP)
+                  FROM cache c,
+                       json_array_elements(convert_from(c.value, 'utf-8')::json)
+                           WITH ORDINALITY AS e(entry, seq)
+                 WHERE c.value IS NOT NULL
+                ON CONFLICT DO NOTHING;
+                DROP TABLE cache;
+            END IF;
+        END
+        $$;
+        """
+
+    CREATE_COUNTERS_TABLE = """
+        CREATE TABLE IF NOT EXISTS cache_counters (
+            name  text NOT NULL,
+            shard integer NOT NULL DEFAULT 0,
+            value bigint NOT NULL DEFAULT 0,
+            PRIMARY KEY(name, shard)
+        );
+        """
+
+    # the count is computed just once, when the counter does not exist yet
+    INIT_TOTAL_ENTRIES_COUNTER = """
+        INSERT INTO cache_counters(name, shard, value)
+        SELECT 'total_entries', 0, COUNT(*)
+          FROM cache_entries
+         WHERE NOT EXISTS
+               (SELECT 1 FROM cache_counters WHERE name = 'total_entries')
         """
 
     SELECT_CONVERSATION_HISTORY_STATEMENT = """
         SELECT value
-          FROM cache
-         WHERE user_id=%s AND conversation_id=%s LIMIT 1
+          FROM cache_entries
+         WHERE user_id=%s AND conversation_id=%s
+         ORDER BY seq
         """
 
-    UPDATE_CONVERSATION_HISTORY_STATEMENT = """
-        UPDATE cache
-           SET value=%s, updated_at=CURRENT_TIMESTAMP
-         WHERE user_id=%s AND conversation_id=%s
+    # both bounds are read from the primary key index, values are not touched
+    SELECT_HISTORY_VERSION_STATEMENT = """
+        SELECT (SELECT MIN(seq)
+                  FROM cache_entries
+                 WHERE user_id=%(user_id)s AND conversation_id=%(conversation_id)s),
+               seq, created_at
+          FROM cache_entries
+         WHERE user_id=%(user_id)s AND conversation_id=%(conversation_id)s
+         ORDER BY seq DESC
+         LIMIT 1
+        """
+
+    APPEND_CACHE_ENTRY_STATEMENT = """
+        INSERT INTO cache_entries(user_id, conversation_id, seq, value, created_at)
+        SELECT %(user_id)s, %(conversation_id)s, COALESCE(MAX(seq), 0) + 1,
+               %(value)s, CURRENT_TIMESTAMP
+          FROM cache_entries
+         WHERE user_id=%(user_id)s AND conversation_id=%(conversation_id)s
+        """
+
+    # the whole history is written by one statement, seq follows the array order
+    INSERT_CACHE_ENTRIES_STATEMENT = """
+        INSERT INTO cache_entries(user_id, conversation_id, seq, value, created_at)
+        SELECT %(user_id)s, %(conversation_id)s, e.seq, e.value, CURRENT_TIMESTAMP
+          FROM unnest(%(values)s::bytea[]) WITH ORDINALITY AS e(value, seq)
         """
 
-    INSERT_CONVERSATION_HISTORY_STATEMENT = """
-        INSERT INTO cache(user_id, conversation_id, value, updated_at)
-        VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+    # only the shard of the written conversation is locked by the update; a
+    # single shard can go below zero when it is decreased by evicted entries
+    # counted in other shards, only the sum of all shards is meaningful
+    UPDATE_TOTAL_ENTRIES_STATEMENT = """
+        INSERT INTO cache_counters(name, shard, value)
+        VALUES ('total_entries', %s, %s)
+        ON CONFLICT (name, shard)
+        DO UPDATE SET value = cache_counters.value + EXCLUDED.value
         """
 
-    DELETE_CONVERSATION_HISTORY_STATEMENT = """
-        DELETE FROM cache
-         WHERE (user_id, conversation_id) in
-               (SELECT user_id, conversation_id FROM cache ORDER BY updated_at LIMIT
+    # reading the shards takes no row locks
+    QUERY_TOTAL_ENTRIES_STATEMENT = """
+        SELECT COALESCE(SUM(value), 0)
+          FROM cache_counters
+         WHERE name = 'total_entries'
         """
 
-    QUERY_TOTAL_ENTRIES = """
-        SELECT COALESCE(SUM(json_array_length(convert_from(value, 'utf-8')::json)), 0) FROM cache;
+    # concurrent writers that find the cache over capacity do not wait for
+    # each other, the one holding the lock evicts for all of them
+    EVICTION_LOCK_STATEMENT = """
+        SELECT pg_try_advisory_xact_lock(hashtext('ols_cache_eviction'))
         """
 
-    SELECT_OLDEST_ROW = """
-        SELECT user_id, conversation_id, value FROM cache ORDER BY updated_at LIMIT 1;
+    DELETE_OLDEST_ENTRIES_STATEMENT = """
+        DELETE FROM cache_entries
+         WHERE (user_id, conversation_id, seq) IN
+               (SELECT user_id, conversation_id, seq
+                  FROM cache_entries
+                 ORDER BY created_at, seq
+                 LIMIT %s)
         """
 
     DELETE_SINGLE_CONVERSATION_STATEMENT = """
-        DELETE FROM cache
+        DELETE FROM cache_entries
          WHERE user_id=%s AND conversation_id=%s
         """
 
@@ -142,6 +249,15 @@ class PostgresCache(Cache, PostgresBase):
                       message_count = conversations.message_count + 1
     """
 
+    REPLACE_CONVERSATION_STATEMENT = """
+        INSERT INTO conversations
+            (user_id, conversation_id, topic_summary, last_message_timestamp, message_count)
+        VALUES (%s, %s, '', CURRENT_TIMESTAMP, %s)
+        ON CONFLICT (user_id, conversation_id)
+        DO UPDATE SET last_message_timestamp = CURRENT_TIMESTAMP,
+                      message_count = EXCLUDED.message_count
+    """
+
     DELETE_CONVERSATION_METADATA_STATEMENT = """
         DELETE FROM conversations
          WHERE user_id=%s AND conversation_id=%s
@@ -153,7 +269,6 @@ class PostgresCache(Cache, PostgresBase):
 
     def __init__(self, config: PostgresConfig) -> None:
         """Create a new instance of Postgres cache."""
-        self._tx_lock = threading.Lock()
         self.capacity = config.max_entries
         super().__init__(config)
 
@@ -161,9 +276,12 @@ class PostgresCache(Cache, PostgresBase):
     def _ddl_statements(self) -> list[str]:
         """Return DDL statements for cache tables and indexes."""
         return [
-            self.CREATE_CACHE_TABLE,
+            self.CREATE_CACHE_ENTRIES_TABLE,
             self.CREATE_CONVERSATIONS_TABLE,
             self.CREATE_INDEX,
+            self.MIGRATE_LEGACY_CACHE_TABLE,
+            self.CREATE_COUNTERS_TABLE,
+            self.INIT_TOTAL_ENTRIES_COUNTER,
         ]
 
     @connection
@@ -183,17 +301,64 @@ class PostgresCache(Cache, PostgresBase):
         # just check if user_id and conversation_id are UUIDs
         super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        with self._tx_lock:
-            with self.connection.cursor() as cursor:
-                try:
-                    value = PostgresCache._select(cursor, user_id, conversation_id)
-                    if value is None:
-                        return []
-                    history = [CacheEntry.from_dict(ce) for ce in value]
-                    return history
-                except psycopg2.DatabaseError as e:
-                    logger.error("PostgresCache.get %s", e)
-                    raise CacheError("PostgresCache.get", e) from e
+        with self._cursor() as cursor:
+            try:
+                value = PostgresCache._select(cursor, user_id, conversation_id)
+                return [CacheEntry.from_dict(ce) for ce in value]
+            except psycopg2.DatabaseError as e:
+                logger.error("PostgresCache.get %s", e)
+                raise CacheError("PostgresCache.get", e) from e
+
+    @connection
+    def get_with_version(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> tuple[Optional[HistoryVersion], list[CacheEntry]]:
+        """Get the conversation history together with its version.
+
+        The version is read before the history, so a concurrent write can
+        only make the returned history newer than the version, never older.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            Version of the history (`None` for empty history) and the history.
+        """
+        super().construct_key(user_id, conversation_id, skip_user_id_check)
+
+        with self._cursor() as cursor:
+            try:
+                version = PostgresCache._version(cursor, user_id, conversation_id)
+                value = PostgresCache._select(cursor, user_id, conversation_id)
+                return version, [CacheEntry.from_dict(ce) for ce in value]
+            except psycopg2.DatabaseError as e:
+                logger.error("PostgresCache.get_with_version %s", e)
+                raise CacheError("PostgresCache.get_with_version", e) from e
+
+    @connection
+    def history_version(
+        self, user_id: str, conversation_id: str
+    ) -> Optional[HistoryVersion]:
+        """Get version of the conversation history without reading the history.
+
+        The version changes whenever an entry is appended or evicted and when
+        the conversation is deleted and created again.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+
+        Returns:
+            Version of the history, `None` when the history is empty.
+        """
+        with self._cursor() as cursor:
+            try:
+                return PostgresCache._version(cursor, user_id, conversation_id)
+            except psycopg2.DatabaseError as e:
+                logger.error("PostgresCache.history_version %s", e)
+                raise CacheError("PostgresCache.history_version", e) from e
 
     @connection
     def insert_or_append(
@@ -212,65 +377,75 @@ class PostgresCache(Cache, PostgresBase):
             skip_user_id_check: Skip user_id suid check.
 
         """
+        self._insert_or_append(user_id, conversation_id, cache_entry)
+
+    @connection
+    def append_with_version(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> tuple[Optional[HistoryVersion], Optional[HistoryVersion]]:
+        """Append the entry and return history versions before and after it.
+
+        Both versions are read in the same transaction as the append, while
+        the conversation lock is held, so they can be used to keep a copy of
+        the history up to date without reading it again.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            History versions before and after the append.
+        """
+        return self._insert_or_append(
+            user_id, conversation_id, cache_entry, with_versions=True
+        )
+
+    def _insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        with_versions: bool = False,
+    ) -> tuple[Optional[HistoryVersion], Optional[HistoryVersion]]:
+        """Append the entry, optionally reading history versions around it."""
+        before = after = None
         value = cache_entry.to_dict()
-        # autocommit=True makes each execute() its own transaction, so
-        # pg_advisory_xact_lock would be released immediately after the first
-        # execute.  Disable autocommit for a real multi-statement transaction.
-        # The lock serialises concurrent callers that share this connection.
-        with self._tx_lock:
-            # This transaction status check is required for evaluation tests that use
-            # multi-turn conversations. Without it, rapid cache writes (appending each
-            # turn's messages) can leave an active transaction when autocommit=True is
-            # set in the finally block, causing psycopg2 to raise "set_session cannot
-            # be used inside a transaction". Rollback any active transaction to ensure
-            # clean autocommit mode transition.
-            if (
-                self.connection.get_transaction_status()
-                != psycopg2.extensions.TRANSACTION_STATUS_IDLE
-            ):
-                self.connection.rollback()
-            self.connection.autocommit = False
-            with self.connection.cursor() as cursor:
-                try:
-                    cursor.execute(
-                        self.ADVISORY_LOCK_STATEMENT,
-                        (user_id, conversation_id),
-                    )
-                    old_value = self._select(cursor, user_id, conversation_id)
-                    if old_value:
-                        old_value.append(value)
-                        PostgresCache._update(
-                            cursor,
-                            user_id,
-                            conversation_id,
-                            json.dumps(old_value, cls=MessageEncoder).encode("utf-8"),
-                        )
-                    else:
-                        PostgresCache._insert(
-                            cursor,
-                            user_id,
-                            conversation_id,
-                            json.dumps([value], cls=MessageEncoder).encode("utf-8"),
-                        )
-                    cursor.execute(
-                        PostgresCache.UPSERT_CONVERSATION_STATEMENT,
-                        (user_id, conversation_id),
-                    )
-                    PostgresCache._cleanup(cursor, self.capacity)
-                    self.connection.commit()
-                except psycopg2.DatabaseError as e:
-                    self.connection.rollback()
-                    logger.error("PostgresCache.insert_or_append: %s", e)
-                    raise CacheError("PostgresCache.insert_or_append", e) from e
-                finally:
-                    # Ensure transaction is closed before setting autocommit
-                    # to avoid "set_session cannot be used inside a transaction" error
-                    if (
-                        self.connection.get_transaction_status()
-                        != psycopg2.extensions.TRANSACTION_STATUS_IDLE
-                    ):
-                        self.connection.rollback()
-                    self.connection.autocommit = True
+        # pg_advisory_xact_lock is held until the transaction ends, so it
+        # serialises concurrent writers to the same conversation (across
+        # pooled connections and across pods).
+        with self._transaction() as cursor:
+            try:
+                cursor.execute(
+                    self.ADVISORY_LOCK_STATEMENT,
+                    (user_id, conversation_id),
+                )
+                if with_versions:
+                    before = PostgresCache._version(cursor, user_id, conversation_id)
+                PostgresCache._append(
+                    cursor,
+                    user_id,
+                    conversation_id,
+                    encode_value(value),
+                )
+                cursor.execute(
+                    PostgresCache.UPSERT_CONVERSATION_STATEMENT,
+                    (user_id, conversation_id),
+                )
+                shard = PostgresCache._counter_shard(user_id, conversation_id)
+                PostgresCache._update_total_entries(cursor, shard, 1)
+                PostgresCache._cleanup(cursor, self.capacity, shard)
+                if with_versions:
+                    after = PostgresCache._version(cursor, user_id, conversation_id)
+            except psycopg2.DatabaseError as e:
+                logger.error("PostgresCache.insert_or_append: %s", e)
+                raise CacheError("PostgresCache.insert_or_append", e) from e
+        return before, after
 
     @connection
     def delete(
@@ -287,41 +462,81 @@ class PostgresCache(Cache, PostgresBase):
             bool: True if the conversation was deleted, False if not found.
 
         """
-        with self._tx_lock:
-            # This transaction status check is required for evaluation tests that use
-            # multi-turn conversations. Without it, rapid cache writes (appending each
-            # turn's messages) can leave an active transaction when autocommit=True is
-            # set in the finally block, causing psycopg2 to raise "set_session cannot
-            # be used inside a transaction". Rollback any active transaction to ensure
-            # clean autocommit mode transition.
-            if (
-                self.connection.get_transaction_status()
-                != psycopg2.extensions.TRANSACTION_STATUS_IDLE
-            ):
-                self.connection.rollback()
-            self.connection.autocommit = False
-            with self.connection.cursor() as cursor:
-                try:
-                    deleted = PostgresCache._delete(cursor, user_id, conversation_id)
+        with self._transaction() as cursor:
+            try:
+                deleted = PostgresCache._delete(cursor, user_id, conversation_id)
+                if deleted:
+                    PostgresCache._update_total_entries(
+                        cursor,
+                        PostgresCache._counter_shard(user_id, conversation_id),
+                        -deleted,
+                    )
+                cursor.execute(
+                    PostgresCache.DELETE_CONVERSATION_METADATA_STATEMENT,
+                    (user_id, conversation_id),
+                )
+                return deleted > 0
+            except psycopg2.DatabaseError as e:
+                logger.error("PostgresCache.delete: %s", e)
+                raise CacheError("PostgresCache.delete", e) from e
+
+    @connection
+    def replace_history(
+        self,
+        user_id: str,
+        conversation_id: str,
+        entries: list[CacheEntry],
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Atomically replace the whole conversation history by given entries.
+
+        Old entries are deleted and the new ones inserted by a single
+        statement in one transaction, under the same conversation lock as
+        appends use. The topic summary is kept; an empty history deletes the
+        conversation.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            entries: The new history, from the oldest to the newest entry.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        super().construct_key(user_id, conversation_id, skip_user_id_check)
+        values = [encode_value(cache_entry.to_dict()) for cache_entry in entries]
+
+        with self._transaction() as cursor:
+            try:
+                cursor.execute(
+                    self.ADVISORY_LOCK_STATEMENT,
+                    (user_id, conversation_id),
+                )
+                deleted = PostgresCache._delete(cursor, user_id, conversation_id)
+                if values:
+                    cursor.execute(
+                        PostgresCache.INSERT_CACHE_ENTRIES_STATEMENT,
+                        {
+                            "user_id": user_id,
+                            "conversation_id": conversation_id,
+                            "values": values,
+                        },
+                    )
+                    cursor.execute(
+                        PostgresCache.REPLACE_CONVERSATION_STATEMENT,
+                        (user_id, conversation_id, len(values)),
+                    )
+                else:
                     cursor.execute(
                         PostgresCache.DELETE_CONVERSATION_METADATA_STATEMENT,
                         (user_id, conversation_id),
                     )
-                    self.connection.commit()
-                    return deleted
-                except psycopg2.DatabaseError as e:
-                    self.connection.rollback()
-                    logger.error("PostgresCache.delete: %s", e)
-                    raise CacheError("PostgresCache.delete", e) from e
-                finally:
-                    # Ensure transaction is closed before setting autocommit
-                    # to avoid "set_session cannot be used inside a transaction" error
-                    if (
-                        self.connection.get_transaction_status()
-                        != psycopg2.extensions.TRANSACTION_STATUS_IDLE
-                    ):
-                        self.connection.rollback()
-                    self.connection.autocommit = True
+                shard = PostgresCache._counter_shard(user_id, conversation_id)
+                PostgresCache._update_total_entries(
+                    cursor, shard, len(values) - deleted
+                )
+                PostgresCache._cleanup(cursor, self.capacity, shard)
+            except psycopg2.DatabaseError as e:
+                logger.error("PostgresCache.replace_history: %s", e)
+                raise CacheError("PostgresCache.replace_history", e) from e
 
     @connection
     def list(
@@ -338,25 +553,22 @@ class PostgresCache(Cache, PostgresBase):
             topic_summary, last_message_timestamp, and message_count.
 
         """
-        with self._tx_lock:
-            with self.connection.cursor() as cursor:
-                try:
-                    cursor.execute(
-                        PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,)
+        with self._cursor() as cursor:
+            try:
+                cursor.execute(PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,))
+                rows = cursor.fetchall()
+                return [
+                    ConversationData(
+                        conversation_id=row[0],
+                        topic_summary=row[1] or "",
+                        last_message_timestamp=float(row[2]),
+                        message_count=row[3] or 0,
                     )
-                    rows = cursor.fetchall()
-                    return [
-                        ConversationData(
-                            conversation_id=row[0],
-                            topic_summary=row[1] or "",
-                            last_message_timestamp=float(row[2]),
-                            message_count=row[3] or 0,
-                        )
-                        for row in rows
-                    ]
-                except psycopg2.DatabaseError as e:
-                    logger.error("PostgresCache.list: %s", e)
-                    raise CacheError("PostgresCache.list", e) from e
+                    for row in rows
+                ]
+            except psycopg2.DatabaseError as e:
+                logger.error("PostgresCache.list: %s", e)
+                raise CacheError("PostgresCache.list", e) from e
 
     @connection
     def set_topic_summary(
@@ -374,46 +586,35 @@ class PostgresCache(Cache, PostgresBase):
             topic_summary: The topic summary to store.
             skip_user_id_check: Skip user_id suid check.
         """
-        with self._tx_lock:
-            with self.connection.cursor() as cursor:
-                try:
-                    cursor.execute(
-                        PostgresCache.INSERT_OR_UPDATE_TOPIC_SUMMARY_STATEMENT,
-                        (user_id, conversation_id, topic_summary),
-                    )
-                except psycopg2.DatabaseError as e:
-                    logger.error("PostgresCache.set_topic_summary: %s", e)
-                    raise CacheError("PostgresCache.set_topic_summary", e) from e
+        with self._cursor(write=True) as cursor:
+            try:
+                cursor.execute(
+                    PostgresCache.INSERT_OR_UPDATE_TOPIC_SUMMARY_STATEMENT,
+                    (user_id, conversation_id, topic_summary),
+                )
+            except psycopg2.DatabaseError as e:
+                logger.error("PostgresCache.set_topic_summary: %s", e)
+                raise CacheError("PostgresCache.set_topic_summary", e) from e
 
     def ready(self) -> bool:
         """Check if the cache is ready.
 
-        Postgres cache checks if the connection is alive. When a dead
-        connection is detected and the database is available again, the
-        connection is automatically re-established.
+        Postgres cache checks if a pooled connection is alive. Broken
+        connections are dropped by the pool; when the database is available
+        again, the connection is automatically re-established.
 
         Returns:
             True if the cache is ready, False otherwise.
         """
-        with self._tx_lock:
-            if not self.connection or self.connection.closed == 1:
-                try:
-                    logger.info("Detected dead connection, attempting reconnect")
-                    self.connect()
-                    return True
-                except Exception as e:
-                    logger.warning("Reconnect attempt failed: %s", e)
-                    return False
-            try:
-                return self.connection.poll() == psycopg2.extensions.POLL_OK
-            except (psycopg2.OperationalError, psycopg2.InterfaceError):
-                try:
-                    logger.info("Connection error during poll, attempting reconnect")
-                    self.connect()
-                    return True
-                except Exception as e:
-                    logger.warning("Reconnect attempt failed: %s", e)
-                    return False
+        if self.connected():
+            return True
+        try:
+            logger.info("Detected dead connection, attempting reconnect")
+            self.reconnect()
+            return True
+        except Exception as e:
+            logger.warning("Reconnect attempt failed: %s", e)
+            return False
 
     @staticmethod
     def _select(
@@ -427,87 +628,106 @@ class PostgresCache(Cache, PostgresBase):
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
         )
-        value = cursor.fetchone()
-
-        # check if history exists at all
-        if value is None:
-            return None
+        rows = cursor.fetchall()
 
-        # check the retrieved value
-        if len(value) != 1:
-            raise ValueError("Invalid value read from cache:", value)
+        deserialized = []
+        for row in rows:
+            # check the retrieved value
+            if len(row) != 1:
+                raise ValueError("Invalid value read from cache:", row)
 
-        # convert from memoryview object to a string
-        text_value = str(value[0], "utf-8")
-        deserialized = json.loads(text_value, cls=MessageDecoder)
+            # values are prefixed by the codec header, legacy ones are plain JSON
+            deserialized.append(decode_value(row[0]))
 
-        # try to deserialize the value
         return deserialized
 
     @staticmethod
-    def _update(
-        cursor: psycopg2.extensions.cursor,
-        user_id: str,
-        conversation_id: str,
-        value: bytes,
-    ) -> None:
-        """Update conversation history for given user_id and conversation_id."""
+    def _version(
+        cursor: psycopg2.extensions.cursor, user_id: str, conversation_id: str
+    ) -> Optional[HistoryVersion]:
+        """Read version of the conversation history, `None` if it is empty."""
         cursor.execute(
-            PostgresCache.UPDATE_CONVERSATION_HISTORY_STATEMENT,
-            (value, user_id, conversation_id),
+            PostgresCache.SELECT_HISTORY_VERSION_STATEMENT,
+            {"user_id": user_id, "conversation_id": conversation_id},
         )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return (row[0], row[1], row[2])
 
     @staticmethod
-    def _insert(
+    def _append(
         cursor: psycopg2.extensions.cursor,
         user_id: str,
         conversation_id: str,
         value: bytes,
     ) -> None:
-        """Insert new conversation history for given user_id and conversation_id."""
+        """Append one cache entry to the given user_id and conversation_id."""
         cursor.execute(
-            PostgresCache.INSERT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id, value),
+            PostgresCache.APPEND_CACHE_ENTRY_STATEMENT,
+            {
+                "user_id": user_id,
+                "conversation_id": conversation_id,
+                "value": value,
+            },
         )
 
     @staticmethod
-    def _cleanup(cursor: psycopg2.extensions.cursor, capacity: int) -> None:
-        """Perform cleanup by evicting oldest messages until total_entries <= capacity."""
-        cursor.execute(PostgresCache.QUERY_TOTAL_ENTRIES)
+    def _counter_shard(user_id: str, conversation_id: str) -> int:
+        """Select the counter shard updated by writes to the given conversation."""
+        key = f"{user_id}:{conversation_id}".encode()
+        return zlib.crc32(key) % constants.POSTGRES_CACHE_COUNTER_SHARDS
+
+    @staticmethod
+    def _update_total_entries(
+        cursor: psycopg2.extensions.cursor, shard: int, delta: int
+    ) -> None:
+        """Change the maintained number of cache entries in the given shard."""
+        cursor.execute(PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT, (shard, delta))
+
+    @staticmethod
+    def _total_entries(cursor: psycopg2.extensions.cursor) -> int:
+        """Read the maintained number of cache entries summed over all shards."""
+        cursor.execute(PostgresCache.QUERY_TOTAL_ENTRIES_STATEMENT)
         result = cursor.fetchone()
         if result is None:
-            total_entries = 0
-        else:
-            val = result[0]
-            try:
-                total_entries = int(val)
-            except (TypeError, ValueError):
-                total_entries = 0
-
-        if total_entries > capacity:
-            cursor.execute(PostgresCache.SELECT_OLDEST_ROW)
-            row = cursor.fetchone()
-            if not row:
-                return
-            user_id, conversation_id, value_bytes = row
-            text_value = str(value_bytes, "utf-8")
-            value = json.loads(text_value, cls=MessageDecoder)
-
-            if len(value) > 1:
-                value.pop(0)
-                new_value_bytes = json.dumps(value, cls=MessageEncoder).encode("utf-8")
-                PostgresCache._update(cursor, user_id, conversation_id, new_value_bytes)
-            else:
-                PostgresCache._delete(cursor, user_id, conversation_id)
-            total_entries -= 1
+            return 0
+        try:
+            return int(result[0])
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _cleanup(cursor: psycopg2.extensions.cursor, capacity: int, shard: int) -> None:
+        """Evict a batch of the oldest messages when the cache exceeds capacity.
+
+        The cache is trimmed down to a low watermark below capacity, so the
+        following inserts do not need to evict anything. When another writer
+        is already evicting, the eviction is left to it.
+        """
+        total_entries = PostgresCache._total_entries(cursor)
+        if total_entries <= capacity:
+            return
+
+        cursor.execute(PostgresCache.EVICTION_LOCK_STATEMENT)
+        result = cursor.fetchone()
+        if result is None or not result[0]:
+            return
+
+        batch = max(1, int(capacity * constants.POSTGRES_CACHE_EVICTION_BATCH_RATIO))
+        to_evict = total_entries - capacity + batch
+        logger.info("Evicting %d oldest entries from Postgres cache", to_evict)
+        cursor.execute(PostgresCache.DELETE_OLDEST_ENTRIES_STATEMENT, (to_evict,))
+        if cursor.rowcount > 0:
+            PostgresCache._update_total_entries(cursor, shard, -cursor.rowcount)
 
     @staticmethod
     def _delete(
         cursor: psycopg2.extensions.cursor, user_id: str, conversation_id: str
-    ) -> bool:
-        """Delete conversation history for given user_id and conversation_id."""
+    ) -> int:
+        """Delete conversation history and return the number of deleted entries."""
         cursor.execute(
             PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
         )
-        return cursor.rowcount > 0
+        return max(cursor.rowcount, 0)
@@ -0,0 +1,244 @@
+"""Postgres cache with a local in-process tier of decoded conversations."""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from prometheus_client import Counter
+
+from ols.app.models.models import CacheEntry, ConversationData
+from ols.src.cache.cache import Cache
+from ols.src.cache.postgres_cache import HistoryVersion, PostgresCache
+from ols.src.cache.value_codec import decode_value, encode_value
+
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+conversation_cache_local_hits_total = Counter(
+    "ols_conversation_cache_local_hits_total",
+    "Conversation histories served from the local cache tier",
+)
+conversation_cache_local_misses_total = Counter(
+    "ols_conversation_cache_local_misses_total",
+    "Conversation histories read from the database (missing or stale locally)",
+)
+
+
+class TieredCache(Cache):
+    """Read-through local LRU tier in front of `PostgresCache`.
+
+    Up to `max_conversations` decoded conversation histories are kept in
+    process memory together with their version (see
+    `PostgresCache.history_version`). A read compares the local version with
+    the version stored in the database, which is one index lookup, and only
+    when they differ the whole history is fetched and decoded again. This
+    keeps replicas sharing one database coherent without any notification.
+
+    Appends are written through: the versions read around the append tell
+    whether the local copy can be extended by the new entry or has to be
+    dropped. Deleting a conversation, replacing its history and updating its
+    topic drop the local copy.
+    """
+
+    def __init__(self, backend: PostgresCache, max_conversations: int) -> None:
+        """Wrap the Postgres cache with a local tier of the given size."""
+        self.backend = backend
+        self.max_conversations = max_conversations
+        self._local: OrderedDict[
+            str, tuple[Optional[HistoryVersion], list[CacheEntry]]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _as_stored(cache_entry: CacheEntry) -> CacheEntry:
+        """Return the entry as it is read back from the database."""
+        value = encode_value(cache_entry.to_dict())
+        return CacheEntry.from_dict(decode_value(value))
+
+    @staticmethod
+    def _copy(entries: list[CacheEntry]) -> list[CacheEntry]:
+        """Copy entries, so callers can not modify the local tier."""
+        return [entry.model_copy(deep=True) for entry in entries]
+
+    def _lookup(
+        self, key: str
+    ) -> Optional[tuple[Optional[HistoryVersion], list[CacheEntry]]]:
+        """Get the local copy of history and mark it as recently used."""
+        with self._lock:
+            item = self._local.get(key)
+            if item is not None:
+                self._local.move_to_end(key)
+            return item
+
+    def _store(
+        self, key: str, version: Optional[HistoryVersion], entries: list[CacheEntry]
+    ) -> None:
+        """Store the local copy of history, evicting the least recently used ones."""
+        with self._lock:
+            self._put(key, version, entries)
+
+    def _put(
+        self, key: str, version: Optional[HistoryVersion], entries: list[CacheEntry]
+    ) -> None:
+        """Store the local copy of history, the lock has to be held by the caller."""
+        self._local[key] = (version, entries)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_conversations:
+            self._local.popitem(last=False)
+
+    @staticmethod
+    def _only_appended(
+        local_version: Optional[HistoryVersion],
+        before: Optional[HistoryVersion],
+        after: Optional[HistoryVersion],
+    ) -> bool:
+        """Check that the local copy was up to date and just one entry was added."""
+        if after is None or local_version != before:
+            return False
+        # no entry of this conversation has been evicted during the append
+        first_seq = before[0] if before is not None else after[1]
+        return after[0] == first_seq
+
+    def _invalidate(self, key: str) -> None:
+        """Drop the local copy of history."""
+        with self._lock:
+            self._local.pop(key, None)
+
+    def get(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> list[CacheEntry]:
+        """Get the value associated with the given key.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            The value associated with the key.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+
+        item = self._lookup(key)
+        if item is not None:
+            version, entries = item
+            if self.backend.history_version(user_id, conversation_id) == version:
+                conversation_cache_local_hits_total.inc()
+                return self._copy(entries)
+
+        conversation_cache_local_misses_total.inc()
+        version, entries = self.backend.get_with_version(
+            user_id, conversation_id, skip_user_id_check
+        )
+        self._store(key, version, self._copy(entries))
+        return entries
+
+    def insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Append the entry to the database and to the local copy of history.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        before, after = self.backend.append_with_version(
+            user_id, conversation_id, cache_entry, skip_user_id_check
+        )
+
+        with self._lock:
+            item = self._local.get(key)
+            if item is None and before is None:
+                # new conversation, the appended entry is its whole history
+                item = (None, [])
+            if item is not None and self._only_appended(item[0], before, after):
+                self._put(key, after, [*item[1], self._as_stored(cache_entry)])
+            else:
+                self._local.pop(key, None)
+
+    def delete(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> bool:
+        """Delete conversation history for a given user_id and conversation_id.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            bool: True if the conversation was deleted, False if not found.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        self._invalidate(key)
+        return self.backend.delete(user_id, conversation_id, skip_user_id_check)
+
+    def replace_history(
+        self,
+        user_id: str,
+        conversation_id: str,
+        entries: list[CacheEntry],
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Atomically replace the whole conversation history by given entries.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            entries: The new history, from the oldest to the newest entry.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        self._invalidate(key)
+        self.backend.replace_history(
+            user_id, conversation_id, entries, skip_user_id_check
+        )
+
+    def list(
+        self, user_id: str, skip_user_id_check: bool = False
+    ) -> list[ConversationData]:
+        """List all conversations for a given user_id.
+
+        Args:
+            user_id: User identification.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            A list of ConversationData objects.
+        """
+        return self.backend.list(user_id, skip_user_id_check)
+
+    def set_topic_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        topic_summary: str,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Set or update the topic summary for a conversation.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            topic_summary: The topic summary to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        self._invalidate(key)
+        self.backend.set_topic_summary(
+            user_id, conversation_id, topic_summary, skip_user_id_check
+        )
+
+    def ready(self) -> bool:
+        """Check if the cache is ready.
+
+        Returns:
+            True if the cache is ready, False otherwise.
+        """
+        return self.backend.ready()
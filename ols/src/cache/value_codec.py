@@ -0,0 +1,116 @@
+"""Versioned codecs for conversation cache values stored in the database.
+
+Every encoded value starts with one header byte identifying the codec used to
+produce the rest of it. Values written before the header was introduced are
+plain UTF-8 JSON; a JSON document never starts with a control character, so
+such values are recognized by their first byte and still decoded.
+"""
+
+import json
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Union
+
+from ols import constants
+from ols.app.models.models import MessageDecoder, MessageEncoder
+
+
+class ValueCodec(ABC):
+    """Codec of one cache value format, identified by its header byte."""
+
+    format_id: int
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        """Encode the value to the payload stored after the header byte."""
+
+    @abstractmethod
+    def decode(self, payload: bytes) -> Any:
+        """Decode the payload stored after the header byte."""
+
+
+class JSONCodec(ValueCodec):
+    """Compact UTF-8 JSON produced by `MessageEncoder`."""
+
+    format_id = 0x01
+
+    def encode(self, value: Any) -> bytes:
+        """Encode the value to compact JSON."""
+        return json.dumps(value, cls=MessageEncoder, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    def decode(self, payload: bytes) -> Any:
+        """Decode JSON payload."""
+        return json.loads(str(payload, "utf-8"), cls=MessageDecoder)
+
+
+class ZlibJSONCodec(JSONCodec):
+    """JSON compressed by zlib, used for large values like tool results."""
+
+    format_id = 0x02
+
+    def __init__(self, level: int = constants.POSTGRES_CACHE_COMPRESSION_LEVEL):
+        """Initialize the codec with the given compression level."""
+        self.level = level
+
+    def encode(self, value: Any) -> bytes:
+        """Encode the value to compressed JSON."""
+        return self.compress(super().encode(value))
+
+    def compress(self, payload: bytes) -> bytes:
+        """Compress already encoded JSON payload."""
+        return zlib.compress(payload, self.level)
+
+    def decode(self, payload: bytes) -> Any:
+        """Decode compressed JSON payload."""
+        return super().decode(zlib.decompress(payload))
+
+
+_json_codec = JSONCodec()
+_zlib_codec = ZlibJSONCodec()
+
+# codecs of all known formats; a new format gets a new header byte here
+CODECS: dict[int, ValueCodec] = {
+    codec.format_id: codec for codec in (_json_codec, _zlib_codec)
+}
+
+
+def encode_value(value: Any) -> bytes:
+    """Encode the cache value, compressing it when it is large enough.
+
+    Args:
+        value: Value to encode, usually `CacheEntry.to_dict()`.
+
+    Returns:
+        Header byte followed by the encoded value.
+    """
+    payload = _json_codec.encode(value)
+    if len(payload) >= constants.POSTGRES_CACHE_COMPRESSION_THRESHOLD:
+        compressed = _zlib_codec.compress(payload)
+        # incompressible values are stored as they are
+        if len(compressed) < len(payload):
+            return bytes((_zlib_codec.format_id,)) + compressed
+    return bytes((_json_codec.format_id,)) + payload
+
+
+def decode_value(data: Union[bytes, memoryview]) -> Any:
+    """Decode the cache value written by `encode_value` or by older versions.
+
+    Args:
+        data: Value read from the database.
+
+    Returns:
+        Decoded value.
+
+    Raises:
+        ValueError: When the value is empty.
+    """
+    data = bytes(data)
+    if not data:
+        raise ValueError("Empty value read from cache")
+    codec = CODECS.get(data[0])
+    if codec is None:
+        # legacy value without header: plain UTF-8 JSON
+        return json.loads(str(data, "utf-8"), cls=MessageDecoder)
+    return codec.decode(data[1:])
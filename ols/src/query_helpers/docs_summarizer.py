@@ -3,8 +3,9 @@
 import asyncio
 import json
 import logging
+import time
 from contextlib import nullcontext
-from typing import Any, AsyncGenerator, Coroutine, Optional
+from typing import Any, AsyncGenerator, Awaitable, Coroutine, Optional, TypeVar
 
 from langchain_core.globals import set_debug
 from langchain_core.messages import AIMessage, BaseMessage
@@ -13,6 +14,7 @@ from langchain_core.tools.structured import StructuredTool
 from llama_index.core.retrievers import BaseRetriever
 
 from ols import config, constants
+from ols.app.metrics.metrics import query_preparation_stage_duration_seconds
 from ols.app.models.models import (
     RagChunk,
     StreamChunkType,
@@ -22,14 +24,21 @@ from ols.app.models.models import (
 from ols.constants import GenericLLMParameters
 from ols.src.auth.k8s import CLUSTER_VERSION_UNAVAILABLE, K8sClientSingleton
 from ols.src.prompts.prompt_generator import GeneratePrompt
-from ols.src.query_helpers.history_support import prepare_history
+from ols.src.query_helpers.history_support import (
+    prepare_history,
+    retrieve_history_entries,
+)
 from ols.src.query_helpers.llm_execution_agent import (
     LLMExecutionAgent,
     log_tool_loop_iteration,
 )
 from ols.src.query_helpers.query_helper import QueryHelper
 from ols.src.rag_index.solr_support import get_openshift_docs_tool
-from ols.src.skills.skills_rag import create_skill_support_tool
+from ols.src.skills.skills_rag import (
+    Skill,
+    SkillLoadResult,
+    create_skill_support_tool,
+)
 from ols.src.tools.offloaded_content import OffloadManager
 from ols.utils.audit_logger import AuditContext
 from ols.utils.mcp_utils import ClientHeaders, build_mcp_config, get_mcp_tools
@@ -42,6 +51,11 @@ from ols.utils.token_handler import (
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# selected skill, its confidence and content
+SkillSelection = tuple[Optional[Skill], float, Optional[SkillLoadResult]]
+
 
 def run_async_safely(coro: Coroutine[Any, Any, Any]) -> Any:
     """Run an async function safely."""
@@ -54,6 +68,17 @@ def run_async_safely(coro: Coroutine[Any, Any, Any]) -> Any:
         raise
 
 
+async def _timed(stage: str, awaitable: Awaitable[T], timings: dict[str, float]) -> T:
+    """Await the query preparation stage, recording its duration."""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        duration = time.perf_counter() - start
+        timings[stage] = duration
+        query_preparation_stage_duration_seconds.labels(stage=stage).observe(duration)
+
+
 class DocsSummarizer(QueryHelper):
     """A class for summarizing documentation context."""
 
@@ -154,19 +179,14 @@ class DocsSummarizer(QueryHelper):
             self.generic_llm_params,
         )
 
-    async def _prepare_prompt_context(
-        self,
-        query: str,
-        rag_retriever: Optional[BaseRetriever] = None,
-    ) -> list[RagChunk]:
-        """Prepare RAG context for prompt construction.
+    def _charge_base_prompt(self, query: str) -> None:
+        """Charge the prompt template with the query to the token budget.
 
         Args:
             query: The query to be answered.
-            rag_retriever: The retriever to get RAG data/context.
 
-        Returns:
-            RAG chunks truncated to fit the prompt budget.
+        Raises:
+            PromptTooLongError: The prompt alone does not fit the budget.
         """
         temp_prompt, temp_prompt_input = GeneratePrompt(
             query,
@@ -189,6 +209,18 @@ class DocsSummarizer(QueryHelper):
             )
         self._tracker.charge(TokenCategory.PROMPT, prompt_tokens)
 
+    async def _retrieve_rag_context(
+        self, query: str, rag_retriever: Optional[BaseRetriever]
+    ) -> list[RagChunk]:
+        """Retrieve RAG context and charge it to the token budget.
+
+        Args:
+            query: The query to be answered.
+            rag_retriever: The retriever to get RAG data/context.
+
+        Returns:
+            RAG chunks truncated to fit the prompt budget.
+        """
         if rag_retriever:
             rag_span = (
                 self._audit_ctx.span("request.rag")
@@ -196,7 +228,8 @@ class DocsSummarizer(QueryHelper):
                 else nullcontext()
             )
             with rag_span as span:
-                retrieved_nodes = rag_retriever.retrieve(query)
+                # indexes are searched off the event loop, concurrently
+                retrieved_nodes = await rag_retriever.aretrieve(query)
                 logger.info(
                     "Retrieved %d document nodes for RAG context",
                     len(retrieved_nodes),
@@ -237,6 +270,49 @@ class DocsSummarizer(QueryHelper):
 
         return rag_chunks
 
+    async def _select_skill(self, query: str) -> SkillSelection:
+        """Select the skill matching the query and read its content.
+
+        Args:
+            query: The query to be answered.
+
+        Returns:
+            Tuple of (skill, confidence, loaded skill); the skill is None when
+            skills are not configured, none matches or it can not be read.
+        """
+        skills_rag = config.skills_rag
+        if skills_rag is None:
+            return None, 0.0, None
+        loop = asyncio.get_running_loop()
+        # the query embedding is batched, keep the wait off the event loop
+        skill, confidence = await loop.run_in_executor(
+            None, skills_rag.retrieve_skill, query
+        )
+        if skill is None:
+            return None, confidence, None
+        loaded = await loop.run_in_executor(None, skill.load_skill)
+        if not loaded.ok:
+            return None, confidence, None
+        return skill, confidence, loaded
+
+    async def _resolve_tools_for_skill(
+        self, query: str, skill_selection: Awaitable[SkillSelection]
+    ) -> list[StructuredTool]:
+        """Resolve MCP tools for the query extended by the selected skill.
+
+        Args:
+            query: The query to be answered.
+            skill_selection: Selected skill, see `_select_skill`.
+
+        Returns:
+            Tools available for the request.
+        """
+        _, _, loaded = await skill_selection
+        content = loaded.content if loaded is not None else None
+        return await self._resolve_tools_for_request(
+            f"{content}\n\n{query}" if content else query
+        )
+
     def _serialized_tool_definitions_text(
         self, all_mcp_tools: list[StructuredTool]
     ) -> str:
@@ -336,111 +412,150 @@ class DocsSummarizer(QueryHelper):
         Yields:
             StreamedChunk objects representing parts of the response
         """
-        rag_chunks = await self._prepare_prompt_context(query, rag_retriever)
-
-        skill_content: Optional[str] = None
-        has_support_files = False
-        skill = None
-        skills_rag = config.skills_rag
-        if skills_rag is not None:
-            skill, confidence = skills_rag.retrieve_skill(query)
-            if skill is not None:
-                loaded = skill.load_skill()
-                if not loaded.ok:
-                    skill = None
+        self._charge_base_prompt(query)
+
+        # Stages independent of each other run concurrently: RAG retrieval,
+        # skill selection and the conversation history read. Tools are
+        # resolved as soon as the skill is known, as they are filtered by its
+        # content. Token budgets are then charged in the original order.
+        timings: dict[str, float] = {}
+        rag_task = asyncio.create_task(
+            _timed("rag", self._retrieve_rag_context(query, rag_retriever), timings)
+        )
+        skill_task = asyncio.create_task(
+            _timed("skill", self._select_skill(query), timings)
+        )
+        history_task = asyncio.create_task(
+            _timed(
+                "history_fetch",
+                retrieve_history_entries(user_id, conversation_id, skip_user_id_check),
+                timings,
+            )
+        )
+        tools_task = asyncio.create_task(
+            _timed("tools", self._resolve_tools_for_skill(query, skill_task), timings)
+        )
+        tasks = [rag_task, skill_task, history_task, tools_task]
+        try:
+            rag_chunks = await rag_task
+
+            skill_content: Optional[str] = None
+            has_support_files = False
+            skill, confidence, loaded = await skill_task
+            if skill is not None and loaded is not None:
+                skill_content = loaded.content
+                has_support_files = loaded.has_support_files
+                skill_tokens = self._tracker.count_tokens(skill_content)
+                shared_tail_budget = self._tracker.prompt_budget_remaining
+                if skill_tokens > shared_tail_budget * 0.8:
+                    logger.warning(
+                        "Skill '%s' requires %d tokens but only %d available "
+                        "in prompt tail (skill + history); skipping",
+                        skill.name,
+                        skill_tokens,
+                        shared_tail_budget,
+                    )
+                    skill_content = None
+                    has_support_files = False
+                    yield StreamedChunk(
+                        type=StreamChunkType.SKILL_SELECTED,
+                        data={
+                            "name": skill.name,
+                            "confidence": confidence,
+                            "skipped": True,
+                            "reason": "exceeds token budget",
+                        },
+                    )
                 else:
-                    skill_content = loaded.content
-                    has_support_files = loaded.has_support_files
-                    skill_tokens = self._tracker.count_tokens(skill_content)
-                    shared_tail_budget = self._tracker.prompt_budget_remaining
-                    if skill_tokens > shared_tail_budget * 0.8:
+                    self._tracker.charge(TokenCategory.SKILL, skill_tokens)
+                    if skill_tokens > shared_tail_budget * 0.5:
                         logger.warning(
-                            "Skill '%s' requires %d tokens but only %d available "
-                            "in prompt tail (skill + history); skipping",
+                            "Skill '%s' uses %d tokens (%.0f%% of prompt tail budget)",
                             skill.name,
                             skill_tokens,
-                            shared_tail_budget,
-                        )
-                        skill_content = None
-                        has_support_files = False
-                        yield StreamedChunk(
-                            type=StreamChunkType.SKILL_SELECTED,
-                            data={
-                                "name": skill.name,
-                                "confidence": confidence,
-                                "skipped": True,
-                                "reason": "exceeds token budget",
-                            },
+                            skill_tokens / shared_tail_budget * 100,
                         )
+                    yield StreamedChunk(
+                        type=StreamChunkType.SKILL_SELECTED,
+                        data={
+                            "name": skill.name,
+                            "confidence": confidence,
+                        },
+                    )
+
+            history: list[BaseMessage] = []
+            truncated = False
+            compressed = False
+            available_tokens = self._tracker.history_budget
+            cache_entries = await history_task
+            history_start = time.perf_counter()
+            history_span = (
+                self._audit_ctx.span("request.history")
+                if self._audit_ctx
+                else nullcontext()
+            )
+            with history_span as span:
+                async for item in prepare_history(
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    skip_user_id_check=skip_user_id_check,
+                    available_tokens=available_tokens,
+                    provider=self.provider,
+                    model=self.model,
+                    bare_llm=self.bare_llm,
+                    token_handler=self._tracker.token_handler,
+                    cache_entries=cache_entries,
+                ):
+                    if isinstance(item, StreamedChunk):
+                        if item.type == StreamChunkType.HISTORY_COMPRESSION_END:
+                            compressed = True
+                        yield item
                     else:
-                        self._tracker.charge(TokenCategory.SKILL, skill_tokens)
-                        if skill_tokens > shared_tail_budget * 0.5:
-                            logger.warning(
-                                "Skill '%s' uses %d tokens (%.0f%% of prompt tail budget)",
-                                skill.name,
-                                skill_tokens,
-                                skill_tokens / shared_tail_budget * 100,
-                            )
-                        yield StreamedChunk(
-                            type=StreamChunkType.SKILL_SELECTED,
-                            data={
-                                "name": skill.name,
-                                "confidence": confidence,
-                            },
-                        )
+                        history, truncated = item
 
-        history: list[BaseMessage] = []
-        truncated = False
-        compressed = False
-        available_tokens = self._tracker.history_budget
-        history_span = (
-            self._audit_ctx.span("request.history")
-            if self._audit_ctx
-            else nullcontext()
-        )
-        with history_span as span:
-            async for item in prepare_history(
-                user_id=user_id,
-                conversation_id=conversation_id,
-                skip_user_id_check=skip_user_id_check,
-                available_tokens=available_tokens,
-                provider=self.provider,
-                model=self.model,
-                bare_llm=self.bare_llm,
-                token_handler=self._tracker.token_handler,
-            ):
-                if isinstance(item, StreamedChunk):
-                    if item.type == StreamChunkType.HISTORY_COMPRESSION_END:
-                        compressed = True
-                    yield item
-                else:
-                    history, truncated = item
+                if self._audit_ctx and span:
+                    self._audit_ctx.logger.history_retrieved(
+                        turn_count=len(history) // 2,
+                        compressed=compressed,
+                        truncated=truncated,
+                    )
+            timings["history"] = time.perf_counter() - history_start
+            query_preparation_stage_duration_seconds.labels(stage="history").observe(
+                timings["history"]
+            )
 
-            if self._audit_ctx and span:
-                self._audit_ctx.logger.history_retrieved(
-                    turn_count=len(history) // 2,
-                    compressed=compressed,
-                    truncated=truncated,
-                )
+            for msg in history:
+                if isinstance(msg.content, str):
+                    self._tracker.charge(
+                        TokenCategory.HISTORY,
+                        self._tracker.count_tokens(msg.content),
+                    )
 
-        for msg in history:
-            if isinstance(msg.content, str):
-                self._tracker.charge(
-                    TokenCategory.HISTORY,
-                    self._tracker.count_tokens(msg.content),
-                )
+            final_prompt, llm_input_values = self._build_final_prompt(
+                query=query,
+                history=history,
+                rag_chunks=rag_chunks,
+                skill_content=skill_content,
+                tool_definitions_tokens=0,
+            )
 
-        final_prompt, llm_input_values = self._build_final_prompt(
-            query=query,
-            history=history,
-            rag_chunks=rag_chunks,
-            skill_content=skill_content,
-            tool_definitions_tokens=0,
+            all_mcp_tools = await tools_task
+            if skill is not None and skill_content is None:
+                # tools were filtered by the skill skipped for its size
+                all_mcp_tools = await self._resolve_tools_for_request(query)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            # errors of stages not awaited because of an earlier failure
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.info(
+            "Query prepared in stages: %s",
+            ", ".join(f"{stage} {t * 1000:.0f} ms" for stage, t in timings.items()),
         )
 
         messages = final_prompt.model_copy()
-        mcp_tools_query = f"{skill_content}\n\n{query}" if skill_content else query
-        all_mcp_tools = await self._resolve_tools_for_request(mcp_tools_query)
         if skill is not None and skill_content is not None and has_support_files:
             all_mcp_tools.append(create_skill_support_tool(skill))
         tool_definitions_text = self._serialized_tool_definitions_text(all_mcp_tools)
@@ -3,7 +3,9 @@
 import asyncio
 import logging
 import time
+from bisect import bisect_right
 from collections.abc import AsyncGenerator
+from itertools import accumulate
 from typing import TypeAlias
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
@@ -21,22 +23,24 @@ DEFAULT_ENTRIES_TO_KEEP = 5
 SUMMARY_ATTEMPT_TIMEOUT_SECONDS = 20.0
 
 
-def _count_message_tokens(message: BaseMessage, token_handler: TokenHandler) -> int:
-    """Estimate token count for one message with newline overhead.
+def _entry_token_counts(
+    entries: list[CacheEntry], token_handler: TokenHandler
+) -> list[int]:
+    """Estimate token counts of history messages with newline overhead.
 
     Args:
-        message: Chat message to estimate token usage for.
-        token_handler: Token helper used for text-to-token conversion.
+        entries: Conversation history ordered oldest to newest.
+        token_handler: Token helper used for token counting.
 
     Returns:
-        Estimated token count for the message including newline separator overhead.
+        Estimated token counts of the query and the response of every entry,
+        in the order of messages in the history.
     """
-    # Mirror the same type/content formatting used by history token limiting.
-    message_tokens = TokenHandler._get_token_count(
-        token_handler.text_to_tokens(f"{message.type}: {message.content}")
-    )
-    # Reserve a single token for message separator/newline in joined history text.
-    return message_tokens + 1
+    token_counts: list[int] = []
+    for entry in entries:
+        # Counts are stored with the entry, older entries are counted just once.
+        token_counts.extend(token_handler.count_entry_tokens(entry))
+    return token_counts
 
 
 def _split_entries_by_token_budget(
@@ -59,21 +63,15 @@ def _split_entries_by_token_budget(
     if not entries:
         return [], False
 
-    kept_newest_first: list[CacheEntry] = []
-    used_tokens = 0
-    # Walk from newest to oldest and keep appending until we exceed the budget.
-    for entry in reversed(entries):
-        # Count one cached turn (user query + assistant response) consistently.
-        response_message = entry.response or AIMessage("")
-        entry_tokens = _count_message_tokens(entry.query, token_handler)
-        entry_tokens += _count_message_tokens(response_message, token_handler)
-        if used_tokens + entry_tokens > available_tokens:
-            # First non-fitting entry marks token overflow; return what still fits.
-            return kept_newest_first, True
-        kept_newest_first.append(entry)
-        used_tokens += entry_tokens
-
-    return kept_newest_first, False
+    # Count one cached turn (user query + assistant response) consistently,
+    # reserving a single token for each message separator/newline.
+    entry_tokens = [sum(token_handler.count_entry_tokens(e)) + 2 for e in entries]
+    # Tokens used by the newest entries; the first entry over the budget
+    # marks token overflow and only the entries before it still fit.
+    used_tokens = list(accumulate(reversed(entry_tokens)))
+    fitting = bisect_right(used_tokens, available_tokens)
+    kept_newest_first = entries[::-1][:fitting]
+    return kept_newest_first, fitting < len(entries)
 
 
 def _rewrite_cache(
@@ -97,16 +95,13 @@ def _rewrite_cache(
     """
     rewrite_start = time.perf_counter()
     try:
-        # Replace in two phases: clear previous history first...
-        config.conversation_cache.delete(user_id, conversation_id, skip_user_id_check)
-        # ...then append the replacement history in order.
-        for entry in entries:
-            config.conversation_cache.insert_or_append(
-                user_id,
-                conversation_id,
-                entry,
-                skip_user_id_check,
-            )
+        # Replace in one step, so the conversation is never left half-written.
+        config.conversation_cache.replace_history(
+            user_id,
+            conversation_id,
+            entries,
+            skip_user_id_check,
+        )
         return entries
     except Exception as e:
         logger.error("Failed to update cache with %s: %s", context, e)
@@ -155,6 +150,33 @@ def _retrieve_previous_input(
     return previous_input
 
 
+async def retrieve_history_entries(
+    user_id: str | None,
+    conversation_id: str | None,
+    skip_user_id_check: bool,
+) -> list[CacheEntry]:
+    """Read conversation history entries from cache off the event loop.
+
+    Args:
+        user_id: User ID for cache lookup.
+        conversation_id: Conversation ID for cache lookup.
+        skip_user_id_check: Whether to bypass user ID validation.
+
+    Returns:
+        Conversation history entries, or an empty list when none exist.
+    """
+    if not (user_id and conversation_id):
+        return []
+    # cache backends are synchronous, Postgres reads must not block the loop
+    return await asyncio.get_running_loop().run_in_executor(
+        None,
+        _retrieve_previous_input,
+        user_id,
+        conversation_id,
+        skip_user_id_check,
+    )
+
+
 async def summarize_entries(entries: list[CacheEntry], bare_llm: object) -> str | None:
     """Summarize a list of conversation cache entries.
 
@@ -352,6 +374,7 @@ async def prepare_history(
     model: str,
     bare_llm: object,
     token_handler: TokenHandler,
+    cache_entries: list[CacheEntry] | None = None,
 ) -> AsyncGenerator[StreamedChunk | HistoryResult, None]:
     """Retrieve, optionally compress, and truncate history for prompting.
 
@@ -367,6 +390,8 @@ async def prepare_history(
         model: LLM model name used for summary metadata.
         bare_llm: LLM client used for summarizing overflow history.
         token_handler: Token helper used for history budgeting and truncation.
+        cache_entries: History entries already read from cache, e.g. by
+            `retrieve_history_entries`; read from cache when not provided.
 
     Yields:
         StreamedChunk for compression start/end events, then a
@@ -376,14 +401,18 @@ async def prepare_history(
         yield ([], False)
         return
 
-    cache_entries = _retrieve_previous_input(
-        user_id,
-        conversation_id,
-        skip_user_id_check,
-    )
+    if cache_entries is None:
+        cache_entries = _retrieve_previous_input(
+            user_id,
+            conversation_id,
+            skip_user_id_check,
+        )
     if not config.ols_config.history_compression_enabled:
+        token_counts = _entry_token_counts(cache_entries, token_handler)
         history = CacheEntry.cache_entries_to_history(cache_entries)
-        yield token_handler.limit_conversation_history(history, available_tokens)
+        yield token_handler.limit_conversation_history(
+            history, available_tokens, token_counts
+        )
         return
     effective_history_budget = max(
         1, int(available_tokens * HISTORY_TOKEN_BUDGET_RATIO)
@@ -417,5 +446,8 @@ async def prepare_history(
         type=StreamChunkType.HISTORY_COMPRESSION_END,
         data={"status": "completed", "duration_ms": round(duration_ms, 2)},
     )
+    token_counts = _entry_token_counts(cache_entries, token_handler)
     history = CacheEntry.cache_entries_to_history(cache_entries)
-    yield token_handler.limit_conversation_history(history, available_tokens)
+    yield token_handler.limit_conversation_history(
+        history, available_tokens, token_counts
+    )
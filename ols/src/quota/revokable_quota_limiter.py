@@ -72,16 +72,16 @@ class RevokableQuotaLimiter(QuotaLimiter, PostgresBase):
         """Retrieve available quota for given subject."""
         if self.subject_type == "c":
             subject_id = ""
-        with self.connection.cursor() as cursor:
+        with self._cursor() as cursor:
             cursor.execute(
                 RevokableQuotaLimiter.SELECT_QUOTA,
                 (subject_id, self.subject_type),
             )
             value = cursor.fetchone()
-            if value is None:
-                self._init_quota(subject_id)
-                return self.initial_quota
-            return value[0]
+        if value is None:
+            self._init_quota(subject_id)
+            return self.initial_quota
+        return value[0]
 
     @connection
     def revoke_quota(self, subject_id: str = "") -> None:
@@ -91,12 +91,11 @@ class RevokableQuotaLimiter(QuotaLimiter, PostgresBase):
         # timestamp to be used
         revoked_at = datetime.now()
 
-        with self.connection.cursor() as cursor:
+        with self._cursor(write=True) as cursor:
             cursor.execute(
                 RevokableQuotaLimiter.SET_AVAILABLE_QUOTA,
                 (self.initial_quota, revoked_at, subject_id, self.subject_type),
             )
-            self.connection.commit()
 
     @connection
     def increase_quota(self, subject_id: str = "") -> None:
@@ -106,12 +105,11 @@ class RevokableQuotaLimiter(QuotaLimiter, PostgresBase):
         # timestamp to be used
         updated_at = datetime.now()
 
-        with self.connection.cursor() as cursor:
+        with self._cursor(write=True) as cursor:
             cursor.execute(
                 RevokableQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
                 (self.increase_by, updated_at, subject_id, self.subject_type),
             )
-            self.connection.commit()
 
     def ensure_available_quota(self, subject_id: str = "") -> None:
         """Ensure that there's avaiable quota left."""
@@ -143,7 +141,7 @@ class RevokableQuotaLimiter(QuotaLimiter, PostgresBase):
         )
         to_be_consumed = input_tokens + output_tokens
 
-        with self.connection.cursor() as cursor:
+        with self._cursor(write=True) as cursor:
             # timestamp to be used
             updated_at = datetime.now()
 
@@ -151,14 +149,13 @@ class RevokableQuotaLimiter(QuotaLimiter, PostgresBase):
                 RevokableQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
                 (-to_be_consumed, updated_at, subject_id, self.subject_type),
             )
-            self.connection.commit()
 
     def _init_quota(self, subject_id: str = "") -> None:
         """Initialize quota for given ID."""
         # timestamp to be used
         revoked_at = datetime.now()
 
-        with self.connection.cursor() as cursor:
+        with self._cursor(write=True) as cursor:
             cursor.execute(
                 RevokableQuotaLimiter.INIT_QUOTA,
                 (
@@ -169,4 +166,3 @@ class RevokableQuotaLimiter(QuotaLimiter, PostgresBase):
                     revoked_at,
                 ),
             )
-            self.connection.commit()
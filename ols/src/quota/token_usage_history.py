@@ -71,7 +71,7 @@ class TokenUsageHistory(PostgresBase):
         )
         updated_at = datetime.now()
 
-        with self.connection.cursor() as cursor:
+        with self._cursor(write=True) as cursor:
             cursor.execute(
                 TokenUsageHistory.CONSUME_TOKENS_FOR_USER,
                 {
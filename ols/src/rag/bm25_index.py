@@ -0,0 +1,213 @@
+"""Incremental inverted index scoring documents with BM25."""
+
+import math
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class BM25Statistics:
+    """Immutable BM25 statistics of the indexed corpus at one point in time.
+
+    Statistics are taken from `BM25Index` after it is updated and are never
+    modified, so any number of threads can score queries against them while
+    the index is being updated.
+    """
+
+    k1: float = 1.5
+    b: float = 0.75
+    # term -> document ID -> frequency of the term in the document
+    postings: Mapping[str, Mapping[str, int]] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    lengths: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+    total_length: int = 0
+
+    def idf(self, term: str) -> float:
+        """Return inverse document frequency of the term in the corpus."""
+        count = len(self.lengths)
+        frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+
+    def scores(self, tokens: Iterable[str]) -> dict[str, float]:
+        """Score documents against the query tokens.
+
+        Only documents containing at least one query token are scored, the
+        score of every other document is zero.
+
+        Args:
+            tokens: Tokens of the query.
+
+        Returns:
+            BM25 score by document ID.
+        """
+        if not self.lengths:
+            return {}
+        average_length = self.total_length / len(self.lengths) or 1.0
+        scores: dict[str, float] = {}
+        for term in tokens:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self.lengths[doc_id] / average_length
+                )
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                    frequency * (self.k1 + 1) / (frequency + norm)
+                )
+        return scores
+
+    def __len__(self) -> int:
+        """Return number of documents in the corpus."""
+        return len(self.lengths)
+
+
+class BM25Index:
+    """BM25 index of tokenized documents updated one document at a time.
+
+    The index keeps a posting list of term frequencies per term, the length
+    of every document and the number of documents containing every term.
+    Adding, replacing or removing a document updates only the postings of
+    its terms, so it takes time proportional to the document length, not to
+    the size of the corpus. IDF is computed from the maintained document
+    frequencies when a query is scored, so it always reflects the current
+    corpus.
+
+    IDF is the non-negative variant ``log(1 + (N - df + 0.5) / (df + 0.5))``.
+    Unlike the plain Okapi IDF it does not turn negative for terms present
+    in most documents of a small corpus, so no corpus-wide correction of
+    negative values is needed.
+
+    The index is not thread safe, callers serialize updates. Queries score
+    immutable `statistics` taken after an update instead, which share the
+    postings of terms not changed since the previous statistics.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        """Initialize empty index.
+
+        Args:
+            k1: Term frequency saturation parameter.
+            b: Document length normalization parameter.
+        """
+        self.k1 = k1
+        self.b = b
+        # term -> document ID -> frequency of the term in the document
+        self._postings: dict[str, dict[str, int]] = {}
+        # document ID -> term frequencies of the document
+        self._documents: dict[str, Counter[str]] = {}
+        self._lengths: dict[str, int] = {}
+        self._total_length = 0
+        self._statistics = BM25Statistics(k1, b)
+        # terms whose postings changed since the statistics were taken, None
+        # when nothing changed
+        self._changed_terms: Optional[set[str]] = None
+
+    def add(self, doc_id: str, tokens: Iterable[str]) -> None:
+        """Add the document, replacing the document indexed under the same ID.
+
+        Args:
+            doc_id: Document identifier.
+            tokens: Tokens of the document.
+        """
+        self.remove(doc_id)
+        frequencies = Counter(tokens)
+        changed_terms = self._changed()
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+            changed_terms.add(term)
+        self._documents[doc_id] = frequencies
+        length = frequencies.total()
+        self._lengths[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove the document from the index.
+
+        Args:
+            doc_id: Document identifier.
+
+        Returns:
+            Whether the document was indexed.
+        """
+        frequencies = self._documents.pop(doc_id, None)
+        if frequencies is None:
+            return False
+        changed_terms = self._changed()
+        for term in frequencies:
+            changed_terms.add(term)
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        return True
+
+    def _changed(self) -> set[str]:
+        """Return the set collecting terms changed since the statistics were taken."""
+        if self._changed_terms is None:
+            self._changed_terms = set()
+        return self._changed_terms
+
+    def statistics(self) -> BM25Statistics:
+        """Return immutable statistics of the current corpus.
+
+        Postings of the terms changed since the previous statistics are
+        copied, postings of other terms are shared with them.
+
+        Returns:
+            Statistics to score queries against.
+        """
+        if self._changed_terms is None:
+            return self._statistics
+        postings = dict(self._statistics.postings)
+        for term in self._changed_terms:
+            term_postings = self._postings.get(term)
+            if term_postings:
+                postings[term] = MappingProxyType(dict(term_postings))
+            else:
+                postings.pop(term, None)
+        self._statistics = BM25Statistics(
+            self.k1,
+            self.b,
+            MappingProxyType(postings),
+            MappingProxyType(dict(self._lengths)),
+            self._total_length,
+        )
+        self._changed_terms = None
+        return self._statistics
+
+    def idf(self, term: str) -> float:
+        """Return inverse document frequency of the term in the current corpus."""
+        return self.statistics().idf(term)
+
+    def scores(self, tokens: Iterable[str]) -> dict[str, float]:
+        """Score indexed documents against the query tokens.
+
+        Only documents containing at least one query token are scored, the
+        score of every other document is zero.
+
+        Args:
+            tokens: Tokens of the query.
+
+        Returns:
+            BM25 score by document ID.
+        """
+        return self.statistics().scores(tokens)
+
+    def doc_ids(self) -> Iterator[str]:
+        """Iterate IDs of the indexed documents."""
+        return iter(self._documents)
+
+    def __contains__(self, doc_id: object) -> bool:
+        """Return whether a document is indexed under the ID."""
+        return doc_id in self._documents
+
+    def __len__(self) -> int:
+        """Return number of indexed documents."""
+        return len(self._documents)
@@ -0,0 +1,154 @@
+"""Micro-batching of concurrent text embeddings.
+
+Embedding models encode a batch of texts in one forward pass much faster than
+the same texts one by one. `EmbeddingBatcher` collects texts submitted
+concurrently by request handlers for a few milliseconds and encodes them
+together on its worker thread.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from prometheus_client import Histogram
+
+from ols.constants import EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_MAX_WAIT_MS
+from ols.src.rag.embeddings import as_float_list
+
+logger = logging.getLogger(__name__)
+
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+embedding_batch_size = Histogram(
+    "ols_embedding_batch_size",
+    "Numbers of texts encoded by the embedding model in one batch",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+# the worker thread exits when there is nothing to encode for this long
+_WORKER_IDLE_TIMEOUT = 30.0
+
+
+class EmbeddingBatcher:
+    """Encode texts submitted concurrently in batches on a worker thread.
+
+    The worker waits for the first text, then for at most `max_wait` seconds
+    for more texts, up to `max_batch_size` of them, and encodes all of them by
+    one call of the batch encode function. Texts of one `encode_batch` call
+    are queued at once, so large batches, e.g. tools being indexed, are split
+    to batches of `max_batch_size` texts without waiting.
+
+    The worker thread is started by the first text submitted and exits when
+    it is idle, so batchers which are not used do not keep threads around.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        encode_batch_fn: Callable[[list[str]], Sequence[Any]],
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        max_wait: float = EMBEDDING_BATCH_MAX_WAIT_MS / 1000,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            model_id: Identifier of the model, used in metrics and logs.
+            encode_batch_fn: Function that encodes list of texts into list of
+                embedding vectors.
+            max_batch_size: Maximum number of texts encoded in one batch.
+            max_wait: Maximum time in seconds to wait for more texts.
+        """
+        self.model_id = model_id
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self._encode_batch_fn = encode_batch_fn
+        self._queue: queue.SimpleQueue[tuple[str, Future]] = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future:
+        """Submit the text to be encoded in the next batch.
+
+        Args:
+            text: Text to embed.
+
+        Returns:
+            Future resolved to the embedding vector.
+        """
+        future: Future = Future()
+        with self._lock:
+            self._queue.put((text, future))
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name=f"embedding-batcher-{self.model_id}",
+                    daemon=True,
+                )
+                self._worker.start()
+        return future
+
+    def encode(self, text: str) -> list[float]:
+        """Return the embedding of the text, encoded in a batch.
+
+        Blocks the calling thread until the batch is encoded, so it must not
+        be called from the event loop.
+        """
+        return self.submit(text).result()
+
+    def encode_batch(self, texts: Sequence[str]) -> list[list[float]]:
+        """Return embeddings of the texts, encoded in batches."""
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    def _run(self) -> None:
+        """Collect submitted texts and encode them in batches."""
+        while True:
+            try:
+                first = self._queue.get(timeout=_WORKER_IDLE_TIMEOUT)
+            except queue.Empty:
+                with self._lock:
+                    # texts are submitted under the lock, none can be missed
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+            self._encode(self._collect(first))
+
+    def _collect(self, first: tuple[str, Future]) -> list[tuple[str, Future]]:
+        """Collect texts submitted until the batch is full or waiting expires."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    # take texts which are already queued without waiting
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _encode(self, batch: list[tuple[str, Future]]) -> None:
+        """Encode the batch and resolve futures of its texts."""
+        embedding_batch_size.labels(model=self.model_id).observe(len(batch))
+        try:
+            vectors = self._encode_batch_fn([text for text, _ in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(
+                    f"Embedding model returned {len(vectors)} embeddings "
+                    f"for {len(batch)} texts"
+                )
+        except Exception as e:
+            logger.error("Failed to encode %d texts: %s", len(batch), e)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(as_float_list(vector))
@@ -0,0 +1,158 @@
+"""Registry of embedding models shared by all their consumers.
+
+The same embedding model is used by RAG index retrieval, tools filtering and
+skill selection. The registry loads every model once, keyed by its path, and
+hands out the one instance to all consumers, so the weights are not kept in
+memory several times.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional
+
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+embedding_model_resident_bytes = Gauge(
+    "ols_embedding_model_resident_bytes",
+    "Growth of the process resident memory caused by loading the embedding model",
+    ["model"],
+)
+embedding_model_load_duration_seconds = Gauge(
+    "ols_embedding_model_load_duration_seconds",
+    "Duration of loading the embedding model",
+    ["model"],
+)
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """Return resident memory of the process, None when it is not known."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def load_hugging_face_model(model_path: str) -> Any:
+    """Load the HuggingFace embedding model from the given path or model ID."""
+    # llama_index is imported only when a model is really needed, importing
+    # it bumps memory consumption up considerably
+    from llama_index.embeddings.huggingface import (  # pylint: disable=import-outside-toplevel
+        HuggingFaceEmbedding,
+    )
+
+    return HuggingFaceEmbedding(model_name=model_path)
+
+
+class EmbeddingModelRegistry:
+    """Load embedding models once and share them among their consumers.
+
+    Models are loaded one at a time: loading is a startup operation, and
+    loading models sequentially keeps the resident memory attributed to each
+    of them meaningful. Loaded models are only used for inference, which is
+    safe to run from several threads at once.
+    """
+
+    def __init__(self, loader: Callable[[str], Any] = load_hugging_face_model) -> None:
+        """Initialize empty registry.
+
+        Args:
+            loader: Function that loads the model from its path.
+        """
+        self._loader = loader
+        self._models: dict[str, Any] = {}
+        self._resident_bytes: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_path: str) -> Any:
+        """Return the model, loading it when it is not loaded yet.
+
+        Args:
+            model_path: Path or ID of the model.
+
+        Returns:
+            The shared model instance.
+        """
+        model = self._models.get(model_path)
+        if model is not None:
+            return model
+        with self._lock:
+            # the model might have been loaded while waiting for the lock
+            model = self._models.get(model_path)
+            if model is None:
+                model = self._load(model_path)
+                self._models[model_path] = model
+        return model
+
+    def _load(self, model_path: str) -> Any:
+        """Load the model, recording load time and resident memory it takes."""
+        logger.info("Loading embedding model %s", model_path)
+        rss_before = resident_memory_bytes()
+        start = time.monotonic()
+        model = self._loader(model_path)
+        duration = time.monotonic() - start
+        rss_after = resident_memory_bytes()
+
+        embedding_model_load_duration_seconds.labels(model=model_path).set(duration)
+        if rss_before is not None and rss_after is not None:
+            resident = max(rss_after - rss_before, 0)
+            self._resident_bytes[model_path] = resident
+            embedding_model_resident_bytes.labels(model=model_path).set(resident)
+            logger.info(
+                "Embedding model %s loaded in %.2f s, it takes %d MiB",
+                model_path,
+                duration,
+                resident // (1024 * 1024),
+            )
+        else:
+            logger.info("Embedding model %s loaded in %.2f s", model_path, duration)
+        return model
+
+    def encode_batch_fn(
+        self, model_path: str, lazy: bool = False
+    ) -> Callable[[list[str]], list[list[float]]]:
+        """Return function embedding list of texts by the model in one batch.
+
+        Args:
+            model_path: Path or ID of the model.
+            lazy: Load the model on the first use of the function instead of
+                now. Consumers that need to know the model is usable, e.g. to
+                disable a feature otherwise, load it eagerly.
+
+        Returns:
+            Function mapping list of texts to list of their embeddings.
+        """
+        if not lazy:
+            return self.get(model_path).get_text_embedding_batch
+
+        def encode_batch(texts: list[str]) -> list[list[float]]:
+            return self.get(model_path).get_text_embedding_batch(texts)
+
+        return encode_batch
+
+    def resident_memory(self) -> dict[str, int]:
+        """Return resident memory in bytes taken by loading each of the models."""
+        with self._lock:
+            return dict(self._resident_bytes)
+
+    def __contains__(self, model_path: str) -> bool:
+        """Return whether the model is loaded."""
+        return model_path in self._models
+
+    def clear(self) -> None:
+        """Drop all loaded models."""
+        with self._lock:
+            self._models.clear()
+            self._resident_bytes.clear()
+
+
+# one instance of each model per process
+embedding_models = EmbeddingModelRegistry()
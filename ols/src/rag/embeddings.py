@@ -0,0 +1,217 @@
+"""Memoized text embedding shared by RAG, tools and skills retrieval and Solr search.
+
+One user query is embedded by several consumers during one request: tools
+filtering, skill selection, RAG retrieval and Solr hybrid search. Some of them
+use the same model, so embeddings are memoized by `EmbeddingService`, keyed by
+the model ID and the normalized text.
+"""
+
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from prometheus_client import Counter, Histogram
+
+from ols.constants import EMBEDDING_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+embedding_cache_hits_total = Counter(
+    "ols_embedding_cache_hits_total",
+    "Embeddings served from the embedding cache or from an encode in flight",
+    ["model"],
+)
+embedding_cache_misses_total = Counter(
+    "ols_embedding_cache_misses_total",
+    "Embeddings computed by the embedding model",
+    ["model"],
+)
+embedding_encode_duration_seconds = Histogram(
+    "ols_embedding_encode_duration_seconds",
+    "Durations of text embedding by the embedding model",
+    ["model"],
+)
+
+EmbeddingKey = tuple[str, str]
+
+
+def normalize_text(text: str) -> str:
+    """Normalize whitespace, so trivially different texts share one embedding."""
+    return " ".join(text.split())
+
+
+def as_float_list(vector: Any) -> list[float]:
+    """Convert the embedding returned by a model (list or numpy array) to a list."""
+    values = vector.tolist() if hasattr(vector, "tolist") else vector
+    return [float(x) for x in values]
+
+
+class EmbeddingCache:
+    """Bounded LRU cache of embeddings.
+
+    Embeddings are stored as arrays of doubles, which take a fraction of the
+    memory of lists of Python floats and convert back to the same values.
+    """
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES) -> None:
+        """Initialize empty cache with the given capacity."""
+        self.max_entries = max_entries
+        self._embeddings: OrderedDict[EmbeddingKey, array] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: EmbeddingKey) -> Optional[list[float]]:
+        """Return the cached embedding and mark it as recently used."""
+        with self._lock:
+            vector = self._embeddings.get(key)
+            if vector is None:
+                return None
+            self._embeddings.move_to_end(key)
+        return vector.tolist()
+
+    def put(self, key: EmbeddingKey, vector: Sequence[float]) -> None:
+        """Store the embedding, dropping the least recently used one when full."""
+        if self.max_entries <= 0:
+            return
+        stored = array("d", vector)
+        with self._lock:
+            self._embeddings[key] = stored
+            self._embeddings.move_to_end(key)
+            while len(self._embeddings) > self.max_entries:
+                self._embeddings.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached embeddings."""
+        with self._lock:
+            self._embeddings.clear()
+
+    def __len__(self) -> int:
+        """Return number of cached embeddings."""
+        return len(self._embeddings)
+
+
+# shared by all services, the key contains the model ID
+embedding_cache = EmbeddingCache()
+
+
+class EmbeddingService:
+    """Embed texts by one model, memoizing the embeddings.
+
+    Embeddings computed in previous requests are served from the shared
+    `embedding_cache`. Concurrent requests for the same text, typically made
+    by several consumers of one user query, wait for one encode in flight
+    instead of encoding the text again.
+
+    The service is callable, so it can be passed wherever an encode function
+    mapping text to a vector is expected.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        encode_fn: Callable[[str], Any],
+        cache: Optional[EmbeddingCache] = None,
+        encode_batch_fn: Optional[Callable[[list[str]], Sequence[Any]]] = None,
+    ) -> None:
+        """Initialize the service.
+
+        Args:
+            model_id: Identifier of the model, part of the cache key. Services
+                of different models or of differently prompted embeddings of
+                one model must use different IDs.
+            encode_fn: Function that encodes text into an embedding vector.
+            cache: Cache of embeddings, the shared `embedding_cache` by default.
+            encode_batch_fn: Function that encodes list of texts into list of
+                embedding vectors; texts are encoded one by one without it.
+        """
+        self.model_id = model_id
+        self._encode_fn = encode_fn
+        self._encode_batch_fn = encode_batch_fn
+        self._cache = cache if cache is not None else embedding_cache
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> list[float]:
+        """Return the embedding of the normalized text.
+
+        Args:
+            text: Text to embed.
+
+        Returns:
+            The embedding vector.
+        """
+        normalized = normalize_text(text)
+        key = (self.model_id, normalized)
+        vector = self._cache.get(key)
+        if vector is not None:
+            embedding_cache_hits_total.labels(model=self.model_id).inc()
+            return vector
+
+        with self._lock:
+            in_flight = self._in_flight.get(normalized)
+            if in_flight is None:
+                in_flight = self._in_flight[normalized] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            embedding_cache_hits_total.labels(model=self.model_id).inc()
+            return list(in_flight.result())
+
+        embedding_cache_misses_total.labels(model=self.model_id).inc()
+        try:
+            with embedding_encode_duration_seconds.labels(model=self.model_id).time():
+                vector = as_float_list(self._encode_fn(normalized))
+            self._cache.put(key, vector)
+            in_flight.set_result(vector)
+        except BaseException as e:
+            in_flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[normalized]
+        return list(vector)
+
+    def embed_batch(self, texts: Sequence[str]) -> list[list[float]]:
+        """Return embeddings of the normalized texts.
+
+        Texts which are not cached are encoded together by one call of the
+        batch encode function.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            The embedding vectors, in the order of the texts.
+        """
+        normalized = [normalize_text(text) for text in texts]
+        vectors: dict[str, list[float]] = {}
+        missing: list[str] = []
+        for text in dict.fromkeys(normalized):
+            vector = self._cache.get((self.model_id, text))
+            if vector is None:
+                missing.append(text)
+            else:
+                vectors[text] = vector
+        if vectors:
+            embedding_cache_hits_total.labels(model=self.model_id).inc(len(vectors))
+
+        if missing:
+            embedding_cache_misses_total.labels(model=self.model_id).inc(len(missing))
+            with embedding_encode_duration_seconds.labels(model=self.model_id).time():
+                if self._encode_batch_fn is not None:
+                    encoded = self._encode_batch_fn(missing)
+                else:
+                    encoded = [self._encode_fn(text) for text in missing]
+            for text, vector in zip(missing, encoded):
+                vectors[text] = as_float_list(vector)
+                self._cache.put((self.model_id, text), vectors[text])
+
+        return [list(vectors[text]) for text in normalized]
+
+    __call__ = embed
@@ -1,10 +1,17 @@
 """Base class for hybrid (dense + sparse) RAG retrieval."""
 
+import logging
+import os
 import re
+import threading
+import time
 import uuid
-from collections.abc import Callable
-from typing import Any
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Optional
 
+from prometheus_client import Counter, Gauge
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance,
@@ -15,12 +22,40 @@ from qdrant_client.models import (
     PointStruct,
     VectorParams,
 )
-from rank_bm25 import BM25Okapi
 
+from ols.constants import HybridRAGBackend
+from ols.src.rag.bm25_index import BM25Index, BM25Statistics
+from ols.src.rag.index_snapshot import EmbeddingSnapshot, content_hash
+from ols.src.rag.matrix_store import MatrixStore, MatrixView
 from ols.src.rag.stop_words import ENGLISH_STOP_WORDS
 
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+hybrid_rag_startup_duration_seconds = Gauge(
+    "ols_hybrid_rag_startup_duration_seconds",
+    "Time to load the embedding snapshot and index the first documents",
+    ["collection"],
+)
+hybrid_rag_embeddings_total = Counter(
+    "ols_hybrid_rag_embeddings_total",
+    "Embeddings of indexed documents, by source: snapshot or model",
+    ["collection", "source"],
+)
+
 _NON_ALPHA = re.compile(r"[^a-z0-9\s]")
 
+# number of records read from Qdrant in one scroll request
+_SCROLL_PAGE_SIZE = 1_000
+
+# minimum number of seconds between saves of the embedding snapshot after
+# the first population, later changes are saved at shutdown at the latest
+_SNAPSHOT_SAVE_INTERVAL = 60.0
+
 
 def _tokenize(text: str) -> list[str]:
     """Lowercase, strip punctuation, remove stop words, and split."""
@@ -29,7 +64,12 @@ def _tokenize(text: str) -> list[str]:
 
 
 class QdrantStore:
-    """Wrapper for in-memory vector database operations backed by Qdrant."""
+    """Wrapper for in-memory vector database operations backed by Qdrant.
+
+    The in-memory Qdrant client is not thread safe. Calls to it are
+    serialized by a lock held only for the call, so a search waits for a
+    concurrent upsert or delete, not for the whole indexing of documents.
+    """
 
     def __init__(self, collection: str) -> None:
         """Initialize in-memory Qdrant client.
@@ -40,6 +80,7 @@ class QdrantStore:
         self._collection = collection
         self.client = QdrantClient(location=":memory:")
         self._collection_ready = False
+        self._lock = threading.Lock()
 
     def _ensure_collection(self, vector_size: int) -> None:
         """Lazily create the vector collection on first upsert."""
@@ -73,8 +114,6 @@ class QdrantStore:
         """
         if not vectors:
             return
-        self._ensure_collection(len(vectors[0]))
-
         points = []
         for i, (str_id, doc, vec) in enumerate(zip(ids, docs, vectors)):
             payload: dict[str, Any] = {"_id": str_id, "_document": doc}
@@ -83,7 +122,9 @@ class QdrantStore:
             points.append(
                 PointStruct(id=self._point_id(str_id), vector=vec, payload=payload)
             )
-        self.client.upsert(self._collection, points=points)
+        with self._lock:
+            self._ensure_collection(len(vectors[0]))
+            self.client.upsert(self._collection, points=points)
 
     def search_with_scores(
         self,
@@ -115,12 +156,13 @@ class QdrantStore:
                 ]
             )
 
-        results = self.client.query_points(
-            self._collection,
-            query=vector,
-            limit=k,
-            query_filter=query_filter,
-        )
+        with self._lock:
+            results = self.client.query_points(
+                self._collection,
+                query=vector,
+                limit=k,
+                query_filter=query_filter,
+            )
 
         out_ids: list[str] = []
         scores: list[float] = []
@@ -142,10 +184,11 @@ class QdrantStore:
             return
 
         point_ids = [self._point_id(str_id) for str_id in ids]
-        self.client.delete(
-            self._collection,
-            points_selector=PointIdsList(points=point_ids),
-        )
+        with self._lock:
+            self.client.delete(
+                self._collection,
+                points_selector=PointIdsList(points=point_ids),
+            )
 
     def get_all(self) -> dict:
         """Get all documents with their metadata.
@@ -156,24 +199,92 @@ class QdrantStore:
         if not self._collection_ready:
             return {"ids": [], "documents": [], "metadatas": []}
 
-        records, _ = self.client.scroll(self._collection, limit=10_000)
-
         out_ids: list[str] = []
         documents: list[str] = []
         metas: list[dict] = []
-        for record in records:
-            payload = record.payload or {}
-            out_ids.append(payload["_id"])
-            documents.append(payload.get("_document", ""))
-            metas.append({k: v for k, v in payload.items() if not k.startswith("_")})
+        offset = None
+        while True:
+            with self._lock:
+                records, offset = self.client.scroll(
+                    self._collection, limit=_SCROLL_PAGE_SIZE, offset=offset
+                )
+            for record in records:
+                payload = record.payload or {}
+                out_ids.append(payload["_id"])
+                documents.append(payload.get("_document", ""))
+                metas.append(
+                    {k: v for k, v in payload.items() if not k.startswith("_")}
+                )
+            if offset is None:
+                break
         return {"ids": out_ids, "documents": documents, "metadatas": metas}
 
 
+@dataclass(frozen=True, slots=True)
+class CorpusSnapshot:
+    """Immutable view of the indexed documents at one point in time.
+
+    A new snapshot replaces the current one whenever documents are indexed
+    or removed, queries read the snapshot taken when they started. Besides
+    the documents, it holds the BM25 statistics and, with the numpy backend,
+    the dense vectors of the same documents, so queries never read the
+    indexes writers update. Metadata are parsed once, when the snapshot is
+    built, and shared by all queries, so they must not be modified.
+    """
+
+    version: int = 0
+    ids: tuple[str, ...] = ()
+    documents: tuple[str, ...] = ()
+    metadatas: tuple[dict[str, Any], ...] = ()
+    metadata_by_id: Mapping[str, dict[str, Any]] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    bm25: BM25Statistics = field(default_factory=BM25Statistics)
+    vectors: Optional[MatrixView] = None
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        entries: Mapping[str, tuple[str, dict[str, Any]]],
+        bm25: BM25Statistics,
+        vectors: Optional[MatrixView] = None,
+    ) -> "CorpusSnapshot":
+        """Build snapshot of the documents.
+
+        Args:
+            version: Version of the snapshot.
+            entries: Document text and parsed metadata by document ID.
+            bm25: BM25 statistics of the documents.
+            vectors: Dense vectors of the documents, with the numpy backend.
+
+        Returns:
+            The snapshot.
+        """
+        ids = tuple(entries)
+        metadatas = tuple(metadata for _, metadata in entries.values())
+        return cls(
+            version=version,
+            ids=ids,
+            documents=tuple(document for document, _ in entries.values()),
+            metadatas=metadatas,
+            metadata_by_id=MappingProxyType(dict(zip(ids, metadatas))),
+            bm25=bm25,
+            vectors=vectors,
+        )
+
+    def __len__(self) -> int:
+        """Return number of documents in the snapshot."""
+        return len(self.ids)
+
+
 class HybridRAGBase:
     """Base class for hybrid retrieval using dense (Qdrant) and sparse (BM25) methods.
 
     Subclasses implement domain-specific indexing and result formatting
-    while reusing the shared retrieval algorithm.
+    while reusing the shared retrieval algorithm. Dense vectors are kept in
+    an in-memory Qdrant collection, or in a NumPy matrix with the numpy
+    backend, which also fuses dense and sparse scores in vectorized form.
     """
 
     def __init__(
@@ -183,6 +294,10 @@ class HybridRAGBase:
         alpha: float = 0.8,
         top_k: int = 10,
         threshold: float = 0.01,
+        encode_batch_fn: Callable[[list[str]], list[list[float]]] | None = None,
+        backend: HybridRAGBackend = HybridRAGBackend.QDRANT,
+        snapshot_dir: Optional[str] = None,
+        model_id: str = "",
     ) -> None:
         """Initialize the hybrid RAG system.
 
@@ -192,13 +307,182 @@ class HybridRAGBase:
             alpha: Weight for dense vs sparse (1.0 = full dense, 0.0 = full sparse).
             top_k: Number of results to retrieve.
             threshold: Minimum similarity threshold for filtering results.
+            encode_batch_fn: Optional function that encodes list of texts into
+                list of embedding vectors, used to index documents.
+            backend: Vector store keeping the dense vectors.
+            snapshot_dir: Optional directory of the embedding snapshot. When
+                set, embeddings are loaded from the snapshot and only new or
+                changed documents are embedded.
+            model_id: ID of the embedding model, embeddings in the snapshot
+                of another model are not used.
         """
         self.alpha = alpha
         self.top_k = top_k
         self.threshold = threshold
         self._encode = encode_fn
-        self.bm25: BM25Okapi | None = None
-        self.store = QdrantStore(collection)
+        self._encode_batch_fn = encode_batch_fn
+        self.bm25 = BM25Index()
+        self.store: QdrantStore | MatrixStore = (
+            MatrixStore(collection)
+            if backend == HybridRAGBackend.NUMPY
+            else QdrantStore(collection)
+        )
+        self.snapshot = CorpusSnapshot()
+        # document text and parsed metadata of the snapshot, by document ID,
+        # updated in place so a new snapshot is not rebuilt from the old one
+        self._entries: dict[str, tuple[str, dict[str, Any]]] = {}
+        # documents are indexed from executor threads; the lock keeps the
+        # store, the BM25 index and the snapshot of its documents consistent.
+        # Queries do not take it, they read the immutable corpus snapshot.
+        self._lock = threading.RLock()
+        self._collection = collection
+        self._populated = False
+        self.embedding_snapshot: Optional[EmbeddingSnapshot] = None
+        # content hashes and metadata of the indexed documents, by document
+        # ID, documents indexed again unchanged are skipped
+        self._content_hashes: dict[str, str] = {}
+        self._metadatas: dict[str, dict] = {}
+        # the embedding snapshot holds vectors of documents not saved yet;
+        # saves are serialized so an older list of documents is not written
+        # over a newer one
+        self._snapshot_dirty = False
+        self._save_lock = threading.Lock()
+        self._snapshot_saved_at = 0.0
+        self._load_duration = 0.0
+        if snapshot_dir is not None:
+            start = time.perf_counter()
+            self.embedding_snapshot = EmbeddingSnapshot(
+                os.path.join(snapshot_dir, f"{collection}.snapshot"), model_id
+            )
+            loaded = self.embedding_snapshot.load()
+            self._load_duration = time.perf_counter() - start
+            logger.info(
+                "Loaded %d %s embeddings from snapshot %s",
+                loaded,
+                collection,
+                self.embedding_snapshot.path,
+            )
+
+    def _encode_texts(self, texts: list[str]) -> list[list[float]]:
+        """Encode documents in one batch, or one by one without batch function."""
+        if not texts:
+            return []
+        if self._encode_batch_fn is not None:
+            return self._encode_batch_fn(texts)
+        return [self._encode(text) for text in texts]
+
+    def _encode_batch(self, texts: list[str]) -> list[list[float]]:
+        """Encode documents, reusing embeddings from the embedding snapshot.
+
+        Without the snapshot all documents are encoded. With it, only
+        documents whose content hash is not in the snapshot are encoded,
+        in one batch, and their embeddings are added to the snapshot.
+        """
+        snapshot = self.embedding_snapshot
+        if snapshot is None or not texts:
+            return self._encode_texts(texts)
+
+        hashes = [content_hash(text) for text in texts]
+        vectors: dict[str, np.ndarray] = {}
+        missing: dict[str, str] = {}
+        for key, text in zip(hashes, texts):
+            vector = snapshot.get(key)
+            if vector is None:
+                missing[key] = text
+            else:
+                vectors[key] = vector
+        # encoding takes long, it must not block queries
+        encoded = self._encode_texts(list(missing.values()))
+        for key, encoded_vector in zip(missing, encoded):
+            vectors[key] = snapshot.put(key, encoded_vector)
+
+        hybrid_rag_embeddings_total.labels(
+            collection=self._collection, source="snapshot"
+        ).inc(len(texts) - len(missing))
+        hybrid_rag_embeddings_total.labels(
+            collection=self._collection, source="model"
+        ).inc(len(missing))
+        return [vectors[key].tolist() for key in hashes]
+
+    def _changed_documents(
+        self,
+        ids: list[str],
+        docs: list[str],
+        metadatas: list[dict] | None = None,
+    ) -> list[int]:
+        """Return positions of documents not indexed with the same text and metadata.
+
+        Must be called with the lock held.
+
+        Args:
+            ids: Document identifiers.
+            docs: Document texts.
+            metadatas: Optional metadata dicts for each document.
+
+        Returns:
+            Positions of new or changed documents.
+        """
+        changed = []
+        for i, (doc_id, doc) in enumerate(zip(ids, docs)):
+            metadata = metadatas[i] if metadatas and i < len(metadatas) else {}
+            if (
+                self._content_hashes.get(doc_id) != content_hash(doc)
+                or self._metadatas.get(doc_id) != metadata
+            ):
+                changed.append(i)
+        return changed
+
+    def _populate(
+        self,
+        ids: list[str],
+        docs: list[str],
+        metadatas: list[dict] | None = None,
+    ) -> None:
+        """Encode and index documents.
+
+        Documents already indexed with the same text and metadata are not
+        encoded nor indexed again. Duration of the first population,
+        together with loading of the embedding snapshot, is reported as the
+        startup duration. The embedding snapshot is saved after the first
+        population and then at most once per save interval.
+
+        Args:
+            ids: Document identifiers.
+            docs: Document texts (used for both dense and sparse retrieval).
+            metadatas: Optional metadata dicts for each document.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            changed = self._changed_documents(ids, docs, metadatas)
+        if changed:
+            changed_docs = [docs[i] for i in changed]
+            self._index_documents(
+                [ids[i] for i in changed],
+                changed_docs,
+                self._encode_batch(changed_docs),
+                metadatas=[
+                    metadatas[i] if metadatas and i < len(metadatas) else {}
+                    for i in changed
+                ],
+            )
+        with self._lock:
+            first, self._populated = not self._populated, True
+        if (
+            first
+            or time.monotonic() - self._snapshot_saved_at >= _SNAPSHOT_SAVE_INTERVAL
+        ):
+            self.save_embedding_snapshot()
+        if first:
+            duration = self._load_duration + time.perf_counter() - start
+            hybrid_rag_startup_duration_seconds.labels(collection=self._collection).set(
+                duration
+            )
+            logger.info(
+                "Indexed first %d %s documents in %.2f s",
+                len(ids),
+                self._collection,
+                duration,
+            )
 
     def _index_documents(
         self,
@@ -207,7 +491,10 @@ class HybridRAGBase:
         vectors: list[list[float]],
         metadatas: list[dict] | None = None,
     ) -> None:
-        """Index documents in the store and rebuild BM25.
+        """Index documents in the store and in the BM25 index, update the snapshot.
+
+        Only new or changed documents are indexed, documents already indexed
+        with the same text and metadata are skipped.
 
         Args:
             ids: Document identifiers.
@@ -215,63 +502,224 @@ class HybridRAGBase:
             vectors: Pre-computed embedding vectors.
             metadatas: Optional metadata dicts for each document.
         """
-        self.store.upsert(ids, docs, vectors, metadatas=metadatas)
-        self._rebuild_bm25()
-
-    def _rebuild_bm25(self) -> None:
-        """Rebuild BM25 index from all stored documents."""
-        all_data = self.store.get_all()
-        if not all_data["documents"]:
-            self.bm25 = None
+        with self._lock:
+            changed = self._changed_documents(ids, docs, metadatas)
+            if not changed:
+                return
+            ids = [ids[i] for i in changed]
+            docs = [docs[i] for i in changed]
+            vectors = [vectors[i] for i in changed]
+            metadatas = [
+                metadatas[i] if metadatas and i < len(metadatas) else {}
+                for i in changed
+            ]
+            self.store.upsert(ids, docs, vectors, metadatas=metadatas)
+            added: dict[str, tuple[str, dict[str, Any]]] = {}
+            for doc_id, doc, metadata in zip(ids, docs, metadatas):
+                self.bm25.add(doc_id, _tokenize(doc))
+                self._content_hashes[doc_id] = content_hash(doc)
+                self._metadatas[doc_id] = metadata
+                added[doc_id] = (doc, self._parse_metadata(metadata))
+            self._swap_snapshot(added=added)
+            self._snapshot_dirty = True
+
+    def _remove_documents(self, ids: list[str]) -> None:
+        """Remove documents from the store, BM25 index and snapshot.
+
+        Documents not indexed are ignored.
+
+        Args:
+            ids: Identifiers of the documents to remove.
+        """
+        with self._lock:
+            ids = [doc_id for doc_id in ids if doc_id in self._content_hashes]
+            if not ids:
+                return
+            self.store.delete(ids)
+            for doc_id in ids:
+                self.bm25.remove(doc_id)
+                self._content_hashes.pop(doc_id, None)
+                self._metadatas.pop(doc_id, None)
+            self._swap_snapshot(removed=ids)
+            self._snapshot_dirty = True
+
+    def save_embedding_snapshot(self) -> None:
+        """Save the embedding snapshot when documents changed since the last save.
+
+        The content hashes of the indexed documents are copied under the
+        lock, the file is written without holding it, so queries and
+        indexing are not blocked by the write.
+        """
+        snapshot = self.embedding_snapshot
+        if snapshot is None:
             return
-        sparse_docs = [_tokenize(doc) for doc in all_data["documents"]]
-        self.bm25 = BM25Okapi(sparse_docs)
+        with self._save_lock:
+            with self._lock:
+                if not self._snapshot_dirty:
+                    return
+                self._snapshot_dirty = False
+                self._snapshot_saved_at = time.monotonic()
+                keys = list(self._content_hashes.values())
+            snapshot.save(keys)
+
+    def _swap_snapshot(
+        self,
+        added: Optional[dict[str, tuple[str, dict[str, Any]]]] = None,
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Replace the corpus snapshot by one with the documents changed.
+
+        The snapshot is kept when no document is added, updated or removed,
+        e.g. when removed documents are not indexed.
+        Must be called with the lock held.
+
+        Args:
+            added: Document text and parsed metadata of added or updated
+                documents, by document ID.
+            removed: IDs of removed documents.
+        """
+        changed = bool(added)
+        for doc_id in removed:
+            changed |= self._entries.pop(doc_id, None) is not None
+        self._entries.update(added or {})
+        if changed:
+            self.snapshot = CorpusSnapshot.build(
+                self.snapshot.version + 1,
+                self._entries,
+                self.bm25.statistics(),
+                self.store.view() if isinstance(self.store, MatrixStore) else None,
+            )
+
+    def _parse_metadata(self, metadata: dict[str, Any]) -> dict[str, Any]:
+        """Parse stored document metadata into the form used by queries.
+
+        Called once per indexed document, when the corpus snapshot is built.
+
+        Args:
+            metadata: Metadata stored with the document.
+
+        Returns:
+            Parsed metadata kept in the corpus snapshot.
+        """
+        return metadata
 
     def _dense_scores(
         self,
         query_vec: list[float],
         k: int,
         allowed_servers: set[str] | None = None,
+        snapshot: Optional[CorpusSnapshot] = None,
     ) -> tuple[dict[str, float], list[str], list[dict]]:
-        """Compute dense retrieval scores using cosine similarity from Qdrant.
+        """Compute dense retrieval scores using cosine similarity.
+
+        With the numpy backend the vectors of the corpus snapshot are
+        searched, otherwise the Qdrant store, which serializes only its own
+        calls and may already hold documents indexed after the snapshot.
 
         Args:
             query_vec: Query embedding vector.
             k: Number of results.
-            allowed_servers: Optional server filter (passed to QdrantStore).
+            allowed_servers: Optional server filter (passed to the store).
+            snapshot: Corpus snapshot to search, the current one by default.
 
         Returns:
             Tuple of (id-to-score dict, ordered id list, metadata list).
         """
-        ids, sim_scores, metas = self.store.search_with_scores(
+        snapshot = self.snapshot if snapshot is None else snapshot
+        store = self.store if snapshot.vectors is None else snapshot.vectors
+        ids, sim_scores, metas = store.search_with_scores(
             query_vec, k, allowed_servers=allowed_servers
         )
         scores = dict(zip(ids, sim_scores))
         return scores, ids, metas
 
-    def _sparse_scores(self, query: str) -> tuple[dict[str, float], dict[str, dict]]:
+    def _sparse_scores(
+        self,
+        query: str,
+        allowed_servers: set[str] | None = None,
+        snapshot: Optional[CorpusSnapshot] = None,
+    ) -> tuple[dict[str, float], Mapping[str, dict[str, Any]]]:
         """Compute BM25 scores normalized to 0-1 range.
 
+        The BM25 statistics, documents and their metadata are read from the
+        corpus snapshot. It is immutable, so no lock is taken and the scores
+        are consistent even when documents are indexed meanwhile.
+
         Args:
             query: The query string.
+            allowed_servers: Optional set of server names to filter by.
+            snapshot: Corpus snapshot to score, the current one by default.
 
         Returns:
-            Tuple of (id-to-score dict, id-to-metadata dict).
+            Tuple of (id-to-score dict, id-to-parsed-metadata mapping).
         """
-        if self.bm25 is None:
+        snapshot = self.snapshot if snapshot is None else snapshot
+        if not snapshot:
             return {}, {}
 
-        all_data = self.store.get_all()
-        ids = all_data["ids"]
-        raw = self.bm25.get_scores(_tokenize(query))
-        # BM25 IDF is negative when corpus has few documents (log((n-df+0.5)/(df+0.5)) < 0
-        # when df >= n), which would penalize the fused score. Clamp to zero.
-        clamped = [max(0.0, s) for s in raw]
-        mx = max(clamped) if max(clamped) > 0 else 1.0
-        scores = {sid: score / mx for sid, score in zip(ids, clamped)}
-        meta_by_id = dict(zip(ids, all_data["metadatas"]))
+        raw = snapshot.bm25.scores(_tokenize(query))
+        mx = max(raw.values(), default=0.0) or 1.0
+        meta_by_id = snapshot.metadata_by_id
+        scores = {
+            sid: raw.get(sid, 0.0) / mx
+            for sid in snapshot.ids
+            if not allowed_servers
+            or meta_by_id[sid].get("server", "") in allowed_servers
+        }
         return scores, meta_by_id
 
+    def _hybrid_scores(
+        self,
+        query: str,
+        query_vec: list[float],
+        k: int,
+        alpha: float,
+        allowed_servers: set[str] | None = None,
+        snapshot: Optional[CorpusSnapshot] = None,
+    ) -> dict[str, float]:
+        """Compute fused dense and sparse scores of the top k documents.
+
+        No lock is held: all documents scored are those of one corpus
+        snapshot. Callers reading documents of the results read them from
+        the snapshot passed in.
+
+        Args:
+            query: The query string.
+            query_vec: Query embedding vector.
+            k: Maximum number of results.
+            alpha: Weight for dense (1-alpha for sparse).
+            allowed_servers: Optional set of server names to filter by.
+            snapshot: Corpus snapshot to score, the current one by default.
+
+        Returns:
+            Dict mapping IDs to fused scores, top k, sorted descending.
+        """
+        snapshot = self.snapshot if snapshot is None else snapshot
+        if snapshot.vectors is not None:
+            return snapshot.vectors.fused_top_k(
+                query_vec,
+                snapshot.bm25.scores(_tokenize(query)),
+                alpha,
+                k,
+                allowed_servers=allowed_servers,
+            )
+        if isinstance(self.store, MatrixStore):
+            # nothing indexed yet
+            return {}
+        dense, _, _ = self._dense_scores(
+            query_vec, k, allowed_servers=allowed_servers, snapshot=snapshot
+        )
+        # documents indexed after the snapshot was taken are not scored
+        dense = {
+            doc_id: score
+            for doc_id, score in dense.items()
+            if doc_id in snapshot.metadata_by_id
+        }
+        sparse, _ = self._sparse_scores(
+            query, allowed_servers=allowed_servers, snapshot=snapshot
+        )
+        return self._fuse_scores(dense, sparse, alpha, k)
+
     @staticmethod
     def _fuse_scores(
         dense: dict[str, float],
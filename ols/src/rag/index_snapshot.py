@@ -0,0 +1,198 @@
+"""On-disk snapshot of embeddings of documents indexed by hybrid RAG.
+
+Skills and MCP tools are embedded when they are indexed, which is repeated on
+every start of the service although they rarely change. The embeddings are
+saved to a snapshot file keyed by the content hash of the embedded text, and
+loaded on the next start, so only new or changed documents are embedded again.
+The snapshot is valid for one embedding model, a snapshot of another model is
+ignored.
+
+File layout:
+
+    magic (8 bytes) | header length (8 bytes, little endian) | header | vectors
+
+The header is JSON with the format version, the embedding model ID, the
+dimension of the vectors and the content hash and age of every vector, in the
+order of the vectors. Vectors are stored as little endian float32 rows.
+
+The age of a vector is the number of runs of the service since its text was
+last indexed. Vectors of texts not indexed in a run, e.g. of tools of a client
+MCP server not used since the start, are kept for a few runs and then dropped.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"OLSEMBS1"
+FORMAT_VERSION = 1
+_LENGTH = struct.Struct("<Q")
+_DTYPE = np.dtype("<f4")
+
+# number of runs of the service a vector of a text not indexed is kept for
+MAX_UNUSED_RUNS = 3
+
+
+def content_hash(text: str) -> str:
+    """Return hash identifying the embedded text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingSnapshot:
+    """Embeddings of indexed documents, keyed by content hash, saved to a file.
+
+    The snapshot is thread safe. The file is written without holding the
+    lock of the vectors, so documents are encoded while it is saved.
+    """
+
+    def __init__(self, path: str, model_id: str) -> None:
+        """Initialize empty snapshot.
+
+        Args:
+            path: Path of the snapshot file.
+            model_id: ID of the embedding model the vectors are computed by.
+        """
+        self.path = path
+        self.model_id = model_id
+        self._vectors: dict[str, np.ndarray] = {}
+        # ages of vectors loaded from the file
+        self._loaded_ages: dict[str, int] = {}
+        # ages of vectors in the file, by content hash
+        self._saved: dict[str, int] = {}
+        # guards the vectors, the file is written under the save lock only
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def load(self) -> int:
+        """Load vectors from the snapshot file.
+
+        A missing, broken or outdated snapshot file is not an error, the
+        documents are embedded again and the file is replaced.
+
+        Returns:
+            Number of loaded vectors.
+        """
+        try:
+            with open(self.path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logger.warning("Can not read embedding snapshot %s: %s", self.path, e)
+            return 0
+        try:
+            prefix_length = len(MAGIC) + _LENGTH.size
+            if data[: len(MAGIC)] != MAGIC:
+                raise ValueError("not an embedding snapshot")
+            (header_length,) = _LENGTH.unpack(data[len(MAGIC) : prefix_length])
+            header = json.loads(data[prefix_length : prefix_length + header_length])
+            if header["version"] != FORMAT_VERSION:
+                raise ValueError(f"unsupported version {header['version']}")
+            if header["model_id"] != self.model_id:
+                logger.info(
+                    "Embedding snapshot %s is for model %s, not %s, ignoring it",
+                    self.path,
+                    header["model_id"],
+                    self.model_id,
+                )
+                return 0
+            keys, ages = header["keys"], header["ages"]
+            vectors = np.frombuffer(
+                data, dtype=_DTYPE, offset=prefix_length + header_length
+            ).reshape(len(keys), header["dimension"])
+        except (ValueError, KeyError, TypeError, struct.error) as e:
+            logger.warning("Ignoring broken embedding snapshot %s: %s", self.path, e)
+            return 0
+        with self._lock:
+            self._vectors.update(zip(keys, vectors))
+            self._loaded_ages = dict(zip(keys, ages))
+        with self._save_lock:
+            self._saved = dict(self._loaded_ages)
+        return len(keys)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return vector of the text with the content hash, None when unknown."""
+        with self._lock:
+            return self._vectors.get(key)
+
+    def put(self, key: str, vector: Sequence[float]) -> np.ndarray:
+        """Store vector of the text with the content hash, return stored vector."""
+        stored = np.asarray(vector, dtype=_DTYPE)
+        with self._lock:
+            self._vectors[key] = stored
+        return stored
+
+    def save(self, keys: Iterable[str]) -> None:
+        """Write vectors of the indexed texts to the file.
+
+        Vectors loaded from the file whose texts are not indexed now are
+        written with their age increased, until they are too old. Other
+        vectors are dropped from the snapshot. The file is not written when
+        it already holds the same vectors. It is written under a temporary
+        name and renamed, so a reader never sees it partially written.
+        Failure to write is logged, not raised.
+
+        Args:
+            keys: Content hashes of the indexed texts.
+        """
+        with self._save_lock:
+            self._save(keys)
+
+    def _save(self, keys: Iterable[str]) -> None:
+        """Write vectors of the indexed texts, called with the save lock held."""
+        with self._lock:
+            ages = {key: 0 for key in keys if key in self._vectors}
+            for key, age in self._loaded_ages.items():
+                if key not in ages and age < MAX_UNUSED_RUNS:
+                    ages[key] = age + 1
+            self._vectors = {key: self._vectors[key] for key in ages}
+            vectors = list(self._vectors.values())
+        if ages == self._saved:
+            return
+        dimension = len(vectors[0]) if vectors else 0
+        header = json.dumps(
+            {
+                "version": FORMAT_VERSION,
+                "model_id": self.model_id,
+                "dimension": dimension,
+                "keys": list(ages),
+                "ages": list(ages.values()),
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+        directory = os.path.dirname(self.path)
+        try:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(MAGIC)
+                    file.write(_LENGTH.pack(len(header)))
+                    file.write(header)
+                    for vector in vectors:
+                        file.write(vector.tobytes())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            logger.warning("Can not write embedding snapshot %s: %s", self.path, e)
+            return
+        self._saved = ages
+
+    def __len__(self) -> int:
+        """Return number of vectors in the snapshot."""
+        with self._lock:
+            return len(self._vectors)
@@ -0,0 +1,346 @@
+"""In-memory vector store keeping embeddings in one NumPy matrix.
+
+Tool and skill collections hold hundreds to low thousands of documents.
+Searching them does not need a vector database: embeddings are normalized
+and kept in a contiguous float32 matrix, so the cosine similarity of a query
+to every document is one matrix-vector product. Server filtering is a
+boolean mask over a column of server codes, and the fused dense and sparse
+scores are ranked with ``argpartition`` instead of a full sort.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Optional
+
+import numpy as np
+
+# code of documents without a server in the server column
+_NO_SERVER = -1
+
+# initial number of rows allocated in the matrix
+_INITIAL_CAPACITY = 64
+
+
+def _normalized_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows of the matrix to unit length, zero rows are kept."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return indices of the k highest finite scores, highest first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[np.isfinite(scores[candidates])]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+@dataclass(frozen=True, slots=True)
+class MatrixView:
+    """Immutable copy of the contents of `MatrixStore` at one point in time.
+
+    The arrays are read-only and the metadata are shared with the store,
+    which replaces them instead of modifying them, so any number of threads
+    can search the view while the store is being updated.
+    """
+
+    # normalized embeddings, one row per document
+    vectors: np.ndarray
+    # server code of every document
+    servers: np.ndarray
+    server_codes: Mapping[str, int]
+    ids: tuple[str, ...]
+    metadatas: tuple[dict, ...]
+    # row of every document, by document ID
+    positions: Mapping[str, int]
+
+    def _dense(self, vector: list[float]) -> np.ndarray:
+        """Return cosine similarity of the vector to every document."""
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        return self.vectors @ query
+
+    def _server_mask(self, allowed_servers: set[str] | None) -> Optional[np.ndarray]:
+        """Return mask of documents of the allowed servers, None for no filter."""
+        if not allowed_servers:
+            return None
+        codes = [
+            self.server_codes[server]
+            for server in allowed_servers
+            if server in self.server_codes
+        ]
+        return np.isin(self.servers, codes)
+
+    def search_with_scores(
+        self,
+        vector: list[float],
+        k: int,
+        allowed_servers: set[str] | None = None,
+    ) -> tuple[list[str], list[float], list[dict]]:
+        """Search and return IDs, similarity scores, and metadata.
+
+        Args:
+            vector: Query embedding vector.
+            k: Number of results to return.
+            allowed_servers: Optional set of server names to filter by.
+
+        Returns:
+            Tuple of (document IDs, similarity scores, metadatas).
+            Scores are cosine similarities, 1 is the most similar.
+        """
+        if not self.ids:
+            return [], [], []
+        scores = self._dense(vector)
+        mask = self._server_mask(allowed_servers)
+        if mask is not None:
+            scores[~mask] = -np.inf
+        top = _top_k(scores, k)
+        return (
+            [self.ids[row] for row in top],
+            scores[top].tolist(),
+            [dict(self.metadatas[row]) for row in top],
+        )
+
+    def fused_top_k(
+        self,
+        vector: list[float],
+        sparse: Mapping[str, float],
+        alpha: float,
+        k: int,
+        allowed_servers: set[str] | None = None,
+    ) -> dict[str, float]:
+        """Fuse dense and sparse scores of all documents and return top k.
+
+        Dense scores of the k most similar documents are fused with sparse
+        scores of all documents of the allowed servers, documents outside
+        the dense top k get 0 for the dense component. This ranks documents
+        the same way as fusion of `QdrantStore` search results does.
+
+        Args:
+            vector: Query embedding vector.
+            sparse: Sparse scores by document ID, documents without a score
+                have score 0. Scores are normalized to 0-1 by their maximum.
+            alpha: Weight for dense (1-alpha for sparse).
+            k: Maximum number of results.
+            allowed_servers: Optional set of server names to filter by.
+
+        Returns:
+            Dict mapping IDs to fused scores, top k, sorted descending.
+        """
+        if not self.ids:
+            return {}
+        count = len(self.ids)
+        dense = self._dense(vector)
+        mask = self._server_mask(allowed_servers)
+        if mask is not None:
+            dense[~mask] = -np.inf
+
+        dense_part = np.zeros(count, dtype=np.float32)
+        dense_top = _top_k(dense, k)
+        dense_part[dense_top] = dense[dense_top]
+
+        sparse_part = np.zeros(count, dtype=np.float32)
+        if sparse:
+            rows = np.fromiter(
+                (self.positions[doc_id] for doc_id in sparse),
+                dtype=np.intp,
+                count=len(sparse),
+            )
+            sparse_part[rows] = np.fromiter(
+                sparse.values(), dtype=np.float32, count=len(sparse)
+            )
+            sparse_max = sparse_part.max()
+            if sparse_max > 0:
+                sparse_part /= sparse_max
+
+        fused = alpha * dense_part + (1 - alpha) * sparse_part
+        if mask is not None:
+            fused[~mask] = -np.inf
+        top = _top_k(fused, k)
+        return {self.ids[row]: float(fused[row]) for row in top}
+
+    def __len__(self) -> int:
+        """Return number of documents in the view."""
+        return len(self.ids)
+
+
+class MatrixStore:
+    """Vector store with the interface of `QdrantStore`, backed by NumPy arrays.
+
+    Rows of the matrix are allocated with spare capacity, so adding documents
+    one population at a time does not copy the matrix every time. A deleted
+    row is replaced by the last row. The store is not thread safe, callers
+    serialize updates. Searches run on an immutable `view` of the store,
+    taken once after it changed.
+    """
+
+    def __init__(self, collection: str) -> None:
+        """Initialize empty store.
+
+        Args:
+            collection: Name of the collection, kept for logging only.
+        """
+        self._collection = collection
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._servers = np.zeros(0, dtype=np.int32)
+        self._server_codes: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._documents: list[str] = []
+        self._metadatas: list[dict] = []
+        self._positions: dict[str, int] = {}
+        self._view: Optional[MatrixView] = None
+
+    def _ensure_capacity(self, rows: int, dimension: int) -> None:
+        """Grow the matrix and the server column to hold the number of rows."""
+        capacity = len(self._vectors)
+        if rows <= capacity and self._vectors.shape[1] == dimension:
+            return
+        capacity = max(capacity, _INITIAL_CAPACITY)
+        while capacity < rows:
+            capacity *= 2
+        count = len(self._ids)
+        vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        servers = np.full(capacity, _NO_SERVER, dtype=np.int32)
+        if count:
+            vectors[:count] = self._vectors[:count]
+            servers[:count] = self._servers[:count]
+        self._vectors, self._servers = vectors, servers
+
+    def _server_code(self, server: Any) -> int:
+        """Return code of the server in the server column."""
+        if server is None:
+            return _NO_SERVER
+        return self._server_codes.setdefault(server, len(self._server_codes))
+
+    def upsert(
+        self,
+        ids: list[str],
+        docs: list[str],
+        vectors: list[list[float]],
+        metadatas: list[dict] | None = None,
+    ) -> None:
+        """Add or update documents with embeddings in the store.
+
+        Args:
+            ids: List of unique identifiers for documents.
+            docs: List of document texts.
+            vectors: List of embedding vectors.
+            metadatas: Optional list of metadata dictionaries.
+        """
+        if not vectors:
+            return
+        self._view = None
+        normalized = _normalized_rows(np.asarray(vectors, dtype=np.float32))
+        new_ids = {doc_id for doc_id in ids if doc_id not in self._positions}
+        self._ensure_capacity(len(self._ids) + len(new_ids), normalized.shape[1])
+
+        for i, (doc_id, doc) in enumerate(zip(ids, docs)):
+            metadata = dict(metadatas[i]) if metadatas and i < len(metadatas) else {}
+            row = self._positions.get(doc_id)
+            if row is None:
+                row = self._positions[doc_id] = len(self._ids)
+                self._ids.append(doc_id)
+                self._documents.append(doc)
+                self._metadatas.append(metadata)
+            else:
+                self._documents[row] = doc
+                self._metadatas[row] = metadata
+            self._vectors[row] = normalized[i]
+            self._servers[row] = self._server_code(metadata.get("server"))
+
+    def delete(self, ids: list[str]) -> None:
+        """Delete documents from the store.
+
+        Args:
+            ids: List of document IDs to delete.
+        """
+        for doc_id in ids:
+            row = self._positions.pop(doc_id, None)
+            if row is None:
+                continue
+            self._view = None
+            last = len(self._ids) - 1
+            if row != last:
+                self._vectors[row] = self._vectors[last]
+                self._servers[row] = self._servers[last]
+                self._ids[row] = self._ids[last]
+                self._documents[row] = self._documents[last]
+                self._metadatas[row] = self._metadatas[last]
+                self._positions[self._ids[row]] = row
+            self._ids.pop()
+            self._documents.pop()
+            self._metadatas.pop()
+
+    def get_all(self) -> dict:
+        """Get all documents with their metadata.
+
+        Returns:
+            Dictionary with 'ids', 'documents', and 'metadatas' keys.
+        """
+        return {
+            "ids": list(self._ids),
+            "documents": list(self._documents),
+            "metadatas": [dict(metadata) for metadata in self._metadatas],
+        }
+
+    def view(self) -> MatrixView:
+        """Return immutable copy of the current contents of the store.
+
+        The copy is taken on the first call after the store changed, later
+        calls return the same copy.
+
+        Returns:
+            View to search while the store is being updated.
+        """
+        if self._view is None:
+            count = len(self._ids)
+            vectors = self._vectors[:count].copy()
+            servers = self._servers[:count].copy()
+            vectors.setflags(write=False)
+            servers.setflags(write=False)
+            self._view = MatrixView(
+                vectors=vectors,
+                servers=servers,
+                server_codes=MappingProxyType(dict(self._server_codes)),
+                ids=tuple(self._ids),
+                metadatas=tuple(self._metadatas),
+                positions=MappingProxyType(dict(self._positions)),
+            )
+        return self._view
+
+    def search_with_scores(
+        self,
+        vector: list[float],
+        k: int,
+        allowed_servers: set[str] | None = None,
+    ) -> tuple[list[str], list[float], list[dict]]:
+        """Search the current contents, see `MatrixView.search_with_scores`."""
+        return self.view().search_with_scores(
+            vector, k, allowed_servers=allowed_servers
+        )
+
+    def fused_top_k(
+        self,
+        vector: list[float],
+        sparse: Mapping[str, float],
+        alpha: float,
+        k: int,
+        allowed_servers: set[str] | None = None,
+    ) -> dict[str, float]:
+        """Fuse scores of the current contents, see `MatrixView.fused_top_k`."""
+        return self.view().fused_top_k(
+            vector, sparse, alpha, k, allowed_servers=allowed_servers
+        )
+
+    def __len__(self) -> int:
+        """Return number of documents in the store."""
+        return len(self._ids)
@@ -1,13 +1,34 @@
 # type: ignore
 """Module for loading index."""
 
+import asyncio
+import hashlib
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-
-from ols.app.models.config import ReferenceContent
-from ols.constants import EMBEDDINGS_MODEL_BYOK_SUBDIR, RAG_CONTENT_LIMIT
+from ols.app.models.config import ReferenceContent, RetrievalCacheConfig
+from ols.constants import (
+    EMBEDDINGS_MODEL_BYOK_SUBDIR,
+    RAG_CONTENT_LIMIT,
+    RAG_INDEX_CACHE_PATH,
+    RAG_NODE_TOKEN_COUNT_KEY,
+    RAG_RETRIEVAL_MAX_WORKERS,
+)
+from ols.src.rag.embedding_models import embedding_models, resident_memory_bytes
+from ols.src.rag.embeddings import EmbeddingService
+from ols.src.rag_index.mapped_docstore import (
+    DOCSTORE_FILE,
+    MappedDocstoreFile,
+    MappedKVStoreData,
+    compact_docstore_path,
+    is_current,
+    write_compact_docstore,
+)
+from ols.src.rag_index.retrieval_cache import SemanticRetrievalCache
+from ols.utils.token_handler import TokenHandler, format_retrieved_chunk
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +36,15 @@ logger = logging.getLogger(__name__)
 SCORE_DILUTION_WEIGHT = 0.05
 SCORE_DILUTION_DEPTH = 2
 
+# name of the FAISS index file in the persist directory of a LlamaIndex index
+FAISS_INDEX_FILE = "default__vector_store.json"
+
+# vector index search and query embedding are synchronous, retrievals run on
+# these threads so they do not block the event loop
+_retrieval_executor = ThreadPoolExecutor(
+    max_workers=RAG_RETRIEVAL_MAX_WORKERS, thread_name_prefix="rag-retrieval"
+)
+
 
 # delay import of llama_index dependencies
 BaseIndex = Any
@@ -26,7 +56,7 @@ BaseRetriever = Any
 # we load it only when it is required.
 # As these dependencies are lazily loaded, we can't use them in type hints.
 # So this module is excluded from mypy checks as a whole.
-def load_llama_index_deps() -> None:
+def load_llama_index_deps() -> None:  # noqa: C901  # pylint: disable=R0915
     """Load llama_index dependencies."""
     # pylint: disable=global-statement disable=C0415
     global Settings
@@ -38,15 +68,26 @@ def load_llama_index_deps() -> None:
     global resolve_llm
     global FaissVectorStore
     global QueryFusionRetriever
+    global KVDocumentStore
+    global SimpleDocumentStore
+    global SimpleKVStore
+    global faiss
+    import faiss
     from llama_index.core import (
         Settings,
         StorageContext,
         load_index_from_storage,
     )
+    from llama_index.core.base.embeddings.base import BaseEmbedding
+    from llama_index.core.bridge.pydantic import PrivateAttr
     from llama_index.core.embeddings.utils import EmbedType  # pylint: disable=W0611
     from llama_index.core.indices.base import BaseIndex
     from llama_index.core.llms.utils import resolve_llm
     from llama_index.core.retrievers import BaseRetriever, QueryFusionRetriever
+    from llama_index.core.storage.docstore import SimpleDocumentStore
+    from llama_index.core.storage.docstore.keyval_docstore import KVDocumentStore
+    from llama_index.core.storage.kvstore import SimpleKVStore
+    from llama_index.core.storage.kvstore.types import DEFAULT_COLLECTION, BaseKVStore
     from llama_index.vector_stores.faiss import FaissVectorStore
 
     # Set custom query fusion class to override existing normalized weighted score.
@@ -61,6 +102,8 @@ def load_llama_index_deps() -> None:
             # Extract custom parameters before passing to parent
             retriever_weights = kwargs.pop("retriever_weights", None)
             index_configs = kwargs.pop("index_configs", None)
+            retrieval_cache = kwargs.pop("retrieval_cache", None)
+            cache_version = kwargs.pop("cache_version", "")
             retrievers = kwargs.get("retrievers", [])
 
             super().__init__(**kwargs)
@@ -69,6 +112,8 @@ def load_llama_index_deps() -> None:
                 retriever_weights = [1.0] * len(retrievers)
             self._custom_retriever_weights = retriever_weights
             self._index_configs = index_configs
+            self._retrieval_cache = retrieval_cache
+            self._cache_version = cache_version
 
         def _simple_fusion(self, results):
             """Override internal method and apply weighted score."""
@@ -115,16 +160,156 @@ def load_llama_index_deps() -> None:
                 all_nodes.values(), key=lambda x: x.score or 0.0, reverse=True
             )
 
+        async def _aretrieve(self, query_bundle):
+            """Search all indexes concurrently on the retrieval executor."""
+            loop = asyncio.get_running_loop()
+            cache = self._retrieval_cache
+            if cache is not None:
+                if query_bundle.embedding is None:
+                    # the index retrievers reuse the embedding of the bundle
+                    query_bundle.embedding = await loop.run_in_executor(
+                        _retrieval_executor,
+                        Settings.embed_model.get_query_embedding,
+                        query_bundle.query_str,
+                    )
+                nodes = cache.get(query_bundle.embedding, self._cache_version)
+                if nodes is not None:
+                    return nodes
+            start = time.monotonic()
+            nodes_per_index = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        _retrieval_executor, retriever.retrieve, query_bundle
+                    )
+                    for retriever in self._retrievers
+                )
+            )
+            # same shape as results of the synchronous retrieval of one query
+            results = {
+                (query_bundle.query_str, i): nodes
+                for i, nodes in enumerate(nodes_per_index)
+            }
+            nodes = self._simple_fusion(results)[: self.similarity_top_k]
+            if cache is not None:
+                cache.put(
+                    query_bundle.embedding,
+                    self._cache_version,
+                    nodes,
+                    time.monotonic() - start,
+                )
+            return nodes
+
+    # Query embeddings are memoized, so a repeated query is not embedded again.
+    global MemoizedEmbedding  # pylint: disable=W0601
+
+    class MemoizedEmbedding(BaseEmbedding):  # pylint: disable=W0612
+        """Embedding model memoizing query embeddings of the wrapped model."""
+
+        _embed_model: BaseEmbedding = PrivateAttr()
+        _query_embedding: EmbeddingService = PrivateAttr()
+
+        def __init__(self, embed_model, model_id, **kwargs):
+            """Wrap the embedding model identified by model_id."""
+            super().__init__(model_name=model_id, **kwargs)
+            self._embed_model = embed_model
+            # query and text embeddings of one model may be prompted differently
+            self._query_embedding = EmbeddingService(
+                f"{model_id}:query", embed_model.get_query_embedding
+            )
+
+        @classmethod
+        def class_name(cls):
+            """Get class name."""
+            return "MemoizedEmbedding"
+
+        def _get_query_embedding(self, query):
+            """Get memoized query embedding."""
+            return self._query_embedding.embed(query)
+
+        async def _aget_query_embedding(self, query):
+            """Get memoized query embedding."""
+            return self._get_query_embedding(query)
+
+        def _get_text_embedding(self, text):
+            """Get text embedding from the wrapped model."""
+            return self._embed_model.get_text_embedding(text)
+
+        def _get_text_embeddings(self, texts):
+            """Get text embeddings from the wrapped model."""
+            return self._embed_model.get_text_embedding_batch(texts)
+
+    # Docstore of a memory-mapped index, values are read from the mapped file.
+    global MappedKVStore  # pylint: disable=W0601
+
+    class MappedKVStore(BaseKVStore):  # pylint: disable=W0612
+        """Key-value store reading values from a compact docstore file."""
+
+        def __init__(self, data: MappedKVStoreData):
+            """Initialize the store with the compact docstore data."""
+            self._data = data
+
+        def put(self, key, val, collection=DEFAULT_COLLECTION):
+            """Put the value into the store."""
+            self._data.put(key, val, collection)
+
+        async def aput(self, key, val, collection=DEFAULT_COLLECTION):
+            """Put the value into the store."""
+            self.put(key, val, collection)
+
+        def get(self, key, collection=DEFAULT_COLLECTION):
+            """Get the value from the store."""
+            return self._data.get(key, collection)
+
+        async def aget(self, key, collection=DEFAULT_COLLECTION):
+            """Get the value from the store."""
+            return self.get(key, collection)
+
+        def get_all(self, collection=DEFAULT_COLLECTION):
+            """Get all values of the collection."""
+            return self._data.get_all(collection)
+
+        async def aget_all(self, collection=DEFAULT_COLLECTION):
+            """Get all values of the collection."""
+            return self.get_all(collection)
+
+        def delete(self, key, collection=DEFAULT_COLLECTION):
+            """Delete the value from the store."""
+            return self._data.delete(key, collection)
+
+        async def adelete(self, key, collection=DEFAULT_COLLECTION):
+            """Delete the value from the store."""
+            return self.delete(key, collection)
+
 
 class IndexLoader:
     """Load index from local file storage."""
 
-    def __init__(self, index_config: Optional[ReferenceContent]) -> None:
-        """Initialize loader."""
+    def __init__(
+        self,
+        index_config: Optional[ReferenceContent],
+        retrieval_cache_config: Optional[RetrievalCacheConfig] = None,
+    ) -> None:
+        """Initialize loader.
+
+        Args:
+            index_config: Configuration of the indexes to load.
+            retrieval_cache_config: Configuration of the semantic cache of
+                retrieval results, retrievals are not cached without it.
+        """
         load_llama_index_deps()
         self._indexes = None
         self._retriever = None
         self._loaded_index_configs = None
+        self._index_version = ""
+        self._retrieval_cache = (
+            SemanticRetrievalCache(
+                similarity_threshold=retrieval_cache_config.similarity_threshold,
+                ttl=retrieval_cache_config.ttl_seconds,
+                max_entries=retrieval_cache_config.max_entries,
+            )
+            if retrieval_cache_config is not None
+            else None
+        )
 
         self._index_config = index_config
         logger.debug("Config used for index load: %s", str(self._index_config))
@@ -138,16 +323,18 @@ class IndexLoader:
             self._load_index()
 
     @staticmethod
-    def _get_embed_model() -> HuggingFaceEmbedding:
-        """Load the bundled BYOK embedding model."""
-        logger.debug("Loading embedding model: %s", EMBEDDINGS_MODEL_BYOK_SUBDIR)
-        return HuggingFaceEmbedding(model_name=EMBEDDINGS_MODEL_BYOK_SUBDIR)
+    def _get_embed_model() -> Any:
+        """Get the bundled BYOK embedding model, shared with tools and skills."""
+        logger.debug("Using embedding model: %s", EMBEDDINGS_MODEL_BYOK_SUBDIR)
+        return embedding_models.get(EMBEDDINGS_MODEL_BYOK_SUBDIR)
 
     def _load_index(self) -> None:
         """Load vector index."""
         logger.debug("Using %s as embedding model for index", str(self._embed_model))
         logger.info("Setting up settings for index load...")
-        Settings.embed_model = self._embed_model
+        Settings.embed_model = MemoizedEmbedding(
+            self._embed_model, EMBEDDINGS_MODEL_BYOK_SUBDIR
+        )
         Settings.llm = resolve_llm(None)
 
         indexes = []
@@ -159,11 +346,10 @@ class IndexLoader:
             try:
                 # pylint: disable=W0201
                 logger.info("Setting up storage context for index #%d...", i)
-                storage_context = StorageContext.from_defaults(
-                    vector_store=FaissVectorStore.from_persist_dir(
-                        index_config.product_docs_index_path
-                    ),
-                    persist_dir=index_config.product_docs_index_path,
+                rss_before = resident_memory_bytes()
+                start = time.monotonic()
+                storage_context = self._storage_context(
+                    index_config.product_docs_index_path, i
                 )
                 logger.info(
                     "Loading vector index #%d%s...",
@@ -180,7 +366,7 @@ class IndexLoader:
                 )
                 indexes.append(index)
                 loaded_configs.append(index_config)
-                logger.info("Vector index #%d is loaded.", i)
+                self._log_index_loaded(i, time.monotonic() - start, rss_before)
             except Exception as err:
                 logger.exception(
                     "Error loading vector index #%d:\n%s, skipped.", i, err
@@ -198,6 +384,133 @@ class IndexLoader:
             logger.info("All indexes are loaded.")
         self._indexes = indexes
         self._loaded_index_configs = loaded_configs
+        self._index_version = self._version_of(loaded_configs)
+
+    @staticmethod
+    def _version_of(index_configs: list) -> str:
+        """Return version of the loaded indexes, changed when any index changes.
+
+        The version is derived from the paths and IDs of the indexes and from
+        the modification times of their files.
+        """
+        digest = hashlib.sha256()
+        for index_config in index_configs:
+            path = str(index_config.product_docs_index_path)
+            digest.update(f"{path}:{index_config.product_docs_index_id}".encode())
+            for file_name in (FAISS_INDEX_FILE, DOCSTORE_FILE):
+                try:
+                    mtime_ns = os.stat(os.path.join(path, file_name)).st_mtime_ns
+                except OSError:
+                    mtime_ns = 0
+                digest.update(f":{mtime_ns}".encode())
+        return digest.hexdigest()[:16]
+
+    def _storage_context(self, index_path: str, index_number: int) -> Any:
+        """Create storage context of the index persisted in the directory."""
+        if not self._index_config.memory_mapped:
+            return StorageContext.from_defaults(
+                vector_store=FaissVectorStore.from_persist_dir(index_path),
+                persist_dir=index_path,
+            )
+        return StorageContext.from_defaults(
+            vector_store=self._load_mapped_vector_store(index_path),
+            docstore=self._load_mapped_docstore(index_path, index_number),
+            persist_dir=index_path,
+        )
+
+    @staticmethod
+    def _load_mapped_vector_store(index_path: str) -> Any:
+        """Load FAISS index memory-mapped, its vectors are read on demand.
+
+        Index types FAISS can not map are read into memory.
+        """
+        path = os.path.join(index_path, FAISS_INDEX_FILE)
+        # IO_FLAG_MMAP_IFC maps flat indexes, it is missing in older FAISS
+        mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+        try:
+            faiss_index = faiss.read_index(path, mmap_flag | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError as err:
+            logger.warning("FAISS index %s can not be memory-mapped: %s", path, err)
+            faiss_index = faiss.read_index(path)
+        return FaissVectorStore(faiss_index=faiss_index)
+
+    @classmethod
+    def _load_mapped_docstore(cls, index_path: str, index_number: int) -> Any:
+        """Load docstore of the index from its memory-mapped compact copy.
+
+        The compact copy is converted from the docstore JSON when there is
+        none or when the docstore changed since. Token counts of the nodes are
+        computed during the conversion and stored in the copy, so they are
+        not computed again on later loads.
+        """
+        source_path = os.path.join(index_path, DOCSTORE_FILE)
+        path = compact_docstore_path(index_path, RAG_INDEX_CACHE_PATH)
+        if not is_current(path, source_path):
+            logger.info(
+                "Converting docstore of vector index #%d to %s...", index_number, path
+            )
+            kvstore = SimpleKVStore.from_persist_path(source_path)
+            cls._count_docstore_tokens(
+                SimpleDocumentStore(simple_kvstore=kvstore), index_number
+            )
+            write_compact_docstore(path, kvstore.to_dict(), source_path)
+        return KVDocumentStore(
+            MappedKVStore(MappedKVStoreData(MappedDocstoreFile(path)))
+        )
+
+    @staticmethod
+    def _count_docstore_tokens(docstore: Any, index_number: int) -> None:
+        """Store token counts of node texts formatted as RAG context in nodes metadata.
+
+        With the counts, RAG context truncation tokenizes only the nodes that
+        need to be cut. Nodes of indexes built with the counts are skipped.
+        Failing to count the tokens is not fatal, the nodes are then counted
+        when they are retrieved.
+        """
+        try:
+            nodes = [
+                node
+                for node in docstore.docs.values()
+                if RAG_NODE_TOKEN_COUNT_KEY not in node.metadata
+            ]
+            if not nodes:
+                return
+            counts = TokenHandler().exact_token_counts(
+                [format_retrieved_chunk(node.get_text()) for node in nodes]
+            )
+            for node, count in zip(nodes, counts):
+                node.metadata[RAG_NODE_TOKEN_COUNT_KEY] = count
+                # the count is for us only, neither for embeddings nor for LLM
+                node.excluded_embed_metadata_keys.append(RAG_NODE_TOKEN_COUNT_KEY)
+                node.excluded_llm_metadata_keys.append(RAG_NODE_TOKEN_COUNT_KEY)
+            docstore.add_documents(nodes, allow_update=True)
+            logger.info(
+                "Token counts of %d nodes of vector index #%d are computed.",
+                len(nodes),
+                index_number,
+            )
+        except Exception as err:
+            logger.warning(
+                "Token counts of vector index #%d nodes are not computed: %s",
+                index_number,
+                err,
+            )
+
+    @staticmethod
+    def _log_index_loaded(
+        index_number: int, duration: float, rss_before: Optional[int]
+    ) -> None:
+        """Log time and resident memory taken by loading the index."""
+        rss_after = resident_memory_bytes()
+        if rss_before is None or rss_after is None:
+            logger.info("Vector index #%d is loaded in %.2f s.", index_number, duration)
+            return
+        logger.info(
+            "Vector index #%d is loaded in %.2f s, it takes %d MiB.",
+            index_number,
+            duration,
+            max(rss_after - rss_before, 0) // (1024 * 1024),
+        )
 
     @property
     def vector_indexes(self) -> Optional[list[BaseIndex]]:
@@ -252,8 +565,12 @@ class IndexLoader:
             similarity_top_k=similarity_top_k,
             retriever_weights=None,  # Setting as None, until this gets added to config
             index_configs=self._loaded_index_configs,
+            retrieval_cache=self._retrieval_cache,
+            # cached nodes depend on the indexes and on the number of nodes
+            cache_version=f"{self._index_version}:{similarity_top_k}",
             mode="simple",  # Don't modify this as we are adding our own logic
             num_queries=1,  # set this to 1 to disable query generation
+            # aretrieve searches the indexes concurrently on _retrieval_executor
             use_async=False,
             verbose=False,
         )
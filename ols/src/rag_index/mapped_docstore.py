@@ -0,0 +1,215 @@
+"""Compact on-disk copy of a vector index docstore read through a memory map.
+
+LlamaIndex persists the docstore of an index as one JSON document and reads
+all of it into memory when the index is loaded, although only the nodes
+returned by vector search are ever read. The docstore is converted once into
+a compact file holding every stored value as a separate JSON record. The
+file is memory-mapped: only the table of record offsets is kept in memory,
+records are parsed when they are requested and their pages live in the page
+cache, shared by all processes reading the file.
+
+File layout:
+
+    magic (8 bytes) | header length (8 bytes, little endian) | header | records
+
+The header is JSON with the format version, the size and modification time
+of the source docstore and the offset and length of every record, by
+collection and key. Offsets are relative to the start of the records.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+# name of the docstore file in the persist directory of a LlamaIndex index
+DOCSTORE_FILE = "docstore.json"
+
+MAGIC = b"OLSDOCS1"
+FORMAT_VERSION = 1
+_LENGTH = struct.Struct("<Q")
+
+
+def _source_stamp(source_path: str) -> dict[str, Any]:
+    """Identify the version of the source docstore by its size and mtime."""
+    stat = os.stat(source_path)
+    return {
+        "version": FORMAT_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def compact_docstore_path(index_path: str, cache_dir: str) -> str:
+    """Return path of the compact docstore of the index in the cache directory.
+
+    Args:
+        index_path: Persist directory of the index.
+        cache_dir: Directory holding compact docstores of all indexes.
+
+    Returns:
+        Path of the compact docstore file, unique for the index directory.
+    """
+    digest = hashlib.sha256(os.path.abspath(index_path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{digest[:32]}.docstore")
+
+
+def write_compact_docstore(
+    path: str, data: dict[str, dict[str, Any]], source_path: str
+) -> None:
+    """Write the docstore data into a compact docstore file.
+
+    The file is written under a temporary name and renamed, so processes
+    reading the file never see it partially written.
+
+    Args:
+        path: Path of the compact docstore file.
+        data: Docstore key-value data, values by key by collection.
+        source_path: Path of the docstore JSON the data was read from.
+    """
+    offsets: dict[str, dict[str, tuple[int, int]]] = {}
+    records: list[bytes] = []
+    position = 0
+    for collection, values in data.items():
+        collection_offsets = offsets[collection] = {}
+        for key, value in values.items():
+            record = json.dumps(value, separators=(",", ":")).encode("utf-8")
+            collection_offsets[key] = (position, len(record))
+            records.append(record)
+            position += len(record)
+    header = json.dumps(
+        {"source": _source_stamp(source_path), "offsets": offsets},
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    directory = os.path.dirname(path)
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(MAGIC)
+            file.write(_LENGTH.pack(len(header)))
+            file.write(header)
+            file.writelines(records)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+class MappedDocstoreFile:
+    """Read-only compact docstore file accessed through a memory map.
+
+    Instances are safe to use from several threads: the memory map is only
+    read and the offsets are not modified after the file is opened.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open and map the compact docstore file.
+
+        Args:
+            path: Path of the compact docstore file.
+
+        Raises:
+            ValueError: The file is not a compact docstore.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            prefix_length = len(MAGIC) + _LENGTH.size
+            if self._mmap[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a compact docstore file")
+            (header_length,) = _LENGTH.unpack(self._mmap[len(MAGIC) : prefix_length])
+            header = json.loads(
+                self._mmap[prefix_length : prefix_length + header_length]
+            )
+        except BaseException:
+            self._mmap.close()
+            raise
+        self.source: dict[str, Any] = header["source"]
+        self._offsets: dict[str, dict[str, list[int]]] = header["offsets"]
+        self._records_start = prefix_length + header_length
+
+    def get(self, key: str, collection: str) -> Optional[dict]:
+        """Return the value stored under the key, None when there is none."""
+        offset = self._offsets.get(collection, {}).get(key)
+        if offset is None:
+            return None
+        start = self._records_start + offset[0]
+        return json.loads(self._mmap[start : start + offset[1]])
+
+    def keys(self, collection: str) -> Iterator[str]:
+        """Iterate keys of the values stored in the collection."""
+        return iter(self._offsets.get(collection, {}))
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        """Return number of values stored in all collections."""
+        return sum(len(offsets) for offsets in self._offsets.values())
+
+
+def is_current(path: str, source_path: str) -> bool:
+    """Return whether the compact docstore was converted from the source as it is."""
+    try:
+        docstore = MappedDocstoreFile(path)
+    except (OSError, ValueError):
+        return False
+    try:
+        return docstore.source == _source_stamp(source_path)
+    finally:
+        docstore.close()
+
+
+class MappedKVStoreData:
+    """Values of a compact docstore file with changes made after loading.
+
+    The compact file is read-only. Values put or deleted after loading, e.g.
+    by LlamaIndex when an index is updated in memory, are kept in memory on
+    top of the file. This is the storage of the LlamaIndex key-value store
+    built by the index loader.
+    """
+
+    def __init__(self, docstore_file: MappedDocstoreFile) -> None:
+        """Initialize the store reading values from the compact docstore file."""
+        self._file = docstore_file
+        self._changed: dict[str, dict[str, Optional[dict]]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: dict, collection: str) -> None:
+        """Store the value in memory, over the value in the file."""
+        with self._lock:
+            self._changed.setdefault(collection, {})[key] = value
+
+    def get(self, key: str, collection: str) -> Optional[dict]:
+        """Return the value stored under the key, None when there is none."""
+        changed = self._changed.get(collection, {})
+        if key in changed:
+            return changed[key]
+        return self._file.get(key, collection)
+
+    def get_all(self, collection: str) -> dict[str, dict]:
+        """Return all values of the collection, reading all of them from file."""
+        values = {
+            key: self._file.get(key, collection) for key in self._file.keys(collection)
+        }
+        with self._lock:
+            values.update(self._changed.get(collection, {}))
+        return {key: value for key, value in values.items() if value is not None}
+
+    def delete(self, key: str, collection: str) -> bool:
+        """Delete the value, return whether there was any."""
+        if self.get(key, collection) is None:
+            return False
+        with self._lock:
+            self._changed.setdefault(collection, {})[key] = None
+        return True
@@ -0,0 +1,166 @@
+"""Semantic cache of RAG retrieval results.
+
+Users often ask nearly identical questions, e.g. "how do I scale a
+deployment". Their query embeddings are close to each other and so are the
+document nodes retrieved for them. `SemanticRetrievalCache` keeps the nodes
+retrieved for recent queries and serves them for a query whose embedding is
+similar enough to the embedding of a cached one, so the vector indexes are
+not searched again.
+"""
+
+import logging
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from prometheus_client import Counter
+
+from ols.constants import (
+    RAG_RETRIEVAL_CACHE_MAX_ENTRIES,
+    RAG_RETRIEVAL_CACHE_SIMILARITY_THRESHOLD,
+    RAG_RETRIEVAL_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+rag_retrieval_cache_hits_total = Counter(
+    "ols_rag_retrieval_cache_hits_total",
+    "RAG retrievals served from the semantic retrieval cache",
+)
+rag_retrieval_cache_misses_total = Counter(
+    "ols_rag_retrieval_cache_misses_total",
+    "RAG retrievals not found in the semantic retrieval cache",
+)
+rag_retrieval_cache_saved_seconds_total = Counter(
+    "ols_rag_retrieval_cache_saved_seconds_total",
+    "Time the cached RAG retrievals took when they were computed",
+)
+
+
+def _normalized(embedding: Sequence[float]) -> array:
+    """Return the embedding scaled to unit length."""
+    norm = math.sqrt(math.sumprod(embedding, embedding))
+    if norm == 0:
+        return array("d", embedding)
+    return array("d", (x / norm for x in embedding))
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    """Nodes retrieved for one query."""
+
+    embedding: array
+    version: str
+    nodes: list[Any]
+    expires_at: float
+    duration: float
+
+
+class SemanticRetrievalCache:
+    """Bounded cache of retrieved nodes keyed by query embedding similarity.
+
+    A cached retrieval is served when the cosine similarity of its query
+    embedding to the embedding of the new query reaches the threshold. The
+    retrieval results depend on the indexes searched, so every entry is
+    stored with the version of the indexes and served only for that version.
+    Entries expire after the TTL, the least recently used entry is dropped
+    when the cache is full.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = RAG_RETRIEVAL_CACHE_SIMILARITY_THRESHOLD,
+        ttl: float = RAG_RETRIEVAL_CACHE_TTL_SECONDS,
+        max_entries: int = RAG_RETRIEVAL_CACHE_MAX_ENTRIES,
+    ) -> None:
+        """Initialize empty cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity of query embeddings
+                for a cached retrieval to be served.
+            ttl: Time in seconds a cached retrieval is served for.
+            max_entries: Maximum number of cached retrievals.
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def get(self, embedding: Sequence[float], version: str) -> Optional[list[Any]]:
+        """Return nodes retrieved for the most similar cached query.
+
+        Args:
+            embedding: Embedding of the query.
+            version: Version of the searched indexes.
+
+        Returns:
+            The retrieved nodes, None when no cached query is similar enough.
+        """
+        query = _normalized(embedding)
+        now = time.monotonic()
+        best_key, best_similarity = None, self.similarity_threshold
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.expires_at <= now or entry.version != version:
+                    del self._entries[key]
+                    continue
+                similarity = math.sumprod(query, entry.embedding)
+                if similarity >= best_similarity:
+                    best_key, best_similarity = key, similarity
+            if best_key is None:
+                rag_retrieval_cache_misses_total.inc()
+                return None
+            self._entries.move_to_end(best_key)
+            entry = self._entries[best_key]
+        rag_retrieval_cache_hits_total.inc()
+        rag_retrieval_cache_saved_seconds_total.inc(entry.duration)
+        logger.debug("Retrieval served from cache, similarity %.4f", best_similarity)
+        return list(entry.nodes)
+
+    def put(
+        self,
+        embedding: Sequence[float],
+        version: str,
+        nodes: list[Any],
+        duration: float,
+    ) -> None:
+        """Store nodes retrieved for the query.
+
+        Args:
+            embedding: Embedding of the query.
+            version: Version of the searched indexes.
+            nodes: The retrieved nodes.
+            duration: Time in seconds the retrieval took.
+        """
+        if self.max_entries <= 0:
+            return
+        entry = _CacheEntry(
+            embedding=_normalized(embedding),
+            version=version,
+            nodes=list(nodes),
+            expires_at=time.monotonic() + self.ttl,
+            duration=duration,
+        )
+        with self._lock:
+            self._entries[self._next_key] = entry
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached retrievals."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return number of cached retrievals."""
+        return len(self._entries)
@@ -0,0 +1,188 @@
+"""Pooled HTTP client for Solr hybrid search.
+
+Connections of an ``httpx.AsyncClient`` are bound to the event loop that
+opened them, while docs search runs both on the server event loop (streaming
+queries) and on short-lived loops of ``asyncio.run`` (non-streaming queries).
+The pool therefore owns one client running on its own event loop thread;
+requests from any event loop are sent through it, so connections to Solr are
+kept alive and reused across searches instead of being opened per search.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import importlib.util
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge, Histogram
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+solr_http_requests_total = Counter(
+    "ols_solr_http_requests_total",
+    "Requests sent to Solr through the connection pool",
+    ["http_version"],
+)
+solr_http_connections_opened_total = Counter(
+    "ols_solr_http_connections_opened_total",
+    "Connections to Solr opened by the connection pool",
+)
+solr_http_requests_in_flight = Gauge(
+    "ols_solr_http_requests_in_flight",
+    "Requests to Solr waiting for a pooled connection or a response",
+)
+solr_http_request_duration_seconds = Histogram(
+    "ols_solr_http_request_duration_seconds",
+    "Durations of requests to Solr, including wait for a pooled connection",
+)
+
+
+def _http2_available() -> bool:
+    """Return True when the ``h2`` package needed by httpx for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+async def _trace(event_name: str, _info: dict[str, Any]) -> None:
+    """Count connections opened by the pool from httpcore trace events."""
+    if event_name == "connection.connect_tcp.complete":
+        solr_http_connections_opened_total.inc()
+
+
+async def _attach_trace(request: httpx.Request) -> None:
+    """Request hook enabling the connection trace for the request."""
+    request.extensions["trace"] = _trace
+
+
+class SolrConnectionPool:
+    """Long-lived pooled ``httpx.AsyncClient`` shared by all event loops.
+
+    The client and its event loop thread are started on the first request
+    and stopped by `aclose`. A request after `aclose` starts them again.
+    """
+
+    def __init__(
+        self,
+        timeout_s: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry_s: float,
+        http2: bool = True,
+    ) -> None:
+        """Store the client settings, the client is created on first request.
+
+        Args:
+            timeout_s: Total HTTP timeout in seconds of each request.
+            max_connections: Maximum number of connections to Solr.
+            max_keepalive_connections: Maximum number of idle connections kept.
+            keepalive_expiry_s: Time in seconds an idle connection is kept.
+            http2: Negotiate HTTP/2 when the ``h2`` package is installed.
+        """
+        self._timeout_s = timeout_s
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_s,
+        )
+        self._http2 = http2 and _http2_available()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _start(self) -> tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]:
+        """Return event loop and client of the pool, starting them if needed."""
+        with self._lock:
+            if self._loop is None or self._client is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(loop,),
+                    name="solr-http-pool",
+                    daemon=True,
+                )
+                self._thread.start()
+                self._client = httpx.AsyncClient(
+                    timeout=self._timeout_s,
+                    limits=self._limits,
+                    http2=self._http2,
+                    event_hooks={"request": [_attach_trace]},
+                )
+                self._loop = loop
+                logger.info(
+                    "Started Solr connection pool (max connections %d, HTTP/2 %s)",
+                    self._limits.max_connections,
+                    "enabled" if self._http2 else "disabled",
+                )
+            return self._loop, self._client
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        """Run the event loop of the pool until it is stopped."""
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    @staticmethod
+    async def _send(
+        client: httpx.AsyncClient,
+        send: Callable[[httpx.AsyncClient], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """Send the request on the event loop of the pool, recording metrics."""
+        solr_http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            response = await send(client)
+        finally:
+            solr_http_requests_in_flight.dec()
+            solr_http_request_duration_seconds.observe(time.perf_counter() - start)
+        solr_http_requests_total.labels(http_version=response.http_version).inc()
+        return response
+
+    async def _request(
+        self, send: Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """Send the request through the pool and wait for the response."""
+        loop, client = self._start()
+        # The request is scheduled in an empty context: copying contextvars
+        # (including OpenTelemetry span tokens) into the pool thread corrupts
+        # the OTEL context on detach.
+        future = contextvars.Context().run(
+            asyncio.run_coroutine_threadsafe, self._send(client, send), loop
+        )
+        return await asyncio.wrap_future(future)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send GET request, arguments are those of ``httpx.AsyncClient.get``."""
+        return await self._request(lambda client: client.get(url, **kwargs))
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send POST request, arguments are those of ``httpx.AsyncClient.post``."""
+        return await self._request(lambda client: client.post(url, **kwargs))
+
+    async def aclose(self) -> None:
+        """Close pooled connections and stop the event loop thread of the pool."""
+        with self._lock:
+            loop, client, thread = self._loop, self._client, self._thread
+            self._loop = self._client = self._thread = None
+        if loop is None or client is None or thread is None:
+            return
+        try:
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            )
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        logger.info("Closed Solr connection pool")
@@ -27,6 +27,7 @@ from packaging.version import InvalidVersion, Version
 
 from ols.app.models.models import RagChunk
 from ols.src.rag.stop_words import ENGLISH_STOP_WORDS
+from ols.src.rag_index.solr_http_pool import SolrConnectionPool
 from ols.utils.checks import InvalidConfigurationError
 
 if TYPE_CHECKING:
@@ -208,7 +209,8 @@ class SolrHybridSearch:
         Resolves the OCP product version at construction time by reading the
         ``OCP_CLUSTER_VERSION`` environment variable and querying Solr for
         available versions.  The resolved version is used to build
-        ``chunk_filter_query``.
+        ``chunk_filter_query``. Searches are sent through a pool of
+        keep-alive connections, closed by `aclose`.
 
         Args:
             settings: Solr base URL, hybrid weights, timeouts, and row limits.
@@ -220,6 +222,13 @@ class SolrHybridSearch:
         """
         self._settings = settings
         self._encode_fn = encode_fn
+        self._pool = SolrConnectionPool(
+            timeout_s=settings.hybrid_solr_timeout_s,
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry_s=settings.http_keepalive_expiry_s,
+            http2=settings.http2,
+        )
         self.chunk_filter_query: str = self._resolve_chunk_filter_query(
             settings.solr_http_base, settings.hybrid_solr_timeout_s
         )
@@ -245,6 +254,10 @@ class SolrHybridSearch:
             )
             return []
 
+    async def aclose(self) -> None:
+        """Close pooled connections to Solr."""
+        await self._pool.aclose()
+
     async def _search_impl(self, query: str, token_budget: int) -> list[RetrievedChunk]:
         """Execute the hybrid search, dedupe, expand chunks, and build results."""
         cfg = self._settings
@@ -264,66 +277,64 @@ class SolrHybridSearch:
         query_embedding = await loop.run_in_executor(None, _encode)
         vector_str = "[" + ",".join(str(v) for v in query_embedding) + "]"
         form = self._build_hybrid_form(cleaned=cleaned, vector_str=vector_str)
-        async with httpx.AsyncClient(timeout=cfg.hybrid_solr_timeout_s) as client:
-            response = await client.post(
-                hybrid_url,
-                data=form,
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            response.raise_for_status()
-            payload = _solr_response_json(response, log_url=hybrid_url)
-            hybrid_docs = list(payload.get("response", {}).get("docs", []))
+        response = await self._pool.post(
+            hybrid_url,
+            data=form,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        response.raise_for_status()
+        payload = _solr_response_json(response, log_url=hybrid_url)
+        hybrid_docs = list(payload.get("response", {}).get("docs", []))
 
+        if not hybrid_docs:
+            logger.warning("No results (hybrid-search) for: %s", query)
+            return []
+
+        if cfg.hybrid_score_threshold > 0:
+            hybrid_docs = [
+                d
+                for d in hybrid_docs
+                if _safe_solr_score(d.get("score", 0.0)) >= cfg.hybrid_score_threshold
+            ]
             if not hybrid_docs:
-                logger.warning("No results (hybrid-search) for: %s", query)
+                logger.warning(
+                    "No docs above hybrid_score_threshold=%s for: %s",
+                    cfg.hybrid_score_threshold,
+                    query,
+                )
                 return []
 
-            if cfg.hybrid_score_threshold > 0:
-                hybrid_docs = [
-                    d
-                    for d in hybrid_docs
-                    if _safe_solr_score(d.get("score", 0.0))
-                    >= cfg.hybrid_score_threshold
-                ]
-                if not hybrid_docs:
-                    logger.warning(
-                        "No docs above hybrid_score_threshold=%s for: %s",
-                        cfg.hybrid_score_threshold,
-                        query,
-                    )
-                    return []
-
-            deduped = self._dedupe_by_parent(hybrid_docs)[: cfg.max_results]
+        deduped = self._dedupe_by_parent(hybrid_docs)[: cfg.max_results]
 
-            per_chunk_budget = token_budget // len(deduped) if token_budget > 0 else 0
+        per_chunk_budget = token_budget // len(deduped) if token_budget > 0 else 0
 
-            expanded: list[RetrievedChunk] = []
-            for doc in deduped:
-                if per_chunk_budget > 0 and cfg.max_expansion_neighbors > 0:
-                    family = await self._fetch_family(client, base, doc)
-                    ordered = self._expand_around_match(
-                        family,
-                        doc.get("chunk_index", -1),
-                        per_chunk_budget,
-                        max_neighbors=cfg.max_expansion_neighbors,
-                    )
-                else:
-                    ordered = [doc]
-                chunk = self._assemble_chunk(doc, ordered)
-                logger.debug(
-                    "Chunk %s: expanded %d→%d siblings (family=%d, budget=%d)",
-                    doc.get("chunk_index", "?"),
-                    1,
-                    len(ordered),
-                    (
-                        len(family)
-                        if per_chunk_budget > 0 and cfg.max_expansion_neighbors > 0
-                        else 0
-                    ),
+        expanded: list[RetrievedChunk] = []
+        for doc in deduped:
+            if per_chunk_budget > 0 and cfg.max_expansion_neighbors > 0:
+                family = await self._fetch_family(self._pool, base, doc)
+                ordered = self._expand_around_match(
+                    family,
+                    doc.get("chunk_index", -1),
                     per_chunk_budget,
+                    max_neighbors=cfg.max_expansion_neighbors,
                 )
-                expanded.append(chunk)
-            return expanded
+            else:
+                ordered = [doc]
+            chunk = self._assemble_chunk(doc, ordered)
+            logger.debug(
+                "Chunk %s: expanded %d→%d siblings (family=%d, budget=%d)",
+                doc.get("chunk_index", "?"),
+                1,
+                len(ordered),
+                (
+                    len(family)
+                    if per_chunk_budget > 0 and cfg.max_expansion_neighbors > 0
+                    else 0
+                ),
+                per_chunk_budget,
+            )
+            expanded.append(chunk)
+        return expanded
 
     # ------------------------------------------------------------------
     # Startup: OCP version resolution and chunk_filter_query
@@ -604,7 +615,7 @@ class SolrHybridSearch:
 
     @staticmethod
     async def _fetch_family(
-        client: httpx.AsyncClient,
+        pool: SolrConnectionPool,
         base_url: str,
         doc: dict[str, Any],
     ) -> list[dict[str, Any]]:
@@ -632,7 +643,7 @@ class SolrHybridSearch:
             "parent_id,heading_id,resourceName,score",
             "wt": "json",
         }
-        response = await client.get(select_url, params=params)
+        response = await pool.get(select_url, params=params)
         response.raise_for_status()
         payload = _solr_response_json(response, log_url=select_url)
         family = list(payload.get("response", {}).get("docs", []))
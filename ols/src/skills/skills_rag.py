@@ -4,10 +4,12 @@ import logging
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Optional
 
 import frontmatter
 from langchain_core.tools.structured import StructuredTool
 
+from ols.constants import HybridRAGBackend
 from ols.src.rag.hybrid_rag import HybridRAGBase
 
 logger = logging.getLogger(__name__)
@@ -274,6 +276,10 @@ class SkillsRAG(HybridRAGBase):
         encode_fn: Callable[[str], list[float]],
         alpha: float = 0.8,
         threshold: float = 0.01,
+        encode_batch_fn: Callable[[list[str]], list[list[float]]] | None = None,
+        backend: HybridRAGBackend = HybridRAGBackend.QDRANT,
+        snapshot_dir: Optional[str] = None,
+        model_id: str = "",
     ) -> None:
         """Initialize the SkillsRAG system.
 
@@ -281,6 +287,12 @@ class SkillsRAG(HybridRAGBase):
             encode_fn: Function that encodes text into an embedding vector.
             alpha: Weight for dense vs sparse (1.0 = full dense, 0.0 = full sparse).
             threshold: Minimum similarity score to accept a skill match.
+            encode_batch_fn: Optional function that encodes list of texts into
+                list of embedding vectors, used to index documents.
+            backend: Vector store keeping the skill embeddings.
+            snapshot_dir: Optional directory of the embedding snapshot, only
+                new or changed skills are embedded when set.
+            model_id: ID of the embedding model.
         """
         super().__init__(
             collection=self._COLLECTION,
@@ -288,6 +300,10 @@ class SkillsRAG(HybridRAGBase):
             alpha=alpha,
             top_k=self._MAX_TOP_K,
             threshold=threshold,
+            encode_batch_fn=encode_batch_fn,
+            backend=backend,
+            snapshot_dir=snapshot_dir,
+            model_id=model_id,
         )
         self._skills: dict[str, Skill] = {}
 
@@ -299,16 +315,14 @@ class SkillsRAG(HybridRAGBase):
         """
         ids: list[str] = []
         docs: list[str] = []
-        vectors: list[list[float]] = []
 
         for skill in skills:
             text = f"{skill.name} {skill.description}"
             ids.append(skill.source_path)
             docs.append(text)
-            vectors.append(self._encode(text))
             self._skills[skill.source_path] = skill
 
-        self._index_documents(ids, docs, vectors)
+        self._populate(ids, docs)
         self.top_k = min(len(self._skills), self._MAX_TOP_K)
         logger.info("Indexed %d skills for retrieval", len(skills))
 
@@ -326,9 +340,7 @@ class SkillsRAG(HybridRAGBase):
             return None, 0.0
 
         q_vec = self._encode(query)
-        dense, _, _ = self._dense_scores(q_vec, self.top_k)
-        sparse, _ = self._sparse_scores(query)
-        fused = self._fuse_scores(dense, sparse, self.alpha, self.top_k)
+        fused = self._hybrid_scores(query, q_vec, self.top_k, self.alpha)
 
         if not fused:
             return None, 0.0
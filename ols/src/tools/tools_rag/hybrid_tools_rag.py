@@ -2,10 +2,11 @@
 
 import json
 from collections.abc import Callable
-from typing import Any
+from typing import Any, Optional
 
 from langchain_core.tools.structured import StructuredTool
 
+from ols.constants import HybridRAGBackend
 from ols.src.rag.hybrid_rag import HybridRAGBase, QdrantStore
 
 __all__ = ["QdrantStore", "ToolsRAG"]
@@ -22,6 +23,10 @@ class ToolsRAG(HybridRAGBase):
         alpha: float = 0.8,
         top_k: int = 10,
         threshold: float = 0.01,
+        encode_batch_fn: Callable[[list[str]], list[list[float]]] | None = None,
+        backend: HybridRAGBackend = HybridRAGBackend.QDRANT,
+        snapshot_dir: Optional[str] = None,
+        model_id: str = "",
     ) -> None:
         """Initialize the ToolsRAG system with configuration.
 
@@ -30,6 +35,12 @@ class ToolsRAG(HybridRAGBase):
             alpha: Weight for dense vs sparse (1.0 = full dense, 0.0 = full sparse).
             top_k: Number of tools to retrieve.
             threshold: Minimum similarity threshold for filtering results.
+            encode_batch_fn: Optional function that encodes list of texts into
+                list of embedding vectors, used to index documents.
+            backend: Vector store keeping the tool embeddings.
+            snapshot_dir: Optional directory of the embedding snapshot, only
+                new or changed tools are embedded when set.
+            model_id: ID of the embedding model.
         """
         super().__init__(
             collection=self._COLLECTION,
@@ -37,6 +48,10 @@ class ToolsRAG(HybridRAGBase):
             alpha=alpha,
             top_k=top_k,
             threshold=threshold,
+            encode_batch_fn=encode_batch_fn,
+            backend=backend,
+            snapshot_dir=snapshot_dir,
+            model_id=model_id,
         )
         self.default_allowed_servers: set[str] = set()
 
@@ -62,7 +77,6 @@ class ToolsRAG(HybridRAGBase):
         # Process all tools in a single loop
         ids = []
         dense_docs = []
-        vectors = []
         metadatas = []
 
         for tool in tools_list:
@@ -71,7 +85,6 @@ class ToolsRAG(HybridRAGBase):
 
             ids.append(f"{tool_dict.get('server', '')}::{tool_dict['name']}")
             dense_docs.append(text)
-            vectors.append(self._encode(text))
             metadatas.append(
                 {
                     "tool_json": json.dumps(tool_dict),
@@ -79,7 +92,8 @@ class ToolsRAG(HybridRAGBase):
                 }
             )
 
-        self._index_documents(ids, dense_docs, vectors, metadatas=metadatas)
+        # all tools are encoded together, in batches
+        self._populate(ids, dense_docs, metadatas=metadatas)
 
     def remove_tools(self, tool_names: list[str]) -> None:
         """Remove tools by name.
@@ -87,8 +101,7 @@ class ToolsRAG(HybridRAGBase):
         Args:
             tool_names: List of tool names to remove
         """
-        self.store.delete(tool_names)
-        self._rebuild_bm25()
+        self._remove_documents(tool_names)
 
     def retrieve_hybrid(
         self,
@@ -120,22 +133,12 @@ class ToolsRAG(HybridRAGBase):
 
         q_vec = self._encode(query)
 
-        dense, dense_ids, dense_metas = self._dense_scores(
-            q_vec, k, allowed_servers=allowed_servers
+        # scores and tools are read from one snapshot, without locking
+        snapshot = self.snapshot
+        fused = self._hybrid_scores(
+            query, q_vec, k, alpha, allowed_servers=allowed_servers, snapshot=snapshot
         )
-        metadata_lookup = {
-            tool_id: json.loads(meta["tool_json"])
-            for tool_id, meta in zip(dense_ids, dense_metas)
-        }
-
-        sparse, sparse_metadata = self._retrieve_sparse_scores(
-            query, allowed_servers=allowed_servers
-        )
-        for tool_id, tool_dict in sparse_metadata.items():
-            if tool_id not in metadata_lookup:
-                metadata_lookup[tool_id] = tool_dict
-
-        fused = self._fuse_scores(dense, sparse, alpha, k)
+        metadata_lookup = snapshot.metadata_by_id
 
         server_tools: dict[str, list[dict[str, Any]]] = {}
         for name, score in fused.items():
@@ -143,7 +146,8 @@ class ToolsRAG(HybridRAGBase):
                 continue
             if name not in metadata_lookup:
                 continue
-            tool = metadata_lookup[name]
+            # the parsed tool is shared by all queries, return a copy
+            tool = dict(metadata_lookup[name])
             server = tool.pop("server", None)
             if server:
                 server_tools.setdefault(server, []).append(tool)
@@ -177,13 +181,18 @@ class ToolsRAG(HybridRAGBase):
         """Build text representation: name + desc only (best performance: 99.1% hit rate)."""
         return f"{t['name']} {t['desc']}"
 
+    def _parse_metadata(self, metadata: dict[str, Any]) -> dict[str, Any]:
+        """Parse the tool dictionary stored as JSON in the tool metadata."""
+        return json.loads(metadata["tool_json"])
+
     def _retrieve_sparse_scores(
         self, query: str, allowed_servers: set[str] | None = None
     ) -> tuple[dict[str, float], dict[str, dict]]:
         """Retrieve BM25 scores and tool metadata, with optional server filtering.
 
-        Delegates tokenization, clamping, and normalization to the base class,
-        then applies server filtering and attaches parsed tool metadata.
+        Delegates tokenization, normalization and server filtering to the
+        base class, then attaches tool dictionaries parsed in the corpus
+        snapshot.
 
         Args:
             query: The query string.
@@ -194,21 +203,5 @@ class ToolsRAG(HybridRAGBase):
             to normalized BM25 scores and metadata maps tool names to parsed
             tool dictionaries.
         """
-        base_scores, meta_by_id = self._sparse_scores(query)
-        if not base_scores:
-            return {}, {}
-
-        scores: dict[str, float] = {}
-        metadata: dict[str, dict] = {}
-        for name, score in base_scores.items():
-            raw_meta = meta_by_id.get(name)
-            if raw_meta is None:
-                continue
-            tool_dict = json.loads(raw_meta["tool_json"])
-            if allowed_servers:
-                if tool_dict.get("server", "") not in allowed_servers:
-                    continue
-            scores[name] = score
-            metadata[name] = tool_dict
-
-        return scores, metadata
+        scores, meta_by_id = self._sparse_scores(query, allowed_servers=allowed_servers)
+        return scores, {name: meta_by_id[name] for name in scores}
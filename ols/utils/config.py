@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 import traceback
 from functools import cached_property
 from pathlib import Path
@@ -15,6 +16,9 @@ from ols import constants
 from ols.src.cache.cache_factory import CacheFactory
 from ols.src.quota.quota_limiter_factory import QuotaLimiterFactory
 from ols.src.quota.token_usage_history import TokenUsageHistory
+from ols.src.rag.embedding_batcher import EmbeddingBatcher
+from ols.src.rag.embedding_models import embedding_models
+from ols.src.rag.embeddings import EmbeddingService
 
 # as the index_loader.py is excluded from type checks, it confuses
 # mypy a bit, hence the [attr-defined] bellow
@@ -56,11 +60,11 @@ class AppConfig:
         self.k8s_tools_resolved = False
         self._tools_approval: Optional[config_model.ToolsApprovalConfig] = None
         self._pending_approval_store: Optional["PendingApprovalStoreBase"] = None
-        self._cached_solr_embed_model: Any = None
         self._cached_solr_hybrid_search: SolrHybridSearch | None = None
         self._solr_hybrid_initialized: bool = False
         self._solr_init_attempts: int = 0
-        self._cached_byok_embed_model: Any = None
+        self._embedding_services: dict[str, EmbeddingService] = {}
+        self._embedding_services_lock = threading.Lock()
 
     @property
     def llm_config(self) -> config_model.LLMProviders:
@@ -166,24 +170,37 @@ class AppConfig:
         if ref is None or not ref.indexes:
             return None
         if self._rag_index_loader is None:
-            self._rag_index_loader = IndexLoader(ref)
+            self._rag_index_loader = IndexLoader(ref, self.ols_config.retrieval_cache)
         return self._rag_index_loader
 
-    def _byok_embed_model(self) -> Any:
-        """Load and cache the BYOK HuggingFace embedding model.
+    def _embedding_service(self, model_path: str) -> EmbeddingService:
+        """Return memoized text embedding by the model, encoded in batches.
 
-        Shared by tools_rag and skills_rag so the model weights are loaded once.
+        One service per model is shared by all its consumers, e.g. tools_rag
+        and skills_rag, so a query embedded by one of them is not embedded
+        again by the other, and their concurrent encodes are batched together.
+        The model is loaded now, so that consumers know whether it is usable.
+        Consumers are created from executor threads, the lock ensures only one
+        service is created per model.
         """
-        if self._cached_byok_embed_model is not None:
-            return self._cached_byok_embed_model
-        from llama_index.embeddings.huggingface import (  # pylint: disable=import-outside-toplevel
-            HuggingFaceEmbedding,
-        )
-
-        self._cached_byok_embed_model = HuggingFaceEmbedding(
-            model_name=constants.EMBEDDINGS_MODEL_BYOK_SUBDIR
-        )
-        return self._cached_byok_embed_model
+        service = self._embedding_services.get(model_path)
+        if service is not None:
+            return service
+        with self._embedding_services_lock:
+            service = self._embedding_services.get(model_path)
+            if service is None:
+                batching = self.ols_config.embedding_batching
+                batcher = EmbeddingBatcher(
+                    model_path,
+                    embedding_models.encode_batch_fn(model_path),
+                    max_batch_size=batching.max_batch_size,
+                    max_wait=batching.max_wait_ms / 1000,
+                )
+                service = EmbeddingService(
+                    model_path, batcher.encode, encode_batch_fn=batcher.encode_batch
+                )
+                self._embedding_services[model_path] = service
+        return service
 
     @cached_property
     def tools_rag(self) -> Optional[ToolsRAG]:
@@ -199,7 +216,9 @@ class AppConfig:
         ):
             tool_config = self.config.ols_config.tool_filtering
             try:
-                embed_model = self._byok_embed_model()
+                embedding = self._embedding_service(
+                    constants.EMBEDDINGS_MODEL_BYOK_SUBDIR
+                )
             except Exception:
                 logger.exception(
                     "Failed to load embedding model for tool filtering; "
@@ -207,10 +226,14 @@ class AppConfig:
                 )
                 return None
             return ToolsRAG(
-                encode_fn=embed_model.get_text_embedding,
+                encode_fn=embedding,
+                encode_batch_fn=embedding.embed_batch,
                 alpha=tool_config.alpha,
                 top_k=tool_config.top_k,
                 threshold=tool_config.threshold,
+                backend=tool_config.backend,
+                snapshot_dir=tool_config.snapshot_dir,
+                model_id=embedding.model_id,
             )
         return None
 
@@ -236,7 +259,7 @@ class AppConfig:
             return None
 
         try:
-            embed_model = self._byok_embed_model()
+            embedding = self._embedding_service(constants.EMBEDDINGS_MODEL_BYOK_SUBDIR)
         except Exception:
             logger.exception(
                 "Failed to load embedding model for skills; skills disabled"
@@ -244,29 +267,18 @@ class AppConfig:
             return None
 
         rag = SkillsRAG(
-            encode_fn=embed_model.get_text_embedding,
+            encode_fn=embedding,
+            encode_batch_fn=embedding.embed_batch,
             alpha=skills_config.alpha,
             threshold=skills_config.threshold,
+            backend=skills_config.backend,
+            snapshot_dir=skills_config.snapshot_dir,
+            model_id=embedding.model_id,
         )
         rag.populate_skills(skills)
 
         return rag
 
-    def _solr_hybrid_embed_model(self) -> Any:
-        """Load and cache the HuggingFace embedding model for OKP ``portal-rag`` hybrid search."""
-        if self._cached_solr_embed_model is not None:
-            return self._cached_solr_embed_model
-        from llama_index.embeddings.huggingface import (  # pylint: disable=import-outside-toplevel
-            HuggingFaceEmbedding,
-        )
-
-        for name in ("sentence_transformers", "transformers"):
-            logging.getLogger(name).setLevel(logging.ERROR)
-        self._cached_solr_embed_model = HuggingFaceEmbedding(
-            model_name=constants.SOLR_HYBRID_EMBEDDING_MODEL_ID
-        )
-        return self._cached_solr_embed_model
-
     _SOLR_MAX_INIT_ATTEMPTS = 3
 
     @property
@@ -285,8 +297,12 @@ class AppConfig:
             self._solr_hybrid_initialized = True
             return None
         try:
-            embed_model = self._solr_hybrid_embed_model()
-            encode_fn = embed_model.get_text_embedding
+            for name in ("sentence_transformers", "transformers"):
+                logging.getLogger(name).setLevel(logging.ERROR)
+            # loaded eagerly, a failure to load it is retried on the next access
+            encode_fn = self._embedding_service(
+                constants.SOLR_HYBRID_EMBEDDING_MODEL_ID
+            )
             self._cached_solr_hybrid_search = SolrHybridSearch(settings, encode_fn)
             self._solr_hybrid_initialized = True
             return self._cached_solr_hybrid_search
@@ -308,6 +324,23 @@ class AppConfig:
                 )
             return None
 
+    def _save_embedding_snapshots(self) -> None:
+        """Save embedding snapshots of tools and skills created so far."""
+        for name in ("tools_rag", "skills_rag"):
+            rag = self.__dict__.get(name)
+            if rag is not None:
+                rag.save_embedding_snapshot()
+
+    async def close_clients(self) -> None:
+        """Close clients created from the configuration, on shutdown.
+
+        Embedding snapshots of tools and skills are saved and connection
+        pools are closed.
+        """
+        self._save_embedding_snapshots()
+        if self._cached_solr_hybrid_search is not None:
+            await self._cached_solr_hybrid_search.aclose()
+
     @property
     def proxy_config(self) -> Optional[config_model.ProxyConfig]:
         """Return the proxy configuration."""
@@ -1,6 +1,8 @@
 """Utilities for parsing and validating MCP client headers."""
 
+import asyncio
 import logging
+from functools import partial
 from typing import Optional, TypeAlias, TypedDict
 
 from langchain_core.tools.structured import StructuredTool
@@ -272,7 +274,10 @@ async def _gather_and_populate_tools(
     tools = await gather_mcp_tools(servers_config, allowed_tool_names)
 
     if tools and populate_to_rag and config.tools_rag:
-        config.tools_rag.populate_tools(tools)
+        # embedding blocks until the tools are encoded, keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(
+            None, config.tools_rag.populate_tools, tools
+        )
 
     if deduplicate:
         seen_names: set[str] = set()
@@ -379,8 +384,13 @@ async def get_mcp_tools(
         client_server_names = list(client_headers.keys()) if client_headers else None
 
         # Query with client servers (combined with defaults internally)
-        filtered_result = config.tools_rag.retrieve_hybrid(
-            query, client_servers=client_server_names
+        filtered_result = await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(
+                config.tools_rag.retrieve_hybrid,
+                query,
+                client_servers=client_server_names,
+            ),
         )
     except Exception as e:
         logger.error(
@@ -1,47 +1,311 @@
-"""Shared base class for all Postgres-backed components.
+"""Shared base class and connection pool for all Postgres-backed components.
 
-Provides connection lifecycle (connect, reconnect, health check)
+Provides a thread-safe connection pool shared by all components that use
+the same database, connection lifecycle (connect, reconnect, health check)
 and an auto-reconnect decorator for public methods.
 """
 
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Callable
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, ClassVar, Optional
 
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+from prometheus_client import Gauge, Histogram
 
 from ols.app.models.config import PostgresConfig
 from ols.utils.ssl import libpq_tls_params
 
 logger = logging.getLogger(__name__)
 
+# errors meaning that the connection is broken and has to be replaced
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+# set once a call decorated by `connection` may have committed changes; a
+# connection error raised after that is ambiguous and the call is not retried
+_commit_started: ContextVar[bool] = ContextVar("postgres_commit_started", default=False)
+
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+postgres_pool_wait_seconds = Histogram(
+    "ols_postgres_pool_wait_seconds",
+    "Time spent waiting for a connection from the Postgres connection pool",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+postgres_pool_connections_in_use = Gauge(
+    "ols_postgres_pool_connections_in_use",
+    "Number of Postgres connections checked out from the pool",
+    ["pool"],
+)
+postgres_pool_connections_open = Gauge(
+    "ols_postgres_pool_connections_open",
+    "Number of open Postgres connections owned by the pool",
+    ["pool"],
+)
+
+
+def is_connection_error(e: BaseException) -> bool:
+    """Check if the exception, or the exception it was raised from, means a lost connection."""
+    return isinstance(e, CONNECTION_ERRORS) or isinstance(
+        e.__cause__, CONNECTION_ERRORS
+    )
+
 
 def connection(f: Callable) -> Callable:
     """Ensure the object is connected before calling the wrapped method.
 
-    If the connection is lost, reconnect transparently.
+    No liveness probe is sent to the server before the call. When the
+    wrapped method fails because the connection is lost before any of its
+    changes could have been committed, the object reconnects and the call
+    is retried once. That covers read-only methods and transactions failing
+    before COMMIT, which the broken connection rolled back. A connection
+    error raised by COMMIT, or by a statement changing data in autocommit
+    mode, is not retried: the changes may have been applied and running
+    them again could e.g. append an entry twice.
     """
 
+    @wraps(f)
     def wrapper(connectable: Any, *args: Any, **kwargs: Any) -> Callable:
-        if not connectable.connected():
+        if not connectable.attached():
             connectable.connect()
+        token = _commit_started.set(False)
+        try:
+            return f(connectable, *args, **kwargs)
+        except Exception as e:
+            if not is_connection_error(e) or _commit_started.get():
+                raise
+            logger.warning("Connection to storage lost, reconnecting: %s", e)
+        finally:
+            _commit_started.reset(token)
+        connectable.reconnect()
         return f(connectable, *args, **kwargs)
 
     return wrapper
 
 
+def connect_kwargs(config: PostgresConfig) -> dict[str, Any]:
+    """Construct keyword arguments for psycopg2.connect from configuration."""
+    return {
+        "host": config.host,
+        "port": config.port,
+        "user": config.user,
+        "password": config.password,
+        "dbname": config.dbname,
+        "sslmode": config.ssl_mode,
+        "sslrootcert": config.ca_cert_path,
+        "gssencmode": config.gss_encmode,
+        **libpq_tls_params(config.tls_security_profile),
+    }
+
+
+class PostgresConnectionPool:
+    """Thread-safe pool of connections to one Postgres database.
+
+    Connections are handed out in autocommit mode and each checkout is
+    independent, so callers running on different threads do not block each
+    other as long as there are free connections. When all `max_size`
+    connections are in use, the caller waits up to `timeout` seconds.
+    Connections that have been idle for longer than `health_check_interval`
+    seconds are checked by `SELECT 1` before being handed out and broken
+    connections are replaced by new ones.
+
+    Use `PostgresConnectionPool.shared` to obtain the pool shared by all
+    components configured with the same connection parameters.
+    """
+
+    _shared_pools: ClassVar[dict[tuple, "PostgresConnectionPool"]] = {}
+    _shared_pools_lock = threading.Lock()
+
+    def __init__(self, config: PostgresConfig) -> None:
+        """Initialize the pool and open `pool_min_size` connections."""
+        self.min_size = config.pool_min_size
+        self.max_size = config.pool_max_size
+        self.timeout = config.pool_timeout
+        self.health_check_interval = config.pool_health_check_interval
+        self.name = f"{config.host}:{config.port}/{config.dbname}"
+        self.closed = False
+        self._connect_kwargs = connect_kwargs(config)
+        # idle connections with the time they were returned to the pool
+        self._idle: deque[tuple[Any, float]] = deque()
+        # number of connections owned by the pool, both idle and checked out
+        self._size = 0
+        self._condition = threading.Condition()
+
+        for _ in range(self.min_size):
+            self._idle.append((self._new_connection(), time.monotonic()))
+            self._size += 1
+        postgres_pool_connections_open.labels(self.name).set(self._size)
+
+    @classmethod
+    def shared(cls, config: PostgresConfig) -> "PostgresConnectionPool":
+        """Return the pool shared by all components with the same connection parameters."""
+        key = tuple(sorted((k, str(v)) for k, v in connect_kwargs(config).items()))
+        with cls._shared_pools_lock:
+            pool = cls._shared_pools.get(key)
+            if pool is None or pool.closed:
+                logger.info("Creating Postgres connection pool")
+                pool = cls(config)
+                cls._shared_pools[key] = pool
+            return pool
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close all shared pools."""
+        with cls._shared_pools_lock:
+            for pool in cls._shared_pools.values():
+                pool.close()
+            cls._shared_pools.clear()
+
+    def _new_connection(self) -> Any:
+        """Open a new connection in autocommit mode."""
+        conn = psycopg2.connect(**self._connect_kwargs)
+        conn.autocommit = True
+        return conn
+
+    def _is_healthy(self, conn: Any, idle_since: float) -> bool:
+        """Check the connection if it has been idle for too long."""
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except CONNECTION_ERRORS as e:
+            logger.warning("Dropping broken pooled Postgres connection: %s", e)
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        """Close the connection ignoring any errors."""
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _release_slot(self) -> None:
+        """Forget one connection owned by the pool and wake up a waiter."""
+        with self._condition:
+            self._size -= 1
+            postgres_pool_connections_open.labels(self.name).set(self._size)
+            self._condition.notify()
+
+    def getconn(self) -> Any:
+        """Check out a connection, waiting for a free one when the pool is exhausted."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        conn, idle_since = None, 0.0
+        with self._condition:
+            while True:
+                if self.closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise psycopg2.pool.PoolError(
+                        "timed out waiting for a free Postgres connection"
+                    )
+                self._condition.wait(remaining)
+        postgres_pool_wait_seconds.labels(self.name).observe(time.monotonic() - start)
+
+        try:
+            if conn is not None and not self._is_healthy(conn, idle_since):
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._new_connection()
+        except Exception:
+            self._release_slot()
+            raise
+        postgres_pool_connections_open.labels(self.name).set(self._size)
+        postgres_pool_connections_in_use.labels(self.name).inc()
+        return conn
+
+    def putconn(self, conn: Any, discard: bool = False) -> None:
+        """Return the connection to the pool, closing it when it is not reusable."""
+        postgres_pool_connections_in_use.labels(self.name).dec()
+        if not discard:
+            try:
+                # finish any transaction left open so the next user starts clean
+                status = conn.get_transaction_status()
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    discard = True
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if not discard:
+                    conn.autocommit = True
+            except psycopg2.Error:
+                discard = True
+
+        if discard or self.closed:
+            self._close_quietly(conn)
+            self._release_slot()
+            return
+        with self._condition:
+            self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Check out a connection for the duration of the context.
+
+        The connection is dropped instead of being returned to the pool when
+        the context is left because of a connection-level error.
+        """
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+        except Exception as e:
+            discard = is_connection_error(e)
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def discard_idle(self) -> None:
+        """Close all idle connections, new ones are opened on demand."""
+        with self._condition:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._close_quietly(conn)
+                self._size -= 1
+            postgres_pool_connections_open.labels(self.name).set(self._size)
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Close all idle connections; checked out ones are closed when returned."""
+        with self._condition:
+            self.closed = True
+            self.discard_idle()
+
+
 class PostgresBase(ABC):
     """Base class for components that store data in PostgreSQL.
 
     Subclasses declare their DDL via the ``_ddl_statements`` property.
-    The base class handles connecting, executing DDL, committing, and
-    health-checking.
+    The base class handles attaching to the shared connection pool,
+    executing DDL, committing, and health-checking. Subclasses run their
+    statements via ``_cursor`` (autocommit) or ``_transaction`` (single
+    transaction per checkout).
     """
 
     def __init__(self, config: PostgresConfig) -> None:
-        """Initialize Postgres connection and run DDL."""
+        """Initialize Postgres connection pool and run DDL."""
         self.connection_config = config
-        self.connection: Any = None
+        self.pool: Optional[PostgresConnectionPool] = None
         self.connect()
 
     @property
@@ -54,47 +318,90 @@ class PostgresBase(ABC):
     """
 
     def connect(self) -> None:
-        """Establish connection and initialize schema."""
+        """Attach to the shared connection pool and initialize schema."""
         logger.info("Establishing connection to Postgres")
-        self.connection = None
-        config = self.connection_config
-        connect_kwargs: dict[str, Any] = {
-            "host": config.host,
-            "port": config.port,
-            "user": config.user,
-            "password": config.password,
-            "dbname": config.dbname,
-            "sslmode": config.ssl_mode,
-            "sslrootcert": config.ca_cert_path,
-            "gssencmode": config.gss_encmode,
-            **libpq_tls_params(config.tls_security_profile),
-        }
-        self.connection = psycopg2.connect(**connect_kwargs)
+        self.pool = None
+        pool = PostgresConnectionPool.shared(self.connection_config)
+        conn = pool.getconn()
         try:
-            cursor = self.connection.cursor()
+            conn.autocommit = False
+            cursor = conn.cursor()
             cursor.execute("SET LOCAL lock_timeout = '60s'")
             logger.info("Acquiring advisory lock for schema initialization")
             cursor.execute(self.INIT_ADVISORY_LOCK)
             for statement in self._ddl_statements:
                 cursor.execute(statement)
             cursor.close()
-            self.connection.commit()
+            conn.commit()
         except Exception as e:
-            self.connection.close()
+            pool.putconn(conn, discard=True)
             logger.exception("Error initializing Postgres schema:\n%s", e)
             raise
-        self.connection.autocommit = True
+        pool.putconn(conn)
+        self.pool = pool
+
+    def reconnect(self) -> None:
+        """Drop idle pooled connections and connect again.
+
+        Called after a connection error; the other idle connections have
+        most likely been broken by the same event (e.g. database restart).
+        """
+        if self.pool is not None:
+            self.pool.discard_idle()
+        self.connect()
+
+    def attached(self) -> bool:
+        """Check if the component is attached to an open connection pool, without I/O."""
+        return self.pool is not None and not self.pool.closed
 
     def connected(self) -> bool:
-        """Check if the connection to Postgres is alive."""
-        if self.connection is None:
+        """Check if the connection to Postgres is alive.
+
+        This sends a query to the server, so it is meant for readiness checks
+        only; regular operations rely on the `connection` decorator instead.
+        """
+        if not self.attached():
             logger.warning("Not connected, need to reconnect later")
             return False
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.connection() as conn, conn.cursor() as cursor:
                 cursor.execute("SELECT 1")
             logger.info("Connection to storage is ok")
             return True
-        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+        except (*CONNECTION_ERRORS, psycopg2.pool.PoolError) as e:
             logger.error("Disconnected from storage: %s", e)
             return False
+
+    @contextmanager
+    def _cursor(self, write: bool = False) -> Iterator[Any]:
+        """Provide a cursor on a pooled connection in autocommit mode.
+
+        Args:
+            write: The statements change data. Each of them is committed on
+                its own, so a connection error raised by them is not retried.
+        """
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            if write:
+                _commit_started.set(True)
+            yield cursor
+
+    @contextmanager
+    def _transaction(self) -> Iterator[Any]:
+        """Provide a cursor running all statements in one transaction.
+
+        The transaction is committed when the context is left normally and
+        rolled back when an exception is raised.
+        """
+        with self.pool.connection() as conn:
+            conn.autocommit = False
+            try:
+                with conn.cursor() as cursor:
+                    yield cursor
+                _commit_started.set(True)
+                conn.commit()
+            except BaseException:
+                try:
+                    conn.rollback()
+                except psycopg2.Error as e:
+                    logger.warning("Rollback failed: %s", e)
+                raise
@@ -1,23 +1,43 @@
 """Utility to handle tokens."""
 
+import hashlib
 import logging
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 from enum import Enum
+from itertools import accumulate
 from math import ceil
+from typing import Optional
 
 from langchain_core.messages import BaseMessage
 from llama_index.core.schema import NodeWithScore
+from prometheus_client import Counter
 from tiktoken import get_encoding
 
-from ols.app.models.models import RagChunk
+from ols.app.models.models import CacheEntry, RagChunk
 from ols.constants import (
     DEFAULT_TOKENIZER_MODEL,
     MINIMUM_CONTEXT_TOKEN_LIMIT,
+    RAG_NODE_TOKEN_COUNT_KEY,
     RAG_SIMILARITY_CUTOFF,
     TOKEN_BUFFER_WEIGHT,
+    TOKEN_COUNT_CACHE_MAX_ENTRIES,
 )
 
 logger = logging.getLogger(__name__)
 
+# The metrics live here and not in ols.app.metrics, because that module
+# requires fully loaded configuration and it would cause circular imports.
+token_count_cache_hits_total = Counter(
+    "ols_token_count_cache_hits_total",
+    "Token counts served from the token count cache",
+)
+token_count_cache_misses_total = Counter(
+    "ols_token_count_cache_misses_total",
+    "Token counts computed by the tokenizer",
+)
+
 
 def format_retrieved_chunk(rag_content: str) -> str:
     """Format a RAG document chunk with the standard prefix."""
@@ -40,6 +60,56 @@ class PromptTooLongError(Exception):
     """Prompt is too long."""
 
 
+class TokenCountCache:
+    """Bounded LRU cache of token counts.
+
+    Counts are keyed by the encoding name and a hash of the text, so the texts
+    themselves are not kept in memory. Raw counts are stored, the buffer
+    weight is applied by the caller.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_COUNT_CACHE_MAX_ENTRIES) -> None:
+        """Initialize empty cache with the given capacity."""
+        self.max_entries = max_entries
+        self._counts: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(encoding_name: str, text: str) -> tuple[str, bytes]:
+        """Construct cache key from the encoding name and the text."""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        return encoding_name, digest
+
+    def get(self, key: tuple[str, bytes]) -> Optional[int]:
+        """Return the cached count and mark it as recently used."""
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+            return count
+
+    def put(self, key: tuple[str, bytes], count: int) -> None:
+        """Store the count, dropping the least recently used one when full."""
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached counts."""
+        with self._lock:
+            self._counts.clear()
+
+    def __len__(self) -> int:
+        """Return number of cached counts."""
+        return len(self._counts)
+
+
+# shared by all TokenHandler instances, the key contains the encoding name
+token_count_cache = TokenCountCache()
+
+
 class TokenHandler:
     """This class handles tokens.
 
@@ -53,6 +123,7 @@ class TokenHandler:
         # Note: We need an approximate tokens count.
         # For different models, exact tokens may vary due to different tokenizer.
         # Also the provider may add model specific tags.
+        self._encoding_name = encoding_name
         self._encoder = get_encoding(encoding_name)
 
     def text_to_tokens(self, text: str) -> list[int]:
@@ -78,12 +149,106 @@ class TokenHandler:
         return self._encoder.decode(tokens)
 
     @staticmethod
-    def _get_token_count(tokens: list[int]) -> int:
-        """Get approximate tokens count."""
+    def _buffered_count(count: int) -> int:
+        """Get approximate tokens count from the exact one."""
         # Note: As we get approximate tokens count, we want to have enough
         # buffer so that there is less chance of under-estimation.
         # We increase by certain percentage to nearest integer (ceil).
-        return ceil(len(tokens) * TOKEN_BUFFER_WEIGHT)
+        return ceil(count * TOKEN_BUFFER_WEIGHT)
+
+    @staticmethod
+    def _get_token_count(tokens: list[int]) -> int:
+        """Get approximate tokens count."""
+        return TokenHandler._buffered_count(len(tokens))
+
+    def count_tokens(self, text: str) -> int:
+        """Get approximate tokens count of the text.
+
+        The same texts (system prompt, tool definitions, history messages) are
+        counted repeatedly, so exact counts are memoized in the process-wide
+        `token_count_cache` and only texts not seen before are tokenized.
+
+        Args:
+            text: context text, ex: "This is my doc"
+
+        Returns:
+            Approximate tokens count, ex: 5
+        """
+        return TokenHandler._buffered_count(self._exact_count(text))
+
+    def _exact_count(self, text: str) -> int:
+        """Get exact tokens count of the text, memoized by the text hash."""
+        key = TokenCountCache.key(self._encoding_name, text)
+        count = token_count_cache.get(key)
+        if count is None:
+            token_count_cache_misses_total.inc()
+            count = len(self.text_to_tokens(text))
+            token_count_cache.put(key, count)
+        else:
+            token_count_cache_hits_total.inc()
+        return count
+
+    def exact_token_counts(self, texts: list[str]) -> list[int]:
+        """Get exact tokens counts of the texts, tokenized in parallel.
+
+        Args:
+            texts: context texts, ex: ["This is my doc", "This is other doc"]
+
+        Returns:
+            List of exact tokens counts, ex: [4, 5]
+        """
+        return [len(tokens) for tokens in self._encoder.encode_batch(texts)]
+
+    def _chunk_token_count(self, node: NodeWithScore, node_text: str) -> int:
+        """Get exact tokens count of the formatted node text.
+
+        The count stored in the node metadata when the index was built or its
+        docstore was converted to the memory-mapped copy is used when present,
+        and it is remembered so that charging the chunk does not tokenize it.
+        Other nodes are counted when they are retrieved for the first time,
+        the count is memoized by the text hash.
+        """
+        count = node.metadata.get(RAG_NODE_TOKEN_COUNT_KEY)
+        if count is None or self._encoding_name != DEFAULT_TOKENIZER_MODEL:
+            return self._exact_count(node_text)
+        key = TokenCountCache.key(self._encoding_name, node_text)
+        token_count_cache.put(key, count)
+        return count
+
+    @staticmethod
+    def _history_message_text(message: BaseMessage) -> str:
+        """Format the message the way it is counted in conversation history."""
+        content = message.content
+        # messages are stripped in history, see CacheEntry.cache_entries_to_history
+        if isinstance(content, str):
+            content = content.strip()
+        return f"{message.type}: {content}"
+
+    def count_entry_tokens(self, entry: CacheEntry) -> tuple[int, int]:
+        """Get approximate tokens counts of the cache entry query and response.
+
+        Exact counts are stored in the entry when it is written to the cache.
+        Entries written by older versions are counted here and the counts are
+        kept in the entry, so they get persisted once the history is rewritten.
+
+        Args:
+            entry: Conversation cache entry.
+
+        Returns:
+            Approximate tokens counts of the query and of the response.
+        """
+        if entry.query_tokens is None:
+            entry.query_tokens = self._exact_count(
+                TokenHandler._history_message_text(entry.query)
+            )
+        if entry.response_tokens is None:
+            entry.response_tokens = self._exact_count(
+                TokenHandler._history_message_text(entry.response)
+            )
+        return (
+            TokenHandler._buffered_count(entry.query_tokens),
+            TokenHandler._buffered_count(entry.response_tokens),
+        )
 
     def truncate_rag_context(
         self, retrieved_nodes: list[NodeWithScore], max_tokens: int = 500
@@ -122,8 +287,8 @@ class TokenHandler:
                 break
 
             node_text = format_retrieved_chunk(node.get_text())
-            tokens = self.text_to_tokens(node_text)
-            tokens_count = TokenHandler._get_token_count(tokens)
+            exact_count = self._chunk_token_count(node, node_text)
+            tokens_count = TokenHandler._buffered_count(exact_count)
             tokens_count += 1  # for new-line char
             logger.debug("RAG content tokens count: %d", tokens_count)
 
@@ -158,7 +323,10 @@ class TokenHandler:
                 max_tokens - available_tokens,
             )
 
-            node_text = self.tokens_to_text(tokens[:available_tokens])
+            if exact_count > available_tokens:
+                # only the node that does not fit is tokenized to be cut
+                tokens = self.text_to_tokens(node_text)
+                node_text = self.tokens_to_text(tokens[:available_tokens])
             rag_chunks.append(
                 RagChunk(
                     text=node_text,
@@ -175,26 +343,36 @@ class TokenHandler:
         return rag_chunks
 
     def limit_conversation_history(
-        self, history: list[BaseMessage], limit: int = 0
+        self,
+        history: list[BaseMessage],
+        limit: int = 0,
+        token_counts: Optional[list[int]] = None,
     ) -> tuple[list[BaseMessage], bool]:
-        """Limit conversation history to specified number of tokens."""
-        total_length = 0
-        index = 0
+        """Limit conversation history to specified number of tokens.
 
-        for message in reversed(history):
-            message_length = TokenHandler._get_token_count(
-                self.text_to_tokens(f"{message.type}: {message.content}")
-            )
-            total_length += message_length + 1  # 1 for new-line char
+        Args:
+            history: Conversation history ordered from the oldest message.
+            limit: Maximum number of tokens the kept history can take.
+            token_counts: Approximate tokens counts of the history messages,
+                as returned by `count_entry_tokens`; counted when not given.
 
-            # if total length of already checked messages is higher than limit
-            # then skip all remaining messages (we need to skip from top)
-            if total_length > limit:
-                logger.debug(
-                    "History truncated, it exceeds available %d tokens.", limit
-                )
-                return history[len(history) - index :], True
-            index += 1
+        Returns:
+            The newest messages that fit into the limit and a flag whether
+            older messages were skipped.
+        """
+        if token_counts is None:
+            token_counts = [
+                self.count_tokens(TokenHandler._history_message_text(message))
+                for message in history
+            ]
+        # total lengths of the newest messages, 1 for new-line char
+        total_lengths = list(accumulate(count + 1 for count in reversed(token_counts)))
+        # if total length of already checked messages is higher than limit
+        # then skip all remaining messages (we need to skip from top)
+        kept = bisect_right(total_lengths, limit)
+        if kept < len(history):
+            logger.debug("History truncated, it exceeds available %d tokens.", limit)
+            return history[len(history) - kept :], True
 
         return history, False
 
@@ -210,7 +388,7 @@ class TokenHandler:
         Raises:
             PromptTooLongError: If the prompt alone exceeds the allowed budget.
         """
-        prompt_tokens = TokenHandler._get_token_count(self.text_to_tokens(prompt))
+        prompt_tokens = self.count_tokens(prompt)
         context_limit = (
             context_window_size - max_tokens_for_response - max_tokens_for_tools
         )
@@ -265,7 +443,7 @@ class TokenBudgetTracker:
 
     def count_tokens(self, text: str) -> int:
         """Count tokens in text using the underlying tokenizer."""
-        return TokenHandler._get_token_count(self._token_handler.text_to_tokens(text))
+        return self._token_handler.count_tokens(text)
 
     @property
     def history_budget(self) -> int:
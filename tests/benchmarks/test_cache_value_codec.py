@@ -0,0 +1,112 @@
+"""Benchmarks for encoding and decoding conversation cache values."""
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols.app.models.models import CacheEntry, MessageDecoder, MessageEncoder
+from ols.src.cache.value_codec import decode_value, encode_value
+
+POD_MANIFEST = json.dumps(
+    {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {
+            "name": "web-1",
+            "namespace": "prod",
+            "labels": {"app": "web", "tier": "frontend"},
+        },
+        "status": {
+            "phase": "Running",
+            "containerStatuses": [
+                {
+                    "name": "web",
+                    "restartCount": 17,
+                    "state": {
+                        "waiting": {
+                            "reason": "CrashLoopBackOff",
+                            "message": "back-off 5m0s restarting failed container",
+                        }
+                    },
+                }
+            ],
+        },
+    },
+    indent=2,
+)
+
+
+def conversation(turns, with_tools=True):
+    """Construct multi-turn conversation, optionally with tool calls and results."""
+    entries = []
+    for i in range(turns):
+        tool_calls = []
+        tool_results = []
+        if with_tools:
+            tool_calls = [
+                {
+                    "name": "pods_get",
+                    "args": {"name": f"web-{i}", "namespace": "prod"},
+                    "id": f"call_{i}",
+                    "type": "tool_call",
+                }
+            ]
+            tool_results = [
+                {
+                    "id": f"call_{i}",
+                    "status": "success",
+                    "content": POD_MANIFEST * 3,
+                    "type": "tool_result",
+                    "round": 1,
+                }
+            ]
+        entries.append(
+            CacheEntry(
+                query=HumanMessage(f"Why is the pod web-{i} in CrashLoopBackOff?"),
+                response=AIMessage(
+                    "The pod is restarting because its liveness probe fails. " * 12
+                ),
+                tool_calls=tool_calls,
+                tool_results=tool_results,
+            )
+        )
+    return entries
+
+
+def json_encode(value):
+    """Encode the value the way cache values were stored before the codec."""
+    return json.dumps(value, cls=MessageEncoder).encode("utf-8")
+
+
+def json_decode(data):
+    """Decode the value the way cache values were read before the codec."""
+    return json.loads(str(data, "utf-8"), cls=MessageDecoder)
+
+
+CODECS = {
+    "json": (json_encode, json_decode),
+    "codec": (encode_value, decode_value),
+}
+
+
+@pytest.mark.parametrize("codec", CODECS.keys())
+@pytest.mark.parametrize("with_tools", [True, False])
+def test_encode_conversation(benchmark, codec, with_tools):
+    """Benchmark encoding of 20 turns long conversation, bytes stored are recorded."""
+    encode, _ = CODECS[codec]
+    entries = conversation(20, with_tools)
+
+    values = benchmark(lambda: [encode(entry.to_dict()) for entry in entries])
+    benchmark.extra_info["bytes_stored"] = sum(len(value) for value in values)
+
+
+@pytest.mark.parametrize("codec", CODECS.keys())
+@pytest.mark.parametrize("with_tools", [True, False])
+def test_decode_conversation(benchmark, codec, with_tools):
+    """Benchmark decoding of 20 turns long conversation read from the cache."""
+    encode, decode = CODECS[codec]
+    values = [encode(entry.to_dict()) for entry in conversation(20, with_tools)]
+    benchmark.extra_info["bytes_stored"] = sum(len(value) for value in values)
+
+    benchmark(lambda: [CacheEntry.from_dict(decode(value)) for value in values])
@@ -0,0 +1,64 @@
+"""Benchmarks for hybrid retrieval of tools with Qdrant and NumPy backends."""
+
+import functools
+import random
+
+import pytest
+
+from ols.constants import HybridRAGBackend
+from ols.src.rag.hybrid_rag import HybridRAGBase
+
+DIMENSION = 768
+SERVERS = [f"server-{i}" for i in range(8)]
+# words common to many tool descriptions
+COMMON_WORDS = (
+    "list get create delete update pods nodes namespaces deployments services "
+    "routes secrets configmaps logs events metrics alerts operators clusters "
+    "images builds jobs volumes quotas roles bindings"
+).split()
+# words specific to few tools
+RARE_WORDS = [f"term{i}" for i in range(2_000)]
+QUERY = "list pods term7 term42"
+
+
+def _vector(rng: random.Random) -> list[float]:
+    """Random embedding vector."""
+    return [rng.gauss(0.0, 1.0) for _ in range(DIMENSION)]
+
+
+@functools.cache
+def populated_rag(backend: HybridRAGBackend, tools: int) -> HybridRAGBase:
+    """Hybrid RAG indexing the number of tools spread over several servers."""
+    rng = random.Random(tools)  # noqa: S311
+    rag = HybridRAGBase(
+        collection="tools", encode_fn=lambda _: [], top_k=10, backend=backend
+    )
+    ids = [f"tool-{i}" for i in range(tools)]
+    docs = [
+        " ".join(rng.choices(COMMON_WORDS, k=3) + rng.choices(RARE_WORDS, k=9))
+        for _ in ids
+    ]
+    rag._index_documents(
+        ids,
+        docs,
+        [_vector(rng) for _ in ids],
+        metadatas=[{"server": SERVERS[i % len(SERVERS)]} for i in range(tools)],
+    )
+    return rag
+
+
+@pytest.mark.parametrize("tools", [100, 1_000, 10_000])
+@pytest.mark.parametrize("backend", list(HybridRAGBackend))
+@pytest.mark.parametrize("allowed_servers", [None, set(SERVERS[:3])])
+def test_hybrid_scores(benchmark, backend, tools, allowed_servers):
+    """Benchmark fused dense and sparse top 10 of tools for one query."""
+    rag = populated_rag(backend, tools)
+    query_vec = _vector(random.Random(0))  # noqa: S311
+
+    def retrieve():
+        return rag._hybrid_scores(
+            QUERY, query_vec, 10, 0.8, allowed_servers=allowed_servers
+        )
+
+    fused = benchmark(retrieve)
+    assert len(fused) == 10
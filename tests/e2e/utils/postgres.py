@@ -35,7 +35,7 @@ def retrieve_connection():
 
 def read_conversation_history_count(postgres_connection):
     """Read number of items in conversation history."""
-    query = "SELECT count(*) FROM cache;"
+    query = "SELECT count(*) FROM cache_entries;"
     with postgres_connection.cursor() as cursor:
         cursor.execute(query)
         return cursor.fetchone()
@@ -43,7 +43,13 @@ def read_conversation_history_count(postgres_connection):
 
 def read_conversation_history(postgres_connection, conversation_id):
     """Read number of items in conversation history."""
-    query = "SELECT value, updated_at FROM cache WHERE conversation_id = %s"
+    # aggregate per-entry rows back into one JSON array ordered by sequence number
+    query = """
+        SELECT json_agg(convert_from(value, 'utf-8')::json ORDER BY seq)::text,
+               MAX(created_at)
+          FROM cache_entries
+         WHERE conversation_id = %s
+        """
     with postgres_connection.cursor() as cursor:
         cursor.execute(query, (conversation_id,))
         return cursor.fetchone()
@@ -3,9 +3,41 @@
 import pytest
 
 from ols import config
+from ols.src.auth.k8s import auth_decision_cache
+from ols.src.rag.embedding_models import embedding_models
+from ols.src.rag.embeddings import embedding_cache
+from ols.utils.postgres import PostgresConnectionPool
 
 
 @pytest.fixture(scope="function", autouse=True)
 def ensure_empty_config_for_each_integration_test_by_default():
     """Set up fixture for all integration tests."""
     config.reload_empty()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def close_shared_postgres_pools():
+    """Do not share pooled (mocked) Postgres connections between integration tests."""
+    yield
+    PostgresConnectionPool.close_all()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_auth_decision_cache():
+    """Do not reuse K8S authentication decisions between integration tests."""
+    yield
+    auth_decision_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_embedding_cache():
+    """Do not reuse (mocked) embeddings between integration tests."""
+    yield
+    embedding_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_embedding_models():
+    """Do not share (mocked) embedding models between integration tests."""
+    yield
+    embedding_models.clear()
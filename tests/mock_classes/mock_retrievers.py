@@ -34,6 +34,11 @@ class MockRetriever:
             )
         ]
 
+    @staticmethod
+    async def aretrieve(*args):
+        """Return summary for given query asynchronously."""
+        return MockRetriever.retrieve(*args)
+
 
 class MockVectorStore(VectorStore):
     """Mock for VectorStore."""
@@ -28,6 +28,7 @@ from ols.app.models.models import (  # noqa:E402
 from ols.utils import suid  # noqa:E402
 from ols.utils.errors_parsing import DEFAULT_ERROR_MESSAGE  # noqa:E402
 from ols.utils.redactor import Redactor, RegexFilter  # noqa:E402
+from ols.utils.token_handler import TokenHandler  # noqa:E402
 
 
 @pytest.fixture(scope="function")
@@ -177,6 +178,7 @@ def test_store_conversation_history():
         )
 
         expected_history = CacheEntry(query=HumanMessage(query))
+        TokenHandler().count_entry_tokens(expected_history)
         insert_or_append.assert_called_with(
             constants.DEFAULT_USER_UID,
             conversation_id,
@@ -203,6 +205,7 @@ def test_store_conversation_history_some_response():
     expected_history = CacheEntry(
         query=HumanMessage(query), response=AIMessage(response)
     )
+    TokenHandler().count_entry_tokens(expected_history)
     insert_or_append.assert_called_with(
         user_id, conversation_id, expected_history, skip_user_id_check
     )
@@ -277,6 +280,7 @@ def test_store_conversation_history_with_tool_data():
             tool_calls=tool_calls,
             tool_results=tool_results,
         )
+        TokenHandler().count_entry_tokens(expected_history)
         insert_or_append.assert_called_with(
             constants.DEFAULT_USER_UID,
             conversation_id,
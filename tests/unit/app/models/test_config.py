@@ -16,6 +16,7 @@ from ols.app.models.config import (
     Config,
     ConversationCacheConfig,
     DevConfig,
+    EmbeddingBatchingConfig,
     InMemoryCacheConfig,
     LLMProviders,
     LoggingConfig,
@@ -33,6 +34,7 @@ from ols.app.models.config import (
     ReasoningSummary,
     ReferenceContent,
     ReferenceContentIndex,
+    RetrievalCacheConfig,
     SkillsConfig,
     SolrHybridSettings,
     TLSConfig,
@@ -2041,6 +2043,47 @@ def test_postgres_config_wrong_port():
         )
 
 
+def test_postgres_config_pool_default_values():
+    """Test the default connection pool settings in PostgresConfig model."""
+    postgres_config = PostgresConfig()
+    assert postgres_config.pool_min_size == constants.POSTGRES_POOL_MIN_SIZE
+    assert postgres_config.pool_max_size == constants.POSTGRES_POOL_MAX_SIZE
+    assert postgres_config.pool_timeout == constants.POSTGRES_POOL_TIMEOUT
+    assert (
+        postgres_config.pool_health_check_interval
+        == constants.POSTGRES_POOL_HEALTH_CHECK_INTERVAL
+    )
+
+
+def test_postgres_config_wrong_pool_values():
+    """Test the PostgresConfig model when wrong pool settings are used."""
+    with pytest.raises(
+        ValidationError,
+        match="The pool_min_size needs to be between 0 and pool_max_size",
+    ):
+        PostgresConfig(pool_min_size=5, pool_max_size=2)
+
+    with pytest.raises(
+        ValidationError, match="The pool_timeout needs to be a positive number"
+    ):
+        PostgresConfig(pool_timeout=0)
+
+    with pytest.raises(
+        ValidationError,
+        match="The pool_health_check_interval needs to be a non-negative number",
+    ):
+        PostgresConfig(pool_health_check_interval=-1)
+
+
+def test_postgres_config_wrong_local_cache_size():
+    """Test the PostgresConfig model when negative local cache size is used."""
+    with pytest.raises(
+        ValidationError,
+        match="The local_cache_max_conversations needs to be a non-negative number",
+    ):
+        PostgresConfig(local_cache_max_conversations=-1)
+
+
 def test_postgres_config_equality():
     """Test the PostgresConfig equality check."""
     postgres_config_1 = PostgresConfig()
@@ -2238,6 +2281,8 @@ def test_ols_config(tmpdir):
     )
     assert ols_config.offload_storage_path == constants.DEFAULT_OFFLOAD_STORAGE_PATH
     assert ols_config.solr_hybrid is None
+    assert ols_config.embedding_batching == EmbeddingBatchingConfig()
+    assert ols_config.retrieval_cache is None
 
 
 def test_ols_config_with_custom_offload_storage_path():
@@ -2253,6 +2298,58 @@ def test_ols_config_with_custom_offload_storage_path():
     assert ols_config.offload_storage_path == "/custom/offload/path"
 
 
+def test_ols_config_with_embedding_batching():
+    """Test OLSConfig embedding_batching override."""
+    ols_config = OLSConfig(
+        {
+            "default_provider": "test_default_provider",
+            "default_model": "test_default_model",
+            "conversation_cache": {"type": "memory", "memory": {"max_entries": 100}},
+            "embedding_batching": {"max_batch_size": 8},
+        }
+    )
+    assert ols_config.embedding_batching.max_batch_size == 8
+    assert (
+        ols_config.embedding_batching.max_wait_ms
+        == constants.EMBEDDING_BATCH_MAX_WAIT_MS
+    )
+
+
+def test_embedding_batching_config_validation():
+    """Test EmbeddingBatchingConfig field validation boundaries."""
+    with pytest.raises(ValidationError):
+        EmbeddingBatchingConfig(max_batch_size=0)
+    with pytest.raises(ValidationError):
+        EmbeddingBatchingConfig(max_wait_ms=-1)
+
+
+def test_ols_config_with_retrieval_cache():
+    """Test OLSConfig retrieval_cache enables the cache."""
+    ols_config = OLSConfig(
+        {
+            "default_provider": "test_default_provider",
+            "default_model": "test_default_model",
+            "conversation_cache": {"type": "memory", "memory": {"max_entries": 100}},
+            "retrieval_cache": {"similarity_threshold": 0.9},
+        }
+    )
+    assert ols_config.retrieval_cache.similarity_threshold == 0.9
+    assert (
+        ols_config.retrieval_cache.ttl_seconds
+        == constants.RAG_RETRIEVAL_CACHE_TTL_SECONDS
+    )
+
+
+def test_retrieval_cache_config_validation():
+    """Test RetrievalCacheConfig field validation boundaries."""
+    with pytest.raises(ValidationError):
+        RetrievalCacheConfig(similarity_threshold=1.5)
+    with pytest.raises(ValidationError):
+        RetrievalCacheConfig(ttl_seconds=0)
+    with pytest.raises(ValidationError):
+        RetrievalCacheConfig(max_entries=0)
+
+
 def test_ols_config_solr_hybrid_parses_from_yaml_dict():
     """Parse optional ``solr_hybrid`` under ``ols_config`` into ``SolrHybridSettings``."""
     base = {
@@ -2266,12 +2363,16 @@ def test_ols_config_solr_hybrid_parses_from_yaml_dict():
             "solr_hybrid": {
                 "solr_http_base": "https://solr.example.com:8983",
                 "max_results": 7,
+                "http_max_connections": 4,
             },
         }
     )
     assert ols_config.solr_hybrid is not None
     assert ols_config.solr_hybrid.solr_http_base == "https://solr.example.com:8983"
     assert ols_config.solr_hybrid.max_results == 7
+    assert ols_config.solr_hybrid.http_max_connections == 4
+    assert ols_config.solr_hybrid.http_max_keepalive_connections == 10
+    assert ols_config.solr_hybrid.http2
 
 
 def test_config_reserves_tool_budget_for_solr_hybrid_without_mcp():
@@ -3158,6 +3259,13 @@ def test_reference_content_constructor():
     assert reference_content.indexes[0] == ReferenceContentIndex(
         {"product_docs_index_id": "id", "product_docs_index_path": "/path/1/"}
     )
+    assert reference_content.memory_mapped is False
+
+
+def test_reference_content_memory_mapped():
+    """Test the ReferenceContent memory-mapped load mode."""
+    reference_content = ReferenceContent({"indexes": [], "memory_mapped": True})
+    assert reference_content.memory_mapped is True
 
 
 def test_reference_content_equality():
@@ -3637,6 +3745,38 @@ def test_authentication_config_wrong_module():
         cfg.validate_yaml()
 
 
+def test_authentication_config_cache_ttl():
+    """Test method to validate TTLs of the authentication decisions cache."""
+    cfg = AuthenticationConfig(module=constants.DEFAULT_AUTHENTICATION_MODULE)
+    assert cfg.cache_ttl == constants.K8S_AUTH_CACHE_TTL
+    assert cfg.negative_cache_ttl == constants.K8S_AUTH_NEGATIVE_CACHE_TTL
+
+    # zero disables the cache
+    AuthenticationConfig(
+        module=constants.DEFAULT_AUTHENTICATION_MODULE,
+        cache_ttl=0,
+        negative_cache_ttl=0,
+    ).validate_yaml()
+
+    cfg = AuthenticationConfig(
+        module=constants.DEFAULT_AUTHENTICATION_MODULE, cache_ttl=-1
+    )
+    with pytest.raises(
+        InvalidConfigurationError,
+        match="The cache_ttl needs to be a non-negative number",
+    ):
+        cfg.validate_yaml()
+
+    cfg = AuthenticationConfig(
+        module=constants.DEFAULT_AUTHENTICATION_MODULE, negative_cache_ttl=-1
+    )
+    with pytest.raises(
+        InvalidConfigurationError,
+        match="The negative_cache_ttl needs to be a non-negative number",
+    ):
+        cfg.validate_yaml()
+
+
 def test_authentication_config_k8s_cluster_api():
     """Test method to validate authentication config."""
     # k8s_cluster_api is optional
@@ -4320,14 +4460,24 @@ def test_skills_config_defaults():
     assert cfg.skills_dir == "skills"
     assert cfg.alpha == 0.8
     assert cfg.threshold == 0.35
+    assert cfg.backend == constants.HybridRAGBackend.QDRANT
+    assert cfg.snapshot_dir is None
 
 
 def test_skills_config_custom_values():
     """Test SkillsConfig with custom values."""
-    cfg = SkillsConfig(skills_dir="/opt/skills", alpha=0.5, threshold=0.4)
+    cfg = SkillsConfig(
+        skills_dir="/opt/skills",
+        alpha=0.5,
+        threshold=0.4,
+        backend="numpy",
+        snapshot_dir="/var/cache/ols",
+    )
     assert cfg.skills_dir == "/opt/skills"
     assert cfg.alpha == 0.5
     assert cfg.threshold == 0.4
+    assert cfg.backend == constants.HybridRAGBackend.NUMPY
+    assert cfg.snapshot_dir == "/var/cache/ols"
 
 
 def test_skills_config_validation():
@@ -4336,3 +4486,5 @@ def test_skills_config_validation():
         SkillsConfig(alpha=-0.1)
     with pytest.raises(ValidationError, match="less than or equal to 1"):
         SkillsConfig(alpha=1.1)
+    with pytest.raises(ValidationError, match="Input should be 'qdrant' or 'numpy'"):
+        SkillsConfig(backend="faiss")
@@ -532,6 +532,23 @@ class TestCacheEntry:
         assert cache_entry.response == AIMessage("response")
         assert cache_entry.tool_calls == []
         assert cache_entry.tool_results == []
+        assert cache_entry.query_tokens is None
+        assert cache_entry.response_tokens is None
+
+    @staticmethod
+    def test_token_counts_round_trip():
+        """Test that token counts are stored in the dictionary once known."""
+        cache_entry = CacheEntry(
+            query=HumanMessage("query"),
+            response=AIMessage("response"),
+            query_tokens=3,
+            response_tokens=4,
+        )
+        data = cache_entry.to_dict()
+
+        assert data["query_tokens"] == 3
+        assert data["response_tokens"] == 4
+        assert CacheEntry.from_dict(data) == cache_entry
 
     @staticmethod
     def test_cache_entries_to_history():
@@ -1,6 +1,8 @@
 """Unit tests for auth/k8s module."""
 
+import asyncio
 import os
+import threading
 from typing import Optional
 from unittest.mock import MagicMock, patch
 
@@ -13,10 +15,13 @@ from ols import config
 from ols.src.auth.k8s import (
     CLUSTER_ID_LOCAL,
     CLUSTER_VERSION_UNAVAILABLE,
+    AuthDecision,
+    AuthDecisionCache,
     AuthDependency,
     ClusterIDUnavailableError,
     ClusterVersionUnavailableError,
     K8sClientSingleton,
+    auth_decision_cache,
 )
 from tests.mock_classes.mock_k8s_api import (
     MockK8sResponseStatus,
@@ -148,6 +153,203 @@ async def test_cluster_id_is_used_for_kube_admin():
         assert token == "valid-token"  # noqa: S105
 
 
+def request_with_token(token):
+    """Construct request with the given bearer token."""
+    return Request(
+        scope={
+            "type": "http",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_reuses_cached_decision():
+    """Test that repeated requests with the same token are not reviewed again."""
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        create_token_review = mock_authn_api.return_value.create_token_review
+        create_token_review.side_effect = mock_token_review_response
+        create_sar = mock_authz_api.return_value.create_subject_access_review
+        create_sar.side_effect = mock_subject_access_review_response
+
+        first = await auth_dependency(request_with_token("valid-token"))
+        second = await auth_dependency(request_with_token("valid-token"))
+
+        # access to other virtual path is reviewed separately
+        other_path_dependency = AuthDependency(virtual_path="/ols-metrics-access")
+        await other_path_dependency(request_with_token("valid-token"))
+
+    assert first == second == ("valid-uid", "valid-user", False, "valid-token")
+    assert create_token_review.call_count == 2
+    assert create_sar.call_count == 2
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_caches_denied_decision_for_shorter_time():
+    """Test that denied decision is cached with the negative TTL."""
+    config.ols_config.authentication_config.negative_cache_ttl = 5
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.auth_decision_cache") as mock_cache,
+    ):
+        mock_cache.get.return_value = None
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await auth_dependency(request_with_token("invalid-token"))
+
+    assert exc_info.value.status_code == 403
+    key, decision, ttl = mock_cache.put.call_args.args
+    assert "invalid-token" not in key
+    assert decision.allowed is False
+    assert ttl == 5
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_does_not_cache_api_errors():
+    """Test that failed SubjectAccessReview is not cached."""
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+        create_sar = mock_authz_api.return_value.create_subject_access_review
+        create_sar.side_effect = ApiException()
+
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await auth_dependency(request_with_token("valid-token"))
+
+    assert create_sar.call_count == 2
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_does_not_cache_failed_token_review():
+    """Test that TokenReview failed by the API server is not cached as denial."""
+    with patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api:
+        create_token_review = mock_authn_api.return_value.create_token_review
+        create_token_review.side_effect = ApiException(status=503)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await auth_dependency(request_with_token("valid-token"))
+
+    assert exc_info.value.status_code == 503
+    key = AuthDecisionCache.key("valid-token", "/ols-access")
+    assert auth_decision_cache.get(key) is None
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_review():
+    """Test that the review runs off the event loop and is shared by requests."""
+    release = threading.Event()
+
+    def blocking_token_review(token_review):
+        release.wait(timeout=5)
+        return mock_token_review_response(token_review)
+
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        create_token_review = mock_authn_api.return_value.create_token_review
+        create_token_review.side_effect = blocking_token_review
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            mock_subject_access_review_response
+        )
+
+        first = asyncio.ensure_future(
+            auth_dependency(request_with_token("valid-token"))
+        )
+        second = asyncio.ensure_future(
+            auth_dependency(request_with_token("valid-token"))
+        )
+        # the event loop is not blocked while both requests wait for the review
+        await asyncio.sleep(0)
+        assert not first.done() and not second.done()
+        release.set()
+        results = await asyncio.gather(first, second)
+
+    assert results[0] == results[1] == ("valid-uid", "valid-user", False, "valid-token")
+    assert create_token_review.call_count == 1
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_cancelled_request_does_not_cancel_shared_review():
+    """Test that other requests get the decision when the first one is cancelled."""
+    release = threading.Event()
+
+    def blocking_token_review(token_review):
+        release.wait(timeout=5)
+        return mock_token_review_response(token_review)
+
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            blocking_token_review
+        )
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            mock_subject_access_review_response
+        )
+
+        first = asyncio.ensure_future(
+            auth_dependency(request_with_token("valid-token"))
+        )
+        second = asyncio.ensure_future(
+            auth_dependency(request_with_token("valid-token"))
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == ("valid-uid", "valid-user", False, "valid-token")
+        assert first.cancelled()
+
+
+def test_auth_decision_cache_expiration():
+    """Test that decisions expire after their TTL."""
+    cache = AuthDecisionCache()
+    key = AuthDecisionCache.key("token", "/ols-access")
+    decision = AuthDecision(allowed=True, user_id="uid", username="user")
+
+    with patch("ols.src.auth.k8s.time.monotonic", return_value=100.0):
+        cache.put(key, decision, 30)
+        cache.put("other", decision, 0)  # zero TTL disables caching
+    with patch("ols.src.auth.k8s.time.monotonic", return_value=129.0):
+        assert cache.get(key) == decision
+        assert cache.get("other") is None
+    with patch("ols.src.auth.k8s.time.monotonic", return_value=130.0):
+        assert cache.get(key) is None
+
+
+def test_auth_decision_cache_is_bounded():
+    """Test that the oldest decision is dropped when the cache is full."""
+    cache = AuthDecisionCache(max_entries=2)
+    decision = AuthDecision(allowed=False, detail="denied")
+
+    cache.put("a", decision, 30)
+    cache.put("b", decision, 30)
+    cache.put("c", decision, 30)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == decision
+    assert cache.get("c") == decision
+
+
 @pytest.mark.usefixtures("_setup")
 def test_auth_dependency_config():
     """Test the auth dependency can load kubeconfig file."""
@@ -10,6 +10,7 @@ from ols.src.cache.cache_factory import (
     CacheFactory,
     InMemoryCache,
     PostgresCache,
+    TieredCache,
 )
 
 
@@ -66,3 +67,24 @@ def test_conversation_cache_wrong_cache(invalid_cache_type_config):
     """Check if wrong cache configuration is detected properly."""
     with pytest.raises(ValueError, match="Invalid cache type"):
         CacheFactory.conversation_cache(invalid_cache_type_config)
+
+
+def test_conversation_cache_in_postgres_with_local_tier():
+    """Check if TieredCache is returned when the local tier is enabled."""
+    config = ConversationCacheConfig(
+        {
+            "type": constants.CACHE_TYPE_POSTGRES,
+            constants.CACHE_TYPE_POSTGRES: {
+                "host": "localhost",
+                "port": 5432,
+                "local_cache_max_conversations": 100,
+            },
+        }
+    )
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect"):
+        cache = CacheFactory.conversation_cache(config)
+
+    assert isinstance(cache, TieredCache), type(cache)
+    assert isinstance(cache.backend, PostgresCache)
+    assert cache.max_conversations == 100
@@ -1,5 +1,7 @@
 """Unit tests for InMemoryCache class."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
@@ -128,6 +130,51 @@ def test_insert_or_append_eviction(cache):
     )
 
 
+def test_get_marks_conversation_as_recently_used(cache):
+    """Test that reading a conversation protects it from eviction."""
+    # remove last hex digit from user UUID
+    user_name_prefix = constants.DEFAULT_USER_UID[:-1]
+
+    capacity = 3
+    cache.capacity = capacity
+    for i in range(capacity):
+        cache.insert_or_append(
+            f"{user_name_prefix}{i}",
+            conversation_id,
+            CacheEntry(query=HumanMessage(f"user query {i}")),
+        )
+
+    # touch the least recently used conversation
+    assert cache.get(f"{user_name_prefix}0", conversation_id) is not None
+
+    cache.insert_or_append(
+        f"{user_name_prefix}{capacity}",
+        conversation_id,
+        CacheEntry(query=HumanMessage(f"user query {capacity}")),
+    )
+
+    # the conversation that has been read is kept, the next one is evicted
+    assert cache.get(f"{user_name_prefix}0", conversation_id) is not None
+    assert cache.get(f"{user_name_prefix}1", conversation_id) is None
+    assert [c.conversation_id for c in cache.list(f"{user_name_prefix}1")] == []
+
+
+def test_concurrent_reads_and_writes(cache):
+    """Test that concurrent reads and writes keep the cache consistent."""
+    conversation_ids = [suid.get_suid() for _ in range(4)]
+
+    def worker(i: int) -> None:
+        cid = conversation_ids[i % len(conversation_ids)]
+        cache.insert_or_append(constants.DEFAULT_USER_UID, cid, cache_entry_1)
+        cache.get(constants.DEFAULT_USER_UID, cid)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(worker, range(100)))
+
+    assert cache.total_entries == cache.capacity
+    assert cache.total_entries == sum(len(v) for v in cache.cache.values())
+
+
 def test_get_nonexistent_user(cache):
     """Test how non-existent items are handled by the cache."""
     # this UUID is different from DEFAULT_USER_UID
@@ -186,6 +233,22 @@ def test_list_conversations(cache):
     assert conversation_id_2 in conversation_ids
 
 
+def test_list_conversations_of_other_users_are_not_returned(cache):
+    """Test that listing returns only conversations of the given user."""
+    other_user_id = "ffffffff-ffff-ffff-ffff-ffffffffffff"
+    conversation_id_1 = suid.get_suid()
+    conversation_id_2 = suid.get_suid()
+
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id_1, cache_entry_1)
+    cache.insert_or_append(other_user_id, conversation_id_2, cache_entry_2)
+
+    conversations = cache.list(constants.DEFAULT_USER_UID)
+    assert [c.conversation_id for c in conversations] == [conversation_id_1]
+
+    cache.delete(other_user_id, conversation_id_2)
+    assert cache.list(other_user_id) == []
+
+
 def test_list_conversations_skip_user_id_check(cache):
     """Test listing conversations for a user."""
     # Create multiple conversations
@@ -248,6 +311,52 @@ def test_list_conversations_metadata(cache):
     assert conv_data.last_message_timestamp > 0
 
 
+def test_replace_history(cache):
+    """Test that replace_history swaps the whole history and keeps the topic."""
+    conv_id = suid.get_suid()
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conv_id, cache_entry_1)
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conv_id, cache_entry_1)
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conv_id, cache_entry_1)
+    cache.set_topic_summary(constants.DEFAULT_USER_UID, conv_id, "Test Topic")
+
+    cache.replace_history(constants.DEFAULT_USER_UID, conv_id, [cache_entry_2])
+
+    assert cache.get(constants.DEFAULT_USER_UID, conv_id) == [cache_entry_2]
+    assert cache.total_entries == 1
+    conversations = cache.list(constants.DEFAULT_USER_UID)
+    assert len(conversations) == 1
+    assert conversations[0].message_count == 1
+    assert conversations[0].topic_summary == "Test Topic"
+
+
+def test_replace_history_with_empty_history(cache):
+    """Test that replacing history by no entries deletes the conversation."""
+    conv_id = suid.get_suid()
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conv_id, cache_entry_1)
+
+    cache.replace_history(constants.DEFAULT_USER_UID, conv_id, [])
+
+    assert cache.get(constants.DEFAULT_USER_UID, conv_id) is None
+    assert cache.total_entries == 0
+    assert cache.list(constants.DEFAULT_USER_UID) == []
+
+
+def test_replace_history_evicts_over_capacity(cache):
+    """Test that replacing history keeps the cache within its capacity."""
+    old_conv_id = suid.get_suid()
+    conv_id = suid.get_suid()
+    for _ in range(5):
+        cache.insert_or_append(constants.DEFAULT_USER_UID, old_conv_id, cache_entry_1)
+
+    cache.replace_history(
+        constants.DEFAULT_USER_UID, conv_id, [cache_entry_2] * cache.capacity
+    )
+
+    assert cache.total_entries == cache.capacity
+    assert cache.get(constants.DEFAULT_USER_UID, old_conv_id) is None
+    assert len(cache.get(constants.DEFAULT_USER_UID, conv_id)) == cache.capacity
+
+
 def test_set_topic_summary(cache):
     """Test setting topic summary for a conversation."""
     conv_id = suid.get_suid()
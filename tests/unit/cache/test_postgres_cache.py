@@ -1,20 +1,26 @@
 """Unit tests for PostgresCache class."""
 
 import json
+import threading
+from collections import defaultdict
 from unittest.mock import MagicMock, call, patch
 
 import psycopg2
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
+from ols import constants
 from ols.app.models.config import PostgresConfig
-from ols.app.models.models import CacheEntry, MessageDecoder, MessageEncoder
+from ols.app.models.models import CacheEntry, MessageEncoder
 from ols.src.cache.cache_error import CacheError
 from ols.src.cache.postgres_cache import PostgresCache
+from ols.src.cache.value_codec import encode_value
 from ols.utils import suid
 
 user_id = suid.get_suid()
 conversation_id = suid.get_suid()
+# counter shard updated by writes to the conversation
+shard = PostgresCache._counter_shard(user_id, conversation_id)
 cache_entry_1 = CacheEntry(
     query=HumanMessage("用户消息"), response=AIMessage("人工智能信息")
 )
@@ -27,7 +33,7 @@ def test_get_operation_on_empty_cache():
     """Test the Cache.get operation on empty cache."""
     # mock the query result - empty cache
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
+    mock_cursor.fetchall.return_value = []
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
@@ -43,11 +49,9 @@ def test_get_operation_on_empty_cache():
     conversation = cache.get(user_id, conversation_id)
     assert conversation == []
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. select conversation from DB
+    # just one DB operation must be performed (no liveness check):
+    # select conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
@@ -56,14 +60,14 @@ def test_get_operation_on_empty_cache():
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
     # Verify the query execution
-    mock_cursor.fetchone.assert_called_once()
+    mock_cursor.fetchall.assert_called_once()
 
 
 def test_get_operation_invalid_value():
     """Test the Cache.get operation when invalid value is returned from cache."""
     # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = "Invalid value"
+    mock_cursor.fetchall.return_value = ["Invalid value"]
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
@@ -79,11 +83,9 @@ def test_get_operation_invalid_value():
         with pytest.raises(ValueError, match="Invalid value read from cache:"):
             cache.get(user_id, conversation_id)
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. select conversation from DB
+    # just one DB operation must be performed (no liveness check):
+    # select conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
@@ -92,7 +94,7 @@ def test_get_operation_invalid_value():
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
     # Verify the query execution
-    mock_cursor.fetchone.assert_called_once()
+    mock_cursor.fetchall.assert_called_once()
 
 
 def test_get_operation_valid_value():
@@ -101,12 +103,15 @@ def test_get_operation_valid_value():
         cache_entry_1,
         cache_entry_2,
     ]
-    conversation = json.dumps([ce.to_dict() for ce in history], cls=MessageEncoder)
-    as_memview = memoryview(bytearray(conversation, "utf-8"))
+    # one row per cache entry, plain JSON as written by older versions
+    rows = [
+        (memoryview(bytearray(json.dumps(ce.to_dict(), cls=MessageEncoder), "utf-8")),)
+        for ce in history
+    ]
 
     # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = (as_memview,)
+    mock_cursor.fetchall.return_value = rows
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
@@ -122,11 +127,9 @@ def test_get_operation_valid_value():
     # unjsond history should be returned
     assert cache.get(user_id, conversation_id) == history
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. select conversation from DB
+    # just one DB operation must be performed (no liveness check):
+    # select conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
@@ -135,14 +138,35 @@ def test_get_operation_valid_value():
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
     # Verify the query execution
-    mock_cursor.fetchone.assert_called_once()
+    mock_cursor.fetchall.assert_called_once()
+
+
+def test_get_operation_encoded_value():
+    """Test the Cache.get operation decodes values written by the codec."""
+    rows = [(memoryview(encode_value(cache_entry_1.to_dict())),)]
+
+    # mock the query result
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = rows
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
+        # initialize Postgres cache
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
 
 
 def test_get_operation_on_exception():
     """Test the Cache.get operation when exception is thrown."""
     # mock the query
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.side_effect = psycopg2.DatabaseError("PLSQL error")
+    mock_cursor.fetchall.side_effect = psycopg2.DatabaseError("PLSQL error")
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
@@ -159,11 +183,176 @@ def test_get_operation_on_exception():
         cache.get(user_id, conversation_id)
 
 
+def test_get_with_version_operation():
+    """Test the get_with_version operation reads the version before the history."""
+    value = json.dumps(cache_entry_1.to_dict(), cls=MessageEncoder)
+    rows = [(memoryview(bytearray(value, "utf-8")),)]
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (1, 1, "2026-01-01 10:00:00")
+    mock_cursor.fetchall.return_value = rows
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
+        # initialize Postgres cache
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+
+        version, history = cache.get_with_version(user_id, conversation_id)
+
+    assert version == (1, 1, "2026-01-01 10:00:00")
+    assert history == [cache_entry_1]
+    calls = [
+        call(
+            PostgresCache.SELECT_HISTORY_VERSION_STATEMENT,
+            {"user_id": user_id, "conversation_id": conversation_id},
+        ),
+        call(
+            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
+            (user_id, conversation_id),
+        ),
+    ]
+    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+
+
+def test_history_version_of_empty_history():
+    """Test that empty history has no version."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = None
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
+        # initialize Postgres cache
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+
+        assert cache.history_version(user_id, conversation_id) is None
+
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.SELECT_HISTORY_VERSION_STATEMENT,
+        {"user_id": user_id, "conversation_id": conversation_id},
+    )
+
+
+def test_append_with_version_operation():
+    """Test that versions are read under the conversation lock around the append."""
+    value = encode_value(cache_entry_1.to_dict())
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.side_effect = [
+        None,  # version before: empty history
+        (1,),  # total number of entries
+        (1, 1, "2026-01-01 10:00:00"),  # version after
+    ]
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
+        # initialize Postgres cache
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+
+        before, after = cache.append_with_version(
+            user_id, conversation_id, cache_entry_1
+        )
+
+    assert before is None
+    assert after == (1, 1, "2026-01-01 10:00:00")
+    version_params = {"user_id": user_id, "conversation_id": conversation_id}
+    calls = [
+        call(PostgresCache.ADVISORY_LOCK_STATEMENT, (user_id, conversation_id)),
+        call(PostgresCache.SELECT_HISTORY_VERSION_STATEMENT, version_params),
+        call(
+            PostgresCache.APPEND_CACHE_ENTRY_STATEMENT,
+            {"user_id": user_id, "conversation_id": conversation_id, "value": value},
+        ),
+        call(
+            PostgresCache.UPSERT_CONVERSATION_STATEMENT,
+            (user_id, conversation_id),
+        ),
+        call(PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT, (shard, 1)),
+        call(PostgresCache.QUERY_TOTAL_ENTRIES_STATEMENT),
+        call(PostgresCache.SELECT_HISTORY_VERSION_STATEMENT, version_params),
+    ]
+    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+
+
+def test_get_operation_retried_when_connection_cannot_be_acquired():
+    """Test that the Cache.get operation is retried once when no connection is acquired."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = []
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        conn = mock_connect.return_value
+        conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+        # initialize Postgres cache
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+        cache.pool.discard_idle()
+        mock_connect.side_effect = [
+            psycopg2.OperationalError("connection refused"),
+            conn,
+            conn,
+        ]
+        mock_cursor.execute.reset_mock()
+
+        assert cache.get(user_id, conversation_id) == []
+
+    # the schema is initialized again on reconnect, then the query runs once
+    mock_cursor.execute.assert_called_with(
+        PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
+        (user_id, conversation_id),
+    )
+    assert mock_connect.call_count == 3
+
+
+def test_get_operation_retried_after_statement_connection_error():
+    """Test that a read losing a connection that passed its health check is retried."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = []
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
+        # initialize Postgres cache
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+        mock_cursor.execute.reset_mock()
+        mock_cursor.execute.side_effect = [
+            psycopg2.OperationalError("server closed the connection unexpectedly"),
+            None,
+        ]
+
+        assert cache.get(user_id, conversation_id) == []
+
+    # broken connection is closed and the statement runs again on a new one
+    mock_connect.return_value.close.assert_called_once()
+    assert mock_connect.call_count == 2
+    mock_cursor.execute.assert_called_with(
+        PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
+        (user_id, conversation_id),
+    )
+
+
 def test_get_operation_on_disconnected_db():
     """Test the Cache.get operation when DB is not connected."""
     # mock the query
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
+    mock_cursor.fetchall.return_value = []
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
@@ -175,7 +364,7 @@ def test_get_operation_on_disconnected_db():
         config = PostgresConfig()
         cache = PostgresCache(config)
         # simulate DB disconnection
-        cache.connection = None
+        cache.pool = None
         assert not cache.connected()
         # DB operation should connect automatically
         cache.get(user_id, conversation_id)
@@ -193,7 +382,7 @@ def test_get_operation_on_disconnected_db():
 def test_insert_or_append_operation():
     """Test the Cache.insert_or_append operation for first item to be inserted."""
     history = cache_entry_1
-    conversation = json.dumps([history.to_dict()], cls=MessageEncoder)
+    value = encode_value(history.to_dict())
 
     # mock the query result
     mock_cursor = MagicMock()
@@ -220,39 +409,26 @@ def test_insert_or_append_operation():
             (user_id, conversation_id),
         ),
         call(
-            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
-        ),
-        call(
-            PostgresCache.INSERT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id, conversation.encode("utf-8")),
+            PostgresCache.APPEND_CACHE_ENTRY_STATEMENT,
+            {"user_id": user_id, "conversation_id": conversation_id, "value": value},
         ),
         call(
             PostgresCache.UPSERT_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
         ),
-        call(PostgresCache.QUERY_TOTAL_ENTRIES),
+        call(PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT, (shard, 1)),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
 
 def test_insert_or_append_operation_append_item():
-    """Test the Cache.insert_or_append operation for more item to be inserted."""
-    stored_history = cache_entry_1
-
-    old_conversation = json.dumps([stored_history.to_dict()], cls=MessageEncoder)
-    as_memview = memoryview(bytearray(old_conversation, "utf-8"))
-
+    """Test that appending to existing conversation does not read the history back."""
     appended_history = cache_entry_2
-
-    # create json object in the exactly same format
-    whole_history = json.loads(old_conversation, cls=MessageDecoder)
-    whole_history.append(appended_history.to_dict())
-    new_conversation = json.dumps(whole_history, cls=MessageEncoder)
+    value = encode_value(appended_history.to_dict())
 
     # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = (as_memview,)
+    mock_cursor.fetchone.return_value = (1,)
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
@@ -268,19 +444,15 @@ def test_insert_or_append_operation_append_item():
         # to append new history to the old one
         cache.insert_or_append(user_id, conversation_id, appended_history)
 
-    # multiple DB operations must be performed:
+    # only the new entry is written, the stored history is not touched
     calls = [
         call(
             PostgresCache.ADVISORY_LOCK_STATEMENT,
             (user_id, conversation_id),
         ),
         call(
-            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
-        ),
-        call(
-            PostgresCache.UPDATE_CONVERSATION_HISTORY_STATEMENT,
-            (new_conversation.encode("utf-8"), user_id, conversation_id),
+            PostgresCache.APPEND_CACHE_ENTRY_STATEMENT,
+            {"user_id": user_id, "conversation_id": conversation_id, "value": value},
         ),
         call(
             PostgresCache.UPSERT_CONVERSATION_STATEMENT,
@@ -288,6 +460,8 @@ def test_insert_or_append_operation_append_item():
         ),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
+    executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT not in executed
 
 
 def test_insert_or_append_operation_on_exception():
@@ -316,7 +490,7 @@ def test_insert_or_append_operation_on_exception():
 def test_insert_or_append_operation_on_disconnected_db():
     """Test the Cache.insert_or_append operation when DB is not connected."""
     history = cache_entry_1
-    conversation = json.dumps([history.to_dict()], cls=MessageEncoder)
+    value = encode_value(history.to_dict())
 
     # mock the query
     mock_cursor = MagicMock()
@@ -332,7 +506,7 @@ def test_insert_or_append_operation_on_disconnected_db():
         config = PostgresConfig()
         cache = PostgresCache(config)
         # simulate DB disconnection
-        cache.connection = None
+        cache.pool = None
         assert not cache.connected()
         # DB operation should connect automatically
         cache.insert_or_append(user_id, conversation_id, cache_entry_1)
@@ -345,18 +519,15 @@ def test_insert_or_append_operation_on_disconnected_db():
             (user_id, conversation_id),
         ),
         call(
-            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
-        ),
-        call(
-            PostgresCache.INSERT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id, conversation.encode("utf-8")),
+            PostgresCache.APPEND_CACHE_ENTRY_STATEMENT,
+            {"user_id": user_id, "conversation_id": conversation_id, "value": value},
         ),
         call(
             PostgresCache.UPSERT_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
         ),
-        call(PostgresCache.QUERY_TOTAL_ENTRIES),
+        call(PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT, (shard, 1)),
+        call(PostgresCache.QUERY_TOTAL_ENTRIES_STATEMENT),
         call("SELECT 1"),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
@@ -391,8 +562,8 @@ def test_insert_or_append_rollback_on_error():
     """Test that insert_or_append rolls back on error and restores autocommit."""
     mock_cursor = MagicMock()
     mock_cursor.execute.side_effect = [
-        None,  # SELECT 1 (connection check)
-        psycopg2.DatabaseError("insert failed"),  # advisory lock
+        None,  # advisory lock
+        psycopg2.DatabaseError("insert failed"),  # append entry
     ]
 
     with patch("psycopg2.connect") as mock_connect:
@@ -406,15 +577,152 @@ def test_insert_or_append_rollback_on_error():
 
         config = PostgresConfig()
         cache = PostgresCache(config)
+        mock_connect.return_value.rollback.reset_mock()
 
         with pytest.raises(CacheError, match="insert failed"):
             cache.insert_or_append(user_id, conversation_id, cache_entry_1)
 
-    # Rollback called three times: before disabling autocommit, in except block, and in finally
-    assert mock_connect.return_value.rollback.call_count == 3
+    # Rollback called twice: when the transaction is aborted and when the
+    # connection is returned to the pool
+    assert mock_connect.return_value.rollback.call_count == 2
     assert mock_connect.return_value.autocommit is True
 
 
+def test_insert_or_append_not_retried_when_commit_fails():
+    """Test that a connection lost during COMMIT is not retried."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = None
+
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+        mock_connect.return_value.commit.reset_mock()
+        mock_connect.return_value.commit.side_effect = psycopg2.OperationalError(
+            "server closed the connection unexpectedly"
+        )
+        mock_cursor.execute.reset_mock()
+
+        with pytest.raises(psycopg2.OperationalError):
+            cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    # the entry may have been stored, so it is not appended a second time
+    assert mock_connect.call_count == 1
+    mock_connect.return_value.commit.assert_called_once()
+    assert (
+        mock_cursor.execute.call_args_list.count(
+            call(PostgresCache.ADVISORY_LOCK_STATEMENT, (user_id, conversation_id))
+        )
+        == 1
+    )
+
+
+def test_replace_history_operation():
+    """Test that the whole history is replaced in one transaction."""
+    value_1 = encode_value(cache_entry_1.to_dict())
+    value_2 = encode_value(cache_entry_2.to_dict())
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 3  # three old entries deleted
+    mock_cursor.fetchone.return_value = (2,)
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
+        # initialize Postgres cache
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+        mock_connect.return_value.commit.reset_mock()
+
+        cache.replace_history(user_id, conversation_id, [cache_entry_1, cache_entry_2])
+
+    calls = [
+        call(PostgresCache.ADVISORY_LOCK_STATEMENT, (user_id, conversation_id)),
+        call(
+            PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
+            (user_id, conversation_id),
+        ),
+        call(
+            PostgresCache.INSERT_CACHE_ENTRIES_STATEMENT,
+            {
+                "user_id": user_id,
+                "conversation_id": conversation_id,
+                "values": [value_1, value_2],
+            },
+        ),
+        call(
+            PostgresCache.REPLACE_CONVERSATION_STATEMENT,
+            (user_id, conversation_id, 2),
+        ),
+        call(PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT, (shard, -1)),
+    ]
+    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+    mock_connect.return_value.commit.assert_called_once()
+
+
+def test_replace_history_with_empty_history():
+    """Test that replacing history by no entries deletes the conversation."""
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 2
+    mock_cursor.fetchone.return_value = (0,)
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
+        # initialize Postgres cache
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+
+        cache.replace_history(user_id, conversation_id, [])
+
+    calls = [
+        call(
+            PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
+            (user_id, conversation_id),
+        ),
+        call(
+            PostgresCache.DELETE_CONVERSATION_METADATA_STATEMENT,
+            (user_id, conversation_id),
+        ),
+        call(PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT, (shard, -2)),
+    ]
+    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+    executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert PostgresCache.INSERT_CACHE_ENTRIES_STATEMENT not in executed
+
+
+def test_replace_history_rollback_on_error():
+    """Test that failed replacement is rolled back, keeping the old history."""
+    mock_cursor = MagicMock()
+    mock_cursor.execute.side_effect = psycopg2.DatabaseError("PLSQL error")
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+
+        # initialize Postgres cache
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+        mock_connect.return_value.commit.reset_mock()
+        mock_connect.return_value.rollback.reset_mock()
+
+        with pytest.raises(CacheError, match="PLSQL error"):
+            cache.replace_history(user_id, conversation_id, [cache_entry_1])
+
+    mock_connect.return_value.rollback.assert_called()
+    mock_connect.return_value.commit.assert_not_called()
+
+
 def test_list_operation():
     """Test the Cache.list operation."""
     # Mock conversation data to be returned by the database
@@ -451,11 +759,9 @@ def test_list_operation():
     assert result[1].conversation_id == "conversation_2"
     assert result[2].conversation_id == "conversation_3"
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. list conversations from DB
+    # just one DB operation must be performed (no liveness check):
+    # list conversations from DB
     calls = [
-        call("SELECT 1"),
         call(PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,)),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
@@ -502,7 +808,7 @@ def test_list_operation_on_disconnected_db():
         config = PostgresConfig()
         cache = PostgresCache(config)
         # simulate DB disconnection
-        cache.connection = None
+        cache.pool = None
         assert not cache.connected()
         # DB operation should connect automatically
         cache.list(user_id)
@@ -534,11 +840,9 @@ def test_set_topic_summary_operation():
         # Call the "set_topic_summary" operation
         cache.set_topic_summary(user_id, conversation_id, "Test Topic Summary")
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. upsert topic summary
+    # just one DB operation must be performed (no liveness check):
+    # upsert topic summary
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.INSERT_OR_UPDATE_TOPIC_SUMMARY_STATEMENT,
             (user_id, conversation_id, "Test Topic Summary"),
@@ -549,13 +853,9 @@ def test_set_topic_summary_operation():
 
 def test_set_topic_summary_operation_on_exception():
     """Test the Cache.set_topic_summary operation when an exception is raised."""
-    # Mock the database cursor behavior to raise an exception on the second execute call
-    # (first call is "SELECT 1" for connection check)
+    # Mock the database cursor behavior to raise an exception
     mock_cursor = MagicMock()
-    mock_cursor.execute.side_effect = [
-        None,  # SELECT 1 succeeds
-        psycopg2.DatabaseError("PLSQL error"),  # actual operation fails
-    ]
+    mock_cursor.execute.side_effect = psycopg2.DatabaseError("PLSQL error")
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
@@ -595,14 +895,14 @@ def test_delete_operation():
     assert result is True
 
     # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. delete one conversation from DB
+    # 1. delete one conversation from DB
+    # 2. decrease the maintained number of entries
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
         ),
+        call(PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT, (shard, -1)),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
@@ -629,11 +929,9 @@ def test_delete_operation_not_found():
     # Verify the result
     assert result is False
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. delete one conversation from DB
+    # just one DB operation must be performed (no liveness check):
+    # delete one conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
@@ -659,7 +957,7 @@ def test_delete_operation_on_exception():
         cache = PostgresCache(config)
 
         # Verify that the exception is raised
-        with pytest.raises(psycopg2.DatabaseError, match="PLSQL error"):
+        with pytest.raises(CacheError, match="PLSQL error"):
             cache.delete(user_id, conversation_id)
 
 
@@ -679,7 +977,7 @@ def test_delete_operation_on_disconnected_db():
         config = PostgresConfig()
         cache = PostgresCache(config)
         # simulate DB disconnection
-        cache.connection = None
+        cache.pool = None
         assert not cache.connected()
         # DB operation should connect automatically
         cache.delete(user_id, conversation_id)
@@ -725,10 +1023,7 @@ def test_delete_transaction_management():
 def test_delete_rollback_on_error():
     """Test that delete rolls back on error and restores autocommit."""
     mock_cursor = MagicMock()
-    mock_cursor.execute.side_effect = [
-        None,  # SELECT 1 (connection check)
-        psycopg2.DatabaseError("delete failed"),  # DELETE statement
-    ]
+    mock_cursor.execute.side_effect = psycopg2.DatabaseError("delete failed")
 
     with patch("psycopg2.connect") as mock_connect:
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
@@ -741,12 +1036,14 @@ def test_delete_rollback_on_error():
 
         config = PostgresConfig()
         cache = PostgresCache(config)
+        mock_connect.return_value.rollback.reset_mock()
 
         with pytest.raises(CacheError, match="delete failed"):
             cache.delete(user_id, conversation_id)
 
-    # Rollback called three times: before disabling autocommit, in except block, and in finally
-    assert mock_connect.return_value.rollback.call_count == 3
+    # Rollback called twice: when the transaction is aborted and when the
+    # connection is returned to the pool
+    assert mock_connect.return_value.rollback.call_count == 2
     assert mock_connect.return_value.autocommit is True
 
 
@@ -758,69 +1055,228 @@ def test_cleanup_method_when_clean_not_needed():
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect"):
-        PostgresCache._cleanup(mock_cursor, capacity)
+        PostgresCache._cleanup(mock_cursor, capacity, shard)
 
-    # Verify the query execution
-    mock_cursor.execute.assert_called_once_with(PostgresCache.QUERY_TOTAL_ENTRIES)
+    # the maintained counter is below capacity, so just the counter is read
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.QUERY_TOTAL_ENTRIES_STATEMENT
+    )
 
 
 def test_cleanup_method_when_clean_performed():
-    """Test the static method that cleans up PG cache by evicting one message."""
-    # Prepare mock data for eviction: a conversation with 2 messages
-    value = [cache_entry_1.to_dict(), cache_entry_2.to_dict()]
-    conversation = json.dumps(value, cls=MessageEncoder)
-    value_bytes = conversation.encode("utf-8")
-    row = (user_id, conversation_id, value_bytes)
-
-    # After evicting the oldest message, the conversation has 1 message left
-    trimmed_value = [cache_entry_2.to_dict()]
-    trimmed_conversation = json.dumps(trimmed_value, cls=MessageEncoder)
-    trimmed_value_bytes = trimmed_conversation.encode("utf-8")
-
+    """Test the static method that cleans up PG cache by evicting a batch."""
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.side_effect = [(200,), row]
-    capacity = 199  # Total 200 > 199, so evict 1 message
+    mock_cursor.rowcount = 11
+    # Total 101 > 100, eviction lock acquired
+    mock_cursor.fetchone.side_effect = [(101,), (True,)]
+    capacity = 100  # evict down to the low watermark (90)
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect"):
-        PostgresCache._cleanup(mock_cursor, capacity)
+        PostgresCache._cleanup(mock_cursor, capacity, shard)
 
-    # Verify the query executions: get total, get oldest row, update the trimmed conversation
+    # Verify the query executions: delete the oldest messages, update the counter
     calls = [
-        call(PostgresCache.QUERY_TOTAL_ENTRIES),
-        call(PostgresCache.SELECT_OLDEST_ROW),
-        call(
-            PostgresCache.UPDATE_CONVERSATION_HISTORY_STATEMENT,
-            (trimmed_value_bytes, user_id, conversation_id),
-        ),
+        call(PostgresCache.QUERY_TOTAL_ENTRIES_STATEMENT),
+        call(PostgresCache.EVICTION_LOCK_STATEMENT),
+        call(PostgresCache.DELETE_OLDEST_ENTRIES_STATEMENT, (11,)),
+        call(PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT, (shard, -11)),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
 
+def test_cleanup_method_when_other_writer_evicts():
+    """Test that eviction is skipped when other writer holds the eviction lock."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.side_effect = [(101,), (False,)]
+
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect"):
+        PostgresCache._cleanup(mock_cursor, 100, shard)
+
+    executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert executed == [
+        PostgresCache.QUERY_TOTAL_ENTRIES_STATEMENT,
+        PostgresCache.EVICTION_LOCK_STATEMENT,
+    ]
+
+
+def test_update_total_entries():
+    """Test that only the given shard of the maintained counter is updated."""
+    mock_cursor = MagicMock()
+
+    PostgresCache._update_total_entries(mock_cursor, 3, 1)
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT, (3, 1)
+    )
+
+
+def test_total_entries():
+    """Test that the maintained counter is read as the sum of its shards."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (42,)
+
+    assert PostgresCache._total_entries(mock_cursor) == 42
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.QUERY_TOTAL_ENTRIES_STATEMENT
+    )
+
+    # missing counter rows are treated as empty cache
+    mock_cursor.fetchone.return_value = (None,)
+    assert PostgresCache._total_entries(mock_cursor) == 0
+
+
+def test_counter_shard():
+    """Test that the counter shard is stable and within the configured range."""
+    first = PostgresCache._counter_shard(user_id, conversation_id)
+    assert first == PostgresCache._counter_shard(user_id, conversation_id)
+    assert 0 <= first < constants.POSTGRES_CACHE_COUNTER_SHARDS
+
+    # conversations are spread over the shards
+    shards = {
+        PostgresCache._counter_shard(user_id, suid.get_suid()) for _ in range(200)
+    }
+    assert len(shards) > 1
+
+
+class RowLockingConnection:
+    """Fake connection holding counter row locks until the transaction ends."""
+
+    def __init__(self, row_locks, lock_waits):
+        """Initialize the connection sharing row locks with other connections."""
+        self.row_locks = row_locks
+        self.lock_waits = lock_waits
+        self.held = []
+        self.autocommit = True
+        self.before_commit = None
+
+    def cursor(self):
+        """Return a cursor acquiring counter row locks."""
+        cursor = MagicMock()
+        cursor.__enter__.return_value = cursor
+        cursor.fetchone.return_value = (0,)
+        cursor.fetchall.return_value = []
+
+        def execute(statement, params=None):
+            if statement == PostgresCache.UPDATE_TOTAL_ENTRIES_STATEMENT:
+                lock = self.row_locks[params[0]]
+                if not lock.acquire(blocking=False):
+                    self.lock_waits.append(params[0])
+                    lock.acquire()
+                self.held.append(lock)
+
+        cursor.execute.side_effect = execute
+        return cursor
+
+    def _release(self):
+        while self.held:
+            self.held.pop().release()
+
+    def commit(self):
+        """Commit the transaction, optionally waiting for a signal first."""
+        if self.before_commit is not None:
+            self.before_commit()
+        self._release()
+
+    def rollback(self):
+        """Roll back the transaction."""
+        self._release()
+
+    def get_transaction_status(self):
+        """Return idle status, transactions are closed by commit or rollback."""
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        """Close the connection."""
+
+
+def test_concurrent_appends_to_different_conversations_do_not_wait():
+    """Test that appends to different conversations lock different counter rows."""
+    conversation_1 = conversation_id
+    conversation_2 = next(
+        c
+        for c in iter(suid.get_suid, None)
+        if PostgresCache._counter_shard(user_id, c) != shard
+    )
+    row_locks = defaultdict(threading.Lock)
+    lock_waits = []
+    connections = []
+
+    def connect(**kwargs):
+        conn = RowLockingConnection(row_locks, lock_waits)
+        connections.append(conn)
+        return conn
+
+    first_in_commit = threading.Event()
+    second_done = threading.Event()
+
+    def hold_transaction_open():
+        first_in_commit.set()
+        second_done.wait(5)
+
+    with patch("psycopg2.connect", side_effect=connect):
+        cache = PostgresCache(PostgresConfig())
+        for conn in connections:
+            conn.before_commit = hold_transaction_open
+
+        # the first append stays in its transaction until the second one is done
+        first = threading.Thread(
+            target=cache.insert_or_append,
+            args=(user_id, conversation_1, cache_entry_1),
+        )
+        first.start()
+        assert first_in_commit.wait(5)
+        for conn in connections:
+            conn.before_commit = None
+        second = threading.Thread(
+            target=cache.insert_or_append,
+            args=(user_id, conversation_2, cache_entry_2),
+        )
+        second.start()
+        second.join(5)
+        finished = not second.is_alive()
+        second_done.set()
+        first.join(5)
+
+    assert finished
+    assert lock_waits == []
+
+
+def test_legacy_cache_table_is_migrated_on_init():
+    """Test that the legacy cache table is migrated after new tables are created."""
+    with patch("psycopg2.connect") as mock_connect:
+        cursor = mock_connect.return_value.cursor.return_value
+        PostgresCache(PostgresConfig())
+
+    executed = [c.args[0] for c in cursor.execute.call_args_list]
+    assert PostgresCache.MIGRATE_LEGACY_CACHE_TABLE in executed
+    assert executed.index(PostgresCache.CREATE_CACHE_ENTRIES_TABLE) < executed.index(
+        PostgresCache.MIGRATE_LEGACY_CACHE_TABLE
+    )
+
+
 def test_ready():
     """Test the Cache.ready operation."""
     # do not use real PostgreSQL instance
-    with patch("psycopg2.connect"):
+    with patch("psycopg2.connect") as mock_connect:
         # initialize Postgres cache
         config = PostgresConfig()
         cache = PostgresCache(config)
 
-        # mock the connection state 0 - open
-        cache.connection.closed = 0
-        # patch the poll function to return POLL_OK
-        cache.connection.poll = MagicMock(return_value=psycopg2.extensions.POLL_OK)
         # cache is ready
         assert cache.ready()
+        # pooled connection is reused
+        assert mock_connect.call_count == 1
 
 
-def test_ready_reconnects_on_closed_connection():
-    """Test that ready() reconnects when connection is closed."""
+def test_ready_reconnects_on_closed_pool():
+    """Test that ready() reconnects when the connection pool is closed."""
     with patch("psycopg2.connect") as mock_connect:
         config = PostgresConfig()
         cache = PostgresCache(config)
 
-        # simulate closed connection
-        cache.connection.closed = 1
+        # simulate closed pool
+        cache.pool.close()
 
         # ready() should attempt reconnect and succeed
         assert cache.ready()
@@ -828,18 +1284,18 @@ def test_ready_reconnects_on_closed_connection():
         assert mock_connect.call_count == 2
 
 
-def test_ready_reconnects_on_none_connection():
-    """Test that ready() reconnects when connection is None."""
-    with patch("psycopg2.connect") as mock_connect:
+def test_ready_reconnects_on_none_pool():
+    """Test that ready() reconnects when there is no connection pool."""
+    with patch("psycopg2.connect"):
         config = PostgresConfig()
         cache = PostgresCache(config)
 
         # simulate lost connection
-        cache.connection = None
+        cache.pool = None
 
         # ready() should attempt reconnect and succeed
         assert cache.ready()
-        assert mock_connect.call_count == 2
+        assert cache.pool is not None
 
 
 def test_ready_returns_false_when_reconnect_fails():
@@ -848,40 +1304,41 @@ def test_ready_returns_false_when_reconnect_fails():
         config = PostgresConfig()
         cache = PostgresCache(config)
 
-        # simulate closed connection
-        cache.connection.closed = 1
+        # simulate closed pool
+        cache.pool.close()
         # make reconnect fail
         mock_connect.side_effect = psycopg2.OperationalError("connection refused")
 
         assert not cache.ready()
 
 
-def test_ready_reconnects_on_poll_error():
-    """Test that ready() reconnects when poll raises OperationalError."""
+def test_ready_replaces_broken_connection():
+    """Test that ready() replaces the pooled connection broken by the server."""
     with patch("psycopg2.connect") as mock_connect:
         config = PostgresConfig()
         cache = PostgresCache(config)
 
-        cache.connection.closed = 0
-        cache.connection.poll = MagicMock(
-            side_effect=psycopg2.OperationalError("Connection closed")
-        )
+        cursor = mock_connect.return_value.cursor.return_value.__enter__.return_value
+        cursor.execute.side_effect = [
+            psycopg2.OperationalError("Connection closed"),
+            None,
+        ]
 
         # ready() should attempt reconnect and succeed
         assert cache.ready()
+        # broken connection is closed and a new one is opened
+        mock_connect.return_value.close.assert_called_once()
         assert mock_connect.call_count == 2
 
 
-def test_ready_returns_false_when_poll_reconnect_fails():
-    """Test that ready() returns False when reconnect after poll error fails."""
+def test_ready_returns_false_when_broken_connection_cannot_be_replaced():
+    """Test that ready() returns False when the database is unavailable."""
     with patch("psycopg2.connect") as mock_connect:
         config = PostgresConfig()
         cache = PostgresCache(config)
 
-        cache.connection.closed = 0
-        cache.connection.poll = MagicMock(
-            side_effect=psycopg2.InterfaceError("Connection closed")
-        )
+        cursor = mock_connect.return_value.cursor.return_value.__enter__.return_value
+        cursor.execute.side_effect = psycopg2.InterfaceError("Connection closed")
         # make reconnect fail
         mock_connect.side_effect = psycopg2.OperationalError("connection refused")
 
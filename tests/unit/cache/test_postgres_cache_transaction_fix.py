@@ -1,4 +1,4 @@
-"""Unit tests for PostgresCache transaction management fix."""
+"""Unit tests for PostgresCache transaction management on pooled connections."""
 
 from unittest.mock import MagicMock, patch
 
@@ -21,7 +21,7 @@ cache_entry = CacheEntry(
 
 
 def test_insert_or_append_transaction_status_check_on_success():
-    """Test that transaction status is checked before setting autocommit on success."""
+    """Test that the connection is returned to the pool in autocommit mode on success."""
     mock_cursor = MagicMock()
     mock_cursor.fetchone.return_value = None
 
@@ -39,50 +39,49 @@ def test_insert_or_append_transaction_status_check_on_success():
 
         cache.insert_or_append(user_id, conversation_id, cache_entry)
 
-    # Verify transaction status was checked
+    # Verify transaction status was checked when returning the connection
     mock_connection.get_transaction_status.assert_called()
     # Commit should be called (successful operation)
     mock_connection.commit.assert_called()
-    # Rollback should NOT be called in finally (transaction already IDLE)
-    # Note: rollback might be called in except block, but not in finally
+    # Connection goes back to the pool in autocommit mode
     assert mock_connection.autocommit is True
 
 
 def test_insert_or_append_transaction_status_check_on_error():
-    """Test that active transaction is rolled back before setting autocommit on error."""
+    """Test that failed transaction is rolled back before the connection is reused."""
     mock_cursor = MagicMock()
     # Simulate database error
-    mock_cursor.execute.side_effect = [
-        None,  # SELECT 1 (connection check)
-        psycopg2.DatabaseError("test error"),  # advisory lock fails
-    ]
+    mock_cursor.execute.side_effect = psycopg2.DatabaseError("test error")
 
     with patch("psycopg2.connect") as mock_connect:
         mock_connection = mock_connect.return_value
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+
         # After error, transaction is still ACTIVE (not IDLE)
         mock_connection.get_transaction_status.return_value = (
             psycopg2.extensions.TRANSACTION_STATUS_INERROR
         )
-
-        config = PostgresConfig()
-        cache = PostgresCache(config)
+        mock_connection.rollback.reset_mock()
+        mock_connection.commit.reset_mock()
 
         with pytest.raises(CacheError):
             cache.insert_or_append(user_id, conversation_id, cache_entry)
 
-    # Verify transaction status was checked in finally
+    # Verify transaction status was checked when returning the connection
     mock_connection.get_transaction_status.assert_called()
-    # Rollback should be called three times:
-    # 1. Before disabling autocommit (transaction is not IDLE)
-    # 2. In the except block
-    # 3. In the finally block because transaction is not IDLE
-    assert mock_connection.rollback.call_count == 3
+    # Rollback should be called twice:
+    # 1. When the failed transaction is aborted
+    # 2. When the connection is returned because transaction is not IDLE
+    assert mock_connection.rollback.call_count == 2
+    mock_connection.commit.assert_not_called()
     assert mock_connection.autocommit is True
 
 
 def test_delete_transaction_status_check_on_success():
-    """Test that transaction status is checked before setting autocommit on delete success."""
+    """Test that the connection is returned in autocommit mode on delete success."""
     mock_cursor = MagicMock()
     mock_cursor.rowcount = 1  # Simulate successful delete
 
@@ -106,30 +105,30 @@ def test_delete_transaction_status_check_on_success():
 
 
 def test_delete_transaction_status_check_on_error():
-    """Test that active transaction is rolled back before setting autocommit on delete error."""
+    """Test that failed delete transaction is rolled back before the connection is reused."""
     mock_cursor = MagicMock()
-    mock_cursor.execute.side_effect = [
-        None,  # SELECT 1 (connection check)
-        psycopg2.DatabaseError("delete failed"),  # delete fails
-    ]
+    mock_cursor.execute.side_effect = psycopg2.DatabaseError("delete failed")
 
     with patch("psycopg2.connect") as mock_connect:
         mock_connection = mock_connect.return_value
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+
+        config = PostgresConfig()
+        cache = PostgresCache(config)
+
         # After error, transaction is still ACTIVE
         mock_connection.get_transaction_status.return_value = (
             psycopg2.extensions.TRANSACTION_STATUS_INERROR
         )
-
-        config = PostgresConfig()
-        cache = PostgresCache(config)
+        mock_connection.rollback.reset_mock()
 
         with pytest.raises(CacheError):
             cache.delete(user_id, conversation_id)
 
     mock_connection.get_transaction_status.assert_called()
-    # Rollback called three times: before disabling autocommit, in except, and in finally
-    assert mock_connection.rollback.call_count == 3
+    # Rollback called twice: when the transaction is aborted and when the
+    # connection is returned to the pool
+    assert mock_connection.rollback.call_count == 2
     assert mock_connection.autocommit is True
 
 
@@ -153,7 +152,7 @@ def test_no_extra_rollback_when_transaction_idle():
 
     # In successful case with IDLE transaction:
     # - commit() is called (during init and during insert_or_append)
-    # - rollback() should NOT be called in finally (transaction is IDLE)
+    # - rollback() should NOT be called when the connection is returned
     assert mock_connection.commit.call_count >= 1
     # Rollback should not be called at all in the success case
     mock_connection.rollback.assert_not_called()
@@ -0,0 +1,195 @@
+"""Unit tests for TieredCache class."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols.app.models.models import CacheEntry
+from ols.src.cache.postgres_cache import PostgresCache
+from ols.src.cache.tiered_cache import TieredCache
+from ols.utils import suid
+
+user_id = suid.get_suid()
+conversation_id = suid.get_suid()
+cache_entry_1 = CacheEntry(
+    query=HumanMessage("user message1"), response=AIMessage("ai message1")
+)
+cache_entry_2 = CacheEntry(
+    query=HumanMessage("user message2"), response=AIMessage("ai message2")
+)
+
+# versions of history: (first seq, last seq, created_at of the last entry)
+version_1 = (1, 1, "2026-01-01 10:00:00")
+version_2 = (1, 2, "2026-01-01 10:01:00")
+
+
+@pytest.fixture
+def backend():
+    """Fixture with mocked Postgres cache."""
+    return MagicMock(spec=PostgresCache)
+
+
+@pytest.fixture
+def cache(backend):
+    """Fixture with tiered cache in front of mocked Postgres cache."""
+    return TieredCache(backend, max_conversations=10)
+
+
+def test_get_reads_history_from_database_once(cache, backend):
+    """Test that the second read is served from the local tier."""
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    backend.history_version.return_value = version_1
+
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+
+    backend.get_with_version.assert_called_once_with(user_id, conversation_id, False)
+    backend.history_version.assert_called_once_with(user_id, conversation_id)
+
+
+def test_get_refetches_stale_history(cache, backend):
+    """Test that history changed by other replica is read again."""
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    cache.get(user_id, conversation_id)
+
+    # other replica appended an entry
+    backend.history_version.return_value = version_2
+    backend.get_with_version.return_value = (version_2, [cache_entry_1, cache_entry_2])
+
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+    assert backend.get_with_version.call_count == 2
+
+
+def test_get_returns_copies(cache, backend):
+    """Test that modifying returned entries does not change the local tier."""
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    backend.history_version.return_value = version_1
+
+    # the first read is served by the backend, the second one by the local tier
+    cache.get(user_id, conversation_id)
+    cache.get(user_id, conversation_id)[0].query.content = "changed"
+
+    assert cache.get(user_id, conversation_id)[0].query.content == "user message1"
+
+
+def test_insert_or_append_writes_through(cache, backend):
+    """Test that appended entry extends up to date local copy."""
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    cache.get(user_id, conversation_id)
+
+    backend.append_with_version.return_value = (version_1, version_2)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    backend.history_version.return_value = version_2
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+    backend.get_with_version.assert_called_once()
+    backend.append_with_version.assert_called_once_with(
+        user_id, conversation_id, cache_entry_2, False
+    )
+
+
+def test_insert_or_append_new_conversation(cache, backend):
+    """Test that history of a new conversation is cached on the first append."""
+    backend.append_with_version.return_value = (None, version_1)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    backend.history_version.return_value = version_1
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+    backend.get_with_version.assert_not_called()
+
+
+def test_insert_or_append_drops_stale_local_copy(cache, backend):
+    """Test that local copy is dropped when it was not up to date."""
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    cache.get(user_id, conversation_id)
+
+    # other replica appended an entry before this append
+    backend.append_with_version.return_value = (version_2, (1, 3, "later"))
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    backend.history_version.return_value = (1, 3, "later")
+    cache.get(user_id, conversation_id)
+    assert backend.get_with_version.call_count == 2
+
+
+def test_insert_or_append_drops_local_copy_on_eviction(cache, backend):
+    """Test that local copy is dropped when entries were evicted by the append."""
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    cache.get(user_id, conversation_id)
+
+    # the oldest entry has been evicted because of the cache capacity
+    backend.append_with_version.return_value = (version_1, (2, 2, "later"))
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    backend.history_version.return_value = (2, 2, "later")
+    cache.get(user_id, conversation_id)
+    assert backend.get_with_version.call_count == 2
+
+
+def test_delete_drops_local_copy(cache, backend):
+    """Test that deleted conversation is not served from the local tier."""
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    backend.history_version.return_value = version_1
+    backend.delete.return_value = True
+    cache.get(user_id, conversation_id)
+
+    assert cache.delete(user_id, conversation_id) is True
+
+    backend.get_with_version.return_value = (None, [])
+    assert cache.get(user_id, conversation_id) == []
+    backend.delete.assert_called_once_with(user_id, conversation_id, False)
+
+
+def test_set_topic_summary_drops_local_copy(cache, backend):
+    """Test that topic update is passed to the database and drops local copy."""
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    backend.history_version.return_value = version_1
+    cache.get(user_id, conversation_id)
+
+    cache.set_topic_summary(user_id, conversation_id, "topic")
+
+    backend.set_topic_summary.assert_called_once_with(
+        user_id, conversation_id, "topic", False
+    )
+    cache.get(user_id, conversation_id)
+    assert backend.get_with_version.call_count == 2
+
+
+def test_replace_history_drops_local_copy(cache, backend):
+    """Test that replaced history is passed to the database and drops local copy."""
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    backend.history_version.return_value = version_1
+    cache.get(user_id, conversation_id)
+
+    cache.replace_history(user_id, conversation_id, [cache_entry_2])
+
+    backend.replace_history.assert_called_once_with(
+        user_id, conversation_id, [cache_entry_2], False
+    )
+    cache.get(user_id, conversation_id)
+    assert backend.get_with_version.call_count == 2
+
+
+def test_local_tier_is_bounded(backend):
+    """Test that the least recently used conversation is evicted from the tier."""
+    cache = TieredCache(backend, max_conversations=1)
+    other_conversation_id = suid.get_suid()
+    backend.get_with_version.return_value = (version_1, [cache_entry_1])
+    backend.history_version.return_value = version_1
+
+    cache.get(user_id, conversation_id)
+    cache.get(user_id, other_conversation_id)
+    cache.get(user_id, conversation_id)
+
+    assert backend.get_with_version.call_count == 3
+
+
+def test_list_and_ready_are_delegated(cache, backend):
+    """Test that list and ready operations are passed to the database."""
+    backend.list.return_value = []
+    backend.ready.return_value = True
+
+    assert cache.list(user_id) == []
+    assert cache.ready() is True
+    backend.list.assert_called_once_with(user_id, False)
@@ -0,0 +1,64 @@
+"""Unit tests for cache value codecs."""
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols import constants
+from ols.app.models.models import CacheEntry, MessageEncoder
+from ols.src.cache.value_codec import (
+    JSONCodec,
+    ZlibJSONCodec,
+    decode_value,
+    encode_value,
+)
+
+small_entry = CacheEntry(
+    query=HumanMessage("user message"), response=AIMessage("ai message")
+)
+large_entry = CacheEntry(
+    query=HumanMessage("What is wrong with my pod?"),
+    response=AIMessage("The pod is restarting because its liveness probe fails."),
+    tool_calls=[{"name": "pods_get", "args": {"name": "web-1"}, "id": "call_1"}],
+    tool_results=[
+        {
+            "id": "call_1",
+            "status": "success",
+            "content": '{"kind": "Pod", "status": {"phase": "Running"}}' * 50,
+            "type": "tool_result",
+        }
+    ],
+)
+
+
+def test_small_value_is_stored_as_json():
+    """Test that small value is not compressed."""
+    value = encode_value(small_entry.to_dict())
+
+    assert value[0] == JSONCodec.format_id
+    assert len(value) < constants.POSTGRES_CACHE_COMPRESSION_THRESHOLD
+    assert CacheEntry.from_dict(decode_value(value)) == small_entry
+
+
+def test_large_value_is_compressed():
+    """Test that large value is compressed and decoded back."""
+    plain = json.dumps(large_entry.to_dict(), cls=MessageEncoder).encode("utf-8")
+    value = encode_value(large_entry.to_dict())
+
+    assert value[0] == ZlibJSONCodec.format_id
+    assert len(value) < len(plain)
+    assert CacheEntry.from_dict(decode_value(value)) == large_entry
+
+
+def test_legacy_json_value_is_decoded():
+    """Test that value without header written by older versions is decoded."""
+    plain = json.dumps(large_entry.to_dict(), cls=MessageEncoder).encode("utf-8")
+
+    assert CacheEntry.from_dict(decode_value(memoryview(plain))) == large_entry
+
+
+def test_empty_value():
+    """Test that empty value can not be decoded."""
+    with pytest.raises(ValueError, match="Empty value"):
+        decode_value(b"")
@@ -12,7 +12,11 @@ from opentelemetry.sdk.trace.export import (
 )
 
 from ols import config
+from ols.src.auth.k8s import auth_decision_cache
+from ols.src.rag.embedding_models import embedding_models
+from ols.src.rag.embeddings import embedding_cache
 from ols.utils.audit_logger import AuditContext, AuditLogger
+from ols.utils.postgres import PostgresConnectionPool
 
 
 class CollectingExporter(SpanExporter):
@@ -57,3 +61,31 @@ def make_audit_ctx(otel_setup, conversation_id="conv-test", user_id="user-test")
 def ensure_empty_config_for_each_unit_test_by_default():
     """Set up fixture for all unit tests."""
     config.reload_empty()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def close_shared_postgres_pools():
+    """Do not share pooled (mocked) Postgres connections between unit tests."""
+    yield
+    PostgresConnectionPool.close_all()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_auth_decision_cache():
+    """Do not reuse K8S authentication decisions between unit tests."""
+    yield
+    auth_decision_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_embedding_cache():
+    """Do not reuse (mocked) embeddings between unit tests."""
+    yield
+    embedding_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_embedding_models():
+    """Do not share (mocked) embedding models between unit tests."""
+    yield
+    embedding_models.clear()
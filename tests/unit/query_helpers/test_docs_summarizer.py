@@ -1,5 +1,6 @@
 """Unit tests for DocsSummarizer PR2 class."""
 
+import asyncio
 import logging
 from typing import ClassVar
 from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
@@ -26,6 +27,7 @@ from ols.src.query_helpers.docs_summarizer import (  # noqa: E402
     DocsSummarizer,
     QueryHelper,
 )
+from ols.src.skills.skills_rag import SkillLoadResult  # noqa: E402
 from ols.utils.logging_configurator import configure_logging  # noqa: E402
 from ols.utils.mcp_utils import build_mcp_config, gather_mcp_tools  # noqa: E402
 from ols.utils.token_handler import (  # noqa: E402
@@ -292,6 +294,109 @@ async def test_response_generator_emits_history_events_before_tokens():
     ) < chunk_types.index(StreamChunkType.TEXT)
 
 
+@pytest.mark.asyncio
+async def test_generate_response_prepares_history_and_tools_concurrently():
+    """Test history is read from cache while tools are being resolved."""
+    summarizer = DocsSummarizer(
+        llm_loader=mock_llm_loader(mock_langchain_interface("test response")())
+    )
+    summarizer._tool_calling_enabled = True
+    history_started = asyncio.Event()
+    tools_started = asyncio.Event()
+
+    async def slow_history_fetch(*args):
+        history_started.set()
+        # would time out when tools were resolved only after history
+        await asyncio.wait_for(tools_started.wait(), timeout=5)
+        return []
+
+    async def slow_tools(*args):
+        tools_started.set()
+        await asyncio.wait_for(history_started.wait(), timeout=5)
+        return []
+
+    with (
+        patch(
+            "ols.src.query_helpers.docs_summarizer.retrieve_history_entries",
+            side_effect=slow_history_fetch,
+        ),
+        patch(
+            "ols.src.query_helpers.docs_summarizer.get_mcp_tools",
+            side_effect=slow_tools,
+        ),
+    ):
+        chunks = [
+            chunk
+            async for chunk in summarizer.generate_response(
+                "test query", user_id="user", conversation_id="conversation"
+            )
+        ]
+
+    assert any(chunk.type == StreamChunkType.END for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_generate_response_resolves_tools_for_selected_skill():
+    """Test tools are filtered by the query extended by the selected skill."""
+    summarizer = DocsSummarizer(
+        llm_loader=mock_llm_loader(mock_langchain_interface("test response")())
+    )
+    summarizer._tool_calling_enabled = True
+    skill = MagicMock()
+    skill.name = "upgrade"
+    skill.load_skill.return_value = SkillLoadResult(
+        content="Check cluster operators.", has_support_files=False, ok=True
+    )
+    skills_rag = MagicMock()
+    skills_rag.retrieve_skill.return_value = (skill, 0.9)
+
+    with (
+        patch.object(
+            AppConfig, "skills_rag", new_callable=PropertyMock, return_value=skills_rag
+        ),
+        patch(
+            "ols.src.query_helpers.docs_summarizer.get_mcp_tools",
+            new=AsyncMock(return_value=[]),
+        ) as mock_get_tools,
+    ):
+        chunks = [chunk async for chunk in summarizer.generate_response("upgrade")]
+
+    assert chunks[0].type == StreamChunkType.SKILL_SELECTED
+    assert chunks[0].data == {"name": "upgrade", "confidence": 0.9}
+    assert mock_get_tools.await_args.args[0] == "Check cluster operators.\n\nupgrade"
+
+
+@pytest.mark.asyncio
+async def test_generate_response_cancels_preparation_on_failure():
+    """Test pending preparation stages are cancelled when one of them fails."""
+    summarizer = DocsSummarizer(
+        llm_loader=mock_llm_loader(mock_langchain_interface("test response")())
+    )
+    summarizer._tool_calling_enabled = True
+    tools_cancelled = asyncio.Event()
+
+    async def hanging_tools(*args):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            tools_cancelled.set()
+            raise
+
+    retriever = MagicMock()
+    retriever.aretrieve = AsyncMock(side_effect=RuntimeError("index failure"))
+    with (
+        patch(
+            "ols.src.query_helpers.docs_summarizer.get_mcp_tools",
+            side_effect=hanging_tools,
+        ),
+        pytest.raises(RuntimeError, match="index failure"),
+    ):
+        async for _ in summarizer.generate_response("test query", retriever):
+            pass
+
+    assert tools_cancelled.is_set()
+
+
 async def async_mock_invoke(yield_values):
     """Mock async invoke_llm function to simulate LLM behavior."""
     for value in yield_values:
@@ -499,8 +604,8 @@ def test_tool_output_token_tracking_uses_buffer_weight(caplog):
 
     Before this fix, raw len(tokens) was used for tool outputs while tool definitions
     and AIMessage tokens used _get_token_count() (which applies a 1.1x buffer).
-    This test asserts _get_token_count() is called for tool output tokens by spying on
-    it: with one tool call in one round it must be called at least 3 times
+    This test asserts the buffer (_buffered_count()) is applied to tool output tokens by
+    spying on it: with one tool call in one round it must be called at least 3 times
     (tool definitions, AIMessage, tool output).
     """
     mcp_servers_config = {
@@ -510,13 +615,13 @@ def test_tool_output_token_tracking_uses_buffer_weight(caplog):
         },
     }
 
-    original_get_token_count = TokenHandler._get_token_count
+    original_buffered_count = TokenHandler._buffered_count
     call_count = 0
 
-    def counting_get_token_count(tokens: list) -> int:
+    def counting_buffered_count(count: int) -> int:
         nonlocal call_count
         call_count += 1
-        return original_get_token_count(tokens)
+        return original_buffered_count(count)
 
     with (
         patch(
@@ -529,7 +634,7 @@ def test_tool_output_token_tracking_uses_buffer_weight(caplog):
         ) as mock_invoke,
         patch("ols.utils.mcp_utils.config") as mock_config,
         patch.object(
-            TokenHandler, "_get_token_count", staticmethod(counting_get_token_count)
+            TokenHandler, "_buffered_count", staticmethod(counting_buffered_count)
         ),
     ):
         mock_config.tools_rag = None
@@ -563,12 +668,12 @@ def test_tool_output_token_tracking_uses_buffer_weight(caplog):
         summarizer.model_config.max_tokens_for_tools = 50000
         summarizer.create_response("How many namespaces?")
 
-    # _get_token_count must be called for:
+    # _buffered_count must be called for:
     #   1. tool definitions (once at the start of the loop)
     #   2. AIMessage with tool_calls
     #   3. tool output (the change introduced by this fix)
     assert call_count >= 3, (
-        f"Expected _get_token_count to be called at least 3 times "
+        f"Expected _buffered_count to be called at least 3 times "
         f"(definitions + AIMessage + tool output), got {call_count}"
     )
 
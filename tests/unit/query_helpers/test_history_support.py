@@ -9,8 +9,10 @@ from ols import config
 from ols.app.models.models import CacheEntry
 from ols.src.query_helpers.history_support import (
     DEFAULT_ENTRIES_TO_KEEP,
+    _split_entries_by_token_budget,
     compress_conversation_history,
     prepare_history,
+    retrieve_history_entries,
     summarize_entries,
 )
 from ols.utils import suid
@@ -188,8 +190,7 @@ async def test_compress_conversation_history_summarizes_oldest_at_keep_threshold
     ]
 
     with (
-        patch("ols.config.conversation_cache.delete") as mock_cache_delete,
-        patch("ols.config.conversation_cache.insert_or_append") as mock_cache_insert,
+        patch("ols.config.conversation_cache.replace_history") as mock_cache_replace,
     ):
         result = await compress_conversation_history(
             user_id,
@@ -207,8 +208,7 @@ async def test_compress_conversation_history_summarizes_oldest_at_keep_threshold
     assert len(result) == DEFAULT_ENTRIES_TO_KEEP
     assert result[0].query.content == "[Previous conversation summary]"
     assert result[1:] == cache_entries[1:]
-    mock_cache_delete.assert_called_once_with(user_id, conversation_id, True)
-    assert mock_cache_insert.call_count == DEFAULT_ENTRIES_TO_KEEP
+    mock_cache_replace.assert_called_once_with(user_id, conversation_id, result, True)
 
 
 @pytest.mark.asyncio
@@ -233,8 +233,7 @@ async def test_compress_conversation_history_successful_compression():
                 )
             ),
         ),
-        patch("ols.config.conversation_cache.delete") as mock_cache_delete,
-        patch("ols.config.conversation_cache.insert_or_append") as mock_cache_insert,
+        patch("ols.config.conversation_cache.replace_history") as mock_cache_replace,
     ):
         result = await compress_conversation_history(
             user_id,
@@ -253,8 +252,7 @@ async def test_compress_conversation_history_successful_compression():
         result[0].response.content
         == f"Summary of first {DEFAULT_ENTRIES_TO_KEEP} conversations"
     )
-    mock_cache_delete.assert_called_once_with(user_id, conversation_id, True)
-    assert mock_cache_insert.call_count == 6
+    mock_cache_replace.assert_called_once_with(user_id, conversation_id, result, True)
 
 
 @pytest.mark.asyncio
@@ -309,7 +307,8 @@ async def test_compress_conversation_history_cache_update_failure(caplog):
             new=AsyncMock(return_value="Summary of conversations"),
         ),
         patch(
-            "ols.config.conversation_cache.delete", side_effect=Exception("Cache error")
+            "ols.config.conversation_cache.replace_history",
+            side_effect=Exception("Cache error"),
         ),
     ):
         result = await compress_conversation_history(
@@ -347,8 +346,7 @@ async def test_compress_conversation_history_compresses_small_count_when_token_l
             "ols.src.query_helpers.history_support.summarize_entries",
             new=AsyncMock(return_value="summary"),
         ),
-        patch("ols.config.conversation_cache.delete") as mock_cache_delete,
-        patch("ols.config.conversation_cache.insert_or_append") as mock_cache_insert,
+        patch("ols.config.conversation_cache.replace_history") as mock_cache_replace,
     ):
         result = await compress_conversation_history(
             user_id,
@@ -365,8 +363,7 @@ async def test_compress_conversation_history_compresses_small_count_when_token_l
     assert len(result) == 3
     assert result[0].query.content == "[Previous conversation summary]"
     assert result[0].response.content == "summary"
-    mock_cache_delete.assert_called_once_with(user_id, conversation_id, True)
-    assert mock_cache_insert.call_count == 3
+    mock_cache_replace.assert_called_once_with(user_id, conversation_id, result, True)
 
 
 @pytest.mark.asyncio
@@ -383,8 +380,9 @@ async def test_prepare_history_skips_compression_when_disabled():
     ]
 
     mock_token_handler = MagicMock(spec=TokenHandler)
-    mock_token_handler.text_to_tokens.side_effect = lambda text: [0] * max(
-        1, len(text) // 10
+    mock_token_handler.count_entry_tokens.side_effect = lambda entry: (
+        max(1, len(entry.query.content) // 10),
+        max(1, len(entry.response.content) // 10),
     )
     mock_token_handler.limit_conversation_history.return_value = (
         CacheEntry.cache_entries_to_history(cache_entries[-2:]),
@@ -413,6 +411,121 @@ async def test_prepare_history_skips_compression_when_disabled():
         ]
 
     assert mock_compress.await_count == 0
+    # history is limited using the per-entry token counts, not by re-tokenizing
+    mock_token_handler.limit_conversation_history.assert_called_once_with(
+        CacheEntry.cache_entries_to_history(cache_entries), 20, [1] * 16
+    )
     history, truncated = items[-1]
     assert history == CacheEntry.cache_entries_to_history(cache_entries[-2:])
     assert truncated is True
+
+
+@pytest.mark.asyncio
+async def test_retrieve_history_entries_reads_cache():
+    """Test retrieve_history_entries returns conversation entries from cache."""
+    cache_entries = [
+        CacheEntry(
+            query=HumanMessage(content="Query"),
+            response=AIMessage(content="Response"),
+        )
+    ]
+    with patch(
+        "ols.config.conversation_cache.get", return_value=cache_entries
+    ) as mock_get:
+        entries = await retrieve_history_entries("test_user", "conversation", True)
+
+    assert entries == cache_entries
+    mock_get.assert_called_once_with("test_user", "conversation", True)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_history_entries_without_conversation():
+    """Test retrieve_history_entries does not read cache without conversation ID."""
+    with patch("ols.config.conversation_cache.get") as mock_get:
+        entries = await retrieve_history_entries("test_user", None, True)
+
+    assert entries == []
+    mock_get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_prepare_history_uses_prefetched_entries():
+    """Test prepare_history does not read cache when entries are provided."""
+    cache_entries = [
+        CacheEntry(
+            query=HumanMessage(content="Query"),
+            response=AIMessage(content="Response"),
+        )
+    ]
+    token_handler = MagicMock(spec=TokenHandler)
+    token_handler.count_entry_tokens.return_value = (1, 1)
+    token_handler.limit_conversation_history.return_value = (
+        CacheEntry.cache_entries_to_history(cache_entries),
+        False,
+    )
+    with (
+        patch("ols.config.conversation_cache.get") as mock_get,
+        patch("ols.config.ols_config.history_compression_enabled", False),
+    ):
+        items = [
+            item
+            async for item in prepare_history(
+                user_id="test_user",
+                conversation_id=suid.get_suid(),
+                skip_user_id_check=True,
+                available_tokens=20,
+                provider="p",
+                model="m",
+                bare_llm=MagicMock(),
+                token_handler=token_handler,
+                cache_entries=cache_entries,
+            )
+        ]
+
+    mock_get.assert_not_called()
+    assert items[-1] == (CacheEntry.cache_entries_to_history(cache_entries), False)
+
+
+@patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.0)
+def test_split_entries_by_token_budget_uses_stored_token_counts():
+    """Test that history is budgeted by stored token counts without tokenizing."""
+    entries = [
+        CacheEntry(
+            query=HumanMessage(content=f"Query {i}"),
+            response=AIMessage(content=f"Response {i}"),
+            query_tokens=4,
+            response_tokens=4,
+        )
+        for i in range(3)
+    ]
+    token_handler = TokenHandler()
+
+    # every entry takes 4 + 4 tokens plus one separator per message
+    with patch.object(token_handler, "text_to_tokens") as mock_text_to_tokens:
+        assert _split_entries_by_token_budget(entries, 30, token_handler) == (
+            entries[::-1],
+            False,
+        )
+        assert _split_entries_by_token_budget(entries, 29, token_handler) == (
+            [entries[2], entries[1]],
+            True,
+        )
+        assert _split_entries_by_token_budget(entries, 9, token_handler) == ([], True)
+    mock_text_to_tokens.assert_not_called()
+
+
+def test_split_entries_by_token_budget_backfills_token_counts():
+    """Test that entries stored without token counts are counted once."""
+    entries = [
+        CacheEntry(
+            query=HumanMessage(content="What is Kubernetes?"),
+            response=AIMessage(content="Kubernetes is a container orchestrator."),
+        )
+    ]
+
+    kept, overflowed = _split_entries_by_token_budget(entries, 1000, TokenHandler())
+
+    assert kept == entries
+    assert not overflowed
+    assert entries[0].query_tokens is not None
+    assert entries[0].response_tokens is not None
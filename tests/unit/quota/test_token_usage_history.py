@@ -42,8 +42,6 @@ def test_consume_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be read from storage
         # and the initialization of new record should be made
         call(
@@ -92,7 +90,7 @@ def test_consume_tokens_on_disconnected_db():
             q = TokenUsageHistory(config)
 
             # simulate DB disconnection
-            q.connection = None
+            q.pool = None
 
             assert not q.connected()
 
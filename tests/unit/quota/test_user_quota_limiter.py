@@ -73,8 +73,6 @@ def test_available_quota_with_data():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be read from storage
         call(
             UserQuotaLimiter.SELECT_QUOTA,
@@ -158,7 +156,7 @@ def test_available_quota_on_disconnected_db():
             q = UserQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
+            q.pool = None
             assert not q.connected()
 
             # try to retrieve available quota for given user
@@ -203,8 +201,6 @@ def test_revoke_quota():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be written into the storage
         call(
             UserQuotaLimiter.SET_AVAILABLE_QUOTA,
@@ -242,7 +238,7 @@ def test_revoke_quota_on_disconnected_db():
             q = UserQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
+            q.pool = None
             assert not q.connected()
 
             # try to revoke quota
@@ -287,8 +283,6 @@ def test_consume_tokens_not_enough():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             # quota for given user should be read from storage
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -333,8 +327,6 @@ def test_consume_input_tokens_enough_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             # quota for given user should be read from storage
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -379,8 +371,6 @@ def test_consume_output_tokens_enough_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             # quota for given user should be read from storage
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -427,8 +417,6 @@ def test_consume_input_and_output_tokens_enough_tokens():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
             (-to_be_consumed, timestamp, user_id, subject),
@@ -470,8 +458,6 @@ def test_consume_tokens_on_no_record():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         call(
             # quota for given user should be read from storage
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -512,7 +498,7 @@ def test_consume_tokens_on_disconnected_db():
             q = UserQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
+            q.pool = None
             assert not q.connected()
 
             # try to consume tokens
@@ -556,8 +542,6 @@ def test_increase_quota():
 
     # expected calls to storage
     calls = [
-        # check if storage connection is alive
-        call("SELECT 1"),
         # quota for given user should be written into the storage
         call(
             UserQuotaLimiter.UPDATE_AVAILABLE_QUOTA,
@@ -595,7 +579,7 @@ def test_increase_quota_on_disconnected_db():
             q = UserQuotaLimiter(config, quota_limit)
 
             # simulate DB disconnection
-            q.connection = None
+            q.pool = None
             assert not q.connected()
 
             # try to increase quota
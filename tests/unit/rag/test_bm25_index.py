@@ -0,0 +1,114 @@
+"""Unit tests for the incremental BM25 index."""
+
+import math
+
+import pytest
+
+from ols.src.rag.bm25_index import BM25Index
+
+CORPUS = {
+    "pods": ["list", "kubernetes", "pods", "namespace"],
+    "namespaces": ["list", "kubernetes", "namespaces"],
+    "files": ["read", "contents", "file"],
+}
+
+
+def _index(corpus: dict[str, list[str]]) -> BM25Index:
+    """Create BM25 index of the corpus."""
+    index = BM25Index()
+    for doc_id, tokens in corpus.items():
+        index.add(doc_id, tokens)
+    return index
+
+
+def test_scores_follow_bm25_formula():
+    """Test that scores are BM25 of query terms in the current corpus."""
+    index = _index(CORPUS)
+
+    scores = index.scores(["pods"])
+
+    idf = math.log(1 + (3 - 1 + 0.5) / (1 + 0.5))
+    norm = 1.5 * (1 - 0.75 + 0.75 * 4 / (10 / 3))
+    assert scores == {"pods": pytest.approx(idf * 2.5 / (1 + norm))}
+
+
+def test_documents_without_query_terms_are_not_scored():
+    """Test that only documents containing query terms are scored."""
+    index = _index(CORPUS)
+
+    assert set(index.scores(["kubernetes", "unknown"])) == {"pods", "namespaces"}
+    assert index.scores(["unknown"]) == {}
+    assert BM25Index().scores(["pods"]) == {}
+
+
+def test_rarer_terms_score_higher():
+    """Test that IDF is positive and decreases with document frequency."""
+    index = _index(CORPUS)
+
+    assert index.idf("kubernetes") > 0
+    assert index.idf("file") > index.idf("kubernetes")
+
+
+def test_incremental_updates_match_index_built_at_once():
+    """Test that adding, replacing and removing documents keeps statistics exact."""
+    index = _index(CORPUS)
+    index.add("pods", ["get", "pods", "logs"])
+    index.add("nodes", ["list", "nodes"])
+    assert index.remove("files")
+    assert not index.remove("files")
+
+    expected = _index(
+        {
+            "pods": ["get", "pods", "logs"],
+            "namespaces": ["list", "kubernetes", "namespaces"],
+            "nodes": ["list", "nodes"],
+        }
+    )
+    query = ["list", "pods", "file", "kubernetes"]
+    assert index.scores(query) == pytest.approx(expected.scores(query))
+    assert set(index.doc_ids()) == {"pods", "namespaces", "nodes"}
+    assert len(index) == 3
+
+
+def test_removing_all_documents_empties_index():
+    """Test that no postings are left after all documents are removed."""
+    index = _index(CORPUS)
+
+    for doc_id in CORPUS:
+        index.remove(doc_id)
+
+    assert len(index) == 0
+    assert not index._postings
+    assert index.scores(["list"]) == {}
+
+
+def test_statistics_are_not_changed_by_updates():
+    """Test that statistics taken before an update keep scoring the old corpus."""
+    index = _index(CORPUS)
+    statistics = index.statistics()
+    before = statistics.scores(["kubernetes", "file"])
+
+    index.add("logs", ["read", "pod", "logs"])
+    index.remove("pods")
+
+    assert statistics.scores(["kubernetes", "file"]) == before
+    assert len(statistics) == 3
+    assert index.statistics().scores(["kubernetes", "file"]) == index.scores(
+        ["kubernetes", "file"]
+    )
+    assert set(index.statistics().scores(["kubernetes"])) == {"namespaces"}
+
+
+def test_statistics_share_postings_of_unchanged_terms():
+    """Test that only postings of changed terms are copied to new statistics."""
+    index = _index(CORPUS)
+    statistics = index.statistics()
+
+    assert index.statistics() is statistics
+
+    index.add("logs", ["read", "logs"])
+    updated = index.statistics()
+
+    assert updated.postings["kubernetes"] is statistics.postings["kubernetes"]
+    assert updated.postings["read"] is not statistics.postings["read"]
+    assert dict(updated.postings["read"]) == {"files": 1, "logs": 1}
@@ -0,0 +1,78 @@
+"""Unit tests for micro-batching of text embeddings."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ols.src.rag.embedding_batcher import EmbeddingBatcher
+
+
+def _encode_batch(texts: list[str]) -> list[list[float]]:
+    """Fake batch encode: embed every text into its length."""
+    return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_texts_are_encoded_in_one_batch():
+    """Test that texts submitted within the wait time are encoded together."""
+    encode_batch = MagicMock(side_effect=_encode_batch)
+    batcher = EmbeddingBatcher("model", encode_batch, max_batch_size=8, max_wait=0.5)
+
+    futures = [batcher.submit(text) for text in ("a", "bb", "ccc")]
+
+    assert [future.result(timeout=5) for future in futures] == [[1.0], [2.0], [3.0]]
+    encode_batch.assert_called_once_with(["a", "bb", "ccc"])
+
+
+def test_batches_are_limited_by_max_batch_size():
+    """Test that large batch is split into batches of at most max_batch_size texts."""
+    encode_batch = MagicMock(side_effect=_encode_batch)
+    batcher = EmbeddingBatcher("model", encode_batch, max_batch_size=2, max_wait=0.5)
+
+    vectors = batcher.encode_batch(["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert [len(call.args[0]) for call in encode_batch.call_args_list] == [2, 2, 1]
+
+
+def test_single_text_is_encoded():
+    """Test that text is encoded when no other text comes within the wait time."""
+    batcher = EmbeddingBatcher("model", _encode_batch, max_wait=0.001)
+
+    assert batcher.encode("pods") == [4.0]
+
+
+def test_failure_is_propagated_to_all_texts_of_batch():
+    """Test that all callers of a failed batch get the error."""
+    encode_batch = MagicMock(side_effect=RuntimeError("model failure"))
+    batcher = EmbeddingBatcher("model", encode_batch, max_wait=0.5)
+
+    futures = [batcher.submit(text) for text in ("a", "b")]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model failure"):
+            future.result(timeout=5)
+
+
+def test_wrong_number_of_embeddings_is_an_error():
+    """Test that embeddings are not mismatched with texts."""
+    batcher = EmbeddingBatcher("model", lambda texts: [[0.0]], max_wait=0.5)
+
+    futures = [batcher.submit(text) for text in ("a", "b")]
+
+    with pytest.raises(ValueError, match="1 embeddings for 2 texts"):
+        futures[0].result(timeout=5)
+
+
+def test_idle_worker_exits_and_is_restarted():
+    """Test that the worker thread exits when idle and starts again when needed."""
+    batcher = EmbeddingBatcher("model", _encode_batch, max_wait=0.001)
+
+    with patch("ols.src.rag.embedding_batcher._WORKER_IDLE_TIMEOUT", 0.01):
+        assert batcher.encode("pods") == [4.0]
+        deadline = time.monotonic() + 5
+        while batcher._worker is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert batcher._worker is None
+
+        assert batcher.encode("nodes") == [5.0]
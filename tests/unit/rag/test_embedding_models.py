@@ -0,0 +1,108 @@
+"""Unit tests for the embedding model registry."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ols.src.rag.embedding_models import EmbeddingModelRegistry
+
+
+def _model(path: str) -> MagicMock:
+    """Fake embedding model embedding texts into their lengths."""
+    model = MagicMock(path=path)
+    model.get_text_embedding_batch.side_effect = lambda texts: [
+        [float(len(text))] for text in texts
+    ]
+    return model
+
+
+def test_model_is_loaded_once():
+    """Test that all consumers of one model share its instance."""
+    loader = MagicMock(side_effect=_model)
+    registry = EmbeddingModelRegistry(loader)
+
+    first = registry.get("all-mpnet-base-v2")
+    second = registry.get("all-mpnet-base-v2")
+    other = registry.get("granite-embedding-30m-english")
+
+    assert first is second
+    assert other is not first
+    assert loader.call_count == 2
+    assert "all-mpnet-base-v2" in registry
+
+
+def test_concurrent_consumers_load_model_once():
+    """Test that a model requested from several threads at once is loaded once."""
+    release = threading.Event()
+
+    def slow_loader(path):
+        release.wait(timeout=5)
+        return _model(path)
+
+    loader = MagicMock(side_effect=slow_loader)
+    registry = EmbeddingModelRegistry(loader)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(registry.get, "model") for _ in range(4)]
+        release.set()
+        models = [future.result() for future in futures]
+
+    loader.assert_called_once_with("model")
+    assert all(model is models[0] for model in models)
+
+
+def test_eager_encode_batch_fn_loads_model():
+    """Test that the model is loaded when eager encode function is requested."""
+    registry = EmbeddingModelRegistry(_model)
+
+    encode_batch = registry.encode_batch_fn("model")
+
+    assert "model" in registry
+    assert encode_batch(["pods", "nodes"]) == [[4.0], [5.0]]
+
+
+def test_lazy_encode_batch_fn_loads_model_on_first_use():
+    """Test that the model is loaded when lazy encode function is first used."""
+    registry = EmbeddingModelRegistry(_model)
+
+    encode_batch = registry.encode_batch_fn("model", lazy=True)
+    assert "model" not in registry
+
+    assert encode_batch(["pods"]) == [[4.0]]
+    assert "model" in registry
+
+
+def test_failed_load_is_retried():
+    """Test that a model which failed to load is loaded again on next request."""
+    loader = MagicMock(side_effect=[OSError("no such model"), _model("model")])
+    registry = EmbeddingModelRegistry(loader)
+
+    with pytest.raises(OSError, match="no such model"):
+        registry.get("model")
+
+    assert registry.get("model") is not None
+    assert loader.call_count == 2
+
+
+def test_resident_memory_of_model_is_recorded():
+    """Test that the resident memory growth caused by loading is recorded."""
+    registry = EmbeddingModelRegistry(_model)
+
+    with patch(
+        "ols.src.rag.embedding_models.resident_memory_bytes",
+        side_effect=[100 * 1024 * 1024, 500 * 1024 * 1024],
+    ):
+        registry.get("model")
+
+    assert registry.resident_memory() == {"model": 400 * 1024 * 1024}
+
+
+def test_resident_memory_is_not_known():
+    """Test that the model is loaded when resident memory can not be measured."""
+    registry = EmbeddingModelRegistry(_model)
+
+    with patch("ols.src.rag.embedding_models.resident_memory_bytes", return_value=None):
+        assert registry.get("model") is not None
+
+    assert registry.resident_memory() == {}
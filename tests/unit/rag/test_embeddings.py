@@ -0,0 +1,152 @@
+"""Unit tests for the memoized embedding service."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from ols.src.rag.embeddings import (
+    EmbeddingCache,
+    EmbeddingService,
+    embedding_cache,
+    normalize_text,
+)
+
+DIMENSION = 8
+
+
+def _fake_encode(text: str) -> list[float]:
+    """Deterministic encode: sum of char ordinals spread across DIMENSION dims."""
+    total = sum(ord(c) for c in text)
+    return [(total + i) / 1000.0 for i in range(DIMENSION)]
+
+
+def test_normalize_text() -> None:
+    """Verify that surrounding and repeated whitespace is collapsed."""
+    assert normalize_text("  list \n pods\tin  namespace ") == "list pods in namespace"
+
+
+def test_embedding_is_memoized() -> None:
+    """Verify the same (normalized) text is encoded only once."""
+    encode = MagicMock(side_effect=_fake_encode)
+    service = EmbeddingService("model", encode, EmbeddingCache())
+
+    first = service.embed("list pods")
+    second = service("  list   pods ")
+
+    assert first == second == _fake_encode("list pods")
+    encode.assert_called_once_with("list pods")
+
+
+def test_embeddings_of_different_models_are_not_shared() -> None:
+    """Verify the model ID is part of the cache key."""
+    cache = EmbeddingCache()
+    encode_a = MagicMock(side_effect=_fake_encode)
+    encode_b = MagicMock(side_effect=lambda text: [0.0] * DIMENSION)
+
+    EmbeddingService("model-a", encode_a, cache).embed("list pods")
+    vector = EmbeddingService("model-b", encode_b, cache).embed("list pods")
+
+    assert vector == [0.0] * DIMENSION
+    encode_a.assert_called_once()
+    encode_b.assert_called_once()
+
+
+def test_services_of_one_model_share_the_cache() -> None:
+    """Verify that consumers of one model reuse each other's embeddings."""
+    embedding_cache.clear()
+    encode = MagicMock(side_effect=_fake_encode)
+
+    EmbeddingService("model", encode).embed("list pods")
+    EmbeddingService("model", encode).embed("list pods")
+
+    encode.assert_called_once()
+
+
+def test_numpy_like_embedding_is_converted_to_list() -> None:
+    """Verify embeddings with tolist() (numpy arrays) are returned as lists."""
+    vector = MagicMock()
+    vector.tolist.return_value = [1, 2, 3]
+    service = EmbeddingService("model", lambda text: vector, EmbeddingCache())
+
+    assert service.embed("query") == [1.0, 2.0, 3.0]
+    assert service.embed("query") == [1.0, 2.0, 3.0]
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """Verify the cache is bounded."""
+    cache = EmbeddingCache(max_entries=2)
+    cache.put(("model", "a"), [1.0])
+    cache.put(("model", "b"), [2.0])
+    assert cache.get(("model", "a")) == [1.0]
+
+    cache.put(("model", "c"), [3.0])
+
+    assert len(cache) == 2
+    assert cache.get(("model", "b")) is None
+    assert cache.get(("model", "a")) == [1.0]
+    assert cache.get(("model", "c")) == [3.0]
+
+
+def test_failed_encode_is_not_cached() -> None:
+    """Verify an encode failure is propagated and the text is encoded again."""
+    encode = MagicMock(side_effect=[RuntimeError("model failure"), [1.0]])
+    service = EmbeddingService("model", encode, EmbeddingCache())
+
+    with pytest.raises(RuntimeError, match="model failure"):
+        service.embed("query")
+
+    assert service.embed("query") == [1.0]
+    assert encode.call_count == 2
+
+
+def test_concurrent_embeddings_share_one_encode() -> None:
+    """Verify concurrent requests for one text wait for the encode in flight."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = 0
+
+    def blocking_encode(text: str) -> list[float]:
+        nonlocal calls
+        calls += 1
+        started.set()
+        release.wait(timeout=5)
+        return _fake_encode(text)
+
+    service = EmbeddingService("model", blocking_encode, EmbeddingCache())
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        owner = executor.submit(service.embed, "list pods")
+        assert started.wait(timeout=5)
+        followers = [executor.submit(service.embed, "list pods") for _ in range(2)]
+        release.set()
+        results = [owner.result(), *(f.result() for f in followers)]
+
+    assert calls == 1
+    assert results == [_fake_encode("list pods")] * 3
+
+
+def test_embed_batch_encodes_only_missing_texts():
+    """Verify cached texts are not encoded again and duplicates are encoded once."""
+    encode = MagicMock(side_effect=_fake_encode)
+    encode_batch = MagicMock(side_effect=lambda texts: [_fake_encode(t) for t in texts])
+    service = EmbeddingService(
+        "model", encode, EmbeddingCache(), encode_batch_fn=encode_batch
+    )
+    service.embed("list pods")
+
+    vectors = service.embed_batch(["list  pods", "get nodes", "get nodes"])
+
+    assert vectors == [_fake_encode("list pods")] + [_fake_encode("get nodes")] * 2
+    encode_batch.assert_called_once_with(["get nodes"])
+    assert service.embed("get nodes") == _fake_encode("get nodes")
+    encode.assert_called_once_with("list pods")
+
+
+def test_embed_batch_without_batch_function():
+    """Verify texts are encoded one by one when no batch function is given."""
+    encode = MagicMock(side_effect=_fake_encode)
+    service = EmbeddingService("model", encode, EmbeddingCache())
+
+    assert service.embed_batch(["a", "b"]) == [_fake_encode("a"), _fake_encode("b")]
+    assert encode.call_count == 2
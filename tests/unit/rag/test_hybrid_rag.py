@@ -1,10 +1,14 @@
 """Unit tests for the HybridRAGBase and QdrantStore shared primitives."""
 
-from unittest.mock import MagicMock
+import threading
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from ols.src.rag.hybrid_rag import HybridRAGBase, QdrantStore
+from ols.constants import HybridRAGBackend
+from ols.src.rag import hybrid_rag
+from ols.src.rag.hybrid_rag import CorpusSnapshot, HybridRAGBase, QdrantStore
+from ols.src.rag.matrix_store import MatrixStore
 
 DIMENSION = 8
 
@@ -102,20 +106,31 @@ class TestQdrantStore:
         assert len(store_a.get_all()["ids"]) == 1
         assert len(store_b.get_all()["ids"]) == 0
 
+    def test_get_all_reads_all_pages(self) -> None:
+        """Verify get_all returns all documents, not only the first scroll page."""
+        store = QdrantStore("test")
+        ids = [f"doc-{i}" for i in range(5)]
+        store.upsert(ids=ids, docs=ids, vectors=[[0.1] * DIMENSION] * len(ids))
+
+        with patch("ols.src.rag.hybrid_rag._SCROLL_PAGE_SIZE", 2):
+            data = store.get_all()
+
+        assert sorted(data["ids"]) == ids
+
 
 class TestHybridRAGBaseIndex:
-    """Tests for _index_documents and _rebuild_bm25."""
+    """Tests for _index_documents and _remove_documents."""
 
-    def test_index_builds_bm25(self) -> None:
-        """Verify BM25 index is built after indexing documents."""
+    def test_index_adds_to_bm25(self) -> None:
+        """Verify documents are added to BM25 index when indexed."""
         rag = _make_base()
-        assert rag.bm25 is None
+        assert len(rag.bm25) == 0
         rag._index_documents(
             ids=["a"],
             docs=["hello world"],
             vectors=[_fake_encode("hello world")],
         )
-        assert rag.bm25 is not None
+        assert "a" in rag.bm25
 
     def test_index_stores_in_qdrant(self) -> None:
         """Verify documents are stored in the Qdrant store."""
@@ -148,6 +163,73 @@ class TestHybridRAGBaseIndex:
         rag._index_documents(ids=["a"], docs=["doc updated"], vectors=docs)
         data = rag.store.get_all()
         assert len(data["ids"]) == 1
+        assert len(rag.bm25) == 1
+        assert rag._sparse_scores("updated")[0]["a"] == pytest.approx(1.0)
+
+    def test_reindex_skips_unchanged_documents(self) -> None:
+        """Verify only new or changed documents are indexed again."""
+        rag = _make_base()
+        rag._index_documents(
+            ids=["a", "b"],
+            docs=["one", "two"],
+            vectors=[_fake_encode("one"), _fake_encode("two")],
+            metadatas=[{"key": "v1"}, {"key": "v2"}],
+        )
+        snapshot = rag.snapshot
+
+        with (
+            patch.object(rag.store, "upsert") as mock_upsert,
+            patch.object(rag.bm25, "add") as mock_add,
+        ):
+            rag._index_documents(
+                ids=["a", "b"],
+                docs=["one", "two"],
+                vectors=[_fake_encode("one"), _fake_encode("two")],
+                metadatas=[{"key": "v1"}, {"key": "v2"}],
+            )
+            assert rag.snapshot is snapshot
+            mock_upsert.assert_not_called()
+            mock_add.assert_not_called()
+
+            rag._index_documents(
+                ids=["a", "b", "c"],
+                docs=["one", "two", "three"],
+                vectors=[_fake_encode(t) for t in ("one", "two", "three")],
+                metadatas=[{"key": "v1"}, {"key": "changed"}, {"key": "v3"}],
+            )
+            assert mock_upsert.call_args.args[0] == ["b", "c"]
+            assert [c.args[0] for c in mock_add.call_args_list] == ["b", "c"]
+
+    def test_populate_does_not_encode_unchanged_documents(self) -> None:
+        """Verify repeated population encodes only new or changed documents."""
+        mock_encode_batch = MagicMock(
+            side_effect=lambda texts: [_fake_encode(t) for t in texts]
+        )
+        rag = _make_base(encode_batch_fn=mock_encode_batch)
+        rag._populate(ids=["a", "b"], docs=["one", "two"])
+        mock_encode_batch.reset_mock()
+
+        rag._populate(ids=["a", "b"], docs=["one", "two"])
+        mock_encode_batch.assert_not_called()
+
+        rag._populate(ids=["a", "b"], docs=["one", "changed"])
+        mock_encode_batch.assert_called_once_with(["changed"])
+        assert rag.snapshot.documents == ("one", "changed")
+
+    def test_remove_documents(self) -> None:
+        """Verify removed documents are dropped from store and BM25 index."""
+        rag = _make_base()
+        rag._index_documents(
+            ids=["a", "b"],
+            docs=["kubernetes pods", "file system"],
+            vectors=[_fake_encode("kubernetes pods"), _fake_encode("file system")],
+        )
+
+        rag._remove_documents(["a"])
+
+        assert rag.store.get_all()["ids"] == ["b"]
+        assert "a" not in rag.bm25
+        assert rag._sparse_scores("kubernetes")[0] == {"b": 0.0}
 
     def test_encode_fn_is_called(self) -> None:
         """Verify the encode function is used during indexing."""
@@ -158,6 +240,203 @@ class TestHybridRAGBaseIndex:
         rag._index_documents(ids=["a", "b"], docs=["a", "b"], vectors=vecs)
         assert rag.store.get_all()["ids"]
 
+    def test_encode_batch_fn_is_called_once(self) -> None:
+        """Verify documents are encoded in one batch when batch function is set."""
+        mock_encode = MagicMock(side_effect=_fake_encode)
+        mock_encode_batch = MagicMock(
+            side_effect=lambda texts: [_fake_encode(t) for t in texts]
+        )
+        rag = _make_base(encode_fn=mock_encode, encode_batch_fn=mock_encode_batch)
+
+        vectors = rag._encode_batch(["a", "b"])
+
+        assert vectors == [_fake_encode("a"), _fake_encode("b")]
+        mock_encode_batch.assert_called_once_with(["a", "b"])
+        mock_encode.assert_not_called()
+
+    def test_encode_batch_without_batch_fn(self) -> None:
+        """Verify documents are encoded one by one without batch function."""
+        mock_encode = MagicMock(side_effect=_fake_encode)
+        rag = _make_base(encode_fn=mock_encode)
+
+        assert rag._encode_batch(["a", "b"]) == [_fake_encode("a"), _fake_encode("b")]
+        assert mock_encode.call_count == 2
+        assert rag._encode_batch([]) == []
+
+
+class TestHybridRAGBaseSnapshot:
+    """Tests for the corpus snapshot."""
+
+    def test_snapshot_is_replaced_on_changes(self) -> None:
+        """Verify indexing and removal swap in a new snapshot version."""
+        rag = _make_base()
+        initial = rag.snapshot
+        assert len(initial) == 0
+
+        rag._index_documents(
+            ids=["a", "b"],
+            docs=["one", "two"],
+            vectors=[_fake_encode("one"), _fake_encode("two")],
+            metadatas=[{"key": "v1"}, {"key": "v2"}],
+        )
+        indexed = rag.snapshot
+        rag._remove_documents(["a"])
+
+        assert len(initial) == 0
+        assert indexed.ids == ("a", "b")
+        assert indexed.documents == ("one", "two")
+        assert indexed.metadata_by_id["b"] == {"key": "v2"}
+        assert rag.snapshot.ids == ("b",)
+        assert initial.version < indexed.version < rag.snapshot.version
+
+    def test_snapshot_is_kept_without_changes(self) -> None:
+        """Verify removing documents not indexed does not swap the snapshot."""
+        rag = _make_base()
+        rag._index_documents(ids=["a"], docs=["one"], vectors=[_fake_encode("one")])
+        snapshot = rag.snapshot
+
+        rag._remove_documents(["missing"])
+        rag._swap_snapshot()
+
+        assert rag.snapshot is snapshot
+
+    def test_snapshot_is_built_from_previous_entries(self) -> None:
+        """Verify a new snapshot is built from the kept entries, not the old one."""
+        rag = _make_base()
+        rag._index_documents(
+            ids=["a", "b"],
+            docs=["one", "two"],
+            vectors=[_fake_encode("one"), _fake_encode("two")],
+        )
+
+        with patch.object(
+            CorpusSnapshot, "build", wraps=CorpusSnapshot.build
+        ) as mock_build:
+            rag._index_documents(
+                ids=["c"], docs=["three"], vectors=[_fake_encode("three")]
+            )
+
+        mock_build.assert_called_once_with(
+            rag.snapshot.version, rag._entries, rag.snapshot.bm25, None
+        )
+        assert rag.snapshot.ids == ("a", "b", "c")
+        assert rag.snapshot.documents == ("one", "two", "three")
+
+    def test_metadata_is_parsed_once(self) -> None:
+        """Verify metadata is parsed when indexed, not when queried."""
+        rag = _make_base()
+        rag._parse_metadata = MagicMock(side_effect=lambda meta: {"parsed": meta})
+        rag._index_documents(
+            ids=["a"], docs=["doc"], vectors=[_fake_encode("doc")], metadatas=[{}]
+        )
+
+        rag._sparse_scores("doc")
+        _, meta = rag._sparse_scores("doc")
+
+        assert meta["a"] == {"parsed": {}}
+        rag._parse_metadata.assert_called_once_with({})
+
+    def test_sparse_scores_do_not_read_store(self) -> None:
+        """Verify queries are answered from the snapshot without reading the store."""
+        rag = _make_base()
+        rag._index_documents(ids=["a"], docs=["pods"], vectors=[_fake_encode("pods")])
+
+        with patch.object(rag.store, "get_all", side_effect=AssertionError):
+            scores, meta = rag._sparse_scores("pods")
+
+        assert scores == {"a": 1.0}
+        assert meta == {"a": {}}
+
+
+class TestHybridRAGBaseEmbeddingSnapshot:
+    """Tests for reuse of embeddings saved in the embedding snapshot."""
+
+    def test_restart_embeds_only_changed_documents(self, tmp_path) -> None:
+        """Verify documents indexed in previous run are not embedded again."""
+        first = _make_base(snapshot_dir=str(tmp_path), model_id="model")
+        first._populate(ids=["a", "b"], docs=["one", "two"])
+        assert (tmp_path / "test.snapshot").is_file()
+
+        mock_encode_batch = MagicMock(
+            side_effect=lambda texts: [_fake_encode(t) for t in texts]
+        )
+        second = _make_base(
+            snapshot_dir=str(tmp_path),
+            model_id="model",
+            encode_batch_fn=mock_encode_batch,
+        )
+        second._populate(ids=["a", "b"], docs=["one", "changed"])
+
+        mock_encode_batch.assert_called_once_with(["changed"])
+        assert second._encode_batch(["one"]) == [pytest.approx(_fake_encode("one"))]
+        assert set(second.store.get_all()["ids"]) == {"a", "b"}
+
+    def test_snapshot_of_other_model_is_not_used(self, tmp_path) -> None:
+        """Verify embeddings of another embedding model are computed again."""
+        _make_base(snapshot_dir=str(tmp_path), model_id="old")._populate(
+            ids=["a"], docs=["one"]
+        )
+        mock_encode = MagicMock(side_effect=_fake_encode)
+        rag = _make_base(
+            snapshot_dir=str(tmp_path), model_id="new", encode_fn=mock_encode
+        )
+
+        rag._populate(ids=["a"], docs=["one"])
+
+        mock_encode.assert_called_once_with("one")
+
+    def test_removed_documents_are_not_current(self, tmp_path) -> None:
+        """Verify removal ages out vectors of removed documents."""
+        rag = _make_base(snapshot_dir=str(tmp_path), model_id="model")
+        rag._populate(ids=["a", "b"], docs=["one", "two"])
+
+        rag._remove_documents(["a"])
+        rag.save_embedding_snapshot()
+
+        assert list(rag._content_hashes) == ["b"]
+        assert len(rag.embedding_snapshot) == 1
+
+    def test_snapshot_is_saved_after_first_population_then_debounced(
+        self, tmp_path
+    ) -> None:
+        """Verify the snapshot is not saved on every population change."""
+        rag = _make_base(snapshot_dir=str(tmp_path), model_id="model")
+        with patch.object(rag.embedding_snapshot, "save") as mock_save:
+            rag._populate(ids=["a"], docs=["one"])
+            mock_save.assert_called_once()
+
+            rag._populate(ids=["b"], docs=["two"])
+            rag._remove_documents(["a"])
+            mock_save.assert_called_once()
+
+            rag._snapshot_saved_at -= hybrid_rag._SNAPSHOT_SAVE_INTERVAL
+            rag._populate(ids=["c"], docs=["three"])
+            assert mock_save.call_count == 2
+            assert set(mock_save.call_args.args[0]) == set(rag._content_hashes.values())
+
+            rag.save_embedding_snapshot()
+            assert mock_save.call_count == 2
+
+    def test_snapshot_is_saved_without_holding_lock(self, tmp_path) -> None:
+        """Verify queries and indexing are not blocked while the file is written."""
+        rag = _make_base(snapshot_dir=str(tmp_path), model_id="model")
+        acquired = []
+
+        def acquire() -> None:
+            acquired.append(rag._lock.acquire(timeout=5))
+            if acquired[-1]:
+                rag._lock.release()
+
+        def save(keys: list[str]) -> None:
+            thread = threading.Thread(target=acquire)
+            thread.start()
+            thread.join()
+
+        with patch.object(rag.embedding_snapshot, "save", side_effect=save):
+            rag._populate(ids=["a"], docs=["one"])
+
+        assert acquired == [True]
+
 
 class TestHybridRAGBaseDenseScores:
     """Tests for _dense_scores."""
@@ -223,6 +502,119 @@ class TestHybridRAGBaseSparseScores:
         assert len(scores) == 3
 
 
+class TestHybridRAGBaseNumpyBackend:
+    """Tests for hybrid retrieval with the numpy backend."""
+
+    def _populated_rag(self) -> HybridRAGBase:
+        """Create numpy backed HybridRAGBase with documents of two servers."""
+        rag = _make_base(backend=HybridRAGBackend.NUMPY)
+        rag._index_documents(
+            ids=["a", "b", "c", "d"],
+            docs=["kubernetes pods", "list pods", "read file", "list files"],
+            vectors=[
+                [1.0, 0.1, 0.0],
+                [0.7, 0.7, 0.1],
+                [0.0, 1.0, 0.2],
+                [0.1, 0.2, 1.0],
+            ],
+            metadatas=[
+                {"server": "s1"},
+                {"server": "s2"},
+                {"server": "s1"},
+                {"server": "s2"},
+            ],
+        )
+        return rag
+
+    def test_numpy_backend_uses_matrix_store(self) -> None:
+        """Verify the numpy backend keeps vectors in the matrix store."""
+        rag = self._populated_rag()
+        assert isinstance(rag.store, MatrixStore)
+        assert isinstance(_make_base().store, QdrantStore)
+
+    @pytest.mark.parametrize("allowed_servers", [None, {"s1"}, {"s2"}])
+    @pytest.mark.parametrize("k", [1, 2, 4])
+    def test_vectorized_fusion_matches_dict_fusion(
+        self, allowed_servers: set[str] | None, k: int
+    ) -> None:
+        """Verify vectorized fusion returns the same top k as dict fusion."""
+        rag = self._populated_rag()
+        query, query_vec = "list pods", [0.9, 0.4, 0.1]
+
+        dense, _, _ = rag._dense_scores(query_vec, k, allowed_servers=allowed_servers)
+        sparse, _ = rag._sparse_scores(query, allowed_servers=allowed_servers)
+        expected = rag._fuse_scores(dense, sparse, 0.5, k)
+        fused = rag._hybrid_scores(
+            query, query_vec, k, 0.5, allowed_servers=allowed_servers
+        )
+
+        assert list(fused) == list(expected)
+        assert fused == pytest.approx(expected)
+
+
+class TestHybridRAGBaseLockFreeQueries:
+    """Tests for queries reading the corpus snapshot without the lock."""
+
+    @pytest.mark.parametrize("backend", list(HybridRAGBackend))
+    def test_query_does_not_wait_for_writer(self, backend: HybridRAGBackend) -> None:
+        """Verify a query is answered while a writer holds the lock."""
+        rag = _make_base(backend=backend)
+        rag._index_documents(
+            ids=["a"], docs=["kubernetes pods"], vectors=[_fake_encode("pods")]
+        )
+        locked, release = threading.Event(), threading.Event()
+
+        def write() -> None:
+            with rag._lock:
+                locked.set()
+                release.wait(timeout=5)
+
+        results: list[dict[str, float]] = []
+        writer = threading.Thread(target=write)
+        writer.start()
+        assert locked.wait(timeout=5)
+        query = threading.Thread(
+            target=lambda: results.append(
+                rag._hybrid_scores("pods", _fake_encode("pods"), 1, 0.5)
+            )
+        )
+        query.start()
+        query.join(timeout=5)
+        answered_while_locked = not query.is_alive()
+        release.set()
+        writer.join()
+        query.join()
+
+        assert answered_while_locked
+        assert list(results[0]) == ["a"]
+
+    @pytest.mark.parametrize("backend", list(HybridRAGBackend))
+    def test_query_scores_documents_of_its_snapshot(
+        self, backend: HybridRAGBackend
+    ) -> None:
+        """Verify documents indexed after the snapshot was taken are not scored."""
+        rag = _make_base(backend=backend)
+        rag._index_documents(
+            ids=["a"], docs=["list pods"], vectors=[_fake_encode("list pods")]
+        )
+        snapshot = rag.snapshot
+
+        rag._index_documents(
+            ids=["b"], docs=["list pods"], vectors=[_fake_encode("list pods")]
+        )
+        fused = rag._hybrid_scores(
+            "list pods", _fake_encode("list pods"), 2, 0.5, snapshot=snapshot
+        )
+
+        assert list(fused) == ["a"]
+        assert set(
+            rag._hybrid_scores("list pods", _fake_encode("list pods"), 2, 0.5)
+        ) == {
+            "a",
+            "b",
+        }
+
+
 class TestHybridRAGBaseFuseScores:
     """Tests for _fuse_scores static method."""
 
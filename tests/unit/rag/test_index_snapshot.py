@@ -0,0 +1,121 @@
+"""Unit tests for the on-disk snapshot of embeddings of indexed documents."""
+
+from unittest.mock import patch
+
+import pytest
+
+from ols.src.rag.index_snapshot import (
+    MAX_UNUSED_RUNS,
+    EmbeddingSnapshot,
+    content_hash,
+)
+
+
+def _saved(path, model_id="model", vectors=None) -> EmbeddingSnapshot:
+    """Create snapshot file with the vectors, return the saved snapshot."""
+    snapshot = EmbeddingSnapshot(str(path), model_id)
+    vectors = vectors or {"a": [1.0, 2.0], "b": [3.0, 4.0]}
+    for key, vector in vectors.items():
+        snapshot.put(key, vector)
+    snapshot.save(vectors)
+    return snapshot
+
+
+def test_content_hash_identifies_text():
+    """Test that content hash changes with the text only."""
+    assert content_hash("list pods") == content_hash("list pods")
+    assert content_hash("list pods") != content_hash("list nodes")
+
+
+def test_round_trip(tmp_path):
+    """Test that saved vectors are loaded in the next run."""
+    path = tmp_path / "tools.snapshot"
+    _saved(path)
+
+    snapshot = EmbeddingSnapshot(str(path), "model")
+
+    assert snapshot.load() == 2
+    assert snapshot.get("a").tolist() == [1.0, 2.0]
+    assert snapshot.get("b").tolist() == [3.0, 4.0]
+    assert snapshot.get("c") is None
+
+
+def test_missing_file_is_empty_snapshot(tmp_path):
+    """Test that missing snapshot file is not an error."""
+    snapshot = EmbeddingSnapshot(str(tmp_path / "missing.snapshot"), "model")
+
+    assert snapshot.load() == 0
+    assert len(snapshot) == 0
+
+
+def test_snapshot_of_other_model_is_ignored(tmp_path):
+    """Test that vectors of another embedding model are not loaded."""
+    path = tmp_path / "tools.snapshot"
+    _saved(path, model_id="old-model")
+
+    snapshot = EmbeddingSnapshot(str(path), "new-model")
+
+    assert snapshot.load() == 0
+    assert snapshot.get("a") is None
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"", b"not a snapshot", b"OLSEMBS1\xff\x00\x00\x00\x00\x00\x00\x00{}"],
+)
+def test_broken_file_is_ignored(tmp_path, content):
+    """Test that broken snapshot file is ignored and replaced."""
+    path = tmp_path / "tools.snapshot"
+    path.write_bytes(content)
+    snapshot = EmbeddingSnapshot(str(path), "model")
+
+    assert snapshot.load() == 0
+
+    snapshot.put("a", [1.0])
+    snapshot.save(["a"])
+    assert EmbeddingSnapshot(str(path), "model").load() == 1
+
+
+def test_unused_vectors_expire(tmp_path):
+    """Test that vectors of texts not indexed are dropped after a few runs."""
+    path = tmp_path / "tools.snapshot"
+    _saved(path)
+
+    for _ in range(MAX_UNUSED_RUNS):
+        snapshot = EmbeddingSnapshot(str(path), "model")
+        snapshot.load()
+        snapshot.save(["a"])
+        assert snapshot.get("b") is not None
+
+    snapshot = EmbeddingSnapshot(str(path), "model")
+    snapshot.load()
+    snapshot.save(["a"])
+
+    assert snapshot.get("b") is None
+    assert EmbeddingSnapshot(str(path), "model").load() == 1
+
+
+def test_unchanged_snapshot_is_not_written(tmp_path):
+    """Test that the file is written only when its vectors change."""
+    path = tmp_path / "tools.snapshot"
+    snapshot = _saved(path)
+
+    with patch("ols.src.rag.index_snapshot.os.replace") as replace:
+        snapshot.save(["a", "b"])
+        replace.assert_not_called()
+
+        snapshot.save(["a"])
+        replace.assert_called_once()
+
+
+def test_write_failure_is_logged(tmp_path, caplog):
+    """Test that snapshot which can not be written does not fail indexing."""
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    snapshot = EmbeddingSnapshot(str(blocker / "tools.snapshot"), "model")
+    snapshot.put("a", [1.0])
+
+    snapshot.save(["a"])
+
+    assert "Can not write embedding snapshot" in caplog.text
+    assert snapshot.get("a") is not None
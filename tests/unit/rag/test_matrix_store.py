@@ -0,0 +1,118 @@
+"""Unit tests for the NumPy matrix vector store."""
+
+import pytest
+
+from ols.src.rag.matrix_store import MatrixStore
+
+
+@pytest.fixture
+def store():
+    """Store with documents of two servers."""
+    store = MatrixStore("test")
+    store.upsert(
+        ids=["a", "b", "c"],
+        docs=["one", "two", "three"],
+        vectors=[[1.0, 0.0], [0.6, 0.8], [0.0, 2.0]],
+        metadatas=[{"server": "s1"}, {"server": "s2"}, {"server": "s1"}],
+    )
+    return store
+
+
+def test_search_returns_cosine_similarities(store):
+    """Test that documents are ranked by cosine similarity to the query."""
+    ids, scores, metas = store.search_with_scores([0.0, 3.0], k=2)
+
+    assert ids == ["c", "b"]
+    assert scores == pytest.approx([1.0, 0.8])
+    assert metas == [{"server": "s1"}, {"server": "s2"}]
+
+
+def test_search_filters_servers(store):
+    """Test that only documents of the allowed servers are returned."""
+    ids, _, _ = store.search_with_scores([0.0, 1.0], k=3, allowed_servers={"s1"})
+    assert ids == ["c", "a"]
+
+    ids, _, _ = store.search_with_scores([0.0, 1.0], k=3, allowed_servers={"s3"})
+    assert ids == []
+
+
+def test_upsert_updates_existing_documents(store):
+    """Test that document with the same ID is replaced, not duplicated."""
+    store.upsert(ids=["a"], docs=["uno"], vectors=[[0.0, 1.0]], metadatas=[{}])
+
+    data = store.get_all()
+    assert data["ids"] == ["a", "b", "c"]
+    assert data["documents"] == ["uno", "two", "three"]
+    ids, scores, _ = store.search_with_scores([0.0, 1.0], k=1, allowed_servers=None)
+    assert ids[0] in {"a", "c"}
+    assert scores[0] == pytest.approx(1.0)
+    ids, _, _ = store.search_with_scores([0.0, 1.0], k=3, allowed_servers={"s1"})
+    assert ids == ["c"]
+
+
+def test_delete_moves_last_document(store):
+    """Test that deleted documents are removed and the others stay searchable."""
+    store.delete(["a", "unknown"])
+
+    assert store.get_all()["ids"] == ["c", "b"]
+    assert len(store) == 2
+    ids, _, _ = store.search_with_scores([1.0, 0.0], k=3)
+    assert ids == ["b", "c"]
+
+
+def test_matrix_grows(store):
+    """Test that documents beyond the initial capacity are stored."""
+    ids = [f"doc-{i}" for i in range(200)]
+    store.upsert(ids=ids, docs=ids, vectors=[[1.0, i + 1.0] for i in range(200)])
+
+    assert len(store) == 203
+    assert store.search_with_scores([0.0, 1.0], k=1)[0] == ["c"]
+    assert store.search_with_scores([1.0, 0.0], k=1)[0] == ["a"]
+
+
+def test_fused_top_k_matches_fusion_of_search_results(store):
+    """Test that vectorized fusion ranks documents like the dict based fusion."""
+    sparse = {"a": 1.6, "b": 2.0}
+
+    fused = store.fused_top_k([0.0, 1.0], sparse, alpha=0.5, k=2)
+
+    # sparse scores are normalized to a 0.8, b 1.0; dense top 2 are c (1.0)
+    # and b (0.8), a gets only its sparse score
+    assert list(fused) == ["b", "c"]
+    assert fused["b"] == pytest.approx(0.5 * 0.8 + 0.5 * 1.0)
+    assert fused["c"] == pytest.approx(0.5)
+
+
+def test_fused_top_k_filters_servers(store):
+    """Test that documents of other servers are not fused."""
+    fused = store.fused_top_k(
+        [0.0, 1.0], {"b": 1.0}, alpha=0.5, k=3, allowed_servers={"s1"}
+    )
+
+    assert list(fused) == ["c", "a"]
+    assert fused["a"] == pytest.approx(0.0)
+
+
+def test_empty_store():
+    """Test that empty store returns no results."""
+    store = MatrixStore("test")
+
+    assert store.search_with_scores([1.0], k=3) == ([], [], [])
+    assert store.fused_top_k([1.0], {}, alpha=0.5, k=3) == {}
+    assert store.get_all() == {"ids": [], "documents": [], "metadatas": []}
+
+
+def test_view_is_not_changed_by_updates(store):
+    """Test that view taken before an update keeps searching the old contents."""
+    view = store.view()
+
+    assert store.view() is view
+
+    store.upsert(ids=["d"], docs=["four"], vectors=[[0.0, 1.0]])
+    store.delete(["c"])
+
+    assert view.search_with_scores([0.0, 1.0], k=3)[0] == ["c", "b", "a"]
+    assert store.view() is not view
+    assert store.view().search_with_scores([0.0, 1.0], k=1)[0] == ["d"]
+    with pytest.raises(ValueError):
+        view.vectors[0, 0] = 0.0
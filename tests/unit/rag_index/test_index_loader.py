@@ -1,10 +1,15 @@
 """Unit test for the index loader module."""
 
+import threading
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 import ols.src.rag_index.index_loader as il
 from ols import config
 from ols.app.models.config import ReferenceContent, ReferenceContentIndex
+from ols.constants import RAG_NODE_TOKEN_COUNT_KEY
+from ols.utils.token_handler import TokenHandler, format_retrieved_chunk
 from tests.mock_classes.mock_llama_index import MockLlamaIndex
 from tests.mock_classes.mock_retrievers import MockRetriever
 
@@ -33,7 +38,7 @@ def test_index_loader_no_id():
 
     with (
         patch(
-            "ols.src.rag_index.index_loader.HuggingFaceEmbedding",
+            "llama_index.embeddings.huggingface.HuggingFaceEmbedding",
             return_value=mock_embed,
         ),
         patch.object(il.IndexLoader, "_load_index"),
@@ -55,7 +60,7 @@ def test_index_loader():
             "llama_index.vector_stores.faiss.FaissVectorStore.from_persist_dir"
         ) as from_persist_dir,
         patch("llama_index.core.load_index_from_storage", new=MockLlamaIndex),
-        patch("ols.src.rag_index.index_loader.HuggingFaceEmbedding"),
+        patch("llama_index.embeddings.huggingface.HuggingFaceEmbedding"),
         patch(
             "llama_index.core.settings.resolve_embed_model",
             side_effect=lambda m, **kw: m,
@@ -78,6 +83,120 @@ def test_index_loader():
         assert isinstance(indexes[0], MockLlamaIndex)
 
 
+def test_index_loader_memory_mapped_docstore(tmp_path):
+    """Test that docstore is converted to compact copy with node token counts."""
+    from llama_index.core.schema import TextNode
+    from llama_index.core.storage.docstore import SimpleDocumentStore
+
+    il.load_llama_index_deps()
+    index_path = tmp_path / "index"
+    docstore = SimpleDocumentStore()
+    docstore.add_documents(
+        [
+            TextNode(id_="node", text="What is Kubernetes?"),
+            # counted when the index was built
+            TextNode(
+                id_="prebuilt",
+                text="OpenShift",
+                metadata={RAG_NODE_TOKEN_COUNT_KEY: 42},
+            ),
+        ]
+    )
+    docstore.persist(str(index_path / "docstore.json"))
+
+    with patch.object(il, "RAG_INDEX_CACHE_PATH", str(tmp_path / "cache")):
+        mapped = il.IndexLoader._load_mapped_docstore(str(index_path), 0)
+        # converted once, the compact copy is current
+        with patch.object(il, "write_compact_docstore") as write:
+            il.IndexLoader._load_mapped_docstore(str(index_path), 0)
+        write.assert_not_called()
+
+    node = mapped.get_node("node")
+    tokens = TokenHandler().text_to_tokens(format_retrieved_chunk(node.get_text()))
+    assert node.get_text() == "What is Kubernetes?"
+    assert node.metadata[RAG_NODE_TOKEN_COUNT_KEY] == len(tokens)
+    assert RAG_NODE_TOKEN_COUNT_KEY in node.excluded_embed_metadata_keys
+    assert RAG_NODE_TOKEN_COUNT_KEY in node.excluded_llm_metadata_keys
+    assert mapped.get_node("prebuilt").metadata[RAG_NODE_TOKEN_COUNT_KEY] == 42
+
+
+def test_index_loader_node_token_count_failure(caplog):
+    """Test that failure to count node tokens does not fail docstore conversion."""
+    docstore = MagicMock()
+    docstore.docs.values.side_effect = RuntimeError("broken docstore")
+
+    il.IndexLoader._count_docstore_tokens(docstore, 3)
+
+    assert "Token counts of vector index #3 nodes are not computed" in caplog.text
+
+
+def test_index_loader_memory_mapped_retrieved_nodes_carry_token_count(tmp_path):
+    """Test that nodes retrieved from memory-mapped index carry token counts."""
+    import faiss
+    from llama_index.core import StorageContext, VectorStoreIndex
+    from llama_index.core.embeddings import MockEmbedding
+    from llama_index.core.schema import TextNode
+    from llama_index.vector_stores.faiss import FaissVectorStore
+
+    embed_model = MockEmbedding(embed_dim=8)
+    index_path = tmp_path / "index"
+    storage_context = StorageContext.from_defaults(
+        vector_store=FaissVectorStore(faiss_index=faiss.IndexFlatL2(8))
+    )
+    texts = ["What is Kubernetes?", "OpenShift is a Kubernetes distribution."]
+    index = VectorStoreIndex(
+        [TextNode(text=text) for text in texts],
+        storage_context=storage_context,
+        embed_model=embed_model,
+    )
+    index.set_index_id("product")
+    storage_context.persist(persist_dir=str(index_path))
+
+    reference_content = ReferenceContent(
+        {
+            "indexes": [
+                {
+                    "product_docs_index_path": str(index_path),
+                    "product_docs_index_id": "product",
+                }
+            ],
+            "memory_mapped": True,
+        }
+    )
+    with (
+        patch.object(il, "RAG_INDEX_CACHE_PATH", str(tmp_path / "cache")),
+        patch.object(il.IndexLoader, "_get_embed_model", return_value=embed_model),
+    ):
+        indexes = il.IndexLoader(reference_content).vector_indexes
+
+    nodes = indexes[0].as_retriever(similarity_top_k=2).retrieve("Kubernetes")
+
+    assert sorted(node.get_text() for node in nodes) == sorted(texts)
+    token_handler = TokenHandler()
+    for node in nodes:
+        tokens = token_handler.text_to_tokens(format_retrieved_chunk(node.get_text()))
+        assert node.metadata[RAG_NODE_TOKEN_COUNT_KEY] == len(tokens)
+
+
+def test_index_loader_memory_mapped_vector_store_fallback(caplog):
+    """Test that FAISS index which can not be memory-mapped is read into memory."""
+    il.load_llama_index_deps()
+    faiss_index = MagicMock()
+
+    with (
+        patch.object(
+            il.faiss, "read_index", side_effect=[RuntimeError("no mmap"), faiss_index]
+        ) as read_index,
+        patch.object(il, "FaissVectorStore") as vector_store,
+    ):
+        il.IndexLoader._load_mapped_vector_store("./some_dir")
+
+    assert read_index.call_count == 2
+    assert read_index.call_args.args == ("./some_dir/default__vector_store.json",)
+    vector_store.assert_called_once_with(faiss_index=faiss_index)
+    assert "can not be memory-mapped" in caplog.text
+
+
 def test_custom_weight_function():
     """Test custom weight function."""
     # Load llamaindex imports
@@ -151,3 +270,87 @@ def test_custom_weight_function():
     assert round(sorted_result[5].score, 4) == round(
         0.735 * (1 - (1 * 0.05)), 4
     )  # 0.6982
+
+
+@pytest.mark.asyncio
+async def test_custom_retriever_searches_indexes_concurrently():
+    """Test that async retrieval searches all indexes at once, off the event loop."""
+    from llama_index.core.schema import NodeWithScore, TextNode
+
+    il.load_llama_index_deps()
+    il.Settings.llm = il.resolve_llm(None)
+
+    # every search waits for the others, so serial searches would fail
+    all_searching = threading.Barrier(3, timeout=5)
+    event_loop_thread = threading.get_ident()
+
+    class IndexRetriever:
+        def __init__(self, index: int):
+            self.index = index
+
+        def retrieve(self, query_bundle):
+            assert threading.get_ident() != event_loop_thread
+            assert query_bundle.query_str == "query_text"
+            all_searching.wait()
+            return [
+                NodeWithScore(
+                    node=TextNode(text=f"chunk{j}_index{self.index}"),
+                    score=0.7 + self.index / 100 - j / 10,
+                )
+                for j in range(2)
+            ]
+
+    retriever = il.QueryFusionRetrieverCustom(
+        retrievers=[IndexRetriever(i) for i in range(3)],
+        similarity_top_k=4,
+        mode="simple",
+        num_queries=1,
+    )
+    nodes = await retriever.aretrieve("query_text")
+
+    assert [node.get_content() for node in nodes] == [
+        "chunk0_index0",
+        "chunk0_index2",
+        "chunk0_index1",
+        "chunk1_index0",
+    ]
+    # scores of other than the first index are diluted
+    assert nodes[2].score == pytest.approx(0.71 * (1 - 0.05))
+
+
+@pytest.mark.asyncio
+async def test_custom_retriever_serves_similar_query_from_cache():
+    """Test that nodes retrieved for a similar query are served from cache."""
+    from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+
+    from ols.src.rag_index.retrieval_cache import SemanticRetrievalCache
+
+    il.load_llama_index_deps()
+    il.Settings.llm = il.resolve_llm(None)
+    index_retriever = MagicMock()
+    index_retriever.retrieve.side_effect = lambda query_bundle: [
+        NodeWithScore(node=TextNode(text=query_bundle.query_str), score=0.8)
+    ]
+    retriever = il.QueryFusionRetrieverCustom(
+        retrievers=[index_retriever],
+        similarity_top_k=4,
+        mode="simple",
+        num_queries=1,
+        retrieval_cache=SemanticRetrievalCache(similarity_threshold=0.95),
+        cache_version="v1",
+    )
+
+    first = await retriever.aretrieve(
+        QueryBundle("how do I scale a deployment", embedding=[1.0, 0.0])
+    )
+    similar = await retriever.aretrieve(
+        QueryBundle("how to scale a deployment", embedding=[0.99, 0.01])
+    )
+    other = await retriever.aretrieve(
+        QueryBundle("what is a pod", embedding=[0.0, 1.0])
+    )
+
+    assert [node.get_content() for node in first] == ["how do I scale a deployment"]
+    assert [node.get_content() for node in similar] == ["how do I scale a deployment"]
+    assert [node.get_content() for node in other] == ["what is a pod"]
+    assert index_retriever.retrieve.call_count == 2
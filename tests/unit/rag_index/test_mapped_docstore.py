@@ -0,0 +1,105 @@
+"""Unit tests for the memory-mapped compact docstore."""
+
+import json
+import os
+
+import pytest
+
+from ols.src.rag_index.mapped_docstore import (
+    DOCSTORE_FILE,
+    MappedDocstoreFile,
+    MappedKVStoreData,
+    compact_docstore_path,
+    is_current,
+    write_compact_docstore,
+)
+
+DATA = {
+    "docstore/data": {
+        "node-1": {"__data__": {"text": "What is Kubernetes?"}, "__type__": "1"},
+        "node-2": {"__data__": {"text": "Žluťoučký kůň"}, "__type__": "1"},
+    },
+    "docstore/metadata": {"node-1": {"doc_hash": "abc"}},
+}
+
+
+@pytest.fixture
+def source_path(tmp_path):
+    """Docstore JSON persisted by LlamaIndex."""
+    path = tmp_path / "index" / DOCSTORE_FILE
+    path.parent.mkdir()
+    path.write_text(json.dumps(DATA), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def compact_path(tmp_path, source_path):
+    """Compact docstore converted from the source docstore."""
+    path = compact_docstore_path(os.path.dirname(source_path), str(tmp_path / "cache"))
+    write_compact_docstore(path, DATA, source_path)
+    return path
+
+
+def test_values_are_read_from_compact_docstore(compact_path):
+    """Test that every stored value is read back from the mapped file."""
+    docstore = MappedDocstoreFile(compact_path)
+
+    assert docstore.get("node-1", "docstore/data") == DATA["docstore/data"]["node-1"]
+    assert docstore.get("node-2", "docstore/data") == DATA["docstore/data"]["node-2"]
+    assert docstore.get("node-1", "docstore/metadata") == {"doc_hash": "abc"}
+    assert docstore.get("node-3", "docstore/data") is None
+    assert docstore.get("node-1", "docstore/ref_doc_info") is None
+    assert list(docstore.keys("docstore/data")) == ["node-1", "node-2"]
+    assert len(docstore) == 3
+    docstore.close()
+
+
+def test_compact_docstore_path_is_unique_for_index(tmp_path):
+    """Test that indexes in different directories do not share compact docstore."""
+    cache_dir = str(tmp_path / "cache")
+
+    first = compact_docstore_path("/indexes/first", cache_dir)
+
+    assert os.path.dirname(first) == cache_dir
+    assert first == compact_docstore_path("/indexes/first/", cache_dir)
+    assert first != compact_docstore_path("/indexes/second", cache_dir)
+
+
+def test_compact_docstore_is_current(compact_path, source_path):
+    """Test that compact docstore is current until the source docstore changes."""
+    assert is_current(compact_path, source_path)
+
+    with open(source_path, "a", encoding="utf-8") as source:
+        source.write(" ")
+
+    assert not is_current(compact_path, source_path)
+
+
+def test_missing_or_invalid_compact_docstore_is_not_current(tmp_path, source_path):
+    """Test that docstore is converted when compact copy is missing or broken."""
+    path = tmp_path / "broken.docstore"
+
+    assert not is_current(str(path), source_path)
+
+    path.write_bytes(b"not a compact docstore")
+    assert not is_current(str(path), source_path)
+    with pytest.raises(ValueError, match="is not a compact docstore file"):
+        MappedDocstoreFile(str(path))
+
+
+def test_changes_are_kept_over_compact_docstore(compact_path):
+    """Test that values put or deleted after loading take precedence over file."""
+    data = MappedKVStoreData(MappedDocstoreFile(compact_path))
+
+    data.put("node-1", {"__data__": {"text": "updated"}}, "docstore/data")
+    data.put("node-3", {"__data__": {"text": "added"}}, "docstore/data")
+    assert data.delete("node-2", "docstore/data")
+    assert not data.delete("node-4", "docstore/data")
+
+    assert data.get("node-1", "docstore/data") == {"__data__": {"text": "updated"}}
+    assert data.get("node-2", "docstore/data") is None
+    assert data.get_all("docstore/data") == {
+        "node-1": {"__data__": {"text": "updated"}},
+        "node-3": {"__data__": {"text": "added"}},
+    }
+    assert data.get_all("docstore/metadata") == {"node-1": {"doc_hash": "abc"}}
@@ -0,0 +1,86 @@
+"""Unit tests for the semantic cache of RAG retrieval results."""
+
+from unittest.mock import patch
+
+import pytest
+
+from ols.src.rag_index.retrieval_cache import (
+    SemanticRetrievalCache,
+    rag_retrieval_cache_hits_total,
+    rag_retrieval_cache_misses_total,
+    rag_retrieval_cache_saved_seconds_total,
+)
+
+
+def test_similar_query_is_served_from_cache():
+    """Test that nodes are served for query with similar embedding."""
+    cache = SemanticRetrievalCache(similarity_threshold=0.95)
+    cache.put([1.0, 0.0, 0.0], "v1", ["node"], duration=0.2)
+
+    # cosine similarity does not depend on the vector length
+    assert cache.get([2.0, 0.1, 0.0], "v1") == ["node"]
+    assert cache.get([1.0, 1.0, 0.0], "v1") is None
+
+
+def test_most_similar_query_is_served():
+    """Test that nodes of the most similar cached query are served."""
+    cache = SemanticRetrievalCache(similarity_threshold=0.5)
+    cache.put([1.0, 0.0], "v1", ["first"], duration=0.1)
+    cache.put([0.8, 0.6], "v1", ["second"], duration=0.1)
+
+    assert cache.get([0.7, 0.7], "v1") == ["second"]
+    assert cache.get([1.0, 0.1], "v1") == ["first"]
+
+
+def test_entries_of_other_index_version_are_dropped():
+    """Test that retrievals from previous version of indexes are not served."""
+    cache = SemanticRetrievalCache()
+    cache.put([1.0, 0.0], "v1", ["node"], duration=0.1)
+
+    assert cache.get([1.0, 0.0], "v2") is None
+    assert len(cache) == 0
+
+
+def test_expired_entries_are_dropped():
+    """Test that retrievals are served only for the TTL."""
+    cache = SemanticRetrievalCache(ttl=60)
+    with patch("ols.src.rag_index.retrieval_cache.time.monotonic", return_value=100):
+        cache.put([1.0, 0.0], "v1", ["node"], duration=0.1)
+
+    with patch("ols.src.rag_index.retrieval_cache.time.monotonic", return_value=159):
+        assert cache.get([1.0, 0.0], "v1") == ["node"]
+    with patch("ols.src.rag_index.retrieval_cache.time.monotonic", return_value=160):
+        assert cache.get([1.0, 0.0], "v1") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_dropped():
+    """Test that cache is bounded, dropping the least recently used retrieval."""
+    cache = SemanticRetrievalCache(max_entries=2)
+    cache.put([1.0, 0.0, 0.0], "v1", ["first"], duration=0.1)
+    cache.put([0.0, 1.0, 0.0], "v1", ["second"], duration=0.1)
+    assert cache.get([1.0, 0.0, 0.0], "v1") == ["first"]
+
+    cache.put([0.0, 0.0, 1.0], "v1", ["third"], duration=0.1)
+
+    assert len(cache) == 2
+    assert cache.get([0.0, 1.0, 0.0], "v1") is None
+    assert cache.get([1.0, 0.0, 0.0], "v1") == ["first"]
+
+
+def test_hits_misses_and_saved_time_are_counted():
+    """Test that cache hit ratio and saved retrieval time are exposed."""
+    cache = SemanticRetrievalCache()
+    hits = rag_retrieval_cache_hits_total._value.get()
+    misses = rag_retrieval_cache_misses_total._value.get()
+    saved = rag_retrieval_cache_saved_seconds_total._value.get()
+
+    assert cache.get([1.0, 0.0], "v1") is None
+    cache.put([1.0, 0.0], "v1", ["node"], duration=0.25)
+    assert cache.get([1.0, 0.0], "v1") == ["node"]
+
+    assert rag_retrieval_cache_hits_total._value.get() == hits + 1
+    assert rag_retrieval_cache_misses_total._value.get() == misses + 1
+    assert rag_retrieval_cache_saved_seconds_total._value.get() == pytest.approx(
+        saved + 0.25
+    )
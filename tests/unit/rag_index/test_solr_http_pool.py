@@ -0,0 +1,129 @@
+"""Unit tests for the pooled HTTP client of Solr hybrid search."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from ols.src.rag_index.solr_http_pool import (
+    SolrConnectionPool,
+    _attach_trace,
+    solr_http_connections_opened_total,
+    solr_http_requests_in_flight,
+    solr_http_requests_total,
+)
+
+_URL = "http://solr/solr/portal-rag/select"
+
+
+def _pool(**kwargs) -> SolrConnectionPool:
+    """Create pool with test defaults."""
+    defaults = {
+        "timeout_s": 5.0,
+        "max_connections": 4,
+        "max_keepalive_connections": 2,
+        "keepalive_expiry_s": 30.0,
+    }
+    defaults.update(kwargs)
+    return SolrConnectionPool(**defaults)
+
+
+def _patch_client() -> patch:
+    """Patch ``httpx.AsyncClient`` to create mock clients answering every GET."""
+
+    def client_factory(*args, **kwargs) -> AsyncMock:
+        client = AsyncMock()
+        response = httpx.Response(200, json={}, request=httpx.Request("GET", _URL))
+        client.get = AsyncMock(return_value=response)
+        return client
+
+    return patch(
+        "ols.src.rag_index.solr_http_pool.httpx.AsyncClient",
+        side_effect=client_factory,
+    )
+
+
+@pytest.mark.asyncio
+async def test_requests_from_different_event_loops_share_client():
+    """Test that requests from any event loop are sent by one pooled client."""
+    pool = _pool()
+    with _patch_client() as client_class:
+        response = await pool.get(_URL, params={"q": "*:*"})
+        # non-streaming queries search from their own event loop
+        other = threading.Thread(target=asyncio.run, args=(pool.get(_URL),))
+        other.start()
+        other.join()
+        client = pool._client
+        await pool.aclose()
+
+    assert response.status_code == 200
+    client_class.assert_called_once()
+    assert client.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_client_and_next_request_restarts_pool():
+    """Test that closed pool closes its client and starts again when used."""
+    pool = _pool()
+    with _patch_client() as client_class:
+        await pool.get(_URL)
+        thread = pool._thread
+        first = pool._client
+        await pool.aclose()
+
+        assert not thread.is_alive()
+        first.aclose.assert_awaited_once()
+
+        await pool.get(_URL)
+        await pool.aclose()
+
+    assert client_class.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_client_settings():
+    """Test that client is created with pool limits, without HTTP/2 when missing."""
+    with (
+        _patch_client() as client_class,
+        patch("ols.src.rag_index.solr_http_pool._http2_available", return_value=False),
+    ):
+        pool = _pool()
+        await pool.get(_URL)
+        await pool.aclose()
+
+    kwargs = client_class.call_args.kwargs
+    assert kwargs["timeout"] == 5.0
+    assert kwargs["limits"] == httpx.Limits(
+        max_connections=4, max_keepalive_connections=2, keepalive_expiry=30.0
+    )
+    assert kwargs["http2"] is False
+
+
+@pytest.mark.asyncio
+async def test_request_metrics():
+    """Test that requests are counted by HTTP version and not left in flight."""
+    pool = _pool()
+    requests = solr_http_requests_total.labels(http_version="HTTP/1.1")
+    sent = requests._value.get()
+    with _patch_client():
+        await pool.get(_URL)
+        await pool.aclose()
+
+    assert requests._value.get() == sent + 1
+    assert solr_http_requests_in_flight._value.get() == 0
+
+
+@pytest.mark.asyncio
+async def test_trace_counts_opened_connections():
+    """Test that only connection events of the trace are counted."""
+    request = httpx.Request("GET", _URL)
+    await _attach_trace(request)
+    trace = request.extensions["trace"]
+    opened = solr_http_connections_opened_total._value.get()
+
+    await trace("connection.connect_tcp.complete", {})
+    await trace("http11.send_request_headers.complete", {})
+
+    assert solr_http_connections_opened_total._value.get() == opened + 1
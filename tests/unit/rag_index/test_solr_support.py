@@ -35,12 +35,10 @@ def _ok_response(payload: dict[str, Any]) -> httpx.Response:
 def _patch_httpx_client(
     fake_post: AsyncMock, fake_get: AsyncMock | None = None
 ) -> patch:
-    """Patch ``httpx.AsyncClient`` context manager to use a mock client."""
+    """Patch ``httpx.AsyncClient`` of the connection pool to use a mock client."""
     mock_client = AsyncMock()
     mock_client.post = fake_post
     mock_client.get = fake_get if fake_get is not None else AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
     return patch(
         "ols.src.rag_index.solr_support.httpx.AsyncClient",
         return_value=mock_client,
@@ -477,8 +475,8 @@ async def test_solr_hybrid_search_max_expansion_neighbors_zero_with_budget() ->
 
 
 @pytest.mark.asyncio
-async def test_solr_hybrid_search_creates_fresh_client_per_search() -> None:
-    """Each search creates a fresh ``httpx.AsyncClient`` (no stale pool)."""
+async def test_solr_hybrid_search_reuses_pooled_client() -> None:
+    """Searches share one pooled ``httpx.AsyncClient``, closed by ``aclose``."""
     clients_created: list[AsyncMock] = []
 
     def encode_fn(text: str) -> list[float]:
@@ -504,8 +502,6 @@ async def test_solr_hybrid_search_creates_fresh_client_per_search() -> None:
         mock = AsyncMock()
         mock.post = fake_post
         mock.get = AsyncMock()
-        mock.__aenter__ = AsyncMock(return_value=mock)
-        mock.__aexit__ = AsyncMock(return_value=False)
         clients_created.append(mock)
         return mock
 
@@ -518,10 +514,11 @@ async def test_solr_hybrid_search_creates_fresh_client_per_search() -> None:
     ):
         client = SolrHybridSearch(SolrHybridSettings(), encode_fn)
         await client.search("q1")
-        await client.search("q2")
-    assert len(clients_created) == 2
-    for mock in clients_created:
-        mock.__aexit__.assert_awaited_once()
+        chunks = await client.search("q2")
+        await client.aclose()
+    assert len(chunks) == 1
+    assert len(clients_created) == 1
+    clients_created[0].aclose.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -2,6 +2,7 @@
 
 from unittest.mock import MagicMock, patch
 
+import psycopg2
 import pytest
 
 from ols import constants
@@ -61,7 +62,7 @@ def test_quota_scheduler_no_connection():
 
     # don't connect to real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
-        mock_connect.return_value = None
+        mock_connect.side_effect = psycopg2.OperationalError("connection refused")
 
         # quota scheduler should not start
         assert quota_scheduler(config) is False
@@ -188,9 +189,9 @@ def test_connect():
         mock_connect.return_value.cursor.return_value.execute.side_effect = Exception(
             exception_message
         )
-        connection = connect(config)
+        pool = connect(config)
 
-        assert connection is not None
+        assert pool is not None
 
 
 def test_connect_passes_sslrootcert():
@@ -260,9 +261,8 @@ def test_increase_quota():
         )
 
         # try to connect to mocked Postgres
-        connection = connect(config)
-
-        increase_quota(connection, subject_id, increase_by, period)
+        with connect(config).connection() as connection:
+            increase_quota(connection, subject_id, increase_by, period)
 
         # quota should be increased in mocked database
         mock_cursor.execute.assert_called_once_with(
@@ -286,12 +286,12 @@ def test_reset_quota():
 
     # don't connect to real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
-        # try to connect to mocked Postgres
-        connection = connect(config)
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
-        reset_quota(connection, subject_id, reset_to, period)
+        # try to connect to mocked Postgres
+        with connect(config).connection() as connection:
+            reset_quota(connection, subject_id, reset_to, period)
 
         # quota should be reset in mocked database
         mock_cursor.execute.assert_called_once_with(
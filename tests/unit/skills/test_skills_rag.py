@@ -1,6 +1,8 @@
 """Unit tests for skills_rag module."""
 
+import threading
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -435,6 +437,20 @@ class TestSkillsRAGPopulate:
         assert skills[0].source_path in rag._skills
         assert rag._skills[skills[0].source_path].name == skills[0].name
 
+    def test_populate_encodes_skills_in_one_batch(self) -> None:
+        """Verify all skills are encoded by one call of the batch function."""
+        encode_batch = MagicMock(
+            side_effect=lambda texts: [_fake_encode(t) for t in texts]
+        )
+        rag = _make_rag(encode_batch_fn=encode_batch)
+        skills = _sample_skills()
+        rag.populate_skills(skills)
+
+        encode_batch.assert_called_once_with(
+            [f"{skill.name} {skill.description}" for skill in skills]
+        )
+        assert len(rag.store.get_all()["ids"]) == len(skills)
+
 
 class TestSkillsRAGRetrieve:
     """Tests for SkillsRAG.retrieve_skill."""
@@ -453,6 +469,33 @@ class TestSkillsRAGRetrieve:
         assert skill.name
         assert 0.0 <= score <= 1.0
 
+    def test_retrieve_does_not_wait_for_indexing(self) -> None:
+        """Verify a skill is retrieved while skills are being indexed."""
+        rag = self._populated_rag()
+        locked, release = threading.Event(), threading.Event()
+
+        def index() -> None:
+            with rag._lock:
+                locked.set()
+                release.wait(timeout=5)
+
+        results: list[tuple[Skill | None, float]] = []
+        writer = threading.Thread(target=index)
+        writer.start()
+        assert locked.wait(timeout=5)
+        query = threading.Thread(
+            target=lambda: results.append(rag.retrieve_skill("my pod is crashing"))
+        )
+        query.start()
+        query.join(timeout=5)
+        answered_while_locked = not query.is_alive()
+        release.set()
+        writer.join()
+        query.join()
+
+        assert answered_while_locked
+        assert isinstance(results[0][0], Skill)
+
     def test_retrieve_returns_none_when_empty(self) -> None:
         """Verify None returned when no skills are populated."""
         rag = _make_rag()
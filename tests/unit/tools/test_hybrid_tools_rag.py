@@ -1,7 +1,9 @@
 """Unit tests for hybrid_tools_rag module."""
 
+import threading
 from unittest.mock import MagicMock
 
+from ols.constants import HybridRAGBackend
 from ols.src.tools.tools_rag.hybrid_tools_rag import ToolsRAG
 
 DIMENSION = 8
@@ -59,6 +61,20 @@ class TestToolsRAGPopulate:
         assert "k8s-server::get_pods" in data["ids"]
         assert "file-server::read_file" in data["ids"]
 
+    def test_populate_encodes_tools_in_one_batch(self) -> None:
+        """Verify all tools are encoded by one call of the batch function."""
+        encode_batch = MagicMock(
+            side_effect=lambda texts: [_fake_encode(t) for t in texts]
+        )
+        rag = _make_rag(encode_batch_fn=encode_batch)
+        rag.populate_tools(_sample_tools())
+
+        encode_batch.assert_called_once()
+        assert encode_batch.call_args.args[0][0] == (
+            "get_pods List Kubernetes pods in a namespace"
+        )
+        assert len(rag.store.get_all()["ids"]) == 4
+
 
 class TestToolsRAGRetrieveHybrid:
     """Tests for ToolsRAG.retrieve_hybrid."""
@@ -81,6 +97,57 @@ class TestToolsRAGRetrieveHybrid:
             for tool in tools:
                 assert "server" not in tool
 
+    def test_retrieve_does_not_wait_for_indexing(self) -> None:
+        """Verify tools are retrieved while documents are being indexed."""
+        rag = self._populated_rag()
+        locked, release = threading.Event(), threading.Event()
+
+        def index() -> None:
+            with rag._lock:
+                locked.set()
+                release.wait(timeout=5)
+
+        results: list[dict] = []
+        writer = threading.Thread(target=index)
+        writer.start()
+        assert locked.wait(timeout=5)
+        query = threading.Thread(
+            target=lambda: results.append(rag.retrieve_hybrid("list pods"))
+        )
+        query.start()
+        query.join(timeout=5)
+        answered_while_locked = not query.is_alive()
+        release.set()
+        writer.join()
+        query.join()
+
+        assert answered_while_locked
+        assert results[0]
+
+    def test_retrieve_does_not_modify_snapshot(self) -> None:
+        """Verify returned tools are copies of the tools kept in the snapshot."""
+        rag = self._populated_rag()
+
+        first = rag.retrieve_hybrid("list pods")
+        second = rag.retrieve_hybrid("list pods")
+
+        assert first == second
+        tool = rag.snapshot.metadata_by_id["k8s-server::get_pods"]
+        assert tool["server"] == "k8s-server"
+
+    def test_retrieve_with_numpy_backend(self) -> None:
+        """Verify numpy backend returns the same tools as the Qdrant backend."""
+        qdrant = self._populated_rag(alpha=0.0, top_k=2)
+        matrix = self._populated_rag(alpha=0.0, top_k=2, backend=HybridRAGBackend.NUMPY)
+
+        result = matrix.retrieve_hybrid("kubernetes pods")
+
+        assert result == qdrant.retrieve_hybrid("kubernetes pods")
+        assert [tool["name"] for tool in result["k8s-server"]] == [
+            "get_pods",
+            "get_namespaces",
+        ]
+
     def test_retrieve_respects_top_k(self) -> None:
         """Verify at most top_k tools are returned."""
         rag = self._populated_rag(top_k=2)
@@ -247,15 +314,16 @@ class TestRemoveTools:
         assert len(data["ids"]) == initial_count - 1
         assert "k8s-server::get_pods" not in data["ids"]
 
-    def test_remove_rebuilds_bm25(self) -> None:
-        """Verify BM25 is rebuilt after removal."""
+    def test_remove_updates_bm25(self) -> None:
+        """Verify removed tool is dropped from BM25 index."""
         rag = _make_rag()
         rag.set_default_servers(["k8s-server"])
         rag.populate_tools([_make_tool("t1", "desc", "k8s-server")])
-        assert rag.bm25 is not None
+        assert "k8s-server::t1" in rag.bm25
 
         rag.remove_tools(["k8s-server::t1"])
-        assert rag.bm25 is None
+        assert len(rag.bm25) == 0
+        assert rag._retrieve_sparse_scores("desc") == ({}, {})
 
 
 class TestConvertLangchainTool:
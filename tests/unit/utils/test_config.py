@@ -1,11 +1,14 @@
 """Unit tests for the configuration models."""
 
+import asyncio
 import io
 import logging
 import re
+import threading
+import time
 import traceback
 from typing import TypeVar
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 from pydantic import ValidationError
@@ -1202,6 +1205,9 @@ dev_config:
         def get_text_embedding(self, text: str) -> list[float]:
             return [0.0]
 
+        def get_text_embedding_batch(self, texts: list[str]) -> list[list[float]]:
+            return [[0.0] for _ in texts]
+
     with (
         patch(
             "llama_index.embeddings.huggingface.HuggingFaceEmbedding",
@@ -1231,3 +1237,48 @@ dev_config:
             model_name=constants.SOLR_HYBRID_EMBEDDING_MODEL_ID
         )
     config.reload_empty()
+
+
+def test_close_clients_saves_embedding_snapshots_of_created_rags_only():
+    """Check that snapshots are saved without creating ToolsRAG or SkillsRAG."""
+    tools_rag = MagicMock()
+    config.__dict__["tools_rag"] = tools_rag
+    config.__dict__.pop("skills_rag", None)
+    try:
+        asyncio.run(config.close_clients())
+    finally:
+        config.__dict__.pop("tools_rag", None)
+
+    tools_rag.save_embedding_snapshot.assert_called_once_with()
+    assert "skills_rag" not in config.__dict__
+
+
+def test_embedding_service_is_created_once_for_concurrent_consumers():
+    """Check that consumers created concurrently share one embedding service."""
+    config.reload_from_yaml_file("tests/config/valid_config.yaml")
+    config._embedding_services.clear()
+
+    def load_model(model_path: str) -> MagicMock:
+        # loading the model takes long, the other threads have to wait for it
+        time.sleep(0.05)
+        return MagicMock()
+
+    services = []
+    with patch(
+        "ols.utils.config.embedding_models.encode_batch_fn", side_effect=load_model
+    ) as mock_encode_batch_fn:
+        threads = [
+            threading.Thread(
+                target=lambda: services.append(config._embedding_service("model"))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    mock_encode_batch_fn.assert_called_once_with("model")
+    assert len(services) == 8
+    assert all(service is services[0] for service in services)
+    config._embedding_services.clear()
@@ -1,12 +1,27 @@
-"""Unit tests for PostgresBase and the connection decorator."""
+"""Unit tests for PostgresBase, the connection pool and the connection decorator."""
 
 from unittest.mock import MagicMock, call, patch
 
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 import pytest
 
 from ols.app.models.config import TLSSecurityProfile
-from ols.utils.postgres import PostgresBase, connection
+from ols.utils import postgres
+from ols.utils.postgres import PostgresBase, PostgresConnectionPool, connection
+
+
+def mock_config(**pool_options) -> MagicMock:
+    """Return a MagicMock PostgresConfig with real connection pool settings."""
+    cfg = MagicMock()
+    cfg.pool_min_size = pool_options.get("pool_min_size", 1)
+    cfg.pool_max_size = pool_options.get("pool_max_size", 2)
+    cfg.pool_timeout = pool_options.get("pool_timeout", 0.1)
+    cfg.pool_health_check_interval = pool_options.get(
+        "pool_health_check_interval", 30.0
+    )
+    return cfg
 
 
 class FakeComponent(PostgresBase):
@@ -26,10 +41,23 @@ class TestConnectionDecorator:
     class Connectable:
         """Minimal connectable for decorator tests."""
 
-        def __init__(self, raise_on_call: bool = False):
+        def __init__(
+            self,
+            raise_on_call: bool = False,
+            errors: tuple = (),
+            commit_before_error: bool = False,
+        ):
             """Initialize connectable."""
             self._connected = False
             self._raise_on_call = raise_on_call
+            self._errors = list(errors)
+            self._commit_before_error = commit_before_error
+            self.calls = 0
+            self.reconnects = 0
+
+        def attached(self) -> bool:
+            """Check connection status without I/O."""
+            return self._connected
 
         def connected(self) -> bool:
             """Check connection status."""
@@ -39,6 +67,11 @@ class TestConnectionDecorator:
             """Establish connection."""
             self._connected = True
 
+        def reconnect(self) -> None:
+            """Re-establish connection."""
+            self.reconnects += 1
+            self.connect()
+
         def disconnect(self) -> None:
             """Drop connection."""
             self._connected = False
@@ -46,8 +79,13 @@ class TestConnectionDecorator:
         @connection
         def do_work(self) -> str:
             """Perform work requiring a connection."""
+            self.calls += 1
             if self._raise_on_call:
                 raise RuntimeError("work failed")
+            if self._errors:
+                if self._commit_before_error:
+                    postgres._commit_started.set(True)
+                raise self._errors.pop(0)
             return "done"
 
     def test_auto_reconnects_when_disconnected(self):
@@ -68,6 +106,14 @@ class TestConnectionDecorator:
             c.do_work()
             mock_connect.assert_not_called()
 
+    def test_does_not_check_liveness(self):
+        """Decorator does not send a liveness probe before the call."""
+        c = self.Connectable()
+        c.connect()
+        with patch.object(c, "connected") as mock_connected:
+            c.do_work()
+            mock_connected.assert_not_called()
+
     def test_propagates_exception_after_reconnect(self):
         """Decorator reconnects then lets the wrapped exception propagate."""
         c = self.Connectable(raise_on_call=True)
@@ -76,6 +122,70 @@ class TestConnectionDecorator:
         with pytest.raises(RuntimeError, match="work failed"):
             c.do_work()
         assert c.connected() is True
+        # not a connection error, so the call is not retried
+        assert c.calls == 1
+        assert c.reconnects == 0
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            psycopg2.OperationalError("server closed the connection"),
+            psycopg2.InterfaceError("connection already closed"),
+        ],
+    )
+    def test_retries_once_on_connection_error(self, error):
+        """Decorator reconnects and retries the call after a connection error."""
+        c = self.Connectable(errors=(error,))
+        c.connect()
+
+        assert c.do_work() == "done"
+        assert c.calls == 2
+        assert c.reconnects == 1
+
+    def test_retries_on_wrapped_connection_error(self):
+        """Decorator recognizes connection error raised as a cause of other error."""
+        try:
+            raise psycopg2.OperationalError("server closed the connection")
+        except psycopg2.OperationalError as e:
+            try:
+                raise RuntimeError("operation failed") from e
+            except RuntimeError as wrapped:
+                error = wrapped
+        c = self.Connectable(errors=(error,))
+        c.connect()
+
+        assert c.do_work() == "done"
+        assert c.reconnects == 1
+
+    def test_does_not_retry_after_commit_started(self):
+        """Decorator does not run the call again when changes may have been committed."""
+        c = self.Connectable(
+            errors=(psycopg2.OperationalError("server closed the connection"),),
+            commit_before_error=True,
+        )
+        c.connect()
+
+        with pytest.raises(psycopg2.OperationalError):
+            c.do_work()
+        assert c.calls == 1
+        assert c.reconnects == 0
+        # the next call starts without changes committed
+        assert c.do_work() == "done"
+
+    def test_retries_only_once(self):
+        """Decorator lets the second connection error propagate."""
+        c = self.Connectable(
+            errors=(
+                psycopg2.OperationalError("first"),
+                psycopg2.OperationalError("second"),
+            )
+        )
+        c.connect()
+
+        with pytest.raises(psycopg2.OperationalError, match="second"):
+            c.do_work()
+        assert c.calls == 2
+        assert c.reconnects == 1
 
 
 class TestPostgresBaseConnect:
@@ -85,7 +195,7 @@ class TestPostgresBaseConnect:
         """DDL statements are executed in declared order, then committed."""
         with patch("psycopg2.connect") as mock_connect:
             cursor = mock_connect.return_value.cursor.return_value
-            FakeComponent(config=MagicMock())
+            FakeComponent(config=mock_config())
 
         cursor.execute.assert_has_calls(
             [
@@ -96,12 +206,16 @@ class TestPostgresBaseConnect:
         cursor.close.assert_called_once()
         mock_connect.return_value.commit.assert_called_once()
 
-    def test_connect_sets_autocommit_after_init(self):
-        """Autocommit is set to True after successful initialization."""
+    def test_connect_returns_connection_in_autocommit_mode(self):
+        """Connection is returned to the pool in autocommit mode after init."""
         with patch("psycopg2.connect") as mock_connect:
-            FakeComponent(config=MagicMock())
+            mock_connect.return_value.get_transaction_status.return_value = (
+                psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            )
+            component = FakeComponent(config=mock_config())
 
         assert mock_connect.return_value.autocommit is True
+        assert component.pool is not None
 
     def test_connect_closes_connection_on_ddl_failure(self):
         """Connection is closed and exception propagates when DDL fails."""
@@ -110,21 +224,32 @@ class TestPostgresBaseConnect:
             cursor.execute.side_effect = psycopg2.DatabaseError("CREATE failed")
 
             with pytest.raises(psycopg2.DatabaseError, match="CREATE failed"):
-                FakeComponent(config=MagicMock())
+                FakeComponent(config=mock_config())
 
         mock_connect.return_value.close.assert_called_once()
 
-    def test_connect_does_not_set_autocommit_on_failure(self):
-        """Autocommit stays at default when initialization fails."""
+    def test_connect_does_not_attach_pool_on_failure(self):
+        """Pool is not attached when initialization fails."""
+        component = FakeComponent.__new__(FakeComponent)
+        component.connection_config = mock_config()
         with patch("psycopg2.connect") as mock_connect:
             cursor = mock_connect.return_value.cursor.return_value
             cursor.execute.side_effect = psycopg2.DatabaseError("fail")
-            mock_connect.return_value.autocommit = False
 
             with pytest.raises(psycopg2.DatabaseError):
-                FakeComponent(config=MagicMock())
+                component.connect()
+
+        assert component.pool is None
+
+    def test_components_share_one_pool(self):
+        """Components configured with the same database share the pool."""
+        config = mock_config()
+        with patch("psycopg2.connect") as mock_connect:
+            first = FakeComponent(config=config)
+            second = FakeComponent(config=config)
 
-        assert mock_connect.return_value.autocommit is False
+        assert first.pool is second.pool
+        mock_connect.assert_called_once()
 
 
 class TestPostgresBaseConnected:
@@ -133,22 +258,30 @@ class TestPostgresBaseConnected:
     def test_connected_returns_true_on_healthy_connection(self):
         """connected() returns True when SELECT 1 succeeds."""
         with patch("psycopg2.connect"):
-            component = FakeComponent(config=MagicMock())
+            component = FakeComponent(config=mock_config())
 
         assert component.connected() is True
 
     def test_connected_returns_false_when_no_connection(self):
         """connected() returns False when connection is None."""
         with patch("psycopg2.connect"):
-            component = FakeComponent(config=MagicMock())
+            component = FakeComponent(config=mock_config())
+
+        component.pool = None
+        assert component.connected() is False
+
+    def test_connected_returns_false_when_pool_is_closed(self):
+        """connected() returns False when the pool has been closed."""
+        with patch("psycopg2.connect"):
+            component = FakeComponent(config=mock_config())
 
-        component.connection = None
+        component.pool.close()
         assert component.connected() is False
 
     def test_connected_returns_false_on_operational_error(self):
         """connected() returns False on OperationalError."""
         with patch("psycopg2.connect") as mock_connect:
-            component = FakeComponent(config=MagicMock())
+            component = FakeComponent(config=mock_config())
 
         cursor_mock = mock_connect.return_value.cursor.return_value
         cursor_mock.__enter__.return_value.execute.side_effect = (
@@ -159,7 +292,7 @@ class TestPostgresBaseConnected:
     def test_connected_returns_false_on_interface_error(self):
         """connected() returns False on InterfaceError."""
         with patch("psycopg2.connect") as mock_connect:
-            component = FakeComponent(config=MagicMock())
+            component = FakeComponent(config=mock_config())
 
         cursor_mock = mock_connect.return_value.cursor.return_value
         cursor_mock.__enter__.return_value.execute.side_effect = (
@@ -173,7 +306,7 @@ class TestPostgresBaseTlsProfile:
 
     def _mock_config(self, profile: TLSSecurityProfile | None = None) -> MagicMock:
         """Return a MagicMock PostgresConfig with the given TLS profile."""
-        cfg = MagicMock()
+        cfg = mock_config()
         cfg.ca_cert_path = None
         cfg.tls_security_profile = profile
         return cfg
@@ -207,3 +340,264 @@ class TestPostgresBaseTlsProfile:
 
         kwargs = mock_connect.call_args.kwargs
         assert "ssl_min_protocol_version" not in kwargs
+
+
+class TestPostgresBaseTransaction:
+    """Tests for PostgresBase._transaction()."""
+
+    def test_transaction_commits_on_success(self):
+        """Transaction is committed when the block finishes normally."""
+        with patch("psycopg2.connect") as mock_connect:
+            # the transaction is closed by the commit
+            mock_connect.return_value.get_transaction_status.return_value = (
+                psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            )
+            component = FakeComponent(config=mock_config())
+            mock_connect.return_value.commit.reset_mock()
+
+            with component._transaction() as cursor:
+                cursor.execute("INSERT")
+
+        mock_connect.return_value.commit.assert_called_once()
+        mock_connect.return_value.rollback.assert_not_called()
+
+    def test_transaction_rolls_back_on_error(self):
+        """Transaction is rolled back and the error propagates."""
+        with patch("psycopg2.connect") as mock_connect:
+            component = FakeComponent(config=mock_config())
+            mock_connect.return_value.commit.reset_mock()
+
+            with pytest.raises(psycopg2.DatabaseError):
+                with component._transaction():
+                    raise psycopg2.DatabaseError("insert failed")
+
+        mock_connect.return_value.commit.assert_not_called()
+        mock_connect.return_value.rollback.assert_called()
+
+
+class RetryingComponent(FakeComponent):
+    """Component with decorated methods reading and changing data."""
+
+    @connection
+    def read(self) -> list:
+        """Run a query."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT")
+            return cursor.fetchall()
+
+    @connection
+    def write_in_transaction(self) -> None:
+        """Run statements in one transaction."""
+        with self._transaction() as cursor:
+            cursor.execute("INSERT")
+
+    @connection
+    def write_in_autocommit(self) -> None:
+        """Run a statement committed on its own."""
+        with self._cursor(write=True) as cursor:
+            cursor.execute("UPDATE")
+
+
+class TestPostgresBaseRetry:
+    """Tests for retries of decorated PostgresBase methods on connection errors."""
+
+    @staticmethod
+    def _component(mock_connect: MagicMock) -> tuple[RetryingComponent, MagicMock]:
+        """Create component and return it with the cursor of its statements."""
+        conn = mock_connect.return_value
+        conn.get_transaction_status.return_value = (
+            psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        )
+        component = RetryingComponent(config=mock_config())
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = []
+        mock_connect.reset_mock()
+        return component, cursor
+
+    def test_read_is_retried_on_healthy_looking_connection(self):
+        """Query failing on a pooled connection, not checked yet, is retried."""
+        with patch("psycopg2.connect") as mock_connect:
+            component, cursor = self._component(mock_connect)
+            # the pooled connection was used recently, so it passes without
+            # a health check although the database has been restarted
+            cursor.execute.side_effect = [
+                psycopg2.OperationalError("server closed the connection"),
+                None,
+            ]
+
+            with patch.object(
+                component, "reconnect", wraps=component.reconnect
+            ) as mock_reconnect:
+                assert component.read() == []
+
+        mock_reconnect.assert_called_once()
+        # the broken connection and the idle ones are closed and replaced
+        assert mock_connect.call_count == 1
+        assert cursor.execute.call_count == 2
+
+    def test_transaction_failing_before_commit_is_retried(self):
+        """Transaction rolled back by the broken connection is run again."""
+        with patch("psycopg2.connect") as mock_connect:
+            component, cursor = self._component(mock_connect)
+            cursor.execute.side_effect = [
+                psycopg2.OperationalError("server closed the connection"),
+                None,
+            ]
+            component.write_in_transaction()
+
+        assert cursor.execute.call_count == 2
+        mock_connect.return_value.commit.assert_called()
+
+    def test_transaction_failing_in_commit_is_not_retried(self):
+        """Changes may have been applied when COMMIT fails, so they are not repeated."""
+        with patch("psycopg2.connect") as mock_connect:
+            component, cursor = self._component(mock_connect)
+            mock_connect.return_value.commit.side_effect = psycopg2.OperationalError(
+                "server closed the connection"
+            )
+
+            with pytest.raises(psycopg2.OperationalError):
+                component.write_in_transaction()
+
+        assert cursor.execute.call_count == 1
+        mock_connect.assert_not_called()
+
+    def test_autocommit_write_is_not_retried(self):
+        """Statement committed on its own is not run again after a connection error."""
+        with patch("psycopg2.connect") as mock_connect:
+            component, cursor = self._component(mock_connect)
+            cursor.execute.side_effect = psycopg2.OperationalError(
+                "server closed the connection"
+            )
+
+            with pytest.raises(psycopg2.OperationalError):
+                component.write_in_autocommit()
+
+        assert cursor.execute.call_count == 1
+        mock_connect.assert_not_called()
+
+
+class TestPostgresConnectionPool:
+    """Tests for PostgresConnectionPool."""
+
+    def test_pool_opens_min_size_connections(self):
+        """Pool opens pool_min_size connections eagerly."""
+        with patch("psycopg2.connect") as mock_connect:
+            PostgresConnectionPool(mock_config(pool_min_size=2, pool_max_size=3))
+
+        assert mock_connect.call_count == 2
+
+    def test_idle_connection_is_reused(self):
+        """Returned connection is handed out again."""
+        with patch("psycopg2.connect") as mock_connect:
+            pool = PostgresConnectionPool(mock_config())
+            conn = pool.getconn()
+            pool.putconn(conn)
+
+            assert pool.getconn() is conn
+        mock_connect.assert_called_once()
+
+    def test_new_connection_is_opened_up_to_max_size(self):
+        """Pool grows when there is no idle connection."""
+        with patch("psycopg2.connect") as mock_connect:
+            mock_connect.side_effect = [MagicMock(), MagicMock()]
+            pool = PostgresConnectionPool(mock_config(pool_max_size=2))
+
+            first = pool.getconn()
+            second = pool.getconn()
+
+        assert first is not second
+        assert mock_connect.call_count == 2
+
+    def test_exhausted_pool_times_out(self):
+        """PoolError is raised when no connection is freed in time."""
+        with patch("psycopg2.connect"):
+            pool = PostgresConnectionPool(mock_config(pool_max_size=1))
+            pool.getconn()
+
+            with pytest.raises(psycopg2.pool.PoolError, match="timed out"):
+                pool.getconn()
+
+    def test_broken_idle_connection_is_replaced(self):
+        """Idle connection failing the health check is replaced."""
+        broken, fresh = MagicMock(), MagicMock()
+        broken.cursor.return_value.__enter__.return_value.execute.side_effect = (
+            psycopg2.OperationalError("server closed the connection")
+        )
+        with patch("psycopg2.connect") as mock_connect:
+            mock_connect.side_effect = [broken, fresh]
+            pool = PostgresConnectionPool(mock_config(pool_health_check_interval=0.0))
+
+            assert pool.getconn() is fresh
+        broken.close.assert_called_once()
+
+    def test_recently_used_connection_is_not_checked(self):
+        """No health check is made for connections idle for a short time."""
+        with patch("psycopg2.connect") as mock_connect:
+            pool = PostgresConnectionPool(mock_config())
+            pool.getconn()
+
+        mock_connect.return_value.cursor.assert_not_called()
+
+    def test_connection_is_discarded_on_operational_error(self):
+        """Connection is closed instead of returned after a connection error."""
+        with patch("psycopg2.connect") as mock_connect:
+            pool = PostgresConnectionPool(mock_config())
+
+            with pytest.raises(psycopg2.OperationalError):
+                with pool.connection():
+                    raise psycopg2.OperationalError("connection lost")
+
+        mock_connect.return_value.close.assert_called_once()
+        assert not pool._idle
+
+    def test_open_transaction_is_rolled_back_on_return(self):
+        """Transaction left open by the borrower is rolled back."""
+        with patch("psycopg2.connect") as mock_connect:
+            conn = mock_connect.return_value
+            conn.get_transaction_status.return_value = (
+                psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+            )
+            pool = PostgresConnectionPool(mock_config())
+            pool.putconn(pool.getconn())
+
+        conn.rollback.assert_called_once()
+        assert conn.autocommit is True
+
+    def test_closed_pool_refuses_checkout(self):
+        """PoolError is raised when checking out from a closed pool."""
+        with patch("psycopg2.connect") as mock_connect:
+            pool = PostgresConnectionPool(mock_config())
+            pool.close()
+
+            with pytest.raises(psycopg2.pool.PoolError, match="closed"):
+                pool.getconn()
+        mock_connect.return_value.close.assert_called_once()
+
+    def test_discard_idle_closes_idle_connections(self):
+        """Idle connections are closed and new ones are opened on demand."""
+        old, new = MagicMock(), MagicMock()
+        with patch("psycopg2.connect") as mock_connect:
+            mock_connect.side_effect = [old, new]
+            pool = PostgresConnectionPool(mock_config())
+            pool.discard_idle()
+
+            assert pool.getconn() is new
+        old.close.assert_called_once()
+
+
+class TestPostgresBaseReconnect:
+    """Tests for PostgresBase.reconnect()."""
+
+    def test_reconnect_replaces_idle_connections(self):
+        """Reconnect drops idle connections and runs DDL on a new one."""
+        old, new = MagicMock(), MagicMock()
+        with patch("psycopg2.connect") as mock_connect:
+            mock_connect.side_effect = [old, new]
+            component = FakeComponent(config=mock_config())
+
+            component.reconnect()
+
+        old.close.assert_called_once()
+        new.commit.assert_called_once()
+        assert component.attached()
@@ -6,12 +6,20 @@ from unittest import TestCase, mock
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
-from ols.constants import DEFAULT_TOOL_ROUND_CAP_FRACTION, TOKEN_BUFFER_WEIGHT
+from ols.app.models.models import CacheEntry
+from ols.constants import (
+    DEFAULT_TOOL_ROUND_CAP_FRACTION,
+    RAG_NODE_TOKEN_COUNT_KEY,
+    TOKEN_BUFFER_WEIGHT,
+)
 from ols.utils.token_handler import (
     PromptTooLongError,
     TokenBudgetTracker,
     TokenCategory,
+    TokenCountCache,
     TokenHandler,
+    format_retrieved_chunk,
+    token_count_cache,
 )
 from tests.mock_classes.mock_retrieved_node import MockRetrievedNode
 
@@ -172,6 +180,65 @@ class TestTokenHandler(TestCase):
         )
         assert len(rag_chunks) == 1
 
+    @mock.patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 1)
+    @mock.patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
+    def test_token_handler_precomputed_token_counts(self):
+        """Test that only the node that must be cut is tokenized."""
+        nodes = []
+        for text in ("a text text text text", "b text text text text"):
+            count = len(
+                self._token_handler_obj.text_to_tokens(format_retrieved_chunk(text))
+            )
+            nodes.append(
+                MockRetrievedNode(
+                    {
+                        "text": text,
+                        "score": 0.6,
+                        "metadata": {RAG_NODE_TOKEN_COUNT_KEY: count},
+                    }
+                )
+            )
+        first_chunk_tokens = ceil(
+            nodes[0].metadata[RAG_NODE_TOKEN_COUNT_KEY] * TOKEN_BUFFER_WEIGHT
+        )
+        # the second chunk gets 3 tokens only
+        max_tokens = first_chunk_tokens + 1 + 3
+
+        with mock.patch.object(
+            self._token_handler_obj,
+            "text_to_tokens",
+            wraps=self._token_handler_obj.text_to_tokens,
+        ) as mock_text_to_tokens:
+            rag_chunks = self._token_handler_obj.truncate_rag_context(nodes, max_tokens)
+
+        mock_text_to_tokens.assert_called_once_with(
+            format_retrieved_chunk(nodes[1].get_text())
+        )
+        assert rag_chunks[0].text == format_retrieved_chunk(nodes[0].get_text())
+        assert len(self._token_handler_obj.text_to_tokens(rag_chunks[1].text)) == 3
+
+    @mock.patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 1)
+    @mock.patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
+    def test_token_handler_counts_retrieved_node_once(self):
+        """Test that node without stored token count is tokenized on first retrieval only."""
+        token_count_cache.clear()
+        node = MockRetrievedNode(
+            {"text": "a text text text text", "score": 0.6, "metadata": {}}
+        )
+
+        with mock.patch.object(
+            self._token_handler_obj,
+            "text_to_tokens",
+            wraps=self._token_handler_obj.text_to_tokens,
+        ) as mock_text_to_tokens:
+            for _ in range(2):
+                rag_chunks = self._token_handler_obj.truncate_rag_context([node], 500)
+
+        mock_text_to_tokens.assert_called_once_with(
+            format_retrieved_chunk(node.get_text())
+        )
+        assert rag_chunks[0].text == format_retrieved_chunk(node.get_text())
+
     def test_token_handler_empty(self):
         """Test token handler when node is empty."""
         rag_chunks = self._token_handler_obj.truncate_rag_context([], 5)
@@ -318,6 +385,122 @@ class TestTokenHandler(TestCase):
                 max_tokens_for_tools,
             )
 
+    def test_count_tokens(self):
+        """Test that count_tokens applies the buffer weight to the exact count."""
+        text = "What is Kubernetes?"
+        tokens = self._token_handler_obj.text_to_tokens(text)
+
+        assert self._token_handler_obj.count_tokens(text) == ceil(
+            len(tokens) * TOKEN_BUFFER_WEIGHT
+        )
+
+    def test_count_tokens_is_memoized(self):
+        """Test that the same text is tokenized only once."""
+        token_count_cache.clear()
+        text = "You are OpenShift Lightspeed, an intelligent assistant."
+
+        with mock.patch.object(
+            self._token_handler_obj,
+            "text_to_tokens",
+            wraps=self._token_handler_obj.text_to_tokens,
+        ) as mock_text_to_tokens:
+            first = self._token_handler_obj.count_tokens(text)
+            second = self._token_handler_obj.count_tokens(text)
+            # the memo is shared by all instances of the same encoding
+            third = TokenHandler().count_tokens(text)
+
+        assert first == second == third
+        mock_text_to_tokens.assert_called_once_with(text)
+
+    def test_count_tokens_applies_current_buffer_weight(self):
+        """Test that memoized counts are raw, buffer weight is applied per call."""
+        token_count_cache.clear()
+        text = "What is Kubernetes?"
+        tokens = self._token_handler_obj.text_to_tokens(text)
+        self._token_handler_obj.count_tokens(text)
+
+        with mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 2.0):
+            assert self._token_handler_obj.count_tokens(text) == 2 * len(tokens)
+
+    def test_count_entry_tokens(self):
+        """Test that entry token counts are computed once and kept in the entry."""
+        entry = CacheEntry(
+            query=HumanMessage("  What is Kubernetes?\n"),
+            response=AIMessage("Kubernetes is a container orchestrator."),
+        )
+        query_count = len(
+            self._token_handler_obj.text_to_tokens("human: What is Kubernetes?")
+        )
+
+        counts = self._token_handler_obj.count_entry_tokens(entry)
+
+        assert entry.query_tokens == query_count
+        assert entry.response_tokens is not None
+        assert counts == (
+            ceil(entry.query_tokens * TOKEN_BUFFER_WEIGHT),
+            ceil(entry.response_tokens * TOKEN_BUFFER_WEIGHT),
+        )
+
+        # stored counts are used as they are, no tokenization is done
+        entry = CacheEntry(
+            query=HumanMessage("query"),
+            response=AIMessage("response"),
+            query_tokens=10,
+            response_tokens=20,
+        )
+        with mock.patch.object(
+            self._token_handler_obj, "text_to_tokens"
+        ) as mock_text_to_tokens:
+            counts = self._token_handler_obj.count_entry_tokens(entry)
+        mock_text_to_tokens.assert_not_called()
+        assert counts == (
+            ceil(10 * TOKEN_BUFFER_WEIGHT),
+            ceil(20 * TOKEN_BUFFER_WEIGHT),
+        )
+
+    @mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.05)
+    def test_limit_conversation_history_with_token_counts(self):
+        """Check that given token counts are used instead of counting the history."""
+        history = [
+            HumanMessage("first message from human"),
+            AIMessage("first answer from AI"),
+            HumanMessage("second message from human"),
+            AIMessage("second answer from AI"),
+        ]
+
+        with mock.patch.object(
+            self._token_handler_obj, "text_to_tokens"
+        ) as mock_text_to_tokens:
+            truncated_history, truncated = (
+                self._token_handler_obj.limit_conversation_history(
+                    history, 16, [100, 100, 7, 7]
+                )
+            )
+        mock_text_to_tokens.assert_not_called()
+        assert truncated_history == history[2:]
+        assert truncated
+
+    def test_token_count_cache_evicts_least_recently_used(self):
+        """Test that the token count cache is bounded."""
+        cache = TokenCountCache(max_entries=2)
+        keys = [TokenCountCache.key("cl100k_base", text) for text in "abc"]
+        cache.put(keys[0], 1)
+        cache.put(keys[1], 2)
+        assert cache.get(keys[0]) == 1
+
+        cache.put(keys[2], 3)
+
+        assert len(cache) == 2
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == 1
+        assert cache.get(keys[2]) == 3
+
+    def test_token_count_cache_key_contains_encoding(self):
+        """Test that counts of different encodings are not mixed."""
+        assert TokenCountCache.key("cl100k_base", "text") != TokenCountCache.key(
+            "o200k_base", "text"
+        )
+
 
 class TestTokenBudgetTracker(TestCase):
     """Tests for TokenBudgetTracker budget properties."""